@@ -0,0 +1,6 @@
+"""
+ベンチマークパッケージ
+
+コア機能の処理性能を計測するためのスクリプトが含まれます。
+リポジトリのルートから ``python -m benchmarks.<モジュール名>`` で実行します。
+"""
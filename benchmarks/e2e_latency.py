@@ -0,0 +1,384 @@
+"""
+ホットキーからクリップボードまでのエンドツーエンドのレイテンシベンチマーク
+
+WAVファイルの音声を実時間（または指定した倍速）で流す疑似的な入力ストリームと、
+応答時間と帯域幅を設定できる文字起こしAPIのモックサーバーを使用して、
+実際の AudioRecorder → WhisperTranscriber → MainWindow.on_transcription_complete の
+経路を繰り返し実行し、区間ごとのレイテンシの分布（p50/p95/p99）を表示します。
+
+``--pipeline gui`` ではオフスクリーンのQtプラットフォームでメインウィンドウを生成し、
+ホットキーのコールバックからクリップボードへのコピーまでを計測します。
+``--pipeline core`` ではPyQt6を読み込まずに、メインウィンドウと同じ手順で
+録音と文字起こしを行います。どちらも実際の音声デバイスは使用しません。
+
+実行方法::
+
+    python -m benchmarks.e2e_latency --iterations 20 --latency 0.3 --bandwidth 500000
+    python -m benchmarks.e2e_latency --pipeline core --fixture samples/*.wav --speed 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.mock_api import MockTranscriptionServer
+
+# 疑似的な入力ストリームが1回のコールバックで渡すフレーム数
+BLOCK_FRAMES = 512
+
+# 1回の計測が完了するまで待機する最大の時間（秒）
+ITERATION_TIMEOUT = 60.0
+
+
+class FakeCallbackFlags:
+    """オーバーフローなどが発生していないことを表すsounddevice.CallbackFlagsの代わり"""
+
+    input_overflow = False
+    input_underflow = False
+
+    def __bool__(self):
+        return False
+
+    def __str__(self):
+        return ""
+
+
+class FakeInputStream:
+    """
+    音声データを一定の間隔でコールバックに渡すsounddevice.InputStreamの代わり
+
+    開始すると別スレッドで音声データをBLOCK_FRAMESずつコールバックに渡します。
+    音声データの終わりに達した場合は先頭から繰り返します。
+    """
+
+    # 全ストリームで共有する音声データ（float32、フレーム数 x チャンネル数）
+    audio = np.zeros((16000, 1), dtype=np.float32)
+
+    # 実時間に対する音声を流す速度の倍率
+    speed = 1.0
+
+    def __init__(self, samplerate, channels, callback, blocksize=BLOCK_FRAMES, **kwargs):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.blocksize = blocksize or BLOCK_FRAMES
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        """音声データをブロックごとにコールバックに渡す（ストリームのスレッド）"""
+        audio = self.audio
+        if audio.shape[1] != self.channels:
+            audio = np.repeat(audio.mean(axis=1, keepdims=True), self.channels, axis=1)
+        interval = self.blocksize / self.samplerate / self.speed
+        position = 0
+        # 実際のデバイスと同様に、1ブロック分の音声がたまってから最初のコールバックを呼び出す
+        next_time = time.monotonic() + interval
+        while not self._stopped.wait(max(0.0, next_time - time.monotonic())):
+            block = np.take(audio, np.arange(position, position + self.blocksize), axis=0, mode="wrap")
+            position = (position + self.blocksize) % len(audio)
+            self.callback(block, self.blocksize, None, FakeCallbackFlags())
+            next_time += interval
+
+
+def install_fake_sounddevice():
+    """
+    sounddeviceモジュールを疑似的な入力ストリームを持つモジュールに置き換える
+
+    AudioRecorderを読み込む前に呼び出すことで、音声デバイスやPortAudioが
+    ない環境でも同じ経路を計測できます。
+    """
+    module = types.ModuleType("sounddevice")
+    module.InputStream = FakeInputStream
+    module.CallbackFlags = FakeCallbackFlags
+    module.sleep = lambda msec: time.sleep(msec / 1000)
+    sys.modules["sounddevice"] = module
+
+
+def load_fixture(paths, sample_rate, seconds):
+    """
+    入力ストリームに流す音声データを読み込む
+
+    Parameters
+    ----------
+    paths : list
+        WAVファイルのパス（空の場合は合成した音声を使用する）
+    sample_rate : int
+        録音のサンプルレート
+    seconds : float
+        合成する音声の長さ（秒）
+
+    Returns
+    -------
+    np.ndarray
+        float32のモノラル音声データ（フレーム数 x 1）
+    """
+    if not paths:
+        # 話し声に近い帯域の正弦波を組み合わせた音声
+        t = np.arange(int(sample_rate * seconds)) / sample_rate
+        audio = 0.2 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 660 * t) * np.sin(2 * np.pi * 3 * t)
+        return audio.astype(np.float32)[:, None]
+
+    parts = []
+    for path in paths:
+        data, rate = sf.read(path, dtype="float32", always_2d=True)
+        data = data.mean(axis=1)
+        if rate != sample_rate:
+            # ベンチマークの入力なので線形補間で十分
+            positions = np.arange(int(len(data) * sample_rate / rate)) * rate / sample_rate
+            data = np.interp(positions, np.arange(len(data)), data).astype(np.float32)
+        parts.append(data)
+    return np.concatenate(parts)[:, None]
+
+
+def wait_until(predicate, pump, timeout=ITERATION_TIMEOUT):
+    """
+    条件が満たされるまでイベントを処理しながら待機する
+
+    Parameters
+    ----------
+    predicate : Callable[[], bool]
+        待機する条件
+    pump : Callable[[], None]
+        待機中に繰り返し呼び出す関数（Qtのイベント処理など）
+    timeout : float, optional
+        最大の待機時間（秒）
+
+    Returns
+    -------
+    bool
+        条件が満たされた場合True
+    """
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        pump()
+        time.sleep(0.001)
+    return True
+
+
+def sleep_with(pump, seconds):
+    """イベントを処理しながら指定した時間待機する"""
+    wait_until(lambda: False, pump, seconds)
+
+
+def completed_count(latency_tracker):
+    """完了したトレースの数を取得する"""
+    return latency_tracker.summary()["stop_to_clipboard"]["count"]
+
+
+class CorePipeline:
+    """
+    PyQt6を読み込まずにメインウィンドウと同じ手順で録音と文字起こしを行うパイプライン
+    """
+
+    def __init__(self, transcriber, scratch):
+        from src.core.audio_recorder import AudioRecorder
+        from src.core.latency_tracker import latency_tracker
+
+        self.latency_tracker = latency_tracker
+        self.transcriber = transcriber
+        self.recorder = AudioRecorder(scratch=scratch)
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="transcription")
+        # 長時間の実行でメモリが増え続けないよう直近の結果のみ保持する
+        self.results = deque(maxlen=16)
+
+    def pump(self):
+        pass
+
+    def toggle(self):
+        """ホットキーのコールバック（MainWindow._toggle_recording_implと同じ手順）"""
+        self.latency_tracker.mark("hotkey")
+        if not self.recorder.is_recording():
+            self.latency_tracker.begin()
+        self.latency_tracker.mark("dispatch")
+        if not self.recorder.is_recording():
+            self.recorder.start_recording()
+            return
+
+        audio_file = self.recorder.stop_recording()
+        trace = self.latency_tracker.detach()
+        self.executor.submit(self._transcribe, audio_file, trace)
+
+    def _transcribe(self, audio_file, trace):
+        """文字起こしして結果を受け取る（MainWindow.perform_transcriptionと同じ手順）"""
+        self.latency_tracker.bind(trace)
+        try:
+            self.results.append(self.transcriber.transcribe(audio_file))
+        finally:
+            self.latency_tracker.bind(None)
+            self.recorder.scratch.release(audio_file)
+        trace.mark("clipboard")
+        self.latency_tracker.finish(trace)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class GuiPipeline:
+    """
+    オフスクリーンのQtプラットフォームで生成したメインウィンドウを使用するパイプライン
+    """
+
+    def __init__(self, transcriber):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt6.QtWidgets import QApplication
+        from src.core.hotkeys import HotkeyManager
+        from src.core.latency_tracker import latency_tracker
+        from src.gui.windows.main_window import MainWindow
+
+        self.latency_tracker = latency_tracker
+        self.app = QApplication.instance() or QApplication([])
+        self.window = MainWindow()
+
+        # 計測に影響する設定を上書きする（設定ファイルは変更しない）
+        self.window.enable_sound = False
+        self.window.show_indicator = False
+        self.window.auto_copy = True
+        self.window.archive_audio = False
+        self.window.whisper_transcriber = transcriber
+        self.window.offline_queue.transcriber = transcriber
+
+        # グローバルホットキーのリスナーが呼び出すのと同じコールバック
+        self.toggle = HotkeyManager._timed(self.window.toggle_recording)
+
+    def pump(self):
+        self.app.processEvents()
+
+    @property
+    def results(self):
+        return [self.window.transcription_text.toPlainText()]
+
+    def close(self):
+        self.window.quit_application()
+
+
+def run(args):
+    """
+    ベンチマークを実行して結果を表示する
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+
+    Returns
+    -------
+    int
+        終了コード
+    """
+    # 履歴や一時ファイルをユーザーのデータディレクトリに書き込まない
+    data_dir = tempfile.mkdtemp(prefix="osw-e2e-")
+    os.environ["OPEN_SUPER_WHISPER_DATA_DIR"] = data_dir
+
+    install_fake_sounddevice()
+    FakeInputStream.audio = load_fixture(args.fixture, 16000, args.record_seconds)
+    FakeInputStream.speed = args.speed
+
+    from src.core.scratch_manager import ScratchManager
+    from src.core.whisper_api import WhisperTranscriber
+
+    with MockTranscriptionServer(latency=args.latency, jitter=args.jitter, bandwidth=args.bandwidth) as server:
+        transcriber = WhisperTranscriber(api_key="sk-benchmark", base_url=server.url)
+        transcriber.set_model(args.model)
+
+        if args.pipeline == "gui":
+            pipeline = GuiPipeline(transcriber)
+        else:
+            pipeline = CorePipeline(transcriber, ScratchManager(os.path.join(data_dir, "scratch")))
+        tracker = pipeline.latency_tracker
+        tracker.reset()
+
+        record_wall_seconds = args.record_seconds / args.speed
+        failures = 0
+        try:
+            for i in range(args.warmup + args.iterations):
+                if i == args.warmup:
+                    # ウォームアップ（接続の確立など）の計測を除外する
+                    tracker.reset()
+                done = completed_count(tracker)
+                pipeline.toggle()
+                sleep_with(pipeline.pump, record_wall_seconds)
+                pipeline.toggle()
+                if not wait_until(lambda: completed_count(tracker) > done, pipeline.pump):
+                    failures += 1
+                    print(f"Iteration {i} did not complete within {ITERATION_TIMEOUT} seconds", file=sys.stderr)
+        finally:
+            pipeline.close()
+
+        if args.output:
+            tracker.export(args.output)
+        report(tracker.summary(), args, server.requests)
+    return 1 if failures else 0
+
+
+def report(summary, args, requests):
+    """
+    区間ごとのレイテンシの分布を表示する
+
+    Parameters
+    ----------
+    summary : dict
+        LatencyTracker.summary()の結果
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+    requests : int
+        モックサーバーが受け付けたリクエストの数
+    """
+    print(
+        f"pipeline={args.pipeline} iterations={args.iterations} record={args.record_seconds}s speed={args.speed}x "
+        f"latency={args.latency}s jitter={args.jitter}s bandwidth={args.bandwidth or 'unlimited'} requests={requests}"
+    )
+    print(f"{'interval':<32} {'count':>6} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10} {'max (ms)':>10}")
+    for name, stats in summary.items():
+        if not stats.get("count"):
+            continue
+        print(
+            f"{name:<32} {stats['count']:>6} {stats['p50'] * 1000:>10.1f} {stats['p95'] * 1000:>10.1f} "
+            f"{stats['p99'] * 1000:>10.1f} {stats['max'] * 1000:>10.1f}"
+        )
+
+
+def main():
+    """
+    コマンドライン引数を解析してベンチマークを実行する
+    """
+    parser = argparse.ArgumentParser(description="End-to-end hotkey-to-clipboard latency benchmark")
+    parser.add_argument("--pipeline", choices=["gui", "core"], default="gui", help="drive the main window or the core classes only")
+    parser.add_argument("--iterations", type=int, default=20, help="number of measured recordings")
+    parser.add_argument("--warmup", type=int, default=2, help="number of recordings excluded from the results")
+    parser.add_argument("--fixture", nargs="*", default=[], metavar="WAV", help="audio files fed to the fake input stream")
+    parser.add_argument("--record-seconds", type=float, default=3.0, help="seconds of audio recorded per iteration")
+    parser.add_argument("--speed", type=float, default=1.0, help="feed audio this many times faster than real time")
+    parser.add_argument("--model", default="gpt-4o-transcribe", help="model ID sent to the mock server")
+    parser.add_argument("--latency", type=float, default=0.3, help="mock server response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum random seconds added to the latency")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="mock upload bandwidth in bytes per second (0 for no limit)")
+    parser.add_argument("--output", metavar="FILE", help="write the statistics and samples to a JSON file")
+    args = parser.parse_args()
+    if args.iterations < 1 or args.speed <= 0 or args.record_seconds <= 0:
+        parser.error("--iterations, --speed and --record-seconds must be positive")
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+文字起こし履歴のベンチマーク
+
+合成した文字起こしを HistoryStore に追加し、書き込みのスループットと、
+ページ取得および全文検索の応答時間を履歴の件数ごとに計測します。
+
+実行方法::
+
+    python -m benchmarks.history_store
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from src.core.history_store import HistoryStore
+
+# 文字起こしテキストに使用する単語
+WORDS = (
+    "the of and to in is that it for on was with as be at by this have from or had not but "
+    "meeting project release schedule budget review customer feedback design deadline "
+    "会議 資料 予定 確認 お願い 来週 議事録 プロジェクト 担当 進捗"
+).split()
+
+
+def make_text(rng, words=40):
+    """
+    合成した文字起こしテキストを生成する
+
+    Parameters
+    ----------
+    rng : random.Random
+        乱数生成器
+    words : int, optional
+        単語数
+
+    Returns
+    -------
+    str
+        合成したテキスト
+    """
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def measure(func, repeat):
+    """
+    関数の実行時間の中央値と最大値をミリ秒で返す
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def run(sizes, repeat, seed=0):
+    """
+    ベンチマークを実行して結果を表示する
+
+    Parameters
+    ----------
+    sizes : list
+        計測する履歴の件数のリスト
+    repeat : int
+        応答時間の計測を繰り返す回数
+    seed : int, optional
+        乱数のシード
+    """
+    print(f"{'entries':>8} {'insert (rows/s)':>16} {'page (ms)':>16} {'deep page (ms)':>16} {'search (ms)':>16}")
+    for size in sizes:
+        rng = random.Random(seed)
+        with tempfile.TemporaryDirectory() as directory:
+            store = HistoryStore(os.path.join(directory, "history.db"))
+
+            start = time.perf_counter()
+            for _ in range(size):
+                store.add(make_text(rng), model="whisper-1", language="en", audio_seconds=5.0, elapsed_seconds=1.0)
+            store.flush()
+            insert_rate = size / (time.perf_counter() - start)
+
+            page = measure(lambda: store.page(limit=100), repeat)
+            deep = measure(lambda: store.page(before_id=size // 10, limit=100), repeat)
+            search = measure(lambda: store.search("budget 議事録", limit=100), repeat)
+            store.close()
+
+        print(
+            f"{size:>8} {insert_rate:>16,.0f} "
+            f"{page[0]:>7.2f} / {page[1]:>6.2f} {deep[0]:>7.2f} / {deep[1]:>6.2f} {search[0]:>7.2f} / {search[1]:>6.2f}"
+        )
+
+
+def main():
+    """
+    コマンドライン引数を解析してベンチマークを実行する
+    """
+    parser = argparse.ArgumentParser(description="Transcription history store benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="number of history entries")
+    parser.add_argument("--repeat", type=int, default=20, help="number of measurements per query")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
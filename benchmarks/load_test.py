@@ -0,0 +1,180 @@
+"""
+文字起こしクライアントの負荷試験
+
+障害を発生させる文字起こしAPIのモックサーバーに対して、1つの WhisperTranscriber を
+共有する多数のスレッドから一定時間文字起こしを繰り返し、スループット、成功率、
+応答時間の分布と、モックサーバーが発生させた障害の件数を表示します。
+レートリミッターや再試行の変更が、障害の多い状況でどう振る舞うかを
+実際のAPIを使わずに確認できます。
+
+モックサーバーはこのプロセス内で起動します。クライアントとサーバーでGILを
+奪い合わないよう、別のプロセスで起動したサーバーを ``--url`` で指定することもできます
+（一括モードや監視モード、ローカルサービスは ``--base-url`` で同じサーバーを指定できます）。
+
+実行方法::
+
+    python -m benchmarks.load_test --clients 64 --duration 20 --latency 0.05 --error-429 0.05 --error-5xx 0.02
+    python -m benchmarks.mock_api --port 8080 --latency 0.05 --truncate 0.01 &
+    python -m benchmarks.load_test --url http://127.0.0.1:8080/v1 --clients 200
+"""
+
+import argparse
+import io
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.mock_api import add_server_arguments, create_server
+
+
+def make_audio(seconds, sample_rate=16000):
+    """
+    アップロードする音声（WAV）を生成する
+
+    Parameters
+    ----------
+    seconds : float
+        音声の長さ（秒）
+    sample_rate : int, optional
+        サンプルレート
+
+    Returns
+    -------
+    tuple
+        WhisperTranscriber.transcribe()に渡す(ファイル名, バイト列)の組
+    """
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    buffer = io.BytesIO()
+    sf.write(buffer, (0.2 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), sample_rate, format="WAV", subtype="PCM_16")
+    return ("load.wav", buffer.getvalue())
+
+
+def percentile(sorted_samples, q):
+    """ソート済みのサンプルから最近傍順位法でパーセンタイルを求める"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, int(np.ceil(q / 100 * len(sorted_samples))))
+    return sorted_samples[rank - 1]
+
+
+def run(args, url):
+    """
+    負荷をかけて結果を集計する
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+    url : str
+        WhisperTranscriberのbase_urlに指定するURL
+
+    Returns
+    -------
+    dict
+        成功件数（succeeded）、失敗件数（failed）、経過時間（elapsed）、
+        成功した文字起こしの応答時間（latencies、秒）、失敗の内訳（errors）
+    """
+    from src.core.whisper_api import WhisperTranscriber
+
+    transcriber = WhisperTranscriber(api_key="sk-load-test", base_url=url)
+    transcriber.set_model(args.model)
+    transcriber.set_rate_limits(args.requests_per_minute, 0, args.max_in_flight)
+    audio = make_audio(args.audio_seconds)
+
+    lock = threading.Lock()
+    latencies = []
+    errors = {}
+    deadline = time.monotonic() + args.duration
+
+    def client():
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            result = transcriber.transcribe(audio, response_format=args.format)
+            elapsed = time.monotonic() - started
+            with lock:
+                if isinstance(result, str) and result.startswith("Error: "):
+                    # エラーメッセージの先頭で内訳を集計する
+                    kind = result[len("Error: "):].split(" - ", 1)[0][:60]
+                    errors[kind] = errors.get(kind, 0) + 1
+                else:
+                    latencies.append(elapsed)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        for _ in range(args.clients):
+            executor.submit(client)
+    elapsed = time.monotonic() - started
+
+    return {
+        "succeeded": len(latencies),
+        "failed": sum(errors.values()),
+        "elapsed": elapsed,
+        "latencies": sorted(latencies),
+        "errors": errors,
+        "rate_limit": transcriber.get_rate_limit_state(),
+    }
+
+
+def report(result, server_stats):
+    """
+    負荷試験の結果を表示する
+
+    Parameters
+    ----------
+    result : dict
+        run()の結果
+    server_stats : dict or None
+        モックサーバーの応答の種類ごとの件数（外部のサーバーの場合はNone）
+    """
+    total = result["succeeded"] + result["failed"]
+    latencies = result["latencies"]
+    print(f"transcriptions: {total} in {result['elapsed']:.1f}s ({total / result['elapsed']:.1f}/s)")
+    print(f"succeeded:      {result['succeeded']} ({result['succeeded'] / total:.1%})" if total else "succeeded:      0")
+    if latencies:
+        print(
+            f"latency (ms):   p50 {percentile(latencies, 50) * 1000:.1f}  p95 {percentile(latencies, 95) * 1000:.1f}  "
+            f"p99 {percentile(latencies, 99) * 1000:.1f}  mean {statistics.mean(latencies) * 1000:.1f}  "
+            f"max {latencies[-1] * 1000:.1f}"
+        )
+    for kind, count in sorted(result["errors"].items(), key=lambda item: -item[1]):
+        print(f"failed:         {count} x {kind}")
+    if server_stats:
+        print(f"server:         {json.dumps(server_stats)} ({server_stats['requests'] / result['elapsed']:.1f} req/s)")
+    print(f"rate limiter:   {json.dumps(result['rate_limit'])}")
+
+
+def main():
+    """
+    コマンドライン引数を解析して負荷試験を実行する
+    """
+    parser = argparse.ArgumentParser(description="Load and resilience test against a fault-injecting mock transcription server")
+    parser.add_argument("--url", help="base URL of an already running mock server (starts one in-process if omitted)")
+    parser.add_argument("--clients", type=int, default=32, help="number of concurrent client threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to keep sending requests")
+    parser.add_argument("--audio-seconds", type=float, default=2.0, help="length of the uploaded audio")
+    parser.add_argument("--format", default="text", choices=["text", "json", "verbose_json", "srt", "vtt"], help="response format")
+    parser.add_argument("--model", default="gpt-4o-transcribe", help="model ID sent to the server")
+    parser.add_argument("--requests-per-minute", type=float, default=0, help="client-side request limit (0 for none)")
+    parser.add_argument("--max-in-flight", type=int, default=0, help="client-side concurrency limit (0 for none)")
+    add_server_arguments(parser)
+    parser.set_defaults(latency=0.05)
+    args = parser.parse_args()
+    if args.clients < 1 or args.duration <= 0:
+        parser.error("--clients and --duration must be positive")
+
+    if args.url:
+        report(run(args, args.url), None)
+        return
+
+    with create_server(args) as server:
+        result = run(args, server.url)
+        report(result, server.get_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+"""
+コア処理のマイクロベンチマーク
+
+録音コールバックでの音声ブロックの追加、録音終了時のバッファの連結と代替手段、
+WAV/FLACのエンコード、プロンプトの構築、ホットキー文字列の解析、文字起こし後の
+置換・綴り補正・字幕の書き出しといった頻繁に実行される処理の1回あたりの時間を計測します。
+
+結果はJSONのベースラインとして保存でき、別の実行結果と比較して、ベンチマークごとの
+しきい値を超えて遅くなった処理がある場合は終了コード1で終了します。
+ベースラインは実行したマシンに依存するため、変更前と変更後を同じマシンで計測します。
+
+実行方法::
+
+    python -m benchmarks.micro --save baseline.json       # 変更前
+    python -m benchmarks.micro --compare baseline.json    # 変更後
+    python -m benchmarks.micro --filter finalize --repeat 10
+"""
+
+import argparse
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import timeit
+from datetime import datetime
+
+import numpy as np
+import soundfile as sf
+
+# 遅くなったと判定する、ベースラインからの増加率のデフォルト
+DEFAULT_THRESHOLD = 0.10
+
+# 計測する録音の条件（AudioRecorderのデフォルト）
+SAMPLE_RATE = 16000
+BLOCK_FRAMES = 512
+RECORDING_SECONDS = 60
+
+# 合成テキストに使用する単語
+WORDS = (
+    "the of and to in is that it for on was with as be at by this have from or had not but "
+    "meeting project release schedule budget review customer feedback design deadline"
+).split()
+
+# 登録されたベンチマーク（名前から(準備関数, しきい値)への辞書）
+BENCHMARKS = {}
+
+
+def benchmark(name, threshold=DEFAULT_THRESHOLD):
+    """
+    ベンチマークを登録するデコレーター
+
+    準備関数は計測する処理を引数なしの関数として返します。計測に不要な
+    データの生成は準備関数の中で行います。
+
+    Parameters
+    ----------
+    name : str
+        ベンチマーク名（"<グループ>.<処理>"）
+    threshold : float, optional
+        遅くなったと判定する増加率（計測のばらつきが大きい処理では大きくする）
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, threshold)
+        return setup
+    return register
+
+
+def make_blocks(seconds=RECORDING_SECONDS):
+    """録音コールバックが受け取るのと同じ形状の音声ブロックを生成する"""
+    rng = np.random.default_rng(0)
+    count = seconds * SAMPLE_RATE // BLOCK_FRAMES
+    return [rng.uniform(-0.3, 0.3, (BLOCK_FRAMES, 1)).astype(np.float32) for _ in range(count)]
+
+
+def make_text(rng, words):
+    """合成した文字起こしテキストを生成する"""
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+# ---------------------------------------------------------------------------
+# 録音
+# ---------------------------------------------------------------------------
+
+@benchmark("capture.callback_append")
+def bench_callback_append():
+    # AudioRecorderの録音コールバックと同じ処理（ブロックのコピーとリストへの追加）
+    indata = make_blocks(1)[0]
+    blocks_per_minute = RECORDING_SECONDS * SAMPLE_RATE // BLOCK_FRAMES
+    audio_data = []
+
+    def run():
+        data = indata.copy()
+        audio_data.append(data)
+        if len(audio_data) >= blocks_per_minute:
+            audio_data.clear()
+    return run
+
+
+@benchmark("finalize.concatenate")
+def bench_finalize_concatenate():
+    # AudioRecorder.stop_recordingの連結
+    blocks = make_blocks()
+    return lambda: np.concatenate(blocks, axis=0)
+
+
+@benchmark("finalize.preallocated_copy")
+def bench_finalize_preallocated():
+    # 代替手段: 合計サイズの配列を確保してブロックを順にコピーする
+    blocks = make_blocks()
+
+    def run():
+        total = sum(len(block) for block in blocks)
+        out = np.empty((total, blocks[0].shape[1]), dtype=blocks[0].dtype)
+        position = 0
+        for block in blocks:
+            out[position:position + len(block)] = block
+            position += len(block)
+        return out
+    return run
+
+
+@benchmark("finalize.bytes_join")
+def bench_finalize_bytes_join():
+    # 代替手段: バイト列として連結してから配列に戻す
+    blocks = make_blocks()
+    return lambda: np.frombuffer(b"".join(block.tobytes() for block in blocks), dtype=np.float32).reshape(-1, 1)
+
+
+@benchmark("encode.wav_pcm16", threshold=0.15)
+def bench_encode_wav():
+    audio = np.concatenate(make_blocks(), axis=0)
+
+    def run():
+        buffer = io.BytesIO()
+        sf.write(buffer, audio, SAMPLE_RATE, format="WAV", subtype="PCM_16")
+    return run
+
+
+@benchmark("encode.flac", threshold=0.15)
+def bench_encode_flac():
+    audio = np.concatenate(make_blocks(), axis=0)
+
+    def run():
+        buffer = io.BytesIO()
+        sf.write(buffer, audio, SAMPLE_RATE, format="FLAC", subtype="PCM_16")
+    return run
+
+
+# ---------------------------------------------------------------------------
+# プロンプトとホットキー
+# ---------------------------------------------------------------------------
+
+def make_transcriber(terms=500):
+    """語彙とシステム指示を設定したWhisperTranscriberを生成する（APIは呼び出さない）"""
+    from src.core.whisper_api import WhisperTranscriber
+
+    transcriber = WhisperTranscriber(api_key="sk-benchmark")
+    transcriber.add_custom_vocabulary([f"Term{i} Product{i % 37}" for i in range(terms)])
+    transcriber.add_system_instruction(["Use British spelling.", "Keep product names as written."])
+    return transcriber
+
+
+@benchmark("prompt.build_cached")
+def bench_build_prompt_cached():
+    # 直近の文字起こしがない場合（構築結果はキャッシュされる）
+    transcriber = make_transcriber()
+    return lambda: transcriber._build_prompt("en")
+
+
+@benchmark("prompt.build_selected", threshold=0.15)
+def bench_build_prompt_selected():
+    # 直近の文字起こしに基づいて語彙を選択する場合
+    transcriber = make_transcriber()
+    rng = random.Random(0)
+    for i in range(5):
+        transcriber.vocabulary_index.record_transcript(make_text(rng, 60) + f" Term{i * 7} Product{i}")
+    return lambda: transcriber._build_prompt("en")
+
+
+@benchmark("hotkey.parse")
+def bench_parse_hotkey():
+    from src.core.hotkeys import HotkeyManager
+
+    return lambda: HotkeyManager.parse_hotkey_string("ctrl+shift+r")
+
+
+# ---------------------------------------------------------------------------
+# 文字起こし後の処理
+# ---------------------------------------------------------------------------
+
+@benchmark("postprocess.replace")
+def bench_replace():
+    from src.core.text_replacer import TextReplacer
+
+    rng = random.Random(0)
+    replacer = TextReplacer({f"{word} {i}": f"{word.upper()}-{i}" for i, word in enumerate(WORDS * 5)})
+    text = make_text(rng, 200)
+    replacer.apply(text)
+    return lambda: replacer.apply(text)
+
+
+@benchmark("postprocess.correct")
+def bench_correct():
+    from src.core.vocabulary_corrector import VocabularyCorrector
+
+    rng = random.Random(0)
+    corrector = VocabularyCorrector()
+    corrector.update([f"Kubernetes{i}" for i in range(1000)])
+    text = make_text(rng, 200) + " kubernetis12 kubernets400"
+    corrector.correct(text)
+    return lambda: corrector.correct(text)
+
+
+@benchmark("postprocess.transcript_srt", threshold=0.15)
+def bench_transcript_srt():
+    from src.core.transcript import Transcript
+
+    rng = random.Random(0)
+    segments, words = [], []
+    for i in range(500):
+        segment_words = make_text(rng, 12).split()
+        segments.append({"start": i * 4.0, "end": i * 4.0 + 3.8, "text": " ".join(segment_words)})
+        words += [{"word": word, "start": i * 4.0 + j * 0.3, "end": i * 4.0 + j * 0.3 + 0.25} for j, word in enumerate(segment_words)]
+    response = {"text": " ".join(segment["text"] for segment in segments), "language": "english",
+                "duration": 2000.0, "segments": segments, "words": words}
+    return lambda: Transcript.from_response(response).to_srt()
+
+
+def measure(func, repeat, min_time):
+    """
+    関数の1回あたりの実行時間を計測する
+
+    Parameters
+    ----------
+    func : Callable[[], Any]
+        計測する関数
+    repeat : int
+        計測を繰り返す回数
+    min_time : float
+        1回の計測の最小の時間（秒）。この時間を超えるまで関数を繰り返し呼び出す
+
+    Returns
+    -------
+    dict
+        1回あたりの実行時間の最小値（min_us）と中央値（median_us）、1回の計測の呼び出し回数（loops）
+    """
+    timer = timeit.Timer(func)
+    loops = 1
+    while timer.timeit(loops) < min_time:
+        loops *= 2
+    samples = [total / loops * 1e6 for total in timer.repeat(repeat, loops)]
+    return {"min_us": min(samples), "median_us": statistics.median(samples), "loops": loops}
+
+
+def run(names, repeat, min_time):
+    """
+    ベンチマークを実行する
+
+    Parameters
+    ----------
+    names : list
+        実行するベンチマーク名
+    repeat : int
+        計測を繰り返す回数
+    min_time : float
+        1回の計測の最小の時間（秒）
+
+    Returns
+    -------
+    dict
+        ベンチマーク名から計測結果への辞書
+    """
+    results = {}
+    for name in names:
+        setup, threshold = BENCHMARKS[name]
+        try:
+            func = setup()
+        except ImportError as e:
+            # グローバルホットキーなどプラットフォームに依存する処理は計測できない場合がある
+            print(f"{name:<32} skipped ({e.__class__.__name__}: {str(e).splitlines()[0]})")
+            continue
+        result = measure(func, repeat, min_time)
+        result["threshold"] = threshold
+        results[name] = result
+        print(f"{name:<32} {result['min_us']:>12.2f} us {result['median_us']:>12.2f} us {result['loops']:>10}")
+    return results
+
+
+def save_baseline(path, results):
+    """
+    計測結果をベースラインとしてJSONファイルに保存する
+
+    Parameters
+    ----------
+    path : str
+        保存するファイルのパス
+    results : dict
+        ベンチマーク名から計測結果への辞書
+    """
+    baseline = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+    print(f"Saved baseline to {path}")
+
+
+def compare(path, results, threshold=None):
+    """
+    計測結果をベースラインと比較する
+
+    各ベンチマークの最小値がベースラインの最小値の(1 + しきい値)倍を超えた場合に
+    遅くなったと判定します。しきい値はベースラインに保存された値（編集して調整できる）、
+    またはthresholdで指定した値を使用します。
+
+    Parameters
+    ----------
+    path : str
+        ベースラインのJSONファイルのパス
+    results : dict
+        ベンチマーク名から計測結果への辞書
+    threshold : float, optional
+        すべてのベンチマークに適用するしきい値
+
+    Returns
+    -------
+    list
+        遅くなったベンチマーク名のリスト
+    """
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("platform") != platform.platform():
+        print(f"Warning: baseline was recorded on {baseline.get('platform')}", file=sys.stderr)
+
+    regressions = []
+    print(f"\n{'benchmark':<32} {'baseline (us)':>14} {'current (us)':>14} {'change':>9} {'limit':>7}")
+    for name, result in results.items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:<32} {'-':>14} {result['min_us']:>14.2f} {'new':>9}")
+            continue
+        limit = threshold if threshold is not None else reference.get("threshold", DEFAULT_THRESHOLD)
+        change = result["min_us"] / reference["min_us"] - 1
+        status = ""
+        if change > limit:
+            regressions.append(name)
+            status = "  REGRESSION"
+        print(
+            f"{name:<32} {reference['min_us']:>14.2f} {result['min_us']:>14.2f} "
+            f"{change:>+8.1%} {limit:>+6.0%}{status}"
+        )
+    return regressions
+
+
+def main():
+    """
+    コマンドライン引数を解析してベンチマークを実行する
+    """
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the core hot paths")
+    parser.add_argument("--filter", nargs="*", default=[], help="run only benchmarks whose name contains one of these strings")
+    parser.add_argument("--repeat", type=int, default=7, help="number of measurements per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per measurement")
+    parser.add_argument("--save", metavar="FILE", help="save the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare the results with a JSON baseline")
+    parser.add_argument("--threshold", type=float, help="allowed slowdown for every benchmark (e.g. 0.1 for 10%%)")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, threshold) in BENCHMARKS.items():
+            print(f"{name:<32} threshold {threshold:.0%}")
+        return
+
+    names = [name for name in BENCHMARKS if not args.filter or any(part in name for part in args.filter)]
+    if not names:
+        parser.error("no benchmarks match --filter")
+
+    print(f"{'benchmark':<32} {'min':>15} {'median':>15} {'loops':>10}")
+    results = run(names, args.repeat, args.min_time)
+
+    if args.save:
+        save_baseline(args.save, results)
+    if args.compare:
+        regressions = compare(args.compare, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
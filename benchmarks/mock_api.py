@@ -0,0 +1,515 @@
+"""
+文字起こしAPIのモックサーバー
+
+OpenAIの ``POST /v1/audio/transcriptions`` と同じ形式のリクエストを受け付け、
+設定した応答時間と帯域幅で固定の文字起こし結果を返すローカルサーバーです。
+WhisperTranscriber の base_url（ヘッドレスモードでは ``--base-url``、
+それ以外では環境変数 ``OPENAI_BASE_URL``）にこのサーバーのURLを指定すると、
+実際のAPIを呼び出さずに文字起こしの経路全体を計測できます。
+
+負荷試験と耐障害性の試験のため、応答時間の分布（一様、指数、対数正規）と、
+一定の確率で発生させる障害（429応答、5xx応答、途中で切断される応答、
+遅いアップロード）を設定できます。
+
+単体で起動する場合::
+
+    python -m benchmarks.mock_api --port 8080 --latency 0.3 --bandwidth 1000000
+    python -m benchmarks.mock_api --latency 0.2 --jitter 0.5 --distribution lognormal \\
+        --error-429 0.05 --error-5xx 0.02 --truncate 0.01 --slow-upload 0.05
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# 応答する文字起こしテキストのデフォルト
+DEFAULT_TEXT = "This is a transcription returned by the mock server."
+
+# 帯域幅を制限するときにリクエスト本文を読み込む単位（バイト）
+READ_CHUNK_BYTES = 16 * 1024
+
+# 応答時間の分布
+DISTRIBUTIONS = ("uniform", "exponential", "lognormal")
+
+# 5xx応答で返すステータスコード
+SERVER_ERROR_STATUSES = (500, 502, 503)
+
+
+def parse_multipart(body: bytes, content_type: str) -> Dict[str, bytes]:
+    """
+    multipart/form-dataのリクエスト本文をフィールド名と値の辞書に変換する
+
+    Parameters
+    ----------
+    body : bytes
+        リクエスト本文
+    content_type : str
+        Content-Typeヘッダーの値
+
+    Returns
+    -------
+    Dict[str, bytes]
+        フィールド名から値への辞書
+    """
+    match = re.search(r'boundary="?([^";]+)"?', content_type or "")
+    if not match:
+        return {}
+    fields = {}
+    for part in body.split(b"--" + match.group(1).encode("latin-1")):
+        headers, separator, value = part.partition(b"\r\n\r\n")
+        if not separator:
+            continue
+        name = re.search(rb'name="([^"]*)"', headers)
+        if name:
+            fields[name.group(1).decode("utf-8")] = value[:-2] if value.endswith(b"\r\n") else value
+    return fields
+
+
+class MockTranscriptionServer:
+    """
+    応答時間、帯域幅、障害の発生率を設定できる文字起こしAPIのモックサーバー
+
+    多数のクライアントからの同時接続を受け付けられるよう、接続ごとにスレッドを
+    割り当て、待ち受けのキューを大きくしています。
+
+    Attributes
+    ----------
+    latency : float
+        リクエスト本文を受信してから応答するまでの基準の時間（秒）
+    jitter : float
+        応答時間のばらつき（uniformでは加える一様乱数の最大値、exponentialでは
+        加える指数乱数の平均値、lognormalでは対数の標準偏差）
+    distribution : str
+        応答時間の分布（"uniform"、"exponential"、"lognormal"）
+    bandwidth : float
+        リクエスト本文を受信する速度の上限（バイト/秒、0は無制限）
+    text : str
+        応答する文字起こしテキスト
+    error_429 : float
+        429応答を返す確率
+    error_5xx : float
+        5xx応答を返す確率
+    truncate : float
+        応答の途中で接続を切断する確率
+    slow_upload : float
+        リクエスト本文をslow_bandwidthで受信する確率
+    slow_bandwidth : float
+        遅いアップロードの受信速度（バイト/秒）
+    retry_after : float
+        429応答のretry-after-msヘッダーで指定する待機時間（秒）
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        bandwidth: float = 0.0,
+        text: str = DEFAULT_TEXT,
+        seed: Optional[int] = None,
+        distribution: str = "uniform",
+        error_429: float = 0.0,
+        error_5xx: float = 0.0,
+        truncate: float = 0.0,
+        slow_upload: float = 0.0,
+        slow_bandwidth: float = 32 * 1024,
+        retry_after: float = 0.1,
+    ):
+        """
+        MockTranscriptionServerの初期化
+
+        Parameters
+        ----------
+        host : str, optional
+            待ち受けるアドレス (デフォルト: "127.0.0.1")
+        port : int, optional
+            待ち受けるポート番号（0は空いているポート）
+        latency : float, optional
+            応答するまでの時間（秒）
+        jitter : float, optional
+            応答時間のばらつき（distributionによって意味が異なる）
+        bandwidth : float, optional
+            リクエスト本文を受信する速度の上限（バイト/秒、0は無制限）
+        text : str, optional
+            応答する文字起こしテキスト
+        seed : int, optional
+            応答時間と障害の乱数のシード
+        distribution : str, optional
+            応答時間の分布 (デフォルト: "uniform")
+        error_429 : float, optional
+            429応答を返す確率
+        error_5xx : float, optional
+            5xx応答を返す確率
+        truncate : float, optional
+            応答の途中で接続を切断する確率
+        slow_upload : float, optional
+            リクエスト本文を遅い速度で受信する確率
+        slow_bandwidth : float, optional
+            遅いアップロードの受信速度（バイト/秒）
+        retry_after : float, optional
+            429応答で指定する待機時間（秒）
+        """
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.latency = latency
+        self.jitter = jitter
+        self.distribution = distribution
+        self.bandwidth = bandwidth
+        self.text = text
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.truncate = truncate
+        self.slow_upload = slow_upload
+        self.slow_bandwidth = slow_bandwidth
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "ok": 0, "rate_limited": 0, "server_error": 0, "truncated": 0, "slow_upload": 0}
+        self._server = _MockHTTPServer((host, port), self)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """WhisperTranscriberのbase_urlに指定するURL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def requests(self) -> int:
+        """受け付けたリクエストの数"""
+        with self._lock:
+            return self._stats["requests"]
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        応答の種類ごとの件数を取得する
+
+        Returns
+        -------
+        Dict[str, int]
+            受け付けたリクエスト（requests）、正常な応答（ok）、429応答（rate_limited）、
+            5xx応答（server_error）、切断した応答（truncated）、遅いアップロード（slow_upload）の件数
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def start(self) -> str:
+        """
+        バックグラウンドのスレッドで待ち受けを開始する
+
+        Returns
+        -------
+        str
+            WhisperTranscriberのbase_urlに指定するURL
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        """
+        待ち受けを停止する
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.stop()
+
+    def plan(self) -> Tuple[float, Optional[str], float]:
+        """
+        1件のリクエストに対する応答の内容を決める
+
+        Returns
+        -------
+        Tuple[float, Optional[str], float]
+            (応答までの時間（秒）, 障害の種類（"rate_limited"、"server_error"、
+            "truncated"、または障害なしのNone）, 受信速度（バイト/秒、0は無制限）)
+        """
+        with self._lock:
+            rng = self._random
+            self._stats["requests"] += 1
+
+            delay = self.latency
+            if self.jitter > 0:
+                if self.distribution == "uniform":
+                    delay += rng.uniform(0.0, self.jitter)
+                elif self.distribution == "exponential":
+                    delay += rng.expovariate(1.0 / self.jitter)
+                else:
+                    delay *= rng.lognormvariate(0.0, self.jitter)
+
+            bandwidth = self.bandwidth
+            if self.slow_upload > 0 and rng.random() < self.slow_upload:
+                bandwidth = self.slow_bandwidth
+                self._stats["slow_upload"] += 1
+
+            # 障害の種類を1つの乱数で選ぶ（確率の合計が1を超える場合は先の障害を優先する）
+            fault = None
+            draw = rng.random()
+            for kind, probability in (
+                ("rate_limited", self.error_429),
+                ("server_error", self.error_5xx),
+                ("truncated", self.truncate),
+            ):
+                if draw < probability:
+                    fault = kind
+                    break
+                draw -= probability
+            self._stats[fault or "ok"] += 1
+            return delay, fault, bandwidth
+
+    def choose_server_error(self) -> int:
+        """5xx応答のステータスコードを選ぶ"""
+        with self._lock:
+            return self._random.choice(SERVER_ERROR_STATUSES)
+
+    @staticmethod
+    def validate(fields: Dict[str, bytes]) -> Optional[str]:
+        """
+        実際のAPIが400応答を返すリクエストを検出する
+
+        Parameters
+        ----------
+        fields : Dict[str, bytes]
+            multipart/form-dataのフィールド
+
+        Returns
+        -------
+        Optional[str]
+            エラーメッセージ（問題がない場合はNone）
+        """
+        model = fields.get("model", b"").decode("utf-8")
+        response_format = fields.get("response_format", b"json").decode("utf-8")
+        # gpt-4o系のモデルはjsonとtextのみに対応する
+        if model.startswith("gpt-4o") and response_format not in ("json", "text"):
+            return f"response_format '{response_format}' is not compatible with model '{model}'. Use 'json' or 'text' instead."
+        return None
+
+    def render(self, fields: Dict[str, bytes]) -> Tuple[str, str]:
+        """
+        リクエストのフィールドに応じた応答を生成する
+
+        Parameters
+        ----------
+        fields : Dict[str, bytes]
+            multipart/form-dataのフィールド
+
+        Returns
+        -------
+        Tuple[str, str]
+            (Content-Type, 応答本文)
+        """
+        response_format = fields.get("response_format", b"json").decode("utf-8")
+        if response_format == "text":
+            return "text/plain; charset=utf-8", self.text
+        if response_format in ("srt", "vtt"):
+            separator = "," if response_format == "srt" else "."
+            header = "WEBVTT\n\n" if response_format == "vtt" else "1\n"
+            return "text/plain; charset=utf-8", f"{header}00:00:00{separator}000 --> 00:00:01{separator}000\n{self.text}\n"
+
+        payload = {"text": self.text}
+        if response_format == "verbose_json":
+            words = self.text.split()
+            payload.update({
+                "language": fields.get("language", b"english").decode("utf-8"),
+                "duration": float(len(words)) * 0.4,
+                "segments": [{"id": 0, "start": 0.0, "end": len(words) * 0.4, "text": self.text}],
+                "words": [{"word": word, "start": i * 0.4, "end": (i + 1) * 0.4} for i, word in enumerate(words)],
+            })
+        return "application/json", json.dumps(payload)
+
+
+class _MockRequestHandler(BaseHTTPRequestHandler):
+    """モックサーバーのHTTPリクエストハンドラー"""
+
+    # クライアントが接続を再利用できるようにする
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def mock(self) -> MockTranscriptionServer:
+        return self.server.mock
+
+    def _read_body(self, length: int, bandwidth: float) -> bytes:
+        """帯域幅の上限に従ってリクエスト本文を読み込む"""
+        if bandwidth <= 0:
+            return self.rfile.read(length)
+        chunks = []
+        started = time.monotonic()
+        received = 0
+        while received < length:
+            chunk = self.rfile.read(min(READ_CHUNK_BYTES, length - received))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            received += len(chunk)
+            # 受信した量に見合う時刻まで待機する
+            delay = received / bandwidth - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+        return b"".join(chunks)
+
+    def _send(self, status: int, content_type: str, body: str, headers: Optional[Dict[str, str]] = None,
+              truncate: bool = False) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if truncate:
+            # Content-Lengthより短い本文を送信して接続を切断する
+            self.wfile.write(data[:len(data) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(data)
+
+    def _send_error_json(self, status: int, message: str, error_type: str, code: Optional[str] = None,
+                         headers: Optional[Dict[str, str]] = None) -> None:
+        """OpenAI APIと同じ形式のエラーを送信する"""
+        payload = {"error": {"message": message, "type": error_type, "param": None, "code": code}}
+        self._send(status, "application/json", json.dumps(payload), headers)
+
+    def do_POST(self):
+        if not self.path.split("?", 1)[0].endswith("/audio/transcriptions"):
+            self._send_error_json(404, "Not found", "invalid_request_error")
+            return
+        delay, fault, bandwidth = self.mock.plan()
+        body = self._read_body(int(self.headers.get("Content-Length", "0")), bandwidth)
+        fields = parse_multipart(body, self.headers.get("Content-Type", ""))
+        time.sleep(delay)
+
+        error = self.mock.validate(fields)
+        if error:
+            self._send_error_json(400, error, "invalid_request_error", "unsupported_value")
+        elif fault == "rate_limited":
+            retry_after_ms = str(int(self.mock.retry_after * 1000))
+            self._send_error_json(
+                429, "Rate limit reached for requests (mock)", "requests", "rate_limit_exceeded",
+                {"retry-after-ms": retry_after_ms, "x-ratelimit-remaining-requests": "0"},
+            )
+        elif fault == "server_error":
+            self._send_error_json(self.mock.choose_server_error(), "The server had an error (mock)", "server_error")
+        else:
+            content_type, text = self.mock.render(fields)
+            self._send(200, content_type, text, truncate=fault == "truncated")
+
+    def log_message(self, format, *args):
+        # 計測に影響しないようリクエストのログを出力しない
+        pass
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    """モックサーバーのHTTPサーバー"""
+
+    daemon_threads = True
+
+    # 多数のクライアントが同時に接続できるよう待ち受けのキューを大きくする
+    request_queue_size = 1024
+
+    def __init__(self, address, mock: MockTranscriptionServer):
+        self.mock = mock
+        super().__init__(address, _MockRequestHandler)
+
+
+def add_server_arguments(parser):
+    """
+    モックサーバーの応答時間と障害のオプションをパーサーに追加する
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        オプションを追加するパーサー
+    """
+    parser.add_argument("--latency", type=float, default=0.3, help="base seconds before responding")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency spread (meaning depends on --distribution)")
+    parser.add_argument(
+        "--distribution",
+        choices=DISTRIBUTIONS,
+        default="uniform",
+        help="latency distribution: latency + U(0, jitter), latency + Exp(mean jitter), or latency * LogNormal(0, jitter)",
+    )
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="upload bandwidth in bytes per second (0 for no limit)")
+    parser.add_argument("--error-429", type=float, default=0.0, help="probability of a 429 rate limit response")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="probability of a 500/502/503 response")
+    parser.add_argument("--truncate", type=float, default=0.0, help="probability of closing the connection mid-response")
+    parser.add_argument("--slow-upload", type=float, default=0.0, help="probability of reading the upload at --slow-bandwidth")
+    parser.add_argument("--slow-bandwidth", type=float, default=32 * 1024, help="bytes per second for slow uploads")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="seconds sent in retry-after-ms on 429 responses")
+    parser.add_argument("--seed", type=int, help="random seed for latencies and faults")
+
+
+def create_server(args, host="127.0.0.1", port=0, text=DEFAULT_TEXT):
+    """
+    コマンドライン引数からモックサーバーを生成する
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        add_server_arguments()で追加したオプションを含む解析済みの引数
+    host : str, optional
+        待ち受けるアドレス
+    port : int, optional
+        待ち受けるポート番号
+    text : str, optional
+        応答する文字起こしテキスト
+
+    Returns
+    -------
+    MockTranscriptionServer
+        生成したモックサーバー（未開始）
+    """
+    return MockTranscriptionServer(
+        host,
+        port,
+        latency=args.latency,
+        jitter=args.jitter,
+        bandwidth=args.bandwidth,
+        text=text,
+        seed=args.seed,
+        distribution=args.distribution,
+        error_429=args.error_429,
+        error_5xx=args.error_5xx,
+        truncate=args.truncate,
+        slow_upload=args.slow_upload,
+        slow_bandwidth=args.slow_bandwidth,
+        retry_after=args.retry_after,
+    )
+
+
+def main():
+    """
+    コマンドライン引数を解析してモックサーバーを起動する
+    """
+    parser = argparse.ArgumentParser(description="Mock OpenAI audio transcription server")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on")
+    add_server_arguments(parser)
+    parser.add_argument("--text", default=DEFAULT_TEXT, help="transcription text to return")
+    args = parser.parse_args()
+
+    server = create_server(args, args.host, args.port, text=args.text)
+    print(f"Serving mock transcriptions at {server.start()} (Ctrl+C to exit)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(json.dumps(server.get_stats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+長時間の常駐を模したソークテスト（メモリ、スレッド、ファイルのリークの検出）
+
+疑似的な入力ストリームと文字起こしAPIのモックサーバーを使用して、録音と文字起こしを
+数千回繰り返し、プロセスの常駐メモリ（RSS）、スレッド数、開いているファイル
+ディスクリプタの数、作業ディレクトリに残った一時ファイルの数と、tracemallocで
+追跡したメモリを一定の間隔で記録します。ウォームアップ後の値からの増加量が
+しきい値を超えた場合は、増加したメモリの割り当て元の上位を表示して終了コード1で終了します。
+
+録音と文字起こしの経路は e2e_latency と同じで、``--pipeline gui`` では
+メインウィンドウを、``--pipeline core`` ではPyQt6を読み込まずにコアクラスのみを使用します。
+
+実行方法::
+
+    python -m benchmarks.soak --cycles 2000
+    python -m benchmarks.soak --pipeline core --cycles 5000 --max-rss-growth-mb 20
+    python -m benchmarks.soak --cycles 1000 --sound --sample-every 50
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from benchmarks.e2e_latency import (
+    ITERATION_TIMEOUT,
+    CorePipeline,
+    FakeInputStream,
+    GuiPipeline,
+    completed_count,
+    install_fake_sounddevice,
+    load_fixture,
+    sleep_with,
+    wait_until,
+)
+from benchmarks.mock_api import MockTranscriptionServer
+
+# 増加量の表示で除外するトレースバックのファイル（計測自体の割り当て）
+IGNORED_TRACE_FILES = ("<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", tracemalloc.__file__)
+
+
+def read_rss_bytes():
+    """
+    プロセスの現在の常駐メモリ（RSS）を取得する
+
+    Linuxでは/proc/self/statmを読み取り、それ以外の環境ではpsutilがインストール
+    されている場合のみ取得します。
+
+    Returns
+    -------
+    int or None
+        RSS（バイト）、取得できない場合はNone
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def count_open_files():
+    """
+    プロセスが開いているファイルディスクリプタ（Windowsではハンドル）の数を取得する
+
+    Returns
+    -------
+    int or None
+        ファイルディスクリプタの数、取得できない場合はNone
+    """
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(fd_dir))
+        except OSError:
+            continue
+    try:
+        import psutil
+    except ImportError:
+        return None
+    process = psutil.Process()
+    return process.num_handles() if sys.platform == "win32" else process.num_fds()
+
+
+def count_files(directory):
+    """ディレクトリ以下のファイルの数を取得する（ディレクトリがない場合は0）"""
+    return sum(len(files) for _, _, files in os.walk(directory))
+
+
+def sample_resources(cycle, scratch_dir):
+    """
+    リソースの使用量を記録する
+
+    Parameters
+    ----------
+    cycle : int
+        完了した録音と文字起こしの回数
+    scratch_dir : str
+        一時ファイルの作業ディレクトリ
+
+    Returns
+    -------
+    dict
+        回数（cycle）、RSS（rss、バイト）、スレッド数（threads）、ファイルディスクリプタの数（fds）、
+        一時ファイルの数（scratch_files）、tracemallocで追跡しているメモリ（traced、バイト）
+    """
+    # 回収可能なオブジェクトを増加量に含めない
+    gc.collect()
+    return {
+        "cycle": cycle,
+        "rss": read_rss_bytes(),
+        "threads": threading.active_count(),
+        "fds": count_open_files(),
+        "scratch_files": count_files(scratch_dir),
+        "traced": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+    }
+
+
+def format_sample(sample):
+    """記録したリソースの使用量を1行の文字列にする"""
+
+    def megabytes(value):
+        return "n/a" if value is None else f"{value / 1024 / 1024:.1f}MB"
+
+    return (
+        f"cycle {sample['cycle']:>6}  rss {megabytes(sample['rss']):>9}  threads {sample['threads']:>3}  "
+        f"fds {sample['fds'] if sample['fds'] is not None else 'n/a':>4}  scratch {sample['scratch_files']:>4}  "
+        f"traced {megabytes(sample['traced']):>9}"
+    )
+
+
+def check_growth(baseline, final, args):
+    """
+    ウォームアップ後からの増加量をしきい値と比較する
+
+    Parameters
+    ----------
+    baseline : dict
+        ウォームアップ後に記録したリソースの使用量
+    final : dict
+        最後に記録したリソースの使用量
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+
+    Returns
+    -------
+    list
+        しきい値を超えた項目の説明（超えていない場合は空のリスト）
+    """
+    limits = [
+        ("rss", args.max_rss_growth_mb * 1024 * 1024, "RSS", "bytes"),
+        ("traced", args.max_traced_growth_mb * 1024 * 1024, "traced Python memory", "bytes"),
+        ("threads", args.max_thread_growth, "thread count", "threads"),
+        ("fds", args.max_fd_growth, "open file descriptors", "descriptors"),
+        ("scratch_files", args.max_scratch_files, "scratch files", "files"),
+    ]
+    failures = []
+    for key, limit, name, unit in limits:
+        if baseline[key] is None or final[key] is None:
+            continue
+        growth = final[key] - baseline[key]
+        if growth > limit:
+            failures.append(f"{name} grew by {growth} {unit} over {final['cycle'] - baseline['cycle']} cycles (limit {limit:g})")
+    return failures
+
+
+def top_allocations(baseline_snapshot, limit):
+    """
+    ウォームアップ後に増加したメモリの割り当て元の上位を取得する
+
+    Parameters
+    ----------
+    baseline_snapshot : tracemalloc.Snapshot
+        ウォームアップ後に取得したスナップショット
+    limit : int
+        取得する件数
+
+    Returns
+    -------
+    list
+        tracemalloc.StatisticDiffのリスト（増加量の大きい順）
+    """
+    filters = [tracemalloc.Filter(False, filename) for filename in IGNORED_TRACE_FILES]
+    snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+    diff = snapshot.compare_to(baseline_snapshot.filter_traces(filters), "lineno")
+    return [stat for stat in diff if stat.size_diff > 0][:limit]
+
+
+def run(args):
+    """
+    ソークテストを実行して結果を表示する
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+
+    Returns
+    -------
+    int
+        終了コード（しきい値を超えた場合や完了しなかった録音がある場合は1）
+    """
+    if args.tracemalloc_frames:
+        # 読み込み時の割り当ても含めるため、アプリケーションのモジュールより先に開始する
+        tracemalloc.start(args.tracemalloc_frames)
+
+    # 履歴や一時ファイルをユーザーのデータディレクトリに書き込まない
+    data_dir = tempfile.mkdtemp(prefix="osw-soak-")
+    os.environ["OPEN_SUPER_WHISPER_DATA_DIR"] = data_dir
+
+    install_fake_sounddevice()
+    FakeInputStream.audio = load_fixture(args.fixture, 16000, args.record_seconds)
+    FakeInputStream.speed = args.speed
+
+    from src.core.scratch_manager import ScratchManager
+    from src.core.whisper_api import WhisperTranscriber
+
+    with MockTranscriptionServer(latency=args.latency) as server:
+        transcriber = WhisperTranscriber(api_key="sk-soak", base_url=server.url)
+        transcriber.set_model(args.model)
+
+        if args.pipeline == "gui":
+            pipeline = GuiPipeline(transcriber)
+            pipeline.window.enable_sound = args.sound
+            scratch_dir = str(pipeline.window.scratch.directory)
+        else:
+            scratch_dir = os.path.join(data_dir, "scratch")
+            pipeline = CorePipeline(transcriber, ScratchManager(scratch_dir))
+        tracker = pipeline.latency_tracker
+
+        record_wall_seconds = args.record_seconds / args.speed
+        baseline = baseline_snapshot = None
+        final = None
+        failures = 0
+        started = time.monotonic()
+        try:
+            for i in range(args.warmup + args.cycles):
+                done = completed_count(tracker)
+                pipeline.toggle()
+                sleep_with(pipeline.pump, record_wall_seconds)
+                pipeline.toggle()
+                if not wait_until(lambda: completed_count(tracker) > done, pipeline.pump):
+                    failures += 1
+                    print(f"Cycle {i} did not complete within {ITERATION_TIMEOUT} seconds", file=sys.stderr)
+                # 完了の通知後に残っている処理（一時ファイルの削除など）を終わらせる
+                sleep_with(pipeline.pump, args.pause)
+
+                cycle = i + 1 - args.warmup
+                if cycle == 0 and tracemalloc.is_tracing():
+                    # スナップショット自体のメモリがRSSの増加量に含まれないよう、基準の記録より先に取得する
+                    baseline_snapshot = tracemalloc.take_snapshot()
+                if cycle == 0 or (cycle > 0 and (cycle % args.sample_every == 0 or cycle == args.cycles)):
+                    final = sample_resources(cycle, scratch_dir)
+                    print(format_sample(final), flush=True)
+                    if cycle == 0:
+                        baseline = final
+        finally:
+            pipeline.close()
+
+        elapsed = time.monotonic() - started
+        print(
+            f"pipeline={args.pipeline} cycles={args.cycles} warmup={args.warmup} record={args.record_seconds}s "
+            f"speed={args.speed}x requests={server.requests} elapsed={elapsed:.1f}s"
+        )
+
+    problems = check_growth(baseline, final, args)
+    if baseline_snapshot is not None and (problems or args.show_allocations):
+        print("Top allocations since cycle 0:")
+        for stat in top_allocations(baseline_snapshot, args.top):
+            print(f"  {stat}")
+    tracemalloc.stop()
+
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if failures:
+        print(f"FAIL: {failures} cycles did not complete")
+    if not problems and not failures:
+        print("OK: no resource growth above the thresholds")
+    return 1 if problems or failures else 0
+
+
+def main():
+    """
+    コマンドライン引数を解析してソークテストを実行する
+    """
+    parser = argparse.ArgumentParser(description="Soak test for memory, thread and file descriptor leaks over many dictations")
+    parser.add_argument("--pipeline", choices=["gui", "core"], default="gui", help="drive the main window or the core classes only")
+    parser.add_argument("--cycles", type=int, default=2000, help="number of record/transcribe cycles after the warmup")
+    parser.add_argument("--warmup", type=int, default=100, help="cycles run before the baseline is taken")
+    parser.add_argument("--fixture", nargs="*", default=[], metavar="WAV", help="audio files fed to the fake input stream")
+    parser.add_argument("--record-seconds", type=float, default=1.0, help="seconds of audio recorded per cycle")
+    parser.add_argument("--speed", type=float, default=20.0, help="feed audio this many times faster than real time")
+    parser.add_argument("--pause", type=float, default=0.01, help="seconds to idle between cycles")
+    parser.add_argument("--model", default="gpt-4o-transcribe", help="model ID sent to the mock server")
+    parser.add_argument("--latency", type=float, default=0.0, help="mock server response latency in seconds")
+    parser.add_argument("--sound", action="store_true", help="play the notification sounds (gui pipeline only)")
+    parser.add_argument("--sample-every", type=int, default=100, help="record resource usage every N cycles")
+    parser.add_argument("--tracemalloc-frames", type=int, default=1, help="traceback depth for tracemalloc (0 to disable)")
+    parser.add_argument("--top", type=int, default=10, help="number of allocation sites shown")
+    parser.add_argument("--show-allocations", action="store_true", help="show the top allocation sites even when passing")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=30.0, help="allowed RSS growth after the warmup")
+    parser.add_argument("--max-traced-growth-mb", type=float, default=5.0, help="allowed tracemalloc growth after the warmup")
+    parser.add_argument("--max-thread-growth", type=int, default=2, help="allowed increase in the number of threads")
+    parser.add_argument("--max-fd-growth", type=int, default=8, help="allowed increase in open file descriptors")
+    parser.add_argument("--max-scratch-files", type=int, default=2, help="allowed increase in files left in the scratch directory")
+    args = parser.parse_args()
+    if args.cycles < 1 or args.warmup < 1 or args.speed <= 0 or args.record_seconds <= 0 or args.sample_every < 1:
+        parser.error("--cycles, --warmup, --speed, --record-seconds and --sample-every must be positive")
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+語彙補正のスループットベンチマーク
+
+合成したカスタム語彙と文字起こしテキストに対して VocabularyCorrector を実行し、
+1秒あたりの処理単語数を語彙数ごとに計測します。
+
+実行方法::
+
+    python -m benchmarks.vocabulary_correction
+"""
+
+import argparse
+import random
+import time
+
+from src.core.vocabulary_corrector import VocabularyCorrector
+
+# 合成語彙を生成するための音節（子音と母音の組み合わせ）
+SYLLABLES = [consonant + vowel for consonant in "bcdfghjklmnprstvwxz" for vowel in "aeiou"] + ["tra", "qui", "str", "ph"]
+
+# 文字起こしテキストに混ぜる一般的な単語
+COMMON_WORDS = (
+    "the of and to in is that it for on was with as be at by this have from or had not but "
+    "what all were when we there can an your which their said if do will each about how up "
+    "out them then she many some so these would other into has more her two like him see time"
+).split()
+
+
+def make_vocabulary(size, rng):
+    """
+    合成したカスタム語彙を生成する
+
+    Parameters
+    ----------
+    size : int
+        語彙数
+    rng : random.Random
+        乱数生成器
+
+    Returns
+    -------
+    list
+        語彙のリスト
+    """
+    terms = set()
+    while len(terms) < size:
+        term = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        if rng.random() < 0.2:
+            term += " " + "".join(rng.choice(SYLLABLES) for _ in range(2)).capitalize()
+        terms.add(term)
+    return sorted(terms)
+
+
+def misspell(term, rng):
+    """
+    語彙に1文字の誤りを加える
+
+    Parameters
+    ----------
+    term : str
+        元の語彙
+    rng : random.Random
+        乱数生成器
+
+    Returns
+    -------
+    str
+        誤りを含む語彙
+    """
+    position = rng.randrange(1, len(term))
+    return term[:position] + rng.choice("aeiou") + term[position + 1:]
+
+
+def make_transcript(words, vocabulary, rng, term_ratio=0.05):
+    """
+    語彙の誤綴りを一定割合で含む合成文字起こしを生成する
+
+    Parameters
+    ----------
+    words : int
+        単語数
+    vocabulary : list
+        カスタム語彙のリスト
+    rng : random.Random
+        乱数生成器
+    term_ratio : float, optional
+        語彙を含める割合
+
+    Returns
+    -------
+    str
+        合成した文字起こしテキスト
+    """
+    parts = []
+    for _ in range(words):
+        if rng.random() < term_ratio:
+            parts.append(misspell(rng.choice(vocabulary), rng).lower())
+        else:
+            parts.append(rng.choice(COMMON_WORDS))
+    return " ".join(parts)
+
+
+def run(vocabulary_sizes, transcript_words, repeat, seed=0):
+    """
+    ベンチマークを実行して結果を表示する
+
+    Parameters
+    ----------
+    vocabulary_sizes : list
+        計測する語彙数のリスト
+    transcript_words : int
+        文字起こし1件あたりの単語数
+    repeat : int
+        計測を繰り返す回数
+    seed : int, optional
+        乱数のシード
+    """
+    print(f"{'vocabulary':>10} {'build (ms)':>11} {'cold (words/s)':>15} {'warm (words/s)':>15}")
+    for size in vocabulary_sizes:
+        rng = random.Random(seed)
+        vocabulary = make_vocabulary(size, rng)
+        transcripts = [make_transcript(transcript_words, vocabulary, rng) for _ in range(repeat)]
+
+        corrector = VocabularyCorrector()
+        corrector.update(vocabulary)
+        start = time.perf_counter()
+        corrector.lookup("")
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # 初回（照合キャッシュなし）
+        start = time.perf_counter()
+        for transcript in transcripts:
+            corrector.correct(transcript)
+        cold = transcript_words * repeat / (time.perf_counter() - start)
+
+        # 2回目（照合キャッシュあり）
+        start = time.perf_counter()
+        for transcript in transcripts:
+            corrector.correct(transcript)
+        warm = transcript_words * repeat / (time.perf_counter() - start)
+
+        print(f"{size:>10} {build_ms:>11.1f} {cold:>15,.0f} {warm:>15,.0f}")
+
+
+def main():
+    """
+    コマンドライン引数を解析してベンチマークを実行する
+    """
+    parser = argparse.ArgumentParser(description="Vocabulary correction throughput benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="vocabulary sizes")
+    parser.add_argument("--words", type=int, default=5000, help="words per transcript")
+    parser.add_argument("--repeat", type=int, default=5, help="number of transcripts")
+    args = parser.parse_args()
+    run(args.sizes, args.words, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,18 @@
 Open Super Whisper - メインエントリポイント
 
 アプリケーションを起動するためのメインエントリポイントです。
+最初の引数がヘッドレスモードのサブコマンド（例: daemon）の場合は、
+PyQt6を読み込まずにヘッドレスモードで起動します。
 """
 
-from src.gui.main import main
+import sys
+
+from src.headless.cli import COMMANDS as HEADLESS_COMMANDS
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in HEADLESS_COMMANDS:
+        from src.headless.cli import main as headless_main
+        sys.exit(headless_main())
+    
+    from src.gui.main import main
     main()
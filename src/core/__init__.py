@@ -2,10 +2,33 @@
 コアモジュール
 
 アプリケーションの中核となる機能を提供します。
+
+AudioRecorder（PortAudio）やHotkeyManager（X/入力デバイス）は、ファイルの文字起こしだけを
+行うヘッドレスモードでは不要なため、``from src.core import AudioRecorder``のように
+最初に参照された時点で読み込みます。
 """
 
-from src.core.whisper_api import WhisperTranscriber
-from src.core.audio_recorder import AudioRecorder
-from src.core.hotkeys import HotkeyManager
+import importlib
+
+# 公開する名前と定義しているモジュール
+_EXPORTS = {
+    "WhisperTranscriber": "src.core.whisper_api",
+    "AudioRecorder": "src.core.audio_recorder",
+    "HotkeyManager": "src.core.hotkeys",
+    "Transcript": "src.core.transcript",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ["WhisperTranscriber", "AudioRecorder", "HotkeyManager"]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,463 @@
+"""
+音声アーカイブモジュール
+
+文字起こしした録音をFLACまたはOpusに圧縮し、少数の大きなセグメント
+ファイルに追記して保存します。保存した音声は参照文字列で文字起こし履歴と
+関連付け、後から別のモデルで再び文字起こしできます。保持期間と容量の
+上限を超えた音声は削除し、削除で空いた領域は圧縮（コンパクション）で回収します。
+"""
+
+import io
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+# 参照文字列の接頭辞
+REF_PREFIX = "archive:"
+
+# 圧縮形式ごとの (soundfileの形式, サブタイプ, 拡張子)
+AUDIO_FORMATS = {
+    "flac": ("FLAC", "PCM_16", ".flac"),
+    "opus": ("OGG", "OPUS", ".ogg"),
+}
+
+# Opusで使用できるサンプルレート
+_OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+class AudioArchive:
+    """
+    圧縮した音声をセグメントファイルに保存するアーカイブ
+
+    音声はセグメントファイル（segment_000001.bin など）に追記し、位置と長さを
+    索引（index.db）に記録します。読み込みはセグメントファイルをメモリマップして
+    必要な範囲だけを取り出すため、一時ファイルへの展開は行いません。
+    削除した音声の領域はセグメントに残り、有効なデータの割合が下がった
+    セグメントをcompact()で書き直して回収します。
+
+    Attributes
+    ----------
+    directory : Path
+        セグメントファイルと索引を保存するディレクトリ
+    audio_format : str
+        圧縮形式（"flac"または"opus"）
+    max_age_seconds : float
+        これより古い音声を削除する（0の場合は経過時間で削除しない）
+    max_total_bytes : int
+        保存する音声の合計サイズの上限（0の場合は制限しない）
+    on_evict : Callable[[List[str]], None] or None
+        保持期間や容量の上限で音声を削除したときに削除した参照文字列を受け取るコールバック
+    """
+
+    # 1つのセグメントファイルの最大サイズ（バイト）
+    SEGMENT_BYTES = 64 * 1024 * 1024
+
+    # 有効なデータの割合がこれを下回ったセグメントを圧縮する
+    COMPACT_RATIO = 0.5
+
+    # デフォルトの保持期間（秒）と合計サイズの上限（バイト）
+    DEFAULT_MAX_AGE_SECONDS = 90 * 24 * 60 * 60
+    DEFAULT_MAX_TOTAL_BYTES = 1024 * 1024 * 1024
+
+    def __init__(
+        self,
+        directory,
+        audio_format: str = "flac",
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+        on_evict: Optional[Callable[[List[str]], None]] = None,
+    ):
+        """
+        AudioArchiveの初期化
+
+        Parameters
+        ----------
+        directory : str or Path
+            セグメントファイルと索引を保存するディレクトリ
+        audio_format : str, optional
+            圧縮形式："flac"（可逆）または"opus"（非可逆、より小さい）
+        max_age_seconds : float, optional
+            これより古い音声を削除する（デフォルト: 90日）
+        max_total_bytes : int, optional
+            保存する音声の合計サイズの上限（デフォルト: 1GB）
+        on_evict : Callable[[List[str]], None], optional
+            音声を自動で削除したときに呼び出すコールバック（履歴の参照を外すために使用）
+        """
+        if audio_format not in AUDIO_FORMATS:
+            raise ValueError(f"Unsupported archive format: {audio_format}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.audio_format = audio_format
+        self.max_age_seconds = max_age_seconds
+        self.max_total_bytes = max_total_bytes
+        self.on_evict = on_evict
+
+        self._lock = threading.RLock()
+        self._maps: Dict[str, Tuple[int, mmap.mmap]] = {}
+        self._db = sqlite3.connect(str(self.directory / "index.db"), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                id INTEGER PRIMARY KEY,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                suffix TEXT NOT NULL,
+                created REAL NOT NULL,
+                duration REAL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS blobs_created ON blobs (created)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS blobs_segment ON blobs (segment)")
+
+    @staticmethod
+    def is_archive_ref(ref: Optional[str]) -> bool:
+        """
+        アーカイブの参照文字列かを判定する
+
+        Parameters
+        ----------
+        ref : str or None
+            音声の参照文字列
+
+        Returns
+        -------
+        bool
+            アーカイブの参照文字列の場合True
+        """
+        return bool(ref) and ref.startswith(REF_PREFIX)
+
+    @staticmethod
+    def _blob_id(ref: str) -> Optional[int]:
+        """参照文字列から索引のIDを取り出す"""
+        if not AudioArchive.is_archive_ref(ref):
+            return None
+        try:
+            return int(ref[len(REF_PREFIX):])
+        except ValueError:
+            return None
+
+    def _encode(self, audio_file: str) -> Tuple[bytes, float]:
+        """
+        音声ファイルを圧縮形式に変換する
+
+        Returns
+        -------
+        Tuple[bytes, float]
+            圧縮した音声と音声の長さ（秒）
+        """
+        data, sample_rate = sf.read(audio_file, dtype="int16")
+        duration = len(data) / sample_rate if sample_rate else 0.0
+        file_format, subtype, _ = AUDIO_FORMATS[self.audio_format]
+        if self.audio_format == "opus" and sample_rate not in _OPUS_SAMPLE_RATES:
+            # Opusが対応していないサンプルレートは可逆圧縮で保存する
+            file_format, subtype, _ = AUDIO_FORMATS["flac"]
+        buffer = io.BytesIO()
+        sf.write(buffer, data, sample_rate, format=file_format, subtype=subtype)
+        return buffer.getvalue(), duration
+
+    @staticmethod
+    def _segment_number(path: Path) -> int:
+        """セグメントファイルの番号を取り出す"""
+        return int(path.stem.split("_")[1])
+
+    def _active_segment(self, size: int, first_number: int = 1) -> Path:
+        """追記先のセグメントファイルを決める（ロック取得済みで呼び出す）"""
+        segments = [
+            path for path in sorted(self.directory.glob("segment_*.bin")) if self._segment_number(path) >= first_number
+        ]
+        if segments and segments[-1].stat().st_size + size <= self.SEGMENT_BYTES:
+            return segments[-1]
+        number = self._segment_number(segments[-1]) + 1 if segments else first_number
+        return self.directory / f"segment_{number:06d}.bin"
+
+    def _append(self, payload: bytes, first_number: int = 1) -> Tuple[str, int]:
+        """
+        セグメントファイルに追記する（ロック取得済みで呼び出す）
+
+        Parameters
+        ----------
+        payload : bytes
+            追記するデータ
+        first_number : int, optional
+            追記先として使用するセグメントの最小の番号
+        """
+        segment = self._active_segment(len(payload), first_number)
+        with open(segment, "ab") as f:
+            offset = f.tell()
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        return segment.name, offset
+
+    def store(self, audio_file: str) -> Optional[str]:
+        """
+        音声ファイルを圧縮してアーカイブに保存する
+
+        Parameters
+        ----------
+        audio_file : str
+            保存する音声ファイルのパス
+
+        Returns
+        -------
+        str or None
+            保存した音声の参照文字列、保存に失敗した場合や容量の上限より大きい場合はNone
+        """
+        try:
+            payload, duration = self._encode(audio_file)
+        except Exception as e:
+            logger.error("Failed to encode audio for the archive: %s", e)
+            return None
+
+        # 上限より大きい音声は保存してもすぐに削除されるため保存しない
+        if self.max_total_bytes and len(payload) > self.max_total_bytes:
+            logger.warning(
+                "Not archiving audio of %d bytes, which exceeds the archive limit of %d bytes",
+                len(payload), self.max_total_bytes,
+            )
+            return None
+
+        suffix = ".flac" if payload[:4] == b"fLaC" else AUDIO_FORMATS[self.audio_format][2]
+        with self._lock:
+            try:
+                segment, offset = self._append(payload)
+                cursor = self._db.execute(
+                    "INSERT INTO blobs (segment, offset, length, suffix, created, duration) VALUES (?, ?, ?, ?, ?, ?)",
+                    (segment, offset, len(payload), suffix, time.time(), duration),
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.error("Failed to store audio in the archive: %s", e)
+                return None
+            ref = f"{REF_PREFIX}{cursor.lastrowid}"
+            evicted = self._evict(keep=cursor.lastrowid)
+        self._notify_evicted(evicted)
+        return ref
+
+    def _segment_map(self, segment: str) -> mmap.mmap:
+        """セグメントファイルのメモリマップを取得する（ロック取得済みで呼び出す）"""
+        path = self.directory / segment
+        size = path.stat().st_size
+        cached = self._maps.get(segment)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        if cached is not None:
+            cached[1].close()
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[segment] = (size, mapped)
+        return mapped
+
+    def open(self, ref: str) -> Optional[Tuple[str, bytes]]:
+        """
+        保存した音声を読み込む
+
+        戻り値はWhisperTranscriber.transcribe()にそのまま渡せます。
+
+        Parameters
+        ----------
+        ref : str
+            音声の参照文字列
+
+        Returns
+        -------
+        Tuple[str, bytes] or None
+            (ファイル名, 圧縮した音声)の組、音声が存在しない場合はNone
+        """
+        blob_id = self._blob_id(ref)
+        if blob_id is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT segment, offset, length, suffix FROM blobs WHERE id = ?", (blob_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            segment, offset, length, suffix = row
+            try:
+                mapped = self._segment_map(segment)
+            except (OSError, ValueError) as e:
+                logger.error("Failed to read audio from the archive: %s", e)
+                return None
+            return f"archive_{blob_id}{suffix}", mapped[offset:offset + length]
+
+    def exists(self, ref: Optional[str]) -> bool:
+        """
+        音声がアーカイブに存在するかを確認する
+
+        Parameters
+        ----------
+        ref : str or None
+            音声の参照文字列
+
+        Returns
+        -------
+        bool
+            音声が存在する場合True
+        """
+        blob_id = self._blob_id(ref)
+        if blob_id is None:
+            return False
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM blobs WHERE id = ?", (blob_id,)).fetchone() is not None
+
+    def delete(self, ref: Optional[str]) -> None:
+        """
+        音声をアーカイブから削除する
+
+        領域はcompact()を実行するまでセグメントファイルに残ります。
+
+        Parameters
+        ----------
+        ref : str or None
+            音声の参照文字列
+        """
+        blob_id = self._blob_id(ref)
+        if blob_id is None:
+            return
+        with self._lock:
+            self._db.execute("DELETE FROM blobs WHERE id = ?", (blob_id,))
+
+    def total_bytes(self) -> int:
+        """
+        保存している音声の合計サイズを取得する
+
+        Returns
+        -------
+        int
+            削除済みの領域を除いた合計サイズ（バイト）
+        """
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(length), 0) FROM blobs").fetchone()[0]
+
+    def _evict(self, keep: Optional[int] = None) -> List[int]:
+        """
+        保持期間を過ぎた音声と容量の上限を超えた古い音声を削除する（ロック取得済みで呼び出す）
+
+        Parameters
+        ----------
+        keep : int, optional
+            削除の対象から除く音声のID（保存した直後の音声）
+
+        Returns
+        -------
+        List[int]
+            削除した音声のID
+        """
+        removed = []
+        if self.max_age_seconds:
+            cutoff = time.time() - self.max_age_seconds
+            removed += [row[0] for row in self._db.execute("SELECT id FROM blobs WHERE created < ?", (cutoff,))]
+            self._db.execute("DELETE FROM blobs WHERE created < ?", (cutoff,))
+
+        if self.max_total_bytes:
+            total = self._db.execute("SELECT COALESCE(SUM(length), 0) FROM blobs").fetchone()[0]
+            if total > self.max_total_bytes:
+                over = []
+                rows = self._db.execute(
+                    "SELECT id, length FROM blobs WHERE id != ? ORDER BY created", (keep if keep is not None else -1,)
+                )
+                for blob_id, length in rows:
+                    if total <= self.max_total_bytes:
+                        break
+                    over.append(blob_id)
+                    total -= length
+                self._db.executemany("DELETE FROM blobs WHERE id = ?", [(blob_id,) for blob_id in over])
+                removed += over
+        return removed
+
+    def _notify_evicted(self, blob_ids: List[int]) -> None:
+        """削除した音声の参照文字列をコールバックに渡す"""
+        if not blob_ids or not self.on_evict:
+            return
+        try:
+            self.on_evict([f"{REF_PREFIX}{blob_id}" for blob_id in blob_ids])
+        except Exception as e:
+            logger.exception("Audio archive eviction callback failed: %s", e)
+
+    def enforce_policies(self) -> int:
+        """
+        保持期間と容量の上限を適用し、空いた領域を圧縮する
+
+        Returns
+        -------
+        int
+            削除した音声の数
+        """
+        with self._lock:
+            removed = self._evict()
+        self._notify_evicted(removed)
+        self.compact()
+        return len(removed)
+
+    def compact(self) -> int:
+        """
+        有効なデータの割合が低いセグメントファイルを書き直す
+
+        有効な音声をこの圧縮で新しく作成するセグメントに移してから古いセグメントを
+        削除します。移動先のセグメントは今回の圧縮の対象にしないため、移した音声が
+        削除されることはありません。参照文字列は変わりません。
+
+        Returns
+        -------
+        int
+            回収したバイト数
+        """
+        reclaimed = 0
+        with self._lock:
+            segments = sorted(self.directory.glob("segment_*.bin"))
+            # 移した音声は既存のどのセグメントよりも後の番号のセグメントに書き込む
+            first_new = self._segment_number(segments[-1]) + 1 if segments else 1
+            live = dict(self._db.execute("SELECT segment, SUM(length) FROM blobs GROUP BY segment").fetchall())
+            for index, path in enumerate(segments):
+                size = path.stat().st_size
+                live_bytes = live.get(path.name, 0)
+                # 追記中の最新のセグメントは有効なデータがない場合だけ削除する
+                is_last = index == len(segments) - 1
+                if is_last and live_bytes:
+                    continue
+                if size and live_bytes / size >= self.COMPACT_RATIO:
+                    continue
+
+                try:
+                    if live_bytes:
+                        mapped = self._segment_map(path.name)
+                        rows = self._db.execute(
+                            "SELECT id, offset, length FROM blobs WHERE segment = ?", (path.name,)
+                        ).fetchall()
+                        for blob_id, offset, length in rows:
+                            segment, new_offset = self._append(mapped[offset:offset + length], first_new)
+                            self._db.execute(
+                                "UPDATE blobs SET segment = ?, offset = ? WHERE id = ?", (segment, new_offset, blob_id)
+                            )
+                    cached = self._maps.pop(path.name, None)
+                    if cached is not None:
+                        cached[1].close()
+                    path.unlink()
+                except (OSError, ValueError, sqlite3.Error) as e:
+                    logger.error("Failed to compact audio archive segment %s: %s", path.name, e)
+                    continue
+                reclaimed += size - live_bytes
+        return reclaimed
+
+    def close(self) -> None:
+        """
+        メモリマップと索引を閉じる
+        """
+        with self._lock:
+            for _, mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            self._db.close()
@@ -1,12 +1,18 @@
+import logging
 import os
 import time
 import wave
 import threading
-import tempfile
 import numpy as np
 import sounddevice as sd
 import soundfile as sf
-from datetime import datetime
+
+from src.core.latency_tracker import latency_tracker
+from src.core.metrics import RECORDING_DURATION, AUDIO_OVERFLOWS
+from src.core.recording_journal import RecordingJournal
+from src.core.scratch_manager import ScratchManager
+
+logger = logging.getLogger(__name__)
 
 
 class AudioRecorder:
@@ -16,7 +22,7 @@ class AudioRecorder:
     オーディオの録音、保存、状態管理の機能を提供します。
     """
     
-    def __init__(self, sample_rate=16000, channels=1):
+    def __init__(self, sample_rate=16000, channels=1, journal_dir=None, scratch=None):
         """
         AudioRecorderの初期化
         
@@ -26,14 +32,32 @@ class AudioRecorder:
             録音するサンプルレート (デフォルト: 16000)
         channels : int
             オーディオチャンネル数 (デフォルト: 1 モノラル)
+        journal_dir : str, optional
+            録音ジャーナルの保存先。指定された場合、録音中の音声を逐次ディスクに書き込む
+        scratch : ScratchManager, optional
+            録音ファイルを作成する一時ファイル管理
         """
         self.sample_rate = sample_rate
         self.channels = channels
         self.recording = False
         self.audio_data = []
-        self.temp_dir = tempfile.gettempdir()
+        self.scratch = scratch or ScratchManager()
+        self.temp_dir = str(self.scratch.directory)
         self._record_thread = None
+        self.journal_dir = journal_dir
+        self._journal = None
 
+    def set_journal_dir(self, journal_dir):
+        """
+        録音ジャーナルの保存先を設定する（次の録音から有効）
+        
+        Parameters
+        ----------
+        journal_dir : str or None
+            録音ジャーナルの保存先。Noneの場合はジャーナルを使用しない
+        """
+        self.journal_dir = journal_dir
+    
     def start_recording(self):
         """
         音声録音を開始する
@@ -46,6 +70,14 @@ class AudioRecorder:
         self.recording = True
         self.audio_data = []
         
+        # 異常終了に備えて録音中の音声を逐次ディスクに書き込む
+        self._journal = None
+        if self.journal_dir:
+            try:
+                self._journal = RecordingJournal(self.journal_dir, self.sample_rate, self.channels)
+            except OSError as e:
+                logger.error("Failed to start recording journal: %s", e)
+        
         # 別スレッドで録音を開始
         self._record_thread = threading.Thread(target=self._record)
         self._record_thread.daemon = True
@@ -65,41 +97,64 @@ class AudioRecorder:
         if not self.recording:
             return None
             
+        latency_tracker.mark("stop")
         self.recording = False
         
         # 録音スレッドの終了を待機
         if self._record_thread and self._record_thread.is_alive():
             self._record_thread.join()
         
-        # 現在のタイムスタンプに基づいたファイル名を生成
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(self.temp_dir, f"recording_{timestamp}.wav")
-        
-        # 録音した音声を保存
-        if len(self.audio_data) > 0:
-            audio_data = np.concatenate(self.audio_data, axis=0)
-            sf.write(filename, audio_data, self.sample_rate)
-            return filename
+        # 録音した音声を一意な名前の一時ファイルに保存
+        saved = False
+        filename = None
+        try:
+            if len(self.audio_data) > 0:
+                filename = self.scratch.new_path("recording", ".wav")
+                audio_data = np.concatenate(self.audio_data, axis=0)
+                sf.write(filename, audio_data, self.sample_rate)
+                saved = True
+                latency_tracker.mark("saved")
+                RECORDING_DURATION.observe(len(audio_data) / self.sample_rate)
+        except Exception as e:
+            logger.error("Failed to save recording: %s", e)
+            self.scratch.release(filename)
+        finally:
+            # 保存に成功した場合のみジャーナルを削除する（失敗時は次回の起動時に復元できる）
+            if self._journal is not None:
+                self._journal.close(discard=saved or len(self.audio_data) == 0)
+                self._journal = None
         
-        return None
+        return filename if saved else None
     
     def _record(self):
         """
         音声データを録音する内部メソッド
         """
         try:
+            first_block = True
+            
             def callback(indata, frames, time, status):
+                nonlocal first_block
                 if status:
-                    print(f"Status: {status}")
+                    logger.warning("Audio input status: %s", status)
+                    if status.input_overflow:
+                        AUDIO_OVERFLOWS.inc()
                 if self.recording:
-                    self.audio_data.append(indata.copy())
+                    if first_block:
+                        first_block = False
+                        latency_tracker.mark("first_block")
+                    data = indata.copy()
+                    self.audio_data.append(data)
+                    if self._journal is not None:
+                        self._journal.append(data)
             
             with sd.InputStream(samplerate=self.sample_rate, channels=self.channels, callback=callback):
+                latency_tracker.mark("stream_open")
                 while self.recording:
                     sd.sleep(100)  # CPUの過剰消費を避けるためのスリープ
                     
         except Exception as e:
-            print(f"Recording error: {e}")
+            logger.exception("Recording error: %s", e)
             self.recording = False
 
     def is_recording(self):
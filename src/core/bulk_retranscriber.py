@@ -0,0 +1,298 @@
+"""
+一括再文字起こしモジュール
+
+音声アーカイブに音声が保存されている文字起こし履歴を、指定したモデルと
+現在のカスタム語彙でまとめて文字起こしし直し、結果を履歴に書き戻します。
+"""
+
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# モデルごとの1分あたりの料金（米ドル、OpenAIの公開価格）
+PRICE_PER_MINUTE = {
+    "whisper-1": 0.006,
+    "gpt-4o-transcribe": 0.006,
+    "gpt-4o-mini-transcribe": 0.003,
+}
+
+
+class BulkRetranscriber:
+    """
+    履歴の音声を同時実行数を制限して再文字起こしするクラス
+
+    処理はバックグラウンドのスレッドで行い、1件終わるごとに結果を
+    HistoryStore.update()で書き戻すため、途中で中止しても完了した分は
+    保存されます。一時停止中は新しい文字起こしを開始しません。
+
+    Attributes
+    ----------
+    model : str or None
+        使用するモデル（Noneの場合はトランスクライバーの設定済みのモデル）
+    max_workers : int
+        同時に実行する文字起こしの最大数
+    on_progress : Callable[[Dict], None] or None
+        1件終わるごとに進捗を受け取るコールバック（処理スレッドから呼ばれる）
+    on_result : Callable[[Dict], None] or None
+        1件の書き戻しごとに変更後の履歴を受け取るコールバック（処理スレッドから呼ばれる）
+    on_finished : Callable[[Dict], None] or None
+        すべての処理が終わったときに最終的な進捗を受け取るコールバック（処理スレッドから呼ばれる）
+    """
+
+    # 履歴から所要時間の実績を得られない場合の、音声の長さに対する文字起こし時間の比率
+    DEFAULT_REALTIME_FACTOR = 0.2
+
+    # 所要時間の実績を集める履歴の件数
+    ESTIMATE_SAMPLE_SIZE = 200
+
+    # 履歴を読み込む1ページの件数
+    PAGE_SIZE = 500
+
+    def __init__(
+        self,
+        history_store,
+        archive,
+        transcriber,
+        model: Optional[str] = None,
+        max_workers: int = 2,
+        text_replacer=None,
+        on_progress: Optional[Callable[[Dict], None]] = None,
+        on_result: Optional[Callable[[Dict], None]] = None,
+        on_finished: Optional[Callable[[Dict], None]] = None,
+    ):
+        """
+        BulkRetranscriberの初期化
+
+        Parameters
+        ----------
+        history_store : HistoryStore
+            再文字起こしする履歴
+        archive : AudioArchive
+            履歴に関連付けられた音声のアーカイブ
+        transcriber : WhisperTranscriber
+            文字起こしに使用するインスタンス
+        model : str, optional
+            使用するモデル
+        max_workers : int, optional
+            同時に実行する文字起こしの最大数 (デフォルト: 2)
+        text_replacer : TextReplacer, optional
+            文字起こし結果に適用する置換辞書
+        on_progress : Callable[[Dict], None], optional
+            進捗を受け取るコールバック
+        on_result : Callable[[Dict], None], optional
+            変更後の履歴を受け取るコールバック
+        on_finished : Callable[[Dict], None], optional
+            終了時に呼び出すコールバック
+        """
+        self.history_store = history_store
+        self.archive = archive
+        self.transcriber = transcriber
+        self.model = model
+        self.max_workers = max(1, max_workers)
+        self.text_replacer = text_replacer
+        self.on_progress = on_progress
+        self.on_result = on_result
+        self.on_finished = on_finished
+
+        self._lock = threading.Lock()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._cancelled = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._progress = {"total": 0, "done": 0, "failed": 0}
+
+    @property
+    def target_model(self) -> str:
+        """使用するモデル"""
+        return self.model or self.transcriber.model
+
+    def collect(self) -> List[Dict]:
+        """
+        再文字起こしできる履歴を取得する
+
+        Returns
+        -------
+        List[Dict]
+            音声がアーカイブに残っている履歴（新しい順）
+        """
+        entries = []
+        before_id = None
+        while True:
+            page = self.history_store.page(before_id=before_id, limit=self.PAGE_SIZE, with_audio=True)
+            entries.extend(entry for entry in page if self.archive.exists(entry["audio_ref"]))
+            if len(page) < self.PAGE_SIZE:
+                return entries
+            before_id = page[-1]["id"]
+
+    def _realtime_factor(self, model: str) -> float:
+        """履歴の実績から音声の長さに対する文字起こし時間の比率を求める"""
+        ratios = []
+        before_id = None
+        while len(ratios) < self.ESTIMATE_SAMPLE_SIZE:
+            page = self.history_store.page(before_id=before_id, limit=self.PAGE_SIZE)
+            ratios += [
+                entry["elapsed_seconds"] / entry["audio_seconds"]
+                for entry in page
+                if entry["model"] == model and entry["elapsed_seconds"] and entry["audio_seconds"]
+            ]
+            if len(page) < self.PAGE_SIZE:
+                break
+            before_id = page[-1]["id"]
+        return statistics.median(ratios) if ratios else self.DEFAULT_REALTIME_FACTOR
+
+    def estimate(self, entries: List[Dict]) -> Dict:
+        """
+        料金と所要時間を見積もる
+
+        所要時間は履歴に記録された同じモデルの実績から求め、同時実行数と
+        レート制限（音声の秒数の上限）を考慮します。
+
+        Parameters
+        ----------
+        entries : List[Dict]
+            再文字起こしする履歴
+
+        Returns
+        -------
+        Dict
+            件数（entries）、音声の合計秒数（audio_seconds）、
+            料金（cost、モデルの料金が不明な場合はNone）、所要秒数（seconds）
+        """
+        model = self.target_model
+        audio_seconds = sum(entry["audio_seconds"] or 0.0 for entry in entries)
+        price = PRICE_PER_MINUTE.get(model)
+        cost = audio_seconds / 60 * price if price is not None else None
+
+        seconds = audio_seconds * self._realtime_factor(model) / self.max_workers
+        rate_limit = self.transcriber.rate_limiter.audio_seconds_per_minute
+        if rate_limit > 0:
+            seconds = max(seconds, audio_seconds / rate_limit * 60)
+
+        return {"entries": len(entries), "audio_seconds": audio_seconds, "cost": cost, "seconds": seconds}
+
+    def start(self, entries: List[Dict]) -> None:
+        """
+        再文字起こしをバックグラウンドで開始する
+
+        Parameters
+        ----------
+        entries : List[Dict]
+            再文字起こしする履歴
+        """
+        if self.is_running():
+            return
+        self._cancelled.clear()
+        self._resumed.set()
+        with self._lock:
+            self._progress = {"total": len(entries), "done": 0, "failed": 0}
+        self._thread = threading.Thread(target=self._run, args=(list(entries),), daemon=True)
+        self._thread.start()
+
+    def pause(self) -> None:
+        """
+        新しい文字起こしの開始を一時停止する（実行中の文字起こしは完了まで続く）
+        """
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        """
+        一時停止した処理を再開する
+        """
+        self._resumed.set()
+
+    def cancel(self) -> None:
+        """
+        残りの処理を中止する（完了した分の結果は保存済み）
+        """
+        self._cancelled.set()
+        self._resumed.set()
+
+    def is_running(self) -> bool:
+        """
+        処理中かを確認する
+
+        Returns
+        -------
+        bool
+            処理中の場合True
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_paused(self) -> bool:
+        """
+        一時停止中かを確認する
+
+        Returns
+        -------
+        bool
+            一時停止中の場合True
+        """
+        return not self._resumed.is_set()
+
+    def get_progress(self) -> Dict:
+        """
+        進捗を取得する
+
+        Returns
+        -------
+        Dict
+            対象の件数（total）、成功した件数（done）、失敗した件数（failed）
+        """
+        with self._lock:
+            return dict(self._progress)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        処理が終わるまで待機する
+
+        Parameters
+        ----------
+        timeout : float, optional
+            最大の待機時間（秒）
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, entries: List[Dict]) -> None:
+        """同時実行数を制限して履歴を順に処理する（処理スレッド）"""
+        # 待機中のジョブを溜め込まないよう、実行数と同じ数だけ投入する
+        slots = threading.Semaphore(self.max_workers)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for entry in entries:
+                self._resumed.wait()
+                if self._cancelled.is_set():
+                    break
+                slots.acquire()
+                future = executor.submit(self._process, entry)
+                future.add_done_callback(lambda _: slots.release())
+
+        if self.on_finished:
+            self.on_finished(self.get_progress())
+
+    def _process(self, entry: Dict) -> None:
+        """1件の履歴を再文字起こしして書き戻す（ワーカースレッド）"""
+        if self._cancelled.is_set():
+            return
+        result = None
+        audio = self.archive.open(entry["audio_ref"])
+        if audio is not None:
+            model = self.target_model
+            started = time.monotonic()
+            result = self.transcriber.transcribe(audio, entry.get("language"), model=model)
+            elapsed = time.monotonic() - started
+
+        succeeded = isinstance(result, str) and not result.startswith("Error: ")
+        if succeeded:
+            if self.text_replacer is not None:
+                result = self.text_replacer.apply(result)
+            self.history_store.update(entry["id"], text=result, model=model, elapsed_seconds=elapsed)
+            if self.on_result:
+                self.on_result(dict(entry, text=result, model=model, elapsed_seconds=elapsed))
+
+        with self._lock:
+            self._progress["done" if succeeded else "failed"] += 1
+            progress = dict(self._progress)
+        if self.on_progress:
+            self.on_progress(progress)
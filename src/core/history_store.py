@@ -0,0 +1,502 @@
+"""
+文字起こし履歴モジュール
+
+文字起こし結果をSQLite（WALモード）に永続化し、FTS5の全文検索索引で
+履歴を検索できるようにします。書き込みは専用のスレッドでまとめて行うため、
+呼び出し元（GUIスレッドなど）をブロックしません。
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# データベースのスキーマバージョン
+SCHEMA_VERSION = 1
+
+# 検索語の最小文字数（trigramトークナイザーはこれより短い語を索引で検索できない）
+_TRIGRAM_MIN_LENGTH = 3
+
+# 取得する列
+_COLUMNS = ("id", "created", "text", "model", "language", "audio_seconds", "elapsed_seconds", "audio_ref")
+
+# update()で変更できる列
+_UPDATABLE_COLUMNS = ("text", "model", "language", "elapsed_seconds", "audio_ref")
+
+
+class HistoryStore:
+    """
+    文字起こし履歴の保存と検索を行うクラス
+
+    履歴は連番のIDで管理し、新しい順のページ単位で取得します。ページの境界は
+    OFFSETではなくID（キーセット）で指定するため、件数が増えても取得時間は
+    一定です。全文検索には日本語の部分一致に対応したtrigramトークナイザーを
+    使用し、利用できないSQLiteではunicode61トークナイザーの前方一致で検索します。
+
+    書き込み用の接続は書き込みスレッドだけが使用し、読み込み用の接続は
+    スレッドごとに作成します。WALモードのため、書き込み中も読み込みは
+    ブロックされません。
+
+    Attributes
+    ----------
+    path : Path
+        データベースファイルのパス
+    batch_size : int
+        1回のトランザクションでまとめて書き込む最大件数
+    on_commit : Callable[[List[int]], None] or None
+        書き込みが確定したときに追加された履歴のIDを受け取るコールバック
+        （書き込みスレッドから呼ばれる）
+    """
+
+    # 1回のトランザクションでまとめて書き込む最大件数
+    DEFAULT_BATCH_SIZE = 256
+
+    # 1ページのデフォルトの件数
+    DEFAULT_PAGE_SIZE = 100
+
+    def __init__(
+        self,
+        path,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        on_commit: Optional[Callable[[List[int]], None]] = None,
+    ):
+        """
+        HistoryStoreの初期化
+
+        Parameters
+        ----------
+        path : str or Path
+            データベースファイルのパス
+        batch_size : int, optional
+            1回のトランザクションでまとめて書き込む最大件数 (デフォルト: 256)
+        on_commit : Callable[[List[int]], None], optional
+            書き込みが確定したときに呼び出すコールバック
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        self.on_commit = on_commit
+
+        self._local = threading.local()
+        self._queue: "queue.Queue[Optional[Tuple]]" = queue.Queue()
+
+        # スキーマは呼び出し元のスレッドで作成し、作成に失敗した場合はここで例外にする
+        connection = self._connect()
+        try:
+            self.tokenizer = self._create_schema(connection)
+        finally:
+            connection.close()
+
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """データベースに接続する"""
+        connection = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # WALモードでは NORMAL でもデータベースの破損は起こらない
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    @staticmethod
+    def _create_schema(connection: sqlite3.Connection) -> str:
+        """
+        テーブルと全文検索索引を作成する
+
+        Returns
+        -------
+        str
+            全文検索索引のトークナイザー名
+        """
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcripts (
+                id INTEGER PRIMARY KEY,
+                created REAL NOT NULL,
+                text TEXT NOT NULL,
+                model TEXT,
+                language TEXT,
+                audio_seconds REAL,
+                elapsed_seconds REAL,
+                audio_ref TEXT
+            )
+            """
+        )
+        # アーカイブから削除された音声の参照を外すときに使用する
+        connection.execute("CREATE INDEX IF NOT EXISTS transcripts_audio_ref ON transcripts (audio_ref)")
+
+        row = connection.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'transcripts_fts'"
+        ).fetchone()
+        if row is not None:
+            return "trigram" if "trigram" in row[0] else "unicode61"
+
+        # trigramトークナイザーはSQLite 3.34以降で利用できる
+        tokenizer = "trigram"
+        try:
+            connection.execute(
+                "CREATE VIRTUAL TABLE transcripts_fts USING fts5("
+                "text, content='transcripts', content_rowid='id', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            tokenizer = "unicode61"
+            connection.execute(
+                "CREATE VIRTUAL TABLE transcripts_fts USING fts5("
+                "text, content='transcripts', content_rowid='id', tokenize='unicode61')"
+            )
+
+        connection.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS transcripts_ai AFTER INSERT ON transcripts BEGIN
+                INSERT INTO transcripts_fts(rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS transcripts_ad AFTER DELETE ON transcripts BEGIN
+                INSERT INTO transcripts_fts(transcripts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS transcripts_au AFTER UPDATE OF text ON transcripts BEGIN
+                INSERT INTO transcripts_fts(transcripts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+                INSERT INTO transcripts_fts(rowid, text) VALUES (new.id, new.text);
+            END;
+            """
+        )
+        # 既存の履歴がある場合は索引を作り直す
+        connection.execute("INSERT INTO transcripts_fts(transcripts_fts) VALUES ('rebuild')")
+        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return tokenizer
+
+    def _reader(self) -> sqlite3.Connection:
+        """呼び出し元のスレッドの読み込み用接続を取得する"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def add(
+        self,
+        text: str,
+        model: Optional[str] = None,
+        language: Optional[str] = None,
+        audio_seconds: Optional[float] = None,
+        elapsed_seconds: Optional[float] = None,
+        audio_ref: Optional[str] = None,
+        created: Optional[float] = None,
+    ) -> None:
+        """
+        文字起こし結果を履歴に追加する
+
+        追加は書き込みスレッドで行われるため、この関数はすぐに戻ります。
+
+        Parameters
+        ----------
+        text : str
+            文字起こし結果のテキスト
+        model : str, optional
+            文字起こしに使用したモデル
+        language : str, optional
+            文字起こしの言語コード
+        audio_seconds : float, optional
+            音声の長さ（秒）
+        elapsed_seconds : float, optional
+            文字起こしにかかった時間（秒）
+        audio_ref : str, optional
+            保存した音声の参照（ファイルパスなど）
+        created : float, optional
+            作成日時のUNIX時刻（省略時は現在時刻）
+        """
+        if self._closed:
+            return
+        row = (
+            created if created is not None else time.time(),
+            text,
+            model,
+            language,
+            audio_seconds,
+            elapsed_seconds,
+            audio_ref,
+        )
+        self._queue.put(("add", row))
+
+    def update(self, entry_id: int, **fields) -> None:
+        """
+        履歴の内容を変更する
+
+        再文字起こしの結果を書き戻すときなどに使用します。変更は書き込み
+        スレッドで行われるため、この関数はすぐに戻ります。
+
+        Parameters
+        ----------
+        entry_id : int
+            変更する履歴のID
+        **fields
+            変更する列と値（text、model、language、elapsed_seconds、audio_ref）
+        """
+        unknown = set(fields) - set(_UPDATABLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown history fields: {', '.join(sorted(unknown))}")
+        if self._closed or not fields:
+            return
+        self._queue.put(("update", (entry_id, fields)))
+
+    def clear_audio_refs(self, refs: List[str]) -> None:
+        """
+        削除された音声への参照を履歴から外す
+
+        音声アーカイブが保持期間や容量の上限で音声を削除したときに使用します。
+        変更は書き込みスレッドで行われるため、この関数はすぐに戻ります。
+
+        Parameters
+        ----------
+        refs : List[str]
+            削除された音声の参照文字列
+        """
+        if self._closed or not refs:
+            return
+        self._queue.put(("clear_audio_refs", list(refs)))
+
+    def delete(self, entry_id: int) -> None:
+        """
+        履歴を削除する
+
+        Parameters
+        ----------
+        entry_id : int
+            削除する履歴のID
+        """
+        if self._closed:
+            return
+        self._queue.put(("delete", entry_id))
+
+    def flush(self) -> None:
+        """
+        追加、変更、削除の要求がすべて書き込まれるまで待機する
+        """
+        self._queue.join()
+
+    def _writer(self) -> None:
+        """要求をまとめて書き込む（書き込みスレッド）"""
+        connection = self._connect()
+        try:
+            while True:
+                item = self._queue.get()
+                batch = [item]
+                # 待機中に溜まった要求を1つのトランザクションで書き込む
+                while item is not None and len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+
+                try:
+                    self._write_batch(connection, [item for item in batch if item is not None])
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+
+                if batch[-1] is None:
+                    break
+        finally:
+            connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: List[Tuple]) -> None:
+        """要求を1つのトランザクションで書き込む"""
+        if not batch:
+            return
+        added = []
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for op, value in batch:
+                if op == "add":
+                    cursor = connection.execute(
+                        "INSERT INTO transcripts (created, text, model, language, audio_seconds, elapsed_seconds, audio_ref) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        value,
+                    )
+                    added.append(cursor.lastrowid)
+                elif op == "update":
+                    entry_id, fields = value
+                    assignments = ", ".join(f"{column} = ?" for column in fields)
+                    connection.execute(
+                        f"UPDATE transcripts SET {assignments} WHERE id = ?", (*fields.values(), entry_id)
+                    )
+                elif op == "clear_audio_refs":
+                    connection.executemany(
+                        "UPDATE transcripts SET audio_ref = NULL WHERE audio_ref = ?", [(ref,) for ref in value]
+                    )
+                elif op == "delete":
+                    connection.execute("DELETE FROM transcripts WHERE id = ?", (value,))
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            logger.error("Failed to write transcription history: %s", e)
+            return
+
+        if added and self.on_commit:
+            try:
+                self.on_commit(added)
+            except Exception as e:
+                logger.exception("History commit callback failed: %s", e)
+
+    def _match_clause(self, query: str) -> Tuple[str, List]:
+        """
+        検索語から検索条件を作成する
+
+        空白で区切った語をすべて含む履歴を検索します。trigramトークナイザーで
+        索引を使用できない短い語はLIKEで絞り込みます。
+
+        Returns
+        -------
+        Tuple[str, List]
+            WHERE句の条件とパラメータ
+        """
+        terms = query.split()
+        match_terms = []
+        conditions = []
+        params = []
+        for term in terms:
+            quoted = '"' + term.replace('"', '""') + '"'
+            if self.tokenizer == "trigram":
+                if len(term) >= _TRIGRAM_MIN_LENGTH:
+                    match_terms.append(quoted)
+                else:
+                    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                    conditions.append("t.text LIKE ? ESCAPE '\\'")
+                    params.append(f"%{escaped}%")
+            else:
+                match_terms.append(quoted + "*")
+
+        if match_terms:
+            conditions.insert(0, "t.id IN (SELECT rowid FROM transcripts_fts WHERE transcripts_fts MATCH ?)")
+            params.insert(0, " ".join(match_terms))
+        return " AND ".join(conditions), params
+
+    def page(
+        self,
+        query: Optional[str] = None,
+        before_id: Optional[int] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        with_audio: bool = False,
+    ) -> List[Dict]:
+        """
+        履歴を新しい順に1ページ分取得する
+
+        Parameters
+        ----------
+        query : str, optional
+            検索語（空白区切りの語をすべて含む履歴を取得）
+        before_id : int, optional
+            このIDより古い履歴を取得する（前のページの最後のID）
+        limit : int, optional
+            取得する最大件数 (デフォルト: 100)
+        with_audio : bool, optional
+            音声の参照がある履歴だけを取得する場合True
+
+        Returns
+        -------
+        List[Dict]
+            履歴のリスト
+        """
+        conditions = []
+        params: List = []
+        if query and query.strip():
+            clause, clause_params = self._match_clause(query)
+            conditions.append(clause)
+            params.extend(clause_params)
+        if before_id is not None:
+            conditions.append("t.id < ?")
+            params.append(before_id)
+        if with_audio:
+            conditions.append("t.audio_ref IS NOT NULL")
+
+        sql = f"SELECT {', '.join('t.' + column for column in _COLUMNS)} FROM transcripts t"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY t.id DESC LIMIT ?"
+        params.append(limit)
+
+        try:
+            rows = self._reader().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Failed to read transcription history: %s", e)
+            return []
+        return [dict(row) for row in rows]
+
+    def search(self, query: str, limit: int = DEFAULT_PAGE_SIZE) -> List[Dict]:
+        """
+        履歴を全文検索する
+
+        Parameters
+        ----------
+        query : str
+            検索語
+        limit : int, optional
+            取得する最大件数 (デフォルト: 100)
+
+        Returns
+        -------
+        List[Dict]
+            一致した履歴のリスト（新しい順）
+        """
+        return self.page(query=query, limit=limit)
+
+    def get(self, entry_id: int) -> Optional[Dict]:
+        """
+        履歴を1件取得する
+
+        Parameters
+        ----------
+        entry_id : int
+            履歴のID
+
+        Returns
+        -------
+        Dict or None
+            履歴、存在しない場合はNone
+        """
+        try:
+            row = self._reader().execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM transcripts WHERE id = ?", (entry_id,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error("Failed to read transcription history: %s", e)
+            return None
+        return dict(row) if row is not None else None
+
+    def count(self) -> int:
+        """
+        履歴の件数を取得する
+
+        Returns
+        -------
+        int
+            履歴の件数
+        """
+        try:
+            return self._reader().execute("SELECT count(*) FROM transcripts").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error("Failed to read transcription history: %s", e)
+            return 0
+
+    def close(self) -> None:
+        """
+        残りの要求を書き込んでデータベースを閉じる
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -5,11 +5,16 @@
 異なるUIフレームワークでも使用できるよう、コア機能として実装しています。
 """
 
+import logging
 import os
 import sys
 from typing import Dict, Callable, Optional, Union, List, Tuple
 from pynput import keyboard
 
+from src.core.latency_tracker import latency_tracker
+
+logger = logging.getLogger(__name__)
+
 class HotkeyManager:
     """
     グローバルホットキーの登録と管理を行うクラス
@@ -56,14 +61,24 @@ class HotkeyManager:
                 raise ValueError(f"Invalid hotkey format: {hotkey_str}")
             
             # 既存のホットキーマップに新しいホットキーを追加または更新
-            self.hotkeys[hotkey_combination] = callback
+            self.hotkeys[hotkey_combination] = self._timed(callback)
             
             # 新しいリスナーを開始
             return self.start_listener()
         except Exception as e:
-            print(f"Failed to register hotkey: {e}")
+            logger.error("Failed to register hotkey: %s", e)
             return False
     
+    @staticmethod
+    def _timed(callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        ホットキーが押された時刻をレイテンシ計測に記録してからコールバックを呼び出す関数を返す
+        """
+        def wrapper():
+            latency_tracker.mark("hotkey")
+            callback()
+        return wrapper
+    
     def unregister_hotkey(self, hotkey_str: str) -> bool:
         """
         既存のホットキー登録を解除する
@@ -98,7 +113,7 @@ class HotkeyManager:
             
             return True
         except Exception as e:
-            print(f"Failed to unregister hotkey: {e}")
+            logger.error("Failed to unregister hotkey: %s", e)
             return False
     
     def start_listener(self) -> bool:
@@ -118,7 +133,7 @@ class HotkeyManager:
             self.listener.start()
             return True
         except Exception as e:
-            print(f"Failed to start hotkey listener: {e}")
+            logger.error("Failed to start hotkey listener: %s", e)
             return False
     
     def stop_listener(self) -> bool:
@@ -136,7 +151,7 @@ class HotkeyManager:
                 self.listener = None
                 return True
             except Exception as e:
-                print(f"Failed to stop hotkey listener: {e}")
+                logger.error("Failed to stop hotkey listener: %s", e)
         
         return False
     
@@ -228,7 +243,7 @@ class HotkeyManager:
             elif len(part) == 1:  # 単一文字（a-z, 0-9など）
                 processed_parts.append(part)
             else:
-                print(f"Warning: Unknown key '{part}' in hotkey. Using as is.")
+                logger.warning("Unknown key '%s' in hotkey. Using as is.", part)
                 processed_parts.append(part)
         
         # 最低1つのキーが存在することを確認
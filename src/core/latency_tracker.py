@@ -0,0 +1,321 @@
+"""
+レイテンシ計測モジュール
+
+ホットキーの押下からクリップボードへのコピーまでの各段階で単調増加時刻を
+記録し、段階間の所要時間をヒストグラム（p50/p95/p99）に集計します。
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 計測する段階（発生順）
+STAGES = (
+    "hotkey",           # ホットキーのコールバック（HotkeyManager）
+    "dispatch",         # GUIスレッドでの録音切り替え（QTimer.singleShot）
+    "stream_open",      # 入力ストリームの開始
+    "first_block",      # 最初の音声ブロックの受信
+    "stop",             # 録音停止の開始
+    "saved",            # 音声ファイルの書き込み完了
+    "request_sent",     # APIリクエストの送信開始
+    "first_byte",       # APIレスポンスのヘッダー受信
+    "response_parsed",  # レスポンスの解析完了
+    "clipboard",        # 結果の表示とクリップボードへのコピー
+)
+
+# 集計する区間（名前, 開始段階, 終了段階）
+INTERVALS: Tuple[Tuple[str, str, str], ...] = (
+    ("hotkey_to_dispatch", "hotkey", "dispatch"),
+    ("dispatch_to_stream_open", "dispatch", "stream_open"),
+    ("stream_open_to_first_block", "stream_open", "first_block"),
+    ("stop_to_saved", "stop", "saved"),
+    ("saved_to_request_sent", "saved", "request_sent"),
+    ("request_sent_to_first_byte", "request_sent", "first_byte"),
+    ("first_byte_to_response_parsed", "first_byte", "response_parsed"),
+    ("response_parsed_to_clipboard", "response_parsed", "clipboard"),
+    ("start_total", "hotkey", "first_block"),
+    ("stop_to_clipboard", "stop", "clipboard"),
+)
+
+# トレースの開始前に記録され、開始時に取り込む段階
+_PENDING_STAGES = ("hotkey",)
+
+# 保留中の段階をトレースの開始時に取り込む最大の経過時間（秒）
+_PENDING_MAX_AGE = 2.0
+
+# bind()でトレースが関連付けられたスレッドでのみ記録する段階
+# （オフラインキューなど録音と無関係な文字起こしを録音中のトレースに混ぜないため）
+_BOUND_STAGES = ("request_sent", "first_byte", "response_parsed")
+
+
+class LatencyTrace:
+    """
+    1回の録音から文字起こし結果のコピーまでの段階ごとの時刻
+    """
+
+    def __init__(self, marks: Optional[Dict[str, float]] = None):
+        """
+        LatencyTraceの初期化
+
+        Parameters
+        ----------
+        marks : Dict[str, float], optional
+            記録済みの段階と単調増加時刻
+        """
+        self.marks: Dict[str, float] = dict(marks or {})
+
+    def mark(self, stage: str, timestamp: Optional[float] = None, overwrite: bool = False) -> None:
+        """
+        段階の時刻を記録する
+
+        Parameters
+        ----------
+        stage : str
+            段階名
+        timestamp : float, optional
+            time.monotonic()の時刻（省略時は現在時刻）
+        overwrite : bool, optional
+            記録済みの段階を上書きする場合True（再試行時など）
+        """
+        if overwrite or stage not in self.marks:
+            self.marks[stage] = timestamp if timestamp is not None else time.monotonic()
+
+    def intervals(self) -> Dict[str, float]:
+        """
+        記録された段階から区間の所要時間を求める
+
+        Returns
+        -------
+        Dict[str, float]
+            区間名から所要時間（秒）への辞書（両端が記録された区間のみ）
+        """
+        result = {}
+        for name, start, end in INTERVALS:
+            if start in self.marks and end in self.marks and self.marks[end] >= self.marks[start]:
+                result[name] = self.marks[end] - self.marks[start]
+        return result
+
+
+class LatencyHistogram:
+    """
+    区間の所要時間の直近のサンプルを保持し、パーセンタイルを求めるクラス
+    """
+
+    def __init__(self, max_samples: int = 2048):
+        """
+        LatencyHistogramの初期化
+
+        Parameters
+        ----------
+        max_samples : int, optional
+            保持する直近のサンプル数
+        """
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """サンプルを追加する"""
+        self.samples.append(value)
+        self.count += 1
+
+    @staticmethod
+    def _percentile(sorted_samples: List[float], q: float) -> float:
+        """ソート済みのサンプルから最近傍順位法でパーセンタイルを求める"""
+        rank = math.ceil(q / 100 * len(sorted_samples))
+        return sorted_samples[max(0, rank - 1)]
+
+    def summary(self) -> Dict[str, float]:
+        """
+        統計値を求める
+
+        Returns
+        -------
+        Dict[str, float]
+            総件数（count）と直近のサンプルの平均・p50・p95・p99・最大（秒）
+        """
+        samples = sorted(self.samples)
+        if not samples:
+            return {"count": self.count}
+        return {
+            "count": self.count,
+            "mean": sum(samples) / len(samples),
+            "p50": self._percentile(samples, 50),
+            "p95": self._percentile(samples, 95),
+            "p99": self._percentile(samples, 99),
+            "max": samples[-1],
+        }
+
+
+class LatencyTracker:
+    """
+    段階ごとの時刻を記録して区間ごとのヒストグラムに集計するクラス
+
+    録音中のトレースは1つだけで、別スレッドからのmark()はこのトレースに
+    記録されます。APIの呼び出しに関する段階は、bind()でトレースを関連付けた
+    文字起こしのスレッドでのみ記録されるため、次の録音が始まっても正しい
+    トレースに記録されます。トレースがない間に押されたホットキーの時刻は
+    保留し、次のbegin()で取り込みます。
+    """
+
+    def __init__(self):
+        """LatencyTrackerの初期化"""
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._current: Optional[LatencyTrace] = None
+        self._pending: Dict[str, float] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {name: LatencyHistogram() for name, _, _ in INTERVALS}
+
+    def begin(self) -> LatencyTrace:
+        """
+        新しいトレースを開始する
+
+        Returns
+        -------
+        LatencyTrace
+            開始したトレース
+        """
+        now = time.monotonic()
+        with self._lock:
+            marks = {stage: t for stage, t in self._pending.items() if now - t <= _PENDING_MAX_AGE}
+            self._pending = {}
+            self._current = LatencyTrace(marks)
+            return self._current
+
+    def current(self) -> Optional[LatencyTrace]:
+        """
+        呼び出し元のスレッドに関連付けられたトレース、または録音中のトレースを取得する
+
+        Returns
+        -------
+        LatencyTrace or None
+            トレース、存在しない場合はNone
+        """
+        trace = getattr(self._local, "trace", None)
+        return trace if trace is not None else self._current
+
+    def mark(self, stage: str, overwrite: bool = False) -> None:
+        """
+        現在のトレースに段階の時刻を記録する
+
+        Parameters
+        ----------
+        stage : str
+            段階名
+        overwrite : bool, optional
+            記録済みの段階を上書きする場合True
+        """
+        now = time.monotonic()
+        trace = getattr(self._local, "trace", None)
+        if trace is None and stage in _BOUND_STAGES:
+            return
+        with self._lock:
+            if trace is None:
+                trace = self._current
+            if trace is None:
+                if stage in _PENDING_STAGES:
+                    self._pending[stage] = now
+                return
+            trace.mark(stage, now, overwrite)
+
+    def detach(self) -> Optional[LatencyTrace]:
+        """
+        録音中のトレースを切り離して返す（次の録音は新しいトレースになる）
+
+        Returns
+        -------
+        LatencyTrace or None
+            切り離したトレース
+        """
+        with self._lock:
+            trace, self._current = self._current, None
+            return trace
+
+    def bind(self, trace: Optional[LatencyTrace]) -> None:
+        """
+        呼び出し元のスレッドにトレースを関連付ける
+
+        Parameters
+        ----------
+        trace : LatencyTrace or None
+            関連付けるトレース（Noneで解除）
+        """
+        self._local.trace = trace
+
+    def finish(self, trace: Optional[LatencyTrace]) -> None:
+        """
+        トレースの区間をヒストグラムに追加する
+
+        Parameters
+        ----------
+        trace : LatencyTrace or None
+            完了したトレース
+        """
+        if trace is None:
+            return
+        intervals = trace.intervals()
+        with self._lock:
+            for name, value in intervals.items():
+                self._histograms[name].add(value)
+            if self._current is trace:
+                self._current = None
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        区間ごとの統計値を取得する
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            区間名から統計値（LatencyHistogram.summary()）への辞書
+        """
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in self._histograms.items()}
+
+    def reset(self) -> None:
+        """
+        集計したサンプルを破棄する
+        """
+        with self._lock:
+            self._histograms = {name: LatencyHistogram() for name, _, _ in INTERVALS}
+
+    def export(self, path) -> bool:
+        """
+        統計値と直近のサンプルをJSONファイルに書き出す
+
+        Parameters
+        ----------
+        path : str or Path
+            書き出すファイルのパス
+
+        Returns
+        -------
+        bool
+            書き出しに成功した場合True
+        """
+        with self._lock:
+            data = {
+                "generated": datetime.now().isoformat(timespec="seconds"),
+                "unit": "seconds",
+                "intervals": {
+                    name: dict(histogram.summary(), samples=list(histogram.samples))
+                    for name, histogram in self._histograms.items()
+                },
+            }
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            return True
+        except OSError as e:
+            logger.error("Failed to export latency statistics: %s", e)
+            return False
+
+
+# アプリケーション全体で共有するインスタンス
+latency_tracker = LatencyTracker()
@@ -0,0 +1,215 @@
+"""
+ログ出力の設定モジュール
+
+アプリケーション全体のログをQueueHandlerでキューに追加し、QueueListenerのスレッドで
+コンソールとローテーションするファイルに書き出します。音声のコールバックやホットキーの
+スレッドでログを出力しても、端末やファイルへの書き込みを待たずに処理を続けられます。
+
+ログレベルは``INFO,src.core.whisper_api=DEBUG``のように、全体のレベルとモジュールごとの
+レベルをカンマ区切りで指定します。環境変数``OPEN_SUPER_WHISPER_LOG_LEVEL``と
+``OPEN_SUPER_WHISPER_LOG_FILE``が設定されている場合は、その値を優先します。
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# ログレベルを上書きする環境変数
+LOG_LEVEL_ENV = "OPEN_SUPER_WHISPER_LOG_LEVEL"
+
+# ログファイルを上書きする環境変数
+LOG_FILE_ENV = "OPEN_SUPER_WHISPER_LOG_FILE"
+
+# ログファイルのローテーションの既定値
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+# コンソールに出力する形式
+CONSOLE_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# リクエストごとにINFOのログを出力するライブラリの既定のレベル（ログレベルの指定で上書きできる）
+LIBRARY_LEVELS = {
+    "httpx": logging.WARNING,
+    "httpcore": logging.WARNING,
+    "openai": logging.WARNING,
+}
+
+# LogRecordの標準の属性（これ以外の属性はextraで渡された項目としてJSONに含める）
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    ログを1行1件のJSONに変換するフォーマッター
+
+    ``logger.info("...", extra={"model": model})``のようにextraで渡した項目も
+    そのままJSONの項目として出力します。
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        ログをJSONの文字列に変換する
+
+        Parameters
+        ----------
+        record : logging.LogRecord
+            変換するログ
+
+        Returns
+        -------
+        str
+            JSONの文字列
+        """
+        data = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exception"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def parse_levels(spec: str) -> Tuple[Optional[int], Dict[str, int]]:
+    """
+    ログレベルの指定を解析する
+
+    Parameters
+    ----------
+    spec : str
+        ``INFO``や``WARNING,src.core.audio_recorder=DEBUG``の形式の指定
+
+    Returns
+    -------
+    Tuple[Optional[int], Dict[str, int]]
+        全体のレベル（指定がない場合はNone）と、ロガー名からレベルへの辞書
+
+    Raises
+    ------
+    ValueError
+        不明なレベルが指定された場合
+    """
+
+    def to_level(name: str) -> int:
+        level = logging.getLevelName(name.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level: {name.strip()}")
+        return level
+
+    root_level = None
+    module_levels = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        if "=" in part:
+            name, level = part.split("=", 1)
+            module_levels[name.strip()] = to_level(level)
+        else:
+            root_level = to_level(part)
+    return root_level, module_levels
+
+
+def setup_logging(levels: str = "INFO", log_file=None, max_bytes: int = DEFAULT_MAX_BYTES,
+                  backup_count: int = DEFAULT_BACKUP_COUNT, console: bool = True) -> None:
+    """
+    ログの出力先とレベルを設定し、ログを書き出すスレッドを開始する
+
+    既に設定済みの場合は、書き出し待ちのログを出力してから設定し直します。
+
+    Parameters
+    ----------
+    levels : str, optional
+        全体とモジュールごとのログレベル（例: ``INFO,src.core.whisper_api=DEBUG``）
+    log_file : str or Path, optional
+        JSON形式でログを書き出すファイル（省略時はファイルに書き出さない）
+    max_bytes : int, optional
+        ローテーションするファイルの大きさ（バイト）
+    backup_count : int, optional
+        残す古いファイルの数
+    console : bool, optional
+        標準エラー出力にもログを出力する場合True
+
+    Raises
+    ------
+    ValueError
+        不明なログレベルが指定された場合
+    OSError
+        ログファイルのディレクトリを作成できない場合
+    """
+    global _listener, _queue_handler
+
+    root_level, module_levels = parse_levels(levels)
+    env_root_level, env_module_levels = parse_levels(os.environ.get(LOG_LEVEL_ENV, ""))
+    if env_root_level is not None:
+        root_level = env_root_level
+    module_levels = {**LIBRARY_LEVELS, **module_levels, **env_module_levels}
+    log_file = os.environ.get(LOG_FILE_ENV) or log_file
+
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+    if log_file:
+        path = Path(log_file).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    with _lock:
+        shutdown_logging()
+
+        # ログを出力したスレッドはキューに追加するだけで、書き込みはリスナーのスレッドで行う
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        _queue_handler = QueueHandler(log_queue)
+        root.addHandler(_queue_handler)
+        root.setLevel(root_level if root_level is not None else logging.INFO)
+        for name, level in module_levels.items():
+            logging.getLogger(name).setLevel(level)
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+    atexit.unregister(shutdown_logging)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    書き出し待ちのログを出力してログを書き出すスレッドを停止する
+    """
+    global _listener, _queue_handler
+
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    # 停止後のログは書き出されないため、キューへの追加をやめる（警告以上は標準エラー出力に出力される）
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
@@ -0,0 +1,510 @@
+"""
+メトリクスモジュール
+
+録音時間、アップロード量、モデルごとのAPIレイテンシ、エラーと再試行の回数、
+音声入力のオーバーフロー回数などのカウンターとヒストグラムを集計し、
+Prometheusのテキスト形式で公開します。
+
+公開方法はループバックアドレスで待ち受けるHTTPエンドポイントと、
+node_exporterのtextfileコレクター用のファイルの2つです。
+有効にするまでは記録のたびに真偽値を1つ確認するだけで、何も集計しません。
+"""
+
+import ipaddress
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Prometheusのテキスト形式のContent-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 秒単位のヒストグラムのデフォルトのバケット
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    """数値をPrometheusのテキスト形式で表す"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """ラベルをPrometheusのテキスト形式で表す"""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    """
+    メトリクスの基底クラス
+    """
+
+    # Prometheusのメトリクスの種類
+    kind = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, description: str, labelnames: Sequence[str] = ()):
+        """
+        メトリクスの初期化
+
+        Parameters
+        ----------
+        registry : MetricsRegistry
+            登録先のレジストリ
+        name : str
+            メトリクス名
+        description : str
+            HELP行に出力する説明
+        labelnames : Sequence[str], optional
+            ラベル名
+        """
+        self._registry = registry
+        self._lock = threading.Lock()
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Optional[Sequence[str]]) -> Tuple[str, ...]:
+        """ラベルの値を検証してキーに変換する"""
+        key = tuple(str(value) for value in (labels or ()))
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {key}")
+        return key
+
+    def render(self) -> List[str]:
+        """
+        Prometheusのテキスト形式の行を生成する
+
+        Returns
+        -------
+        List[str]
+            HELPとTYPEの行、およびサンプルの行
+        """
+        description = self.description.replace("\\", "\\\\").replace("\n", "\\n")
+        return [f"# HELP {self.name} {description}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    単調に増加するカウンター
+    """
+
+    kind = "counter"
+
+    def __init__(self, registry, name, description, labelnames=()):
+        super().__init__(registry, name, description, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, labels: Optional[Sequence[str]] = None) -> None:
+        """
+        カウンターを増やす
+
+        Parameters
+        ----------
+        amount : float, optional
+            増やす量 (デフォルト: 1)
+        labels : Sequence[str], optional
+            ラベルの値（labelnamesと同じ順序）
+        """
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, labels: Optional[Sequence[str]] = None) -> float:
+        """
+        現在の値を取得する
+
+        Parameters
+        ----------
+        labels : Sequence[str], optional
+            ラベルの値
+
+        Returns
+        -------
+        float
+            現在の値
+        """
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    """
+    値の分布を累積バケットで集計するヒストグラム
+    """
+
+    kind = "histogram"
+
+    def __init__(self, registry, name, description, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # ラベルの値から（バケットごとの件数、合計、件数）への辞書
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, labels: Optional[Sequence[str]] = None) -> None:
+        """
+        値を記録する
+
+        Parameters
+        ----------
+        value : float
+            記録する値
+        labels : Sequence[str], optional
+            ラベルの値（labelnamesと同じ順序）
+        """
+        if not self._registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def get_count(self, labels: Optional[Sequence[str]] = None) -> int:
+        """
+        記録した件数を取得する
+
+        Parameters
+        ----------
+        labels : Sequence[str], optional
+            ラベルの値
+
+        Returns
+        -------
+        int
+            記録した件数
+        """
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        lines = []
+        labelnames = self.labelnames + ("le",)
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(labelnames, key + (_format_value(bound),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labelnames, key + ('+Inf',))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    メトリクスを登録してPrometheusのテキスト形式で出力するクラス
+
+    enable()を呼び出すまでは各メトリクスの記録は何もせずに戻ります。
+
+    Attributes
+    ----------
+    enabled : bool
+        集計が有効な場合True
+    """
+
+    def __init__(self):
+        """MetricsRegistryの初期化"""
+        self.enabled = False
+        self._metrics: List[_Metric] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._textfile: Optional["TextfileExporter"] = None
+
+    def counter(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+        """
+        カウンターを登録する
+
+        Parameters
+        ----------
+        name : str
+            メトリクス名（"_total"で終わる名前）
+        description : str
+            説明
+        labelnames : Sequence[str], optional
+            ラベル名
+
+        Returns
+        -------
+        Counter
+            登録したカウンター
+        """
+        metric = Counter(self, name, description, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, description: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """
+        ヒストグラムを登録する
+
+        Parameters
+        ----------
+        name : str
+            メトリクス名
+        description : str
+            説明
+        labelnames : Sequence[str], optional
+            ラベル名
+        buckets : Sequence[float], optional
+            バケットの上限値
+
+        Returns
+        -------
+        Histogram
+            登録したヒストグラム
+        """
+        metric = Histogram(self, name, description, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        登録されたすべてのメトリクスをPrometheusのテキスト形式で出力する
+
+        Returns
+        -------
+        str
+            テキスト形式のメトリクス
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def enable(self) -> None:
+        """
+        集計を有効にする
+        """
+        self.enabled = True
+
+    def start_http_server(self, port: int, host: str = "127.0.0.1") -> bool:
+        """
+        メトリクスを公開するHTTPエンドポイントを開始する
+
+        GET /metrics でPrometheusのテキスト形式を返します。他のマシンから
+        読み取れないよう、ループバックアドレスでのみ待ち受けます。
+
+        Parameters
+        ----------
+        port : int
+            待ち受けるポート番号
+        host : str, optional
+            待ち受けるループバックアドレス (デフォルト: "127.0.0.1")
+
+        Returns
+        -------
+        bool
+            開始に成功した場合True
+        """
+        try:
+            if not ipaddress.ip_address(host).is_loopback:
+                raise ValueError(f"Metrics endpoint must listen on a loopback address: {host}")
+            self._server = _MetricsHTTPServer((host, port), self)
+        except (OSError, ValueError) as e:
+            logger.error("Failed to start metrics endpoint: %s", e)
+            return False
+        self.enable()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return True
+
+    def start_textfile(self, path: str, interval: float = 15.0) -> bool:
+        """
+        textfileコレクター用のファイルへの定期的な書き出しを開始する
+
+        Parameters
+        ----------
+        path : str
+            書き出すファイルのパス（node_exporterの--collector.textfile.directory内の*.prom）
+        interval : float, optional
+            書き出す間隔（秒） (デフォルト: 15)
+
+        Returns
+        -------
+        bool
+            最初の書き出しに成功した場合True
+        """
+        self.enable()
+        self._textfile = TextfileExporter(self, path, interval)
+        if not self._textfile.write():
+            self._textfile = None
+            return False
+        self._textfile.start()
+        return True
+
+    def stop(self) -> None:
+        """
+        HTTPエンドポイントと定期的な書き出しを停止する（書き出しは最後に1回行う）
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._textfile is not None:
+            self._textfile.stop()
+            self._textfile = None
+
+
+class TextfileExporter:
+    """
+    メトリクスをtextfileコレクター用のファイルに定期的に書き出すクラス
+
+    node_exporterが書き込み途中のファイルを読まないよう、一時ファイルに
+    書き込んでから置き換えます。
+    """
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 15.0):
+        """
+        TextfileExporterの初期化
+
+        Parameters
+        ----------
+        registry : MetricsRegistry
+            書き出すレジストリ
+        path : str
+            書き出すファイルのパス
+        interval : float, optional
+            書き出す間隔（秒）
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> bool:
+        """
+        現在のメトリクスを書き出す
+
+        Returns
+        -------
+        bool
+            書き出しに成功した場合True
+        """
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(self.registry.render())
+            os.replace(temp_path, self.path)
+            return True
+        except OSError as e:
+            logger.error("Failed to write metrics file: %s", e)
+            return False
+
+    def start(self) -> None:
+        """
+        定期的な書き出しを開始する
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        定期的な書き出しを停止し、最後の値を書き出す
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+
+    def _run(self) -> None:
+        """一定間隔で書き出す（書き出しスレッド）"""
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """メトリクスのHTTPリクエストハンドラー"""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        data = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # スクレイプのたびにログを出力しない
+        pass
+
+
+class _MetricsHTTPServer(ThreadingHTTPServer):
+    """メトリクスを公開するHTTPサーバー"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], registry: MetricsRegistry):
+        self.registry = registry
+        super().__init__(address, _MetricsRequestHandler)
+
+
+# アプリケーション全体で共有するレジストリ
+metrics = MetricsRegistry()
+
+RECORDING_DURATION = metrics.histogram(
+    "osw_recording_duration_seconds",
+    "Duration of saved recordings in seconds.",
+    buckets=(1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+AUDIO_OVERFLOWS = metrics.counter(
+    "osw_audio_input_overflows_total",
+    "Number of audio input callbacks that reported an input overflow.",
+)
+UPLOAD_BYTES = metrics.counter(
+    "osw_upload_bytes_total",
+    "Bytes of audio uploaded to the transcription API, including retried attempts.",
+    ("model",),
+)
+API_LATENCY = metrics.histogram(
+    "osw_api_request_duration_seconds",
+    "Duration of successful transcription API requests in seconds.",
+    ("model",),
+)
+API_ERRORS = metrics.counter(
+    "osw_api_errors_total",
+    "Number of failed transcription API attempts by error kind.",
+    ("model", "kind"),
+)
+API_RETRIES = metrics.counter(
+    "osw_api_retries_total",
+    "Number of transcription API attempts that were retried by error kind.",
+    ("model", "kind"),
+)
+TRANSCRIPTIONS = metrics.counter(
+    "osw_transcriptions_total",
+    "Number of transcriptions by outcome.",
+    ("model", "outcome"),
+)
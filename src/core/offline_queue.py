@@ -0,0 +1,465 @@
+"""
+オフライン文字起こしキューモジュール
+
+ネットワーク障害などで失敗した文字起こしを、圧縮した音声とともに
+追記専用のジャーナルへ永続化し、APIへの接続が回復した時点で
+同時実行数を制限しながら順に文字起こしします。再試行しても成功しない
+エラー（400、401、413など）で失敗した文字起こしはキューに追加しません。
+"""
+
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+
+class OfflineQueue:
+    """
+    失敗した文字起こしを永続化し、接続の回復後に再実行するキュー
+
+    ジャーナル（journal.jsonl）にはジョブの追加、試行、完了、放棄を1行ずつ
+    追記し、起動時にこれを再生してキューの状態を復元します。音声はFLACに
+    変換してblobsディレクトリに保存します。完了したジョブが増えると
+    ジャーナルを圧縮します。
+
+    Attributes
+    ----------
+    directory : Path
+        ジャーナルと音声を保存するディレクトリ
+    max_concurrent : int
+        キューを処理するときに同時に実行する文字起こしの最大数
+    on_result : Callable[[Dict, str], None] or None
+        ジョブが完了したときにジョブ情報と文字起こし結果を受け取るコールバック
+    """
+
+    # ジョブを放棄するまでの最大試行回数
+    MAX_ATTEMPTS = 5
+
+    # 放棄したジョブの音声を残す期間（秒）。過ぎたジョブは起動時に削除する
+    FAILED_RETENTION_SECONDS = 14 * 24 * 60 * 60
+
+    # 時間をおいて再試行すれば成功しうるエラーの種類（WhisperTranscriber.last_error_kindの値）
+    RETRYABLE_ERROR_KINDS = ("connection", "server", "rate_limit")
+
+    # 接続確認の間隔（秒）。接続できない間は上限まで倍に延ばす
+    PROBE_INTERVAL = 15.0
+    MAX_PROBE_INTERVAL = 300.0
+
+    # 接続確認のタイムアウト（秒）
+    PROBE_TIMEOUT = 3.0
+
+    # 完了済みの行がこの数を超えたらジャーナルを圧縮する
+    COMPACT_THRESHOLD = 100
+
+    def __init__(
+        self,
+        directory,
+        transcriber=None,
+        max_concurrent: int = 2,
+        on_result: Optional[Callable[[Dict, str], None]] = None,
+    ):
+        """
+        OfflineQueueの初期化
+
+        Parameters
+        ----------
+        directory : str or Path
+            ジャーナルと音声を保存するディレクトリ
+        transcriber : WhisperTranscriber, optional
+            キューの処理に使用するインスタンス
+        max_concurrent : int, optional
+            同時に実行する文字起こしの最大数 (デフォルト: 2)
+        on_result : Callable[[Dict, str], None], optional
+            ジョブが完了したときに呼び出すコールバック（処理スレッドから呼ばれる）
+        """
+        self.directory = Path(directory)
+        self.blob_dir = self.directory / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.directory / "journal.jsonl"
+
+        self.transcriber = transcriber
+        self.max_concurrent = max_concurrent
+        self.on_result = on_result
+
+        self._lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._jobs: Dict[str, Dict] = {}
+        self._dead_lines = 0
+        self._load()
+        self._sweep_blobs()
+
+    def _load(self) -> None:
+        """ジャーナルを再生してキューの状態を復元する"""
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 異常終了時に書きかけになった行は無視する
+                    self._dead_lines += 1
+                    continue
+
+                op = record.get("op")
+                job = self._jobs.get(record.get("id"))
+                if op == "add":
+                    job = {key: value for key, value in record.items() if key != "op"}
+                    job.setdefault("attempts", 0)
+                    job.setdefault("status", "queued")
+                    self._jobs[job["id"]] = job
+                elif job is None:
+                    self._dead_lines += 1
+                elif op == "attempt":
+                    job["attempts"] += 1
+                    job["last_error"] = record.get("error")
+                    self._dead_lines += 1
+                elif op == "abandon":
+                    job["status"] = "failed"
+                    job["last_error"] = record.get("error")
+                    self._dead_lines += 1
+                elif op == "done" or op == "discard":
+                    del self._jobs[job["id"]]
+                    self._dead_lines += 2
+
+        # 音声が失われたジョブは処理できないため取り除く
+        for job_id, job in list(self._jobs.items()):
+            if not (self.blob_dir / job["blob"]).exists():
+                del self._jobs[job_id]
+                self._dead_lines += 1
+
+        # 保持期間を過ぎた放棄済みのジョブを取り除く（音声はこの後の_sweep_blobsで削除される）
+        cutoff = time.time() - self.FAILED_RETENTION_SECONDS
+        for job_id, job in list(self._jobs.items()):
+            if job["status"] == "failed" and job["created"] < cutoff:
+                del self._jobs[job_id]
+                self._dead_lines += 1
+
+        if self._dead_lines > self.COMPACT_THRESHOLD:
+            with self._lock:
+                self._compact()
+
+    def _sweep_blobs(self) -> None:
+        """
+        どのジョブからも参照されない音声を削除する
+
+        ジャーナルへの追記前や完了後の削除前に異常終了した場合に残る音声と、
+        書きかけの一時ファイルを取り除きます。
+        """
+        referenced = {job["blob"] for job in self._jobs.values()}
+        for path in self.blob_dir.iterdir():
+            if path.is_file() and path.name not in referenced:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning("Failed to remove orphaned offline queue audio %s: %s", path, e)
+                else:
+                    logger.info("Removed orphaned offline queue audio: %s", path.name)
+
+    def _append(self, record: Dict) -> None:
+        """ジャーナルに1行追記する（ロック取得済みで呼び出す）"""
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self) -> None:
+        """残っているジョブだけでジャーナルを書き直す（ロック取得済みで呼び出す）"""
+        temp_path = self.journal_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for job in self._jobs.values():
+                f.write(json.dumps(dict(job, op="add"), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+        self._dead_lines = 0
+
+    def _store_audio(self, audio_file: str, job_id: str) -> str:
+        """
+        音声をFLACに変換して保存する
+
+        soundfileで読み込めない形式（m4aなど）はそのままコピーします。
+
+        Returns
+        -------
+        str
+            保存した音声のファイル名
+        """
+        try:
+            data, sample_rate = sf.read(audio_file, dtype="int16")
+            blob = f"{job_id}.flac"
+            temp_path = self.blob_dir / f"{blob}.part"
+            sf.write(temp_path, data, sample_rate, format="FLAC", subtype="PCM_16")
+        except Exception:
+            blob = f"{job_id}{Path(audio_file).suffix.lower()}"
+            temp_path = self.blob_dir / f"{blob}.part"
+            shutil.copyfile(audio_file, temp_path)
+        os.replace(temp_path, self.blob_dir / blob)
+        return blob
+
+    def enqueue(self, audio_file: str, language: Optional[str] = None, error: Optional[str] = None,
+                error_kind: Optional[str] = None) -> Optional[str]:
+        """
+        文字起こしに失敗した音声をキューに追加する
+
+        Parameters
+        ----------
+        audio_file : str
+            音声ファイルのパス
+        language : str, optional
+            文字起こしの言語コード
+        error : str, optional
+            失敗したときのエラーメッセージ
+        error_kind : str, optional
+            失敗したときのエラーの種類（WhisperTranscriber.last_error_kindの値）。
+            再試行しても成功しない種類の場合はキューに追加しません。
+
+        Returns
+        -------
+        str or None
+            追加したジョブのID、追加しなかった場合や保存に失敗した場合はNone
+        """
+        if error_kind is not None and error_kind not in self.RETRYABLE_ERROR_KINDS:
+            logger.info("Not queueing a transcription that failed with a permanent error (%s): %s", error_kind, error)
+            return None
+
+        job_id = uuid.uuid4().hex
+        try:
+            blob = self._store_audio(audio_file, job_id)
+        except OSError as e:
+            logger.error("Failed to store audio in the offline queue: %s", e)
+            return None
+
+        job = {
+            "id": job_id,
+            "blob": blob,
+            "source": str(audio_file),
+            "language": language,
+            "created": time.time(),
+            "attempts": 0,
+            "status": "queued",
+            "last_error": error,
+        }
+        with self._lock:
+            self._append(dict(job, op="add"))
+            self._jobs[job_id] = job
+
+        self._wake.set()
+        return job_id
+
+    def pending_jobs(self) -> List[Dict]:
+        """
+        処理待ちのジョブを追加順に取得する
+
+        Returns
+        -------
+        List[Dict]
+            ジョブ情報のリスト
+        """
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values() if job["status"] == "queued"]
+        return sorted(jobs, key=lambda job: job["created"])
+
+    def failed_jobs(self) -> List[Dict]:
+        """
+        最大試行回数を超えて放棄されたジョブを取得する
+
+        Returns
+        -------
+        List[Dict]
+            ジョブ情報のリスト（音声はdiscard()を呼び出すか保持期間を過ぎるまで``blob_dir``に残ります）
+        """
+        with self._lock:
+            return [dict(job) for job in self._jobs.values() if job["status"] == "failed"]
+
+    def discard(self, job_id: str) -> bool:
+        """
+        ジョブを音声とともにキューから削除する
+
+        Parameters
+        ----------
+        job_id : str
+            削除するジョブのID
+
+        Returns
+        -------
+        bool
+            削除した場合True
+        """
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return False
+            self._append({"op": "discard", "id": job_id})
+            self._dead_lines += 2
+            if self._dead_lines > self.COMPACT_THRESHOLD:
+                self._compact()
+        try:
+            (self.blob_dir / job["blob"]).unlink()
+        except OSError:
+            pass
+        return True
+
+    def discard_failed(self) -> int:
+        """
+        放棄されたすべてのジョブを音声とともに削除する
+
+        Returns
+        -------
+        int
+            削除したジョブ数
+        """
+        return sum(self.discard(job["id"]) for job in self.failed_jobs())
+
+    def __len__(self) -> int:
+        """処理待ちのジョブ数を返す"""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] == "queued")
+
+    def probe(self) -> bool:
+        """
+        APIのホストに接続できるかを確認する
+
+        Returns
+        -------
+        bool
+            TCP接続に成功した場合True
+        """
+        base_url = "https://api.openai.com"
+        if self.transcriber is not None:
+            base_url = str(getattr(self.transcriber.client, "base_url", base_url))
+        url = urlsplit(base_url)
+        port = url.port or (443 if url.scheme == "https" else 80)
+        try:
+            with socket.create_connection((url.hostname, port), timeout=self.PROBE_TIMEOUT):
+                return True
+        except OSError:
+            return False
+
+    def _process(self, job: Dict) -> bool:
+        """1つのジョブを文字起こしする（処理スレッドで実行）"""
+        result = self.transcriber.transcribe(str(self.blob_dir / job["blob"]), job.get("language"))
+        if isinstance(result, str) and result.startswith("Error: "):
+            error = result[len("Error: "):]
+            # 再試行しても成功しないエラーは最大試行回数を待たずに放棄する
+            retryable = self.transcriber.last_error_kind() in self.RETRYABLE_ERROR_KINDS
+            with self._lock:
+                job = self._jobs.get(job["id"])
+                if job is None:
+                    return False
+                job["attempts"] += 1
+                job["last_error"] = error
+                self._append({"op": "attempt", "id": job["id"], "error": error})
+                self._dead_lines += 1
+                if job["attempts"] >= self.MAX_ATTEMPTS or not retryable:
+                    job["status"] = "failed"
+                    self._append({"op": "abandon", "id": job["id"], "error": error})
+                    self._dead_lines += 1
+            return False
+
+        if self.on_result:
+            try:
+                self.on_result(job, str(result))
+            except Exception as e:
+                logger.exception("Offline queue result callback failed: %s", e)
+
+        with self._lock:
+            self._append({"op": "done", "id": job["id"]})
+            self._jobs.pop(job["id"], None)
+            self._dead_lines += 2
+            if self._dead_lines > self.COMPACT_THRESHOLD:
+                self._compact()
+        try:
+            (self.blob_dir / job["blob"]).unlink()
+        except OSError:
+            pass
+        return True
+
+    def drain(self) -> int:
+        """
+        処理待ちのジョブを同時実行数を制限して文字起こしする
+
+        同時に実行したジョブがすべて失敗した場合は、接続が再び失われたと
+        みなして残りのジョブの処理を中止します。
+
+        Returns
+        -------
+        int
+            文字起こしに成功したジョブ数
+        """
+        if self.transcriber is None:
+            return 0
+
+        with self._drain_lock:
+            jobs = self.pending_jobs()
+            succeeded = 0
+            with ThreadPoolExecutor(max_workers=self.max_concurrent) as executor:
+                for start in range(0, len(jobs), self.max_concurrent):
+                    if self._stopped.is_set():
+                        break
+                    results = list(executor.map(self._process, jobs[start:start + self.max_concurrent]))
+                    succeeded += sum(results)
+                    if not any(results):
+                        break
+            return succeeded
+
+    def start(self) -> None:
+        """
+        接続を定期的に確認してキューを処理するバックグラウンドスレッドを開始する
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        # 前回の起動時から残っているジョブがあればすぐに処理を試みる
+        if len(self):
+            self._wake.set()
+
+    def stop(self) -> None:
+        """
+        バックグラウンドスレッドを停止する
+        """
+        self._stopped.set()
+        self._wake.set()
+
+    def wake(self) -> None:
+        """
+        次の接続確認を待たずにキューの処理を試みる
+        """
+        self._wake.set()
+
+    def _run(self) -> None:
+        """接続が回復するまで待機し、キューを処理する"""
+        interval = self.PROBE_INTERVAL
+        while not self._stopped.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            if not len(self) or self.transcriber is None:
+                interval = self.PROBE_INTERVAL
+                continue
+
+            if self.probe():
+                self.drain()
+                interval = self.PROBE_INTERVAL
+            else:
+                interval = min(interval * 2, self.MAX_PROBE_INTERVAL)
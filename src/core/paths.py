@@ -0,0 +1,52 @@
+"""
+アプリケーションデータの保存先を管理するモジュール
+
+オフラインキューや録音ジャーナルなど、アプリケーションの再起動後も
+保持するデータの保存先ディレクトリをプラットフォームごとに決定します。
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# アプリケーションデータのディレクトリ名
+APP_DIR_NAME = "OpenSuperWhisper"
+
+# 保存先を上書きする環境変数
+DATA_DIR_ENV = "OPEN_SUPER_WHISPER_DATA_DIR"
+
+
+def get_app_data_dir(*parts: str, create: bool = True) -> Path:
+    """
+    アプリケーションデータの保存先ディレクトリを取得する
+
+    環境変数``OPEN_SUPER_WHISPER_DATA_DIR``が設定されている場合はその値を使用し、
+    それ以外はWindowsでは%LOCALAPPDATA%、macOSでは~/Library/Application Support、
+    その他では$XDG_DATA_HOME（既定値は~/.local/share）の下に作成します。
+
+    Parameters
+    ----------
+    *parts : str
+        保存先ディレクトリの下のサブディレクトリ名
+    create : bool, optional
+        ディレクトリが存在しない場合に作成する場合True
+
+    Returns
+    -------
+    Path
+        保存先ディレクトリのパス
+    """
+    override = os.environ.get(DATA_DIR_ENV)
+    if override:
+        base = Path(override).expanduser()
+    elif sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local") / APP_DIR_NAME
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Application Support" / APP_DIR_NAME
+    else:
+        base = Path(os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share") / APP_DIR_NAME
+
+    path = base.joinpath(*parts)
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,464 @@
+"""
+音声入力のプロファイリングモジュール
+
+1回の音声入力（録音の開始から文字起こし結果のコピーまで）の間だけ、cProfileまたは
+サンプリングプロファイラーとtracemallocを実行し、結果を日時付きのファイルに書き出します。
+開発版をインストールしなくても、利用者の環境で遅くなった原因を調べられるようにするためのものです。
+
+トレイメニューから次の1回の音声入力を計測するか、環境変数``OPEN_SUPER_WHISPER_PROFILE``
+（例: ``cprofile``、``sampling,tracemalloc``）を設定して毎回の音声入力を計測します。
+"""
+
+import cProfile
+import io
+import logging
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.core.paths import get_app_data_dir
+
+logger = logging.getLogger(__name__)
+
+# プロファイリングを有効にする環境変数（プロファイラーの種類と、tracemallocを使う場合は"tracemalloc"をカンマ区切りで指定）
+PROFILE_ENV = "OPEN_SUPER_WHISPER_PROFILE"
+
+# プロファイラーの種類
+MODES = ("cprofile", "sampling")
+
+# サンプリングプロファイラーの既定の間隔（秒）
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# tracemallocが記録するトレースバックの深さ
+DEFAULT_TRACEMALLOC_FRAMES = 10
+
+# レポートに表示する関数やメモリの割り当て元の件数
+REPORT_LIMIT = 40
+
+
+class SamplingProfiler:
+    """
+    全スレッドのスタックを一定の間隔で記録するサンプリングプロファイラー
+
+    計測対象のスレッドにフックを設定しないため、cProfileでは計測できない
+    録音スレッドなども含めて、オーバーヘッドを抑えて計測できます。
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """
+        SamplingProfilerの初期化
+
+        Parameters
+        ----------
+        interval : float, optional
+            スタックを記録する間隔（秒）
+        """
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """記録を開始する"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """記録を停止する"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """スタックを一定の間隔で記録する（プロファイラーのスレッド）"""
+        own_ident = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                functions = []
+                while frame is not None:
+                    code = frame.f_code
+                    functions.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                functions.append(names.get(ident, f"thread-{ident}"))
+                self._stacks[";".join(reversed(functions))] += 1
+            self.samples += 1
+
+    def write_folded(self, path: Path) -> None:
+        """
+        記録したスタックをflamegraph.plやspeedscopeで読み込める形式で書き出す
+
+        Parameters
+        ----------
+        path : Path
+            書き出すファイルのパス
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def report(self, limit: int = REPORT_LIMIT) -> str:
+        """
+        関数ごとのサンプル数の上位を文字列で取得する
+
+        Parameters
+        ----------
+        limit : int, optional
+            表示する関数の数
+
+        Returns
+        -------
+        str
+            関数自身で実行していたサンプル数（self）と、呼び出し先を含むサンプル数（total）の表
+        """
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self._stacks.items():
+            # 先頭はスレッド名
+            functions = stack.split(";")[1:]
+            if not functions:
+                continue
+            own[functions[-1]] += count
+            for function in set(functions):
+                total[function] += count
+
+        lines = [f"{self.samples} samples at {self.interval * 1000:.1f} ms intervals", "", f"{'self':>8} {'total':>8}  function"]
+        for function, count in own.most_common(limit):
+            lines.append(f"{count:>8} {total[function]:>8}  {function}")
+        lines += ["", f"{'total':>8}  function"]
+        for function, count in total.most_common(limit):
+            lines.append(f"{count:>8}  {function}")
+        return "\n".join(lines)
+
+
+class ProfileSession:
+    """
+    1回の音声入力のプロファイリングの状態
+    """
+
+    def __init__(self, mode: str, trace_memory: bool, sample_interval: float, tracemalloc_frames: int, trace=None):
+        """
+        ProfileSessionの初期化（計測を開始する）
+
+        Parameters
+        ----------
+        mode : str
+            プロファイラーの種類（"cprofile"または"sampling"）
+        trace_memory : bool
+            tracemallocでメモリの割り当てを記録する場合True
+        sample_interval : float
+            サンプリングプロファイラーの間隔（秒）
+        tracemalloc_frames : int
+            tracemallocが記録するトレースバックの深さ
+        trace : LatencyTrace, optional
+            この音声入力のレイテンシ計測のトレース
+        """
+        self.mode = mode
+        self.trace = trace
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.profiles: List[cProfile.Profile] = []
+        self.main_profile: Optional[cProfile.Profile] = None
+        self.sampler: Optional[SamplingProfiler] = None
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.final_snapshot: Optional[tracemalloc.Snapshot] = None
+        self.traced_memory = (0, 0)
+        self.started_tracemalloc = False
+        self._lock = threading.Lock()
+
+        if trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(tracemalloc_frames)
+                self.started_tracemalloc = True
+            self.snapshot = tracemalloc.take_snapshot()
+
+        if mode == "sampling":
+            self.sampler = SamplingProfiler(sample_interval)
+            self.sampler.start()
+        else:
+            self.main_profile = self.enable_thread()
+
+    def enable_thread(self) -> Optional[cProfile.Profile]:
+        """
+        呼び出し元のスレッドでcProfileを開始する
+
+        Python 3.12以降のcProfileは全スレッドを計測するため、既に計測中の場合は何もしません。
+
+        Returns
+        -------
+        cProfile.Profile or None
+            開始したプロファイラー（開始しなかった場合はNone）
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        with self._lock:
+            self.profiles.append(profile)
+        return profile
+
+    def stop(self) -> float:
+        """
+        計測を停止する
+
+        Returns
+        -------
+        float
+            計測した時間（秒）
+        """
+        elapsed = time.perf_counter() - self.started
+        if self.sampler is not None:
+            self.sampler.stop()
+        elif self.main_profile is not None:
+            self.main_profile.disable()
+        if self.snapshot is not None:
+            self.final_snapshot = tracemalloc.take_snapshot()
+            self.traced_memory = tracemalloc.get_traced_memory()
+            if self.started_tracemalloc:
+                tracemalloc.stop()
+        return elapsed
+
+    def write(self, directory: Path, elapsed: float) -> Path:
+        """
+        計測結果をファイルに書き出す
+
+        レポート（.txt）のほかに、cProfileの場合はpstats形式（.prof）、
+        サンプリングの場合はスタックの集計（.folded）を書き出します。
+
+        Parameters
+        ----------
+        directory : Path
+            書き出すディレクトリ
+        elapsed : float
+            計測した時間（秒）
+
+        Returns
+        -------
+        Path
+            レポートのパス
+        """
+        stem = directory / f"dictation-{self.started_at.strftime('%Y%m%d-%H%M%S')}-{self.mode}"
+        sections = [
+            f"Open Super Whisper profile ({self.mode})",
+            f"started: {self.started_at.isoformat(timespec='seconds')}",
+            f"duration: {elapsed:.3f}s",
+            f"python: {platform.python_version()} ({platform.platform()})",
+        ]
+
+        if self.trace is not None:
+            intervals = self.trace.intervals()
+            if intervals:
+                sections += ["", "== Latency (ms) =="]
+                sections += [f"{name:<32} {value * 1000:>10.1f}" for name, value in intervals.items()]
+
+        if self.sampler is not None:
+            self.sampler.write_folded(stem.with_suffix(".folded"))
+            sections += ["", "== Sampling profile ==", self.sampler.report()]
+        else:
+            with self._lock:
+                profiles = list(self.profiles)
+            if profiles:
+                stats = pstats.Stats(profiles[0])
+                for profile in profiles[1:]:
+                    stats.add(profile)
+                stats.dump_stats(str(stem.with_suffix(".prof")))
+                buffer = io.StringIO()
+                stats.stream = buffer
+                stats.sort_stats("cumulative").print_stats(REPORT_LIMIT)
+                sections += ["", "== cProfile (cumulative) ==", buffer.getvalue()]
+
+        if self.final_snapshot is not None:
+            traced, peak = self.traced_memory
+            sections += ["", f"== tracemalloc (traced {traced / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB) =="]
+            for stat in self.final_snapshot.compare_to(self.snapshot, "lineno")[:REPORT_LIMIT]:
+                sections.append(str(stat))
+
+        path = stem.with_suffix(".txt")
+        path.write_text("\n".join(sections) + "\n", encoding="utf-8")
+        return path
+
+
+class DictationProfiler:
+    """
+    音声入力ごとのプロファイリングを管理するクラス
+
+    arm()で計測を予約すると、次のbegin()からそのトレースのfinish()までを計測します。
+    cProfileはbegin()とfinish()を呼び出すスレッド（GUIスレッド）と、
+    profile_thread()の中で実行した処理（文字起こしのスレッド）を計測します。
+    """
+
+    def __init__(self, output_dir=None, sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 tracemalloc_frames: int = DEFAULT_TRACEMALLOC_FRAMES):
+        """
+        DictationProfilerの初期化
+
+        Parameters
+        ----------
+        output_dir : str or Path, optional
+            結果を書き出すディレクトリ（省略時はアプリケーションデータのprofiles）
+        sample_interval : float, optional
+            サンプリングプロファイラーの間隔（秒）
+        tracemalloc_frames : int, optional
+            tracemallocが記録するトレースバックの深さ
+        """
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.sample_interval = sample_interval
+        self.tracemalloc_frames = tracemalloc_frames
+        self._lock = threading.Lock()
+        self._armed: Optional[Dict[str, object]] = None
+        self._session: Optional[ProfileSession] = None
+
+    def arm(self, mode: str = "cprofile", trace_memory: bool = True, persistent: bool = False) -> None:
+        """
+        次の音声入力の計測を予約する
+
+        Parameters
+        ----------
+        mode : str, optional
+            プロファイラーの種類（"cprofile"または"sampling"）
+        trace_memory : bool, optional
+            tracemallocでメモリの割り当てを記録する場合True
+        persistent : bool, optional
+            1回で解除せず、以降のすべての音声入力を計測する場合True
+
+        Raises
+        ------
+        ValueError
+            プロファイラーの種類が正しくない場合
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiler mode: {mode} (expected one of {', '.join(MODES)})")
+        with self._lock:
+            self._armed = {"mode": mode, "trace_memory": trace_memory, "persistent": persistent}
+
+    def disarm(self) -> None:
+        """計測の予約を解除する（計測中の場合は継続する）"""
+        with self._lock:
+            self._armed = None
+
+    def configure_from_env(self) -> bool:
+        """
+        環境変数OPEN_SUPER_WHISPER_PROFILEの設定に従って毎回の音声入力の計測を予約する
+
+        Returns
+        -------
+        bool
+            計測を予約した場合True
+        """
+        value = os.environ.get(PROFILE_ENV, "").strip().lower()
+        if not value or value in ("0", "off", "false"):
+            return False
+        options = [option.strip() for option in value.split(",") if option.strip()]
+        mode = next((option for option in options if option in MODES), "cprofile")
+        try:
+            self.arm(mode, trace_memory="tracemalloc" in options, persistent=True)
+        except ValueError as e:
+            logger.error("Invalid %s: %s", PROFILE_ENV, e)
+            return False
+        return True
+
+    def is_armed(self) -> bool:
+        """計測が予約されているか、計測中かを取得する"""
+        with self._lock:
+            return self._armed is not None or self._session is not None
+
+    def begin(self, trace=None) -> bool:
+        """
+        予約されている場合に計測を開始する
+
+        既に計測中の場合は、その音声入力の計測を続けます。
+
+        Parameters
+        ----------
+        trace : LatencyTrace, optional
+            計測する音声入力のレイテンシ計測のトレース
+
+        Returns
+        -------
+        bool
+            計測を開始した場合True
+        """
+        with self._lock:
+            if self._armed is None or self._session is not None:
+                return False
+            options = self._armed
+            if not options["persistent"]:
+                self._armed = None
+            try:
+                self._session = ProfileSession(
+                    options["mode"], options["trace_memory"], self.sample_interval, self.tracemalloc_frames, trace
+                )
+            except Exception as e:
+                logger.error("Failed to start profiling: %s", e)
+                return False
+            return True
+
+    @contextmanager
+    def profile_thread(self, trace=None) -> Iterator[None]:
+        """
+        計測中の音声入力の処理を呼び出し元のスレッドでもcProfileで計測する
+
+        Parameters
+        ----------
+        trace : LatencyTrace, optional
+            処理する音声入力のトレース（計測中のトレースと異なる場合は計測しない）
+        """
+        session = self._session
+        profile = None
+        if session is not None and session.mode == "cprofile" and (trace is None or session.trace is trace):
+            profile = session.enable_thread()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+
+    def finish(self, trace=None) -> Optional[Path]:
+        """
+        計測を停止して結果をファイルに書き出す
+
+        Parameters
+        ----------
+        trace : LatencyTrace, optional
+            完了した音声入力のトレース（計測中のトレースと異なる場合は停止しない）
+
+        Returns
+        -------
+        Path or None
+            書き出したレポートのパス（計測していない場合や書き出しに失敗した場合はNone）
+        """
+        with self._lock:
+            session = self._session
+            if session is None or (trace is not None and session.trace is not None and session.trace is not trace):
+                return None
+            self._session = None
+
+        elapsed = session.stop()
+        try:
+            directory = self.output_dir or get_app_data_dir("profiles")
+            directory.mkdir(parents=True, exist_ok=True)
+            path = session.write(directory, elapsed)
+        except Exception as e:
+            logger.error("Failed to write profile: %s", e)
+            return None
+        logger.info("Profile written to %s", path)
+        return path
+
+
+# アプリケーション全体で共有するプロファイラー
+profiler = DictationProfiler()
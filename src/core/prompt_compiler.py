@@ -0,0 +1,277 @@
+"""
+プロンプトコンパイラモジュール
+
+カスタム語彙とシステム指示をトークン予算内に収まるプロンプトへ変換します。
+Whisperはプロンプトの末尾約224トークンのみを使用するため、予算を超える内容は
+先頭から黙って切り捨てられます。このモジュールはローカルでトークン数を見積もり、
+語彙を優先度順に予算内へ決定的に詰め込みます。
+"""
+
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# GPT-2系トークナイザーの事前分割に近い区切り（空白付きの単語、数字、記号、空白）
+_PRETOKEN_PATTERN = re.compile(
+    r"'(?:s|t|re|ve|m|ll|d)| ?[A-Za-z]+| ?[0-9]{1,3}| ?[^\sA-Za-z0-9\x80-\U0010ffff]+| ?[\x80-\U0010ffff]+|\s+"
+)
+
+
+def count_tokens(text: str) -> int:
+    """
+    テキストのトークン数をローカルで見積もる
+
+    Whisperのバイトレベル BPE トークナイザーを近似します。英数字の短い単語は
+    1トークン、長い単語は約4文字で1トークン、非ASCII文字はUTF-8で約2バイトごとに
+    1トークンとして数えるため、実際のトークン数よりやや多めに見積もられます。
+
+    Parameters
+    ----------
+    text : str
+        トークン数を数えるテキスト
+
+    Returns
+    -------
+    int
+        見積もったトークン数
+    """
+    if not text:
+        return 0
+
+    tokens = 0
+    for match in _PRETOKEN_PATTERN.finditer(text):
+        piece = match.group()
+        body = piece.lstrip(" ")
+        if not body:
+            # 空白のみ
+            tokens += 1
+        elif body.isascii():
+            # 短い英単語は多くの場合1トークンになる
+            tokens += 1 if len(body) <= 6 else math.ceil(len(body) / 4)
+        else:
+            tokens += max(1, math.ceil(len(body.encode("utf-8")) / 2))
+    return tokens
+
+
+class PromptCompiler:
+    """
+    トークン予算付きでプロンプトを構築するクラス
+
+    システム指示を優先して予算内に収め、残りの予算に語彙を優先度順に詰め込みます。
+    構築結果は語彙またはシステム指示が変更されるまでキャッシュされます。
+
+    Attributes
+    ----------
+    token_budget : int
+        プロンプトに使用できる最大トークン数
+    """
+
+    # Whisperがプロンプトとして使用する最大トークン数
+    DEFAULT_TOKEN_BUDGET = 224
+
+    # トークン数キャッシュの最大エントリ数
+    TOKEN_CACHE_LIMIT = 200_000
+
+    VOCABULARY_PREFIX = "Vocabulary: "
+    VOCABULARY_SEPARATOR = ", "
+    INSTRUCTIONS_PREFIX = "Instructions: "
+    INSTRUCTIONS_SEPARATOR = ". "
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET):
+        """
+        PromptCompilerの初期化
+
+        Parameters
+        ----------
+        token_budget : int, optional
+            プロンプトに使用できる最大トークン数 (デフォルト: 224)
+        """
+        self.token_budget = token_budget
+        self._cache_key: Optional[Tuple] = None
+        self._cached_prompt: Optional[str] = None
+        self._token_cache: Dict[str, int] = {}
+
+    def invalidate(self) -> None:
+        """
+        キャッシュされたプロンプトを破棄する
+
+        語彙やシステム指示が変更されたときに呼び出します。
+        """
+        self._cache_key = None
+        self._cached_prompt = None
+
+    def set_token_budget(self, token_budget: int) -> None:
+        """
+        トークン予算を変更する
+
+        Parameters
+        ----------
+        token_budget : int
+            プロンプトに使用できる最大トークン数
+        """
+        if token_budget != self.token_budget:
+            self.token_budget = token_budget
+            self.invalidate()
+
+    def _tokens(self, text: str) -> int:
+        """語彙や指示ごとのトークン数をキャッシュ付きで数える"""
+        cached = self._token_cache.get(text)
+        if cached is None:
+            if len(self._token_cache) >= self.TOKEN_CACHE_LIMIT:
+                self._token_cache.clear()
+            cached = count_tokens(text)
+            self._token_cache[text] = cached
+        return cached
+
+    @staticmethod
+    def rank_terms(vocabulary: Sequence[str], scores: Optional[Dict[str, float]] = None) -> List[str]:
+        """
+        語彙を優先度順に並べ替える
+
+        大文字小文字の違いのみの重複は最初の出現だけを残します。``scores``が
+        与えられた場合はスコアの高い順、同点の場合は登録順に並べます。
+
+        Parameters
+        ----------
+        vocabulary : Sequence[str]
+            語彙のリスト
+        scores : Dict[str, float], optional
+            語彙ごとの関連度スコア
+
+        Returns
+        -------
+        List[str]
+            優先度順に並べた語彙のリスト
+        """
+        seen = set()
+        unique_terms = []
+        for term in vocabulary:
+            term = term.strip()
+            key = term.casefold()
+            if term and key not in seen:
+                seen.add(key)
+                unique_terms.append(term)
+
+        if not scores:
+            return unique_terms
+
+        order = {term: index for index, term in enumerate(unique_terms)}
+        return sorted(unique_terms, key=lambda term: (-scores.get(term, 0.0), order[term]))
+
+    def _fit_instructions(self, instructions: Sequence[str]) -> Tuple[List[str], int]:
+        """
+        予算内に収まるシステム指示を登録順に選択する
+
+        Returns
+        -------
+        Tuple[List[str], int]
+            選択した指示と使用したトークン数
+        """
+        selected = []
+        used = 1  # 語彙との区切りの空白
+        for instruction in instructions:
+            instruction = instruction.strip()
+            if not instruction:
+                continue
+            if selected:
+                cost = self._tokens(self.INSTRUCTIONS_SEPARATOR + instruction)
+            else:
+                cost = self._tokens(self.INSTRUCTIONS_PREFIX + instruction)
+            if used + cost > self.token_budget:
+                break
+            selected.append(instruction)
+            used += cost
+        return selected, used
+
+    def _fit_vocabulary(self, ranked_terms: Sequence[str], budget: int) -> List[str]:
+        """
+        残りの予算に収まる語彙を優先度順に貪欲に選択する
+
+        予算を超える語彙は飛ばし、より短い下位の語彙で予算を埋めます。
+        区切り文字を含めて数えることで、連結後のトークン数と加算的に一致させます。
+        """
+        selected = []
+        used = 0
+        for term in ranked_terms:
+            if selected:
+                cost = self._tokens(self.VOCABULARY_SEPARATOR + term)
+            else:
+                cost = self._tokens(self.VOCABULARY_PREFIX + term)
+            if used + cost > budget:
+                continue
+            selected.append(term)
+            used += cost
+            if budget - used <= 1:
+                break
+        return selected
+
+    def _compose(self, terms: Sequence[str], instructions: Sequence[str]) -> Optional[str]:
+        """語彙と指示からプロンプト文字列を組み立てる"""
+        prompt_parts = []
+        if terms:
+            prompt_parts.append(self.VOCABULARY_PREFIX + self.VOCABULARY_SEPARATOR.join(terms))
+        if instructions:
+            prompt_parts.append(self.INSTRUCTIONS_PREFIX + self.INSTRUCTIONS_SEPARATOR.join(instructions))
+        if not prompt_parts:
+            return None
+        return " ".join(prompt_parts)
+
+    def compile(
+        self,
+        vocabulary: Sequence[str],
+        instructions: Sequence[str],
+        scores: Optional[Dict[str, float]] = None,
+    ) -> Optional[str]:
+        """
+        語彙とシステム指示から予算内のプロンプトを構築する
+
+        Parameters
+        ----------
+        vocabulary : Sequence[str]
+            カスタム語彙のリスト
+        instructions : Sequence[str]
+            システム指示のリスト
+        scores : Dict[str, float], optional
+            語彙ごとの関連度スコア。指定した場合はキャッシュを使用しません。
+
+        Returns
+        -------
+        str or None
+            構築されたプロンプト、または語彙も指示もない場合はNone
+        """
+        # 件数が同じまま内容が変わった場合も再構築されるよう、内容そのものをキーにする
+        cache_key = (tuple(vocabulary), tuple(instructions), self.token_budget)
+        if scores is None and self._cache_key == cache_key:
+            return self._cached_prompt
+
+        selected_instructions, used = self._fit_instructions(instructions)
+        ranked_terms = self.rank_terms(vocabulary, scores)
+        selected_terms = self._fit_vocabulary(ranked_terms, self.token_budget - used)
+
+        prompt = self._compose(selected_terms, selected_instructions)
+
+        # 見積もりの誤差で予算を超えた場合は優先度の低い語彙から取り除く
+        while prompt and selected_terms and count_tokens(prompt) > self.token_budget:
+            selected_terms.pop()
+            prompt = self._compose(selected_terms, selected_instructions)
+
+        if scores is None:
+            self._cache_key = cache_key
+            self._cached_prompt = prompt
+        return prompt
+
+    def estimate_tokens(self, prompt: Optional[str]) -> int:
+        """
+        プロンプトのトークン数を見積もる
+
+        Parameters
+        ----------
+        prompt : str or None
+            見積もるプロンプト
+
+        Returns
+        -------
+        int
+            見積もったトークン数
+        """
+        return count_tokens(prompt) if prompt else 0
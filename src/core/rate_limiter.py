@@ -0,0 +1,386 @@
+"""
+OpenAI APIのレート制限モジュール
+
+1分あたりのリクエスト数、1分あたりの音声の秒数、同時実行数を
+トークンバケットとカウンターで制限し、APIのレスポンスヘッダー
+（Retry-Afterとx-ratelimit-*）に合わせて待機時間と上限を調整します。
+"""
+
+import re
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+# x-ratelimit-reset-*ヘッダーの時間表記（例: "1s"、"6m0s"、"59.2ms"）
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    レート制限ヘッダーの時間表記を秒数に変換する
+
+    Parameters
+    ----------
+    value : str or None
+        "1s"、"6m0s"、"20ms"などの時間表記、または秒数
+
+    Returns
+    -------
+    float or None
+        秒数。解釈できない場合はNone
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PATTERN.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+class TokenBucket:
+    """
+    一定の速度で補充されるトークンバケット
+
+    要求量がバケットの容量を超える場合（長い音声など）は、バケットが
+    満杯になった時点で許可し、残量を負にして後続の要求を待たせます。
+
+    Attributes
+    ----------
+    per_minute : float
+        1分あたりに補充される量（0以下の場合は制限しない）
+    """
+
+    # 容量（1分あたりの量に対する割合）。短時間に集中する要求を抑える
+    BURST_RATIO = 1 / 6
+
+    def __init__(self, per_minute: float = 0):
+        """
+        TokenBucketの初期化
+
+        Parameters
+        ----------
+        per_minute : float, optional
+            1分あたりに補充される量（0以下の場合は制限しない）
+        """
+        self.per_minute = 0.0
+        self.tokens = 0.0
+        self._updated = time.monotonic()
+        self.set_rate(per_minute)
+
+    @property
+    def capacity(self) -> float:
+        """バケットの容量"""
+        return max(1.0, self.per_minute * self.BURST_RATIO)
+
+    def set_rate(self, per_minute: float) -> None:
+        """
+        補充速度を変更する
+
+        Parameters
+        ----------
+        per_minute : float
+            1分あたりに補充される量（0以下の場合は制限しない）
+        """
+        self._refill(time.monotonic())
+        unlimited = self.per_minute <= 0
+        self.per_minute = max(0.0, float(per_minute or 0))
+        # 制限を新たに設定した場合は満杯から始める
+        self.tokens = self.capacity if unlimited else min(self.tokens, self.capacity)
+
+    def _refill(self, now: float) -> None:
+        """経過時間に応じてトークンを補充する"""
+        if self.per_minute > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        要求量を消費できるまでの待機時間を求める
+
+        Parameters
+        ----------
+        amount : float
+            要求量
+        now : float
+            現在時刻（time.monotonic）
+
+        Returns
+        -------
+        float
+            待機時間（秒）
+        """
+        if self.per_minute <= 0:
+            return 0.0
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) * 60.0 / self.per_minute
+
+    def consume(self, amount: float) -> None:
+        """
+        トークンを消費する
+
+        Parameters
+        ----------
+        amount : float
+            消費する量
+        """
+        if self.per_minute > 0:
+            self.tokens -= amount
+
+
+class RateLimiter:
+    """
+    OpenAI APIの呼び出しを制限するレートリミッター
+
+    1分あたりのリクエスト数と音声の秒数をトークンバケットで、同時実行数を
+    カウンターで制限します。429応答のRetry-Afterや残りリクエスト数が0であることを
+    示すヘッダーを受け取ると、指定された時刻まですべての呼び出しを待たせます。
+    リクエスト数の上限が設定されていない場合は、ヘッダーが示すアカウントの
+    上限を使用します。スレッド間で共有して使用します。
+
+    Attributes
+    ----------
+    max_in_flight : int
+        同時に実行するリクエストの最大数（0の場合は制限しない）
+    """
+
+    # 同時に実行するリクエストのデフォルトの最大数
+    DEFAULT_MAX_IN_FLIGHT = 4
+
+    # Retry-Afterヘッダーがない429応答の初回の待機時間（秒）と上限
+    DEFAULT_BACKOFF = 1.0
+    MAX_BACKOFF = 60.0
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        audio_seconds_per_minute: float = 0,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ):
+        """
+        RateLimiterの初期化
+
+        Parameters
+        ----------
+        requests_per_minute : float, optional
+            1分あたりの最大リクエスト数（0の場合はアカウントの上限に従う）
+        audio_seconds_per_minute : float, optional
+            1分あたりにアップロードする音声の最大秒数（0の場合は制限しない）
+        max_in_flight : int, optional
+            同時に実行するリクエストの最大数（0の場合は制限しない）
+        """
+        self._condition = threading.Condition()
+        self._requests = TokenBucket()
+        self._audio_seconds = TokenBucket(audio_seconds_per_minute)
+        self.max_in_flight = max_in_flight
+
+        self._configured_requests_per_minute = 0.0
+        self._server_requests_limit: Optional[int] = None
+        self._server_requests_remaining: Optional[int] = None
+        self._blocked_until = 0.0
+        self._backoff = self.DEFAULT_BACKOFF
+        self._in_flight = 0
+        self._waiting = 0
+        self._throttled = 0
+        self._wait_seconds = 0.0
+
+        self.set_limits(requests_per_minute=requests_per_minute)
+
+    def set_limits(
+        self,
+        requests_per_minute: Optional[float] = None,
+        audio_seconds_per_minute: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> None:
+        """
+        制限値を変更する（Noneの項目は変更しない）
+
+        Parameters
+        ----------
+        requests_per_minute : float, optional
+            1分あたりの最大リクエスト数（0の場合はアカウントの上限に従う）
+        audio_seconds_per_minute : float, optional
+            1分あたりにアップロードする音声の最大秒数（0の場合は制限しない）
+        max_in_flight : int, optional
+            同時に実行するリクエストの最大数（0の場合は制限しない）
+        """
+        with self._condition:
+            if requests_per_minute is not None:
+                self._configured_requests_per_minute = max(0.0, float(requests_per_minute))
+                self._apply_request_rate()
+            if audio_seconds_per_minute is not None:
+                self._audio_seconds.set_rate(audio_seconds_per_minute)
+            if max_in_flight is not None:
+                self.max_in_flight = max(0, int(max_in_flight))
+            self._condition.notify_all()
+
+    @property
+    def audio_seconds_per_minute(self) -> float:
+        """1分あたりにアップロードする音声の最大秒数（0の場合は制限しない）"""
+        return self._audio_seconds.per_minute
+
+    def _apply_request_rate(self) -> None:
+        """設定値とアカウントの上限の小さい方をリクエスト数の上限にする"""
+        limits = [limit for limit in (self._configured_requests_per_minute, self._server_requests_limit) if limit]
+        self._requests.set_rate(min(limits) if limits else 0)
+
+    def acquire(self, audio_seconds: float = 0.0) -> float:
+        """
+        リクエストを開始できるまで待機する
+
+        開始できた場合は、完了後に必ずrelease()を呼び出してください。
+
+        Parameters
+        ----------
+        audio_seconds : float, optional
+            アップロードする音声の秒数
+
+        Returns
+        -------
+        float
+            待機した時間（秒）
+        """
+        start = time.monotonic()
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                        self._condition.wait()
+                        continue
+                    delay = max(
+                        self._blocked_until - now,
+                        self._requests.wait_time(1, now),
+                        self._audio_seconds.wait_time(audio_seconds, now),
+                    )
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+
+                self._requests.consume(1)
+                self._audio_seconds.consume(audio_seconds)
+                self._in_flight += 1
+            finally:
+                self._waiting -= 1
+            waited = time.monotonic() - start
+            self._wait_seconds += waited
+            return waited
+
+    def release(self) -> None:
+        """
+        リクエストの完了を通知する
+        """
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._condition.notify_all()
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """
+        レスポンスヘッダーに合わせて制限を調整する
+
+        Parameters
+        ----------
+        headers : Mapping[str, str] or None
+            APIのレスポンスヘッダー
+        """
+        if not headers:
+            return
+
+        def header_int(name):
+            try:
+                return int(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        limit = header_int("x-ratelimit-limit-requests")
+        remaining = header_int("x-ratelimit-remaining-requests")
+        reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+
+        with self._condition:
+            now = time.monotonic()
+            if limit and limit != self._server_requests_limit:
+                self._server_requests_limit = limit
+                self._apply_request_rate()
+            if remaining is not None:
+                self._server_requests_remaining = remaining
+                # 他のクライアントと共有しているアカウントの残量を超えて送らない
+                if self._requests.per_minute > 0:
+                    self._requests.tokens = min(self._requests.tokens, float(remaining))
+                if remaining <= 0 and reset:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+            self._condition.notify_all()
+
+    def on_success(self) -> None:
+        """
+        リクエストの成功を通知し、429応答の待機時間を初期値に戻す
+        """
+        with self._condition:
+            self._backoff = self.DEFAULT_BACKOFF
+
+    def on_rate_limited(self, headers: Optional[Mapping[str, str]] = None) -> float:
+        """
+        429応答を受け取ったことを通知し、すべての呼び出しを一時停止する
+
+        Parameters
+        ----------
+        headers : Mapping[str, str], optional
+            429応答のレスポンスヘッダー
+
+        Returns
+        -------
+        float
+            呼び出しを停止する時間（秒）
+        """
+        self.update_from_headers(headers)
+        retry_after = None
+        if headers:
+            retry_after_ms = parse_duration(headers.get("retry-after-ms"))
+            retry_after = retry_after_ms / 1000 if retry_after_ms is not None else parse_duration(headers.get("retry-after"))
+
+        with self._condition:
+            if retry_after is None:
+                # 指定がない場合は連続する429ごとに待機時間を倍にする
+                retry_after = self._backoff
+                self._backoff = min(self._backoff * 2, self.MAX_BACKOFF)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._throttled += 1
+            self._condition.notify_all()
+            return retry_after
+
+    def get_state(self) -> Dict:
+        """
+        現在の制限状態を取得する
+
+        Returns
+        -------
+        Dict
+            制限値、残量、待機中と実行中のリクエスト数などを含む辞書
+        """
+        with self._condition:
+            now = time.monotonic()
+            self._requests.wait_time(0, now)
+            self._audio_seconds.wait_time(0, now)
+            return {
+                "requests_per_minute": self._requests.per_minute,
+                "configured_requests_per_minute": self._configured_requests_per_minute,
+                "server_requests_limit": self._server_requests_limit,
+                "server_requests_remaining": self._server_requests_remaining,
+                "request_tokens": round(self._requests.tokens, 3),
+                "audio_seconds_per_minute": self._audio_seconds.per_minute,
+                "audio_seconds_tokens": round(self._audio_seconds.tokens, 3),
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "blocked_seconds": round(max(0.0, self._blocked_until - now), 3),
+                "throttled_total": self._throttled,
+                "wait_seconds_total": round(self._wait_seconds, 6),
+            }
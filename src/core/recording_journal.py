@@ -0,0 +1,273 @@
+"""
+録音ジャーナルモジュール
+
+録音中の音声を一定の長さのセグメントに区切り、チェックサム付きで
+逐次ディスクに書き込みます。アプリケーションの異常終了やスリープで
+録音が中断された場合も、次回の起動時に書き込み済みのセグメントから
+音声を復元できます。
+"""
+
+import json
+import logging
+import os
+import queue
+import shutil
+import struct
+import threading
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+# セグメントのヘッダー（識別子, 連番, フレーム数, CRC32）
+_SEGMENT_MAGIC = b"OSWS"
+_SEGMENT_HEADER = struct.Struct("<4sIII")
+
+# セッションのファイル名
+_META_FILE = "meta.json"
+_SEGMENTS_FILE = "segments.bin"
+
+
+class RecordingJournal:
+    """
+    録音中の音声をセグメント単位でディスクに書き込むジャーナル
+
+    音声コールバックからは受け取ったデータをキューに入れるだけで、
+    書き込みは専用のスレッドで行います。セグメントは一定のフレーム数ごとに
+    16ビットPCMとして追記し、fsyncは一定間隔でまとめて実行します。
+    録音が正常に保存されたセッションは削除されるため、残っている
+    セッションは中断された録音です。
+
+    Attributes
+    ----------
+    session_dir : Path
+        このセッションのディレクトリ
+    sample_rate : int
+        サンプルレート
+    channels : int
+        チャンネル数
+    """
+
+    # 1セグメントの長さ（秒）
+    SEGMENT_SECONDS = 1.0
+
+    # fsyncの最小間隔（秒）
+    FSYNC_INTERVAL = 2.0
+
+    def __init__(self, directory, sample_rate: int, channels: int):
+        """
+        RecordingJournalの初期化と新しいセッションの作成
+
+        Parameters
+        ----------
+        directory : str or Path
+            セッションを保存するディレクトリ
+        sample_rate : int
+            サンプルレート
+        channels : int
+            チャンネル数
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.segment_frames = max(1, int(sample_rate * self.SEGMENT_SECONDS))
+
+        self.session_dir = Path(directory) / f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "sample_rate": sample_rate,
+            "channels": channels,
+            "started": time.time(),
+            "pid": os.getpid(),
+        }
+        with open(self.session_dir / _META_FILE, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._file = open(self.session_dir / _SEGMENTS_FILE, "ab")
+        self._queue: "queue.Queue[Optional[np.ndarray]]" = queue.Queue()
+        self._buffer: List[np.ndarray] = []
+        self._buffered_frames = 0
+        self._sequence = 0
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self._error: Optional[Exception] = None
+
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def append(self, data: np.ndarray) -> None:
+        """
+        録音した音声データを追加する（音声コールバックから呼び出す）
+
+        Parameters
+        ----------
+        data : np.ndarray
+            (フレーム数, チャンネル数)の音声データ
+        """
+        self._queue.put(data)
+
+    def _writer(self) -> None:
+        """キューの音声データをセグメントとして書き込む（書き込みスレッド）"""
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            if self._error is not None:
+                continue
+            try:
+                self._buffer.append(data)
+                self._buffered_frames += len(data)
+                while self._buffered_frames >= self.segment_frames:
+                    self._write_segment(self.segment_frames)
+                if self._unsynced and time.monotonic() - self._last_fsync >= self.FSYNC_INTERVAL:
+                    self._sync()
+            except Exception as e:
+                # 書き込みに失敗しても録音自体は継続する
+                self._error = e
+                logger.error("Recording journal error: %s", e)
+
+    def _write_segment(self, frames: int) -> None:
+        """バッファの先頭からフレームを取り出してセグメントを書き込む"""
+        audio = np.concatenate(self._buffer, axis=0)
+        segment, rest = audio[:frames], audio[frames:]
+        self._buffer = [rest] if len(rest) else []
+        self._buffered_frames = len(rest)
+
+        if segment.dtype != np.int16:
+            segment = (np.clip(segment, -1.0, 1.0) * 32767).astype(np.int16)
+        payload = segment.tobytes()
+        header = _SEGMENT_HEADER.pack(_SEGMENT_MAGIC, self._sequence, len(segment), zlib.crc32(payload))
+        self._file.write(header + payload)
+        self._sequence += 1
+        self._unsynced = True
+
+    def _sync(self) -> None:
+        """書き込んだセグメントをディスクに反映する"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+
+    def close(self, discard: bool = False) -> None:
+        """
+        残りの音声を書き込んでジャーナルを閉じる
+
+        Parameters
+        ----------
+        discard : bool, optional
+            録音が正常に保存されたためセッションを削除する場合True
+        """
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            if self._error is None and self._buffered_frames and not discard:
+                self._write_segment(self._buffered_frames)
+            self._sync()
+        except (OSError, ValueError) as e:
+            logger.error("Recording journal error: %s", e)
+        finally:
+            self._file.close()
+
+        if discard:
+            discard_session(self.session_dir)
+
+
+def find_orphaned_sessions(directory) -> List[Path]:
+    """
+    中断された録音のセッションを検索する
+
+    Parameters
+    ----------
+    directory : str or Path
+        セッションを保存するディレクトリ
+
+    Returns
+    -------
+    List[Path]
+        中断されたセッションのディレクトリ（古い順）
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(path for path in directory.iterdir() if (path / _META_FILE).exists())
+
+
+def recover_session(session_dir, output_path) -> Optional[str]:
+    """
+    中断されたセッションから音声ファイルを復元する
+
+    チェックサムが一致しないセグメントや書きかけのセグメント以降は破棄します。
+
+    Parameters
+    ----------
+    session_dir : str or Path
+        復元するセッションのディレクトリ
+    output_path : str or Path
+        復元した音声を保存するWAVファイルのパス
+
+    Returns
+    -------
+    str or None
+        復元した音声ファイルのパス、復元できる音声がない場合や書き込みに失敗した場合はNone
+        （セッションは削除しないため、次回の起動時に再び復元できます）
+    """
+    session_dir = Path(session_dir)
+    try:
+        with open(session_dir / _META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(session_dir / _SEGMENTS_FILE, "rb") as f:
+            data = f.read()
+    except (OSError, ValueError) as e:
+        logger.error("Failed to read recording journal %s: %s", session_dir, e)
+        return None
+
+    channels = int(meta.get("channels", 1))
+    segments = []
+    offset = 0
+    expected_sequence = 0
+    while offset + _SEGMENT_HEADER.size <= len(data):
+        magic, sequence, frames, checksum = _SEGMENT_HEADER.unpack_from(data, offset)
+        start = offset + _SEGMENT_HEADER.size
+        end = start + frames * channels * 2
+        if magic != _SEGMENT_MAGIC or sequence != expected_sequence or end > len(data):
+            break
+        payload = data[start:end]
+        if zlib.crc32(payload) != checksum:
+            break
+        segments.append(np.frombuffer(payload, dtype=np.int16).reshape(-1, channels))
+        expected_sequence += 1
+        offset = end
+
+    if not segments:
+        return None
+
+    try:
+        sf.write(str(output_path), np.concatenate(segments, axis=0), int(meta["sample_rate"]), subtype="PCM_16")
+    except (OSError, RuntimeError, KeyError, ValueError) as e:
+        # ディスクの空き不足などで書き込めない場合は、次回の起動時に再び復元できるようジャーナルを残す
+        logger.error("Failed to write recovered audio %s: %s", output_path, e)
+        try:
+            Path(output_path).unlink()
+        except OSError:
+            pass
+        return None
+    return str(output_path)
+
+
+def discard_session(session_dir) -> None:
+    """
+    セッションを削除する
+
+    Parameters
+    ----------
+    session_dir : str or Path
+        削除するセッションのディレクトリ
+    """
+    shutil.rmtree(session_dir, ignore_errors=True)
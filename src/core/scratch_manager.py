@@ -0,0 +1,227 @@
+"""
+一時ファイル管理モジュール
+
+録音の一時ファイルを専用の作業ディレクトリに一意な名前で作成し、
+古いファイルやディレクトリの容量上限を超えた分を自動的に削除します。
+Linuxではメモリ上のファイルシステム（/dev/shm）に配置することもできます。
+"""
+
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Set
+
+# tmpfsとして使用するディレクトリ
+TMPFS_DIR = "/dev/shm"
+
+# 作業ディレクトリ名
+SCRATCH_DIR_NAME = "open-super-whisper"
+
+# 以前のバージョンがシステムの一時ディレクトリに作成していた録音ファイル
+_LEGACY_RECORDING_PATTERN = re.compile(r"recording_\d{8}_\d{6}\.wav")
+
+
+class ScratchManager:
+    """
+    一時ファイルの作成から削除までを管理するクラス
+
+    ファイル名にはタイムスタンプに加えてランダムな識別子を含め、排他的に
+    作成するため、同じ秒に作成されたファイルが上書きされることはありません。
+    使用中のファイルは削除の対象から除外されます。
+
+    Attributes
+    ----------
+    directory : Path
+        作業ディレクトリ
+    max_age_seconds : float
+        これより古いファイルを削除する（0の場合は経過時間で削除しない）
+    max_total_bytes : int
+        作業ディレクトリの合計サイズの上限（0の場合は制限しない）
+    """
+
+    # デフォルトの保持期間（秒）と合計サイズの上限（バイト）
+    DEFAULT_MAX_AGE_SECONDS = 24 * 60 * 60
+    DEFAULT_MAX_TOTAL_BYTES = 500 * 1024 * 1024
+
+    # tmpfsを使用するために必要な最小の空き容量（バイト）
+    TMPFS_MIN_FREE_BYTES = 64 * 1024 * 1024
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        use_tmpfs: bool = False,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+    ):
+        """
+        ScratchManagerの初期化
+
+        Parameters
+        ----------
+        directory : str, optional
+            作業ディレクトリ（省略時はシステムの一時ディレクトリの下に作成）
+        use_tmpfs : bool, optional
+            利用可能な場合に/dev/shmの下に作業ディレクトリを作成する場合True
+        max_age_seconds : float, optional
+            これより古いファイルを削除する（デフォルト: 24時間）
+        max_total_bytes : int, optional
+            作業ディレクトリの合計サイズの上限（デフォルト: 500MB）
+        """
+        if directory:
+            self.directory = Path(directory)
+        elif use_tmpfs and self._tmpfs_available():
+            self.directory = Path(TMPFS_DIR) / f"{SCRATCH_DIR_NAME}-{self._user_id()}"
+        else:
+            self.directory = Path(tempfile.gettempdir()) / f"{SCRATCH_DIR_NAME}-{self._user_id()}"
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+        self.max_age_seconds = max_age_seconds
+        self.max_total_bytes = max_total_bytes
+
+        self._lock = threading.Lock()
+        self._in_use: Set[Path] = set()
+
+    @staticmethod
+    def _user_id() -> str:
+        """ユーザーごとに作業ディレクトリを分けるための識別子を返す"""
+        if hasattr(os, "getuid"):
+            return str(os.getuid())
+        return re.sub(r"\W", "_", os.environ.get("USERNAME", "user"))
+
+    @classmethod
+    def _tmpfs_available(cls) -> bool:
+        """/dev/shmが書き込み可能で十分な空き容量があるかを確認する"""
+        if not os.path.isdir(TMPFS_DIR) or not os.access(TMPFS_DIR, os.W_OK):
+            return False
+        try:
+            stat = os.statvfs(TMPFS_DIR)
+        except (OSError, AttributeError):
+            return False
+        return stat.f_bavail * stat.f_frsize >= cls.TMPFS_MIN_FREE_BYTES
+
+    def new_path(self, prefix: str = "recording", suffix: str = ".wav") -> str:
+        """
+        一意な一時ファイルを作成する
+
+        作成したファイルはrelease()が呼ばれるまで削除の対象から除外されます。
+
+        Parameters
+        ----------
+        prefix : str, optional
+            ファイル名の接頭辞
+        suffix : str, optional
+            ファイル名の拡張子
+
+        Returns
+        -------
+        str
+            作成した空のファイルのパス
+        """
+        self.cleanup()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        while True:
+            path = self.directory / f"{prefix}_{timestamp}_{uuid.uuid4().hex[:8]}{suffix}"
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            except FileExistsError:
+                continue
+            os.close(fd)
+            with self._lock:
+                self._in_use.add(path)
+            return str(path)
+
+    def release(self, path: Optional[str], delete: bool = True) -> None:
+        """
+        一時ファイルの使用を終了する
+
+        Parameters
+        ----------
+        path : str or None
+            使用を終了するファイルのパス
+        delete : bool, optional
+            ファイルをすぐに削除する場合True（Falseの場合は保持期間の経過後に削除）
+        """
+        if not path:
+            return
+        path = Path(path)
+        with self._lock:
+            self._in_use.discard(path)
+        if delete and path.parent == self.directory:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def cleanup(self) -> int:
+        """
+        保持期間を過ぎたファイルと、合計サイズの上限を超えた古いファイルを削除する
+
+        Returns
+        -------
+        int
+            削除したファイル数
+        """
+        now = time.time()
+        with self._lock:
+            in_use = set(self._in_use)
+
+        files = []
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_file(follow_symlinks=False) and Path(entry.path) not in in_use:
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            except OSError:
+                continue
+
+        removed = 0
+        total = sum(size for _, size, _ in files)
+        # 古い順に、保持期間を過ぎたファイルまたは上限を超えている間のファイルを削除する
+        for mtime, size, path in sorted(files):
+            expired = self.max_age_seconds and now - mtime > self.max_age_seconds
+            over_quota = self.max_total_bytes and total > self.max_total_bytes
+            if not (expired or over_quota):
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def cleanup_legacy(self) -> int:
+        """
+        以前のバージョンがシステムの一時ディレクトリに残した録音ファイルを削除する
+
+        Returns
+        -------
+        int
+            削除したファイル数
+        """
+        now = time.time()
+        max_age = self.max_age_seconds or self.DEFAULT_MAX_AGE_SECONDS
+        removed = 0
+        try:
+            entries = list(os.scandir(tempfile.gettempdir()))
+        except OSError:
+            return 0
+        for entry in entries:
+            if not _LEGACY_RECORDING_PATTERN.fullmatch(entry.name):
+                continue
+            try:
+                if entry.is_file(follow_symlinks=False) and now - entry.stat().st_mtime > max_age:
+                    os.unlink(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
@@ -0,0 +1,308 @@
+"""
+置換辞書によるテキスト置換モジュール
+
+ユーザー定義の置換辞書（話し言葉から表記への変換、句読点の読み上げから記号への変換、
+略語の展開など）をAho-Corasickオートマトンに変換し、すべてのパターンを
+1回の線形走査で文字起こし結果に適用する機能を提供します。
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# 単語境界の判定に使用する文字（分かち書きされない文字体系を除く単語構成文字）
+_BOUNDARY_WORD_PATTERN = re.compile(r"[^\W_぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]")
+
+# 直前の単語に続けて書く記号（前の空白を取り除く）
+_ATTACHING_PUNCTUATION = ".,!?;:)]}、。，．！？：；）」』"
+
+
+def _fold(char: str) -> str:
+    """
+    大文字小文字を区別しない照合のために1文字を小文字化する
+
+    小文字化で文字数が変わる文字は、位置がずれないようにそのまま返します。
+
+    Parameters
+    ----------
+    char : str
+        小文字化する1文字
+
+    Returns
+    -------
+    str
+        小文字化した1文字
+    """
+    lowered = char.lower()
+    return lowered if len(lowered) == 1 else char
+
+
+def _is_boundary_char(char: str) -> bool:
+    """単語境界の判定対象となる単語構成文字かどうかを判定する"""
+    return bool(_BOUNDARY_WORD_PATTERN.match(char))
+
+
+class TextReplacer:
+    """
+    置換辞書をAho-Corasickオートマトンで適用するクラス
+
+    パターンのトライ木はパターンの追加時にその場で拡張され、失敗リンクは
+    辞書が変更された後の最初の適用時にのみ再計算されます。照合は大文字小文字を
+    区別せず、重なり合う一致は最も左で最も長いものを優先します。
+    英数字で始まる・終わるパターンは単語の途中には一致しません。
+    """
+
+    def __init__(self, replacements: Optional[Dict[str, str]] = None):
+        """
+        TextReplacerの初期化
+
+        Parameters
+        ----------
+        replacements : Dict[str, str], optional
+            初期の置換辞書（パターンから置換後テキストへのマッピング）
+        """
+        self._lock = threading.Lock()
+        self._replacements: Dict[str, str] = {}
+
+        # トライ木（ノードごとの遷移、失敗リンク、出力リンク、終端のパターン）
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output_link: List[int] = [-1]
+        self._terminal: List[Optional[str]] = [None]
+        self._links_dirty = False
+
+        if replacements:
+            self.update(replacements)
+
+    def __len__(self) -> int:
+        """登録されているパターン数を返す"""
+        return len(self._replacements)
+
+    def get_replacements(self) -> Dict[str, str]:
+        """
+        現在の置換辞書を取得する
+
+        Returns
+        -------
+        Dict[str, str]
+            パターンから置換後テキストへのマッピング
+        """
+        with self._lock:
+            return dict(self._replacements)
+
+    def set_replacement(self, pattern: str, replacement: str) -> None:
+        """
+        置換パターンを追加または更新する
+
+        Parameters
+        ----------
+        pattern : str
+            置換対象のテキスト
+        replacement : str
+            置換後のテキスト
+        """
+        pattern = pattern.strip()
+        if not pattern:
+            return
+        with self._lock:
+            self._insert(pattern, replacement)
+
+    def remove_replacement(self, pattern: str) -> bool:
+        """
+        置換パターンを削除する
+
+        Parameters
+        ----------
+        pattern : str
+            削除するパターン
+
+        Returns
+        -------
+        bool
+            削除した場合True
+        """
+        pattern = pattern.strip()
+        with self._lock:
+            if pattern not in self._replacements:
+                return False
+            del self._replacements[pattern]
+
+            node = self._find_node(pattern)
+            if node is not None:
+                # 大文字小文字違いの同じパターンが残っていればそちらを終端にする
+                folded = "".join(_fold(char) for char in pattern)
+                self._terminal[node] = next(
+                    (other for other in self._replacements if "".join(_fold(c) for c in other) == folded),
+                    None,
+                )
+                self._links_dirty = True
+            return True
+
+    def update(self, replacements: Dict[str, str]) -> None:
+        """
+        置換辞書を差分で更新する
+
+        新しい辞書にないパターンを削除し、追加・変更されたパターンのみを
+        オートマトンに反映します。
+
+        Parameters
+        ----------
+        replacements : Dict[str, str]
+            新しい置換辞書
+        """
+        replacements = {pattern.strip(): value for pattern, value in replacements.items() if pattern.strip()}
+        for pattern in list(self.get_replacements()):
+            if pattern not in replacements:
+                self.remove_replacement(pattern)
+        current = self.get_replacements()
+        for pattern, replacement in replacements.items():
+            if current.get(pattern) != replacement:
+                self.set_replacement(pattern, replacement)
+
+    def clear(self) -> None:
+        """
+        すべての置換パターンを削除する
+        """
+        with self._lock:
+            self._replacements = {}
+            self._goto = [{}]
+            self._fail = [0]
+            self._output_link = [-1]
+            self._terminal = [None]
+            self._links_dirty = False
+
+    def _find_node(self, pattern: str) -> Optional[int]:
+        """パターンに対応するトライ木のノードを探す"""
+        node = 0
+        for char in pattern:
+            node = self._goto[node].get(_fold(char))
+            if node is None:
+                return None
+        return node
+
+    def _insert(self, pattern: str, replacement: str) -> None:
+        """トライ木にパターンを追加する（ロック取得済みで呼び出す）"""
+        self._replacements[pattern] = replacement
+        node = 0
+        for char in pattern:
+            folded = _fold(char)
+            next_node = self._goto[node].get(folded)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output_link.append(-1)
+                self._terminal.append(None)
+                self._goto[node][folded] = next_node
+            node = next_node
+        self._terminal[node] = pattern
+        self._links_dirty = True
+
+    def _build_links(self) -> None:
+        """幅優先探索で失敗リンクと出力リンクを計算する（ロック取得済みで呼び出す）"""
+        goto, fail, output_link, terminal = self._goto, self._fail, self._output_link, self._terminal
+        queue = []
+        for child in goto[0].values():
+            fail[child] = 0
+            output_link[child] = -1
+            queue.append(child)
+
+        index = 0
+        while index < len(queue):
+            node = queue[index]
+            index += 1
+            for char, child in goto[node].items():
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                target = goto[state].get(char, 0)
+                fail[child] = target if target != child else 0
+                # 失敗リンクをたどって最初に見つかる終端ノード
+                output_link[child] = fail[child] if terminal[fail[child]] is not None else output_link[fail[child]]
+                queue.append(child)
+
+        self._links_dirty = False
+
+    def _find_matches(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        テキスト中のすべての一致を1回の走査で検出する（ロック取得済みで呼び出す）
+
+        置換後のテキストもロック中に解決するため、適用中に他のスレッドが
+        パターンを削除・変更しても結果に影響しません。
+
+        Returns
+        -------
+        List[Tuple[int, int, str]]
+            (開始位置, 終了位置, 置換後のテキスト)のリスト
+        """
+        goto, fail, output_link, terminal = self._goto, self._fail, self._output_link, self._terminal
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            folded = _fold(char)
+            while state and folded not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(folded, 0)
+
+            node = state if terminal[state] is not None else output_link[state]
+            while node > 0:
+                pattern = terminal[node]
+                end = position + 1
+                start = end - len(pattern)
+                if self._has_boundaries(text, start, end):
+                    matches.append((start, end, self._replacements[pattern]))
+                node = output_link[node]
+        return matches
+
+    @staticmethod
+    def _has_boundaries(text: str, start: int, end: int) -> bool:
+        """英数字で始まる・終わる一致が単語の途中にないかを確認する"""
+        if _is_boundary_char(text[start]) and start > 0 and _is_boundary_char(text[start - 1]):
+            return False
+        if _is_boundary_char(text[end - 1]) and end < len(text) and _is_boundary_char(text[end]):
+            return False
+        return True
+
+    def apply(self, text: str) -> str:
+        """
+        置換辞書をテキストに適用する
+
+        Parameters
+        ----------
+        text : str
+            置換するテキスト
+
+        Returns
+        -------
+        str
+            置換後のテキスト
+        """
+        if not text:
+            return text
+
+        with self._lock:
+            if not self._replacements:
+                return text
+            if self._links_dirty:
+                self._build_links()
+            matches = self._find_matches(text)
+
+        if not matches:
+            return text
+
+        # 最も左で最も長い一致を優先し、重なる一致は捨てる
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        output = []
+        last_end = 0
+        for start, end, replacement in matches:
+            if start < last_end:
+                continue
+            prefix = text[last_end:start]
+            # 句読点への置換では直前の空白を取り除く
+            if replacement and replacement[0] in _ATTACHING_PUNCTUATION:
+                prefix = prefix.rstrip(" ")
+            output.append(prefix)
+            output.append(replacement)
+            last_end = end
+        output.append(text[last_end:])
+        return "".join(output)
@@ -0,0 +1,473 @@
+"""
+構造化文字起こし結果モジュール
+
+タイムスタンプ付きのセグメントと単語をNumPy配列でコンパクトに保持し、
+SRT、VTT、JSONL形式へ中間オブジェクトを生成せずに書き出す機能を提供します。
+"""
+
+import io
+import json
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TextIO
+
+import numpy as np
+
+
+def _get(obj: Any, key: str, default: Any = None) -> Any:
+    """
+    SDKのレスポンスオブジェクトと辞書の両方から値を取得する
+
+    Parameters
+    ----------
+    obj : Any
+        SDKのモデルオブジェクトまたは辞書
+    key : str
+        取得するキー
+    default : Any, optional
+        値が存在しない場合のデフォルト値
+
+    Returns
+    -------
+    Any
+        取得した値
+    """
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+def _pack_strings(strings: Iterable[str]) -> tuple:
+    """
+    文字列のリストを連結文字列とオフセット配列に変換する
+
+    Parameters
+    ----------
+    strings : Iterable[str]
+        連結する文字列
+
+    Returns
+    -------
+    tuple
+        (連結文字列, 各文字列の開始位置と終了位置を示すint64配列)
+    """
+    parts = list(strings)
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    if parts:
+        np.cumsum([len(part) for part in parts], out=offsets[1:])
+    return "".join(parts), offsets
+
+
+def _format_timestamps(seconds: np.ndarray, separator: str) -> List[str]:
+    """
+    秒数の配列を "HH:MM:SS,mmm" 形式の文字列に一括変換する
+
+    Parameters
+    ----------
+    seconds : np.ndarray
+        秒数の配列
+    separator : str
+        秒とミリ秒の区切り文字（SRTは","、VTTは"."）
+
+    Returns
+    -------
+    List[str]
+        フォーマット済みのタイムスタンプ
+    """
+    total_ms = np.rint(np.clip(seconds, 0.0, None) * 1000.0).astype(np.int64)
+    hours, rem = np.divmod(total_ms, 3_600_000)
+    minutes, rem = np.divmod(rem, 60_000)
+    secs, millis = np.divmod(rem, 1000)
+    return [
+        f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+        for h, m, s, ms in zip(hours.tolist(), minutes.tolist(), secs.tolist(), millis.tolist())
+    ]
+
+
+class Transcript:
+    """
+    タイムスタンプ付きの文字起こし結果を保持するクラス
+
+    セグメントと単語はそれぞれ開始・終了時刻のfloat64配列と、テキストを
+    1つに連結した文字列およびオフセット配列で保持します。単語ごとに
+    辞書やオブジェクトを生成しないため、長時間の文字起こしでもメモリ使用量を
+    抑えられます。
+
+    Attributes
+    ----------
+    text : str
+        全体の文字起こしテキスト
+    language : str or None
+        検出または指定された言語
+    duration : float or None
+        音声の長さ（秒）
+    segment_starts, segment_ends : np.ndarray
+        各セグメントの開始・終了時刻（秒）
+    word_starts, word_ends : np.ndarray
+        各単語の開始・終了時刻（秒）
+    word_segments : np.ndarray
+        各単語が属するセグメントのインデックス
+    """
+
+    __slots__ = (
+        "text",
+        "language",
+        "duration",
+        "segment_starts",
+        "segment_ends",
+        "word_starts",
+        "word_ends",
+        "word_segments",
+        "_segment_text",
+        "_segment_offsets",
+        "_word_text",
+        "_word_offsets",
+    )
+
+    def __init__(
+        self,
+        text: str = "",
+        language: Optional[str] = None,
+        duration: Optional[float] = None,
+        segment_starts: Optional[Iterable[float]] = None,
+        segment_ends: Optional[Iterable[float]] = None,
+        segment_texts: Optional[Iterable[str]] = None,
+        word_starts: Optional[Iterable[float]] = None,
+        word_ends: Optional[Iterable[float]] = None,
+        words: Optional[Iterable[str]] = None,
+    ):
+        """
+        Transcriptの初期化
+
+        Parameters
+        ----------
+        text : str, optional
+            全体の文字起こしテキスト
+        language : str, optional
+            言語コードまたは言語名
+        duration : float, optional
+            音声の長さ（秒）
+        segment_starts, segment_ends : Iterable[float], optional
+            セグメントの開始・終了時刻
+        segment_texts : Iterable[str], optional
+            セグメントのテキスト
+        word_starts, word_ends : Iterable[float], optional
+            単語の開始・終了時刻
+        words : Iterable[str], optional
+            単語のテキスト
+        """
+        self.text = text
+        self.language = language
+        self.duration = duration
+
+        self.segment_starts = np.asarray(segment_starts if segment_starts is not None else [], dtype=np.float64)
+        self.segment_ends = np.asarray(segment_ends if segment_ends is not None else [], dtype=np.float64)
+        self._segment_text, self._segment_offsets = _pack_strings(segment_texts or [])
+
+        self.word_starts = np.asarray(word_starts if word_starts is not None else [], dtype=np.float64)
+        self.word_ends = np.asarray(word_ends if word_ends is not None else [], dtype=np.float64)
+        self._word_text, self._word_offsets = _pack_strings(words or [])
+
+        if not (len(self.segment_starts) == len(self.segment_ends) == len(self._segment_offsets) - 1):
+            raise ValueError("Segment starts, ends and texts must have the same length")
+        if not (len(self.word_starts) == len(self.word_ends) == len(self._word_offsets) - 1):
+            raise ValueError("Word starts, ends and texts must have the same length")
+
+        # 各単語が属するセグメントを開始時刻から求める
+        if len(self.segment_starts) and len(self.word_starts):
+            indices = np.searchsorted(self.segment_starts, self.word_starts, side="right") - 1
+            self.word_segments = np.clip(indices, 0, len(self.segment_starts) - 1).astype(np.int32)
+        else:
+            self.word_segments = np.zeros(len(self.word_starts), dtype=np.int32)
+
+    @classmethod
+    def from_response(cls, response: Any, duration: Optional[float] = None) -> "Transcript":
+        """
+        OpenAI SDKのレスポンスからTranscriptを生成する
+
+        Parameters
+        ----------
+        response : Any
+            ``json``または``verbose_json``形式で取得したSDKのレスポンス、または同じ構造の辞書
+        duration : float, optional
+            レスポンスに長さが含まれない場合に使用する音声の長さ（秒）
+
+        Returns
+        -------
+        Transcript
+            構造化された文字起こし結果
+        """
+        if isinstance(response, str):
+            response = json.loads(response)
+
+        text = _get(response, "text", "") or ""
+        language = _get(response, "language")
+        duration = _get(response, "duration", duration) or duration
+
+        segments = _get(response, "segments") or []
+        words = _get(response, "words") or []
+
+        if segments:
+            segment_starts = [float(_get(segment, "start", 0.0)) for segment in segments]
+            segment_ends = [float(_get(segment, "end", 0.0)) for segment in segments]
+            segment_texts = [(_get(segment, "text", "") or "").strip() for segment in segments]
+        elif text:
+            # タイムスタンプがない場合は全体を1つのセグメントとして扱う
+            segment_starts = [0.0]
+            segment_ends = [float(duration or 0.0)]
+            segment_texts = [text.strip()]
+        else:
+            segment_starts, segment_ends, segment_texts = [], [], []
+
+        return cls(
+            text=text,
+            language=language,
+            duration=float(duration) if duration is not None else None,
+            segment_starts=segment_starts,
+            segment_ends=segment_ends,
+            segment_texts=segment_texts,
+            word_starts=[float(_get(word, "start", 0.0)) for word in words],
+            word_ends=[float(_get(word, "end", 0.0)) for word in words],
+            words=[_get(word, "word", "") or "" for word in words],
+        )
+
+    def __len__(self) -> int:
+        """セグメント数を返す"""
+        return len(self.segment_starts)
+
+    def __str__(self) -> str:
+        """全体のテキストを返す"""
+        return self.text
+
+    def __repr__(self) -> str:
+        return (
+            f"Transcript(segments={self.segment_count}, words={self.word_count}, "
+            f"language={self.language!r}, duration={self.duration!r})"
+        )
+
+    @property
+    def segment_count(self) -> int:
+        """セグメント数"""
+        return len(self.segment_starts)
+
+    @property
+    def word_count(self) -> int:
+        """単語数"""
+        return len(self.word_starts)
+
+    def segment_text(self, index: int) -> str:
+        """
+        指定したセグメントのテキストを取得する
+
+        Parameters
+        ----------
+        index : int
+            セグメントのインデックス
+
+        Returns
+        -------
+        str
+            セグメントのテキスト
+        """
+        offsets = self._segment_offsets
+        return self._segment_text[offsets[index]:offsets[index + 1]]
+
+    def word(self, index: int) -> str:
+        """
+        指定した単語のテキストを取得する
+
+        Parameters
+        ----------
+        index : int
+            単語のインデックス
+
+        Returns
+        -------
+        str
+            単語のテキスト
+        """
+        offsets = self._word_offsets
+        return self._word_text[offsets[index]:offsets[index + 1]]
+
+    def map_text(self, func: Callable[[str], str]) -> "Transcript":
+        """
+        全体、セグメント、単語のテキストに関数を適用した新しいTranscriptを生成する
+
+        タイムスタンプの配列は共有され、コピーされません。
+
+        Parameters
+        ----------
+        func : Callable[[str], str]
+            テキストを変換する関数
+
+        Returns
+        -------
+        Transcript
+            テキストを変換したTranscript
+        """
+        transcript = Transcript.__new__(Transcript)
+        transcript.text = func(self.text)
+        transcript.language = self.language
+        transcript.duration = self.duration
+        transcript.segment_starts = self.segment_starts
+        transcript.segment_ends = self.segment_ends
+        transcript._segment_text, transcript._segment_offsets = _pack_strings(
+            func(text) for text in self._iter_segment_texts()
+        )
+        transcript.word_starts = self.word_starts
+        transcript.word_ends = self.word_ends
+        transcript.word_segments = self.word_segments
+        transcript._word_text, transcript._word_offsets = _pack_strings(func(word) for word in self._iter_words())
+        return transcript
+
+    def words_in_segment(self, index: int) -> np.ndarray:
+        """
+        指定したセグメントに属する単語のインデックスを取得する
+
+        Parameters
+        ----------
+        index : int
+            セグメントのインデックス
+
+        Returns
+        -------
+        np.ndarray
+            単語インデックスの配列
+        """
+        return np.flatnonzero(self.word_segments == index)
+
+    def _iter_segment_texts(self) -> Iterator[str]:
+        """連結文字列からセグメントのテキストを順に切り出す"""
+        text = self._segment_text
+        offsets = self._segment_offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield text[start:end]
+
+    def _iter_words(self) -> Iterator[str]:
+        """連結文字列から単語のテキストを順に切り出す"""
+        text = self._word_text
+        offsets = self._word_offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield text[start:end]
+
+    def write_srt(self, fp: TextIO) -> None:
+        """
+        SRT形式でストリームに書き出す
+
+        Parameters
+        ----------
+        fp : TextIO
+            書き込み先のテキストストリーム
+        """
+        starts = _format_timestamps(self.segment_starts, ",")
+        ends = _format_timestamps(self.segment_ends, ",")
+        for index, (start, end, text) in enumerate(zip(starts, ends, self._iter_segment_texts()), 1):
+            fp.write(f"{index}\n{start} --> {end}\n{text}\n\n")
+
+    def write_vtt(self, fp: TextIO) -> None:
+        """
+        WebVTT形式でストリームに書き出す
+
+        Parameters
+        ----------
+        fp : TextIO
+            書き込み先のテキストストリーム
+        """
+        fp.write("WEBVTT\n\n")
+        starts = _format_timestamps(self.segment_starts, ".")
+        ends = _format_timestamps(self.segment_ends, ".")
+        for start, end, text in zip(starts, ends, self._iter_segment_texts()):
+            fp.write(f"{start} --> {end}\n{text}\n\n")
+
+    def write_jsonl(self, fp: TextIO, level: str = "segment") -> None:
+        """
+        JSON Lines形式でストリームに書き出す
+
+        Parameters
+        ----------
+        fp : TextIO
+            書き込み先のテキストストリーム
+        level : str, optional
+            "segment"の場合はセグメント単位、"word"の場合は単語単位で出力します
+        """
+        if level == "segment":
+            starts, ends, texts = self.segment_starts, self.segment_ends, self._iter_segment_texts()
+        elif level == "word":
+            starts, ends, texts = self.word_starts, self.word_ends, self._iter_words()
+        else:
+            raise ValueError(f"Unknown JSONL level: {level}")
+
+        dumps = json.dumps
+        for start, end, text in zip(starts.tolist(), ends.tolist(), texts):
+            fp.write(f'{{"start": {start:.3f}, "end": {end:.3f}, "text": {dumps(text, ensure_ascii=False)}}}\n')
+
+    def write_txt(self, fp: TextIO) -> None:
+        """
+        プレーンテキストでストリームに書き出す
+
+        Parameters
+        ----------
+        fp : TextIO
+            書き込み先のテキストストリーム
+        """
+        fp.write(self.text)
+        if self.text and not self.text.endswith("\n"):
+            fp.write("\n")
+
+    def write(self, fp: TextIO, fmt: str) -> None:
+        """
+        指定した形式でストリームに書き出す
+
+        Parameters
+        ----------
+        fp : TextIO
+            書き込み先のテキストストリーム
+        fmt : str
+            出力形式："srt"、"vtt"、"jsonl"、または"txt"
+        """
+        writers = {
+            "srt": self.write_srt,
+            "vtt": self.write_vtt,
+            "jsonl": self.write_jsonl,
+            "txt": self.write_txt,
+        }
+        if fmt not in writers:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        writers[fmt](fp)
+
+    def _render(self, fmt: str) -> str:
+        """指定した形式の文字列を生成する"""
+        buffer = io.StringIO()
+        self.write(buffer, fmt)
+        return buffer.getvalue()
+
+    def to_srt(self) -> str:
+        """
+        SRT形式の文字列を取得する
+
+        Returns
+        -------
+        str
+            SRT形式の字幕
+        """
+        return self._render("srt")
+
+    def to_vtt(self) -> str:
+        """
+        WebVTT形式の文字列を取得する
+
+        Returns
+        -------
+        str
+            WebVTT形式の字幕
+        """
+        return self._render("vtt")
+
+    def to_jsonl(self) -> str:
+        """
+        セグメント単位のJSON Lines形式の文字列を取得する
+
+        Returns
+        -------
+        str
+            JSON Lines形式の文字列
+        """
+        return self._render("jsonl")
@@ -0,0 +1,351 @@
+"""
+カスタム語彙による文字起こし後補正モジュール
+
+文字起こし結果の単語をカスタム語彙と照合し、編集距離が閾値以内の
+綴り誤りを語彙の表記に書き換えます。SymSpell方式の削除辞書を使用するため、
+語彙数や文字起こしの長さが増えても高速に照合できます。
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+# 照合対象とする単語（アンダースコアを除く英数字・各国文字）
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+
+# 分かち書きされない文字体系（これらを含む単語は補正しない）
+_CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]")
+
+
+def _normalize(text: str) -> str:
+    """
+    照合用のキーに正規化する（小文字化し、単語以外の文字を取り除く）
+
+    Parameters
+    ----------
+    text : str
+        正規化するテキスト
+
+    Returns
+    -------
+    str
+        照合用のキー
+    """
+    return "".join(_WORD_PATTERN.findall(text.casefold()))
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """
+    最大``max_distance``文字を削除したすべての文字列を生成する
+
+    Parameters
+    ----------
+    word : str
+        元の文字列
+    max_distance : int
+        削除する最大文字数
+
+    Returns
+    -------
+    Set[str]
+        削除によって得られる文字列の集合（元の文字列を含む）
+    """
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for candidate in frontier:
+            if len(candidate) <= 1:
+                continue
+            for i in range(len(candidate)):
+                next_frontier.add(candidate[:i] + candidate[i + 1:])
+        next_frontier -= results
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def damerau_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """
+    隣接文字の入れ替えを考慮した編集距離を計算する
+
+    対角線から``max_distance``以内の帯だけを計算し、距離が``max_distance``を
+    超えることが確定した時点で打ち切ります。
+
+    Parameters
+    ----------
+    a, b : str
+        比較する文字列
+    max_distance : int
+        許容する最大距離
+
+    Returns
+    -------
+    int
+        編集距離。``max_distance``を超える場合は``max_distance + 1``
+    """
+    if a == b:
+        return 0
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > max_distance:
+        return max_distance + 1
+
+    # 共通の接頭辞と接尾辞を取り除く
+    start = 0
+    while start < len_a and start < len_b and a[start] == b[start]:
+        start += 1
+    while len_a > start and len_b > start and a[len_a - 1] == b[len_b - 1]:
+        len_a -= 1
+        len_b -= 1
+    a, b = a[start:len_a], b[start:len_b]
+    len_a, len_b = len(a), len(b)
+    if len_a == 0 or len_b == 0:
+        return min(max(len_a, len_b), max_distance + 1)
+
+    over = max_distance + 1
+    previous_previous: Optional[List[int]] = None
+    previous = [j if j <= max_distance else over for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        current = [over] * (len_b + 1)
+        current[0] = i if i <= max_distance else over
+        low = max(1, i - max_distance)
+        high = min(len_b, i + max_distance)
+        row_min = current[0]
+        char_a = a[i - 1]
+        for j in range(low, high + 1):
+            value = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if (
+                previous_previous is not None
+                and j > 1
+                and char_a == b[j - 2]
+                and a[i - 2] == b[j - 1]
+                and previous_previous[j - 2] + 1 < value
+            ):
+                value = previous_previous[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+        previous_previous, previous = previous, current
+    return min(previous[len_b], over)
+
+
+class VocabularyCorrector:
+    """
+    カスタム語彙に基づいて文字起こし結果の綴り誤りを補正するクラス
+
+    語彙の照合キーの先頭7文字から最大2文字を削除した文字列を索引とする
+    削除辞書（SymSpell方式）を構築します。文字起こし中の連続する1〜数語を
+    連結した照合キーについても同様に削除文字列を生成して索引を引き、候補だけを
+    編集距離で検証します。単語の照合結果はキャッシュされます。
+
+    Attributes
+    ----------
+    max_distance : int
+        補正を許容する最大編集距離
+    min_length : int
+        補正対象とする照合キーの最小文字数
+    """
+
+    # 補正を許容する最大編集距離
+    DEFAULT_MAX_DISTANCE = 2
+
+    # これより短い照合キーは誤補正を避けるため補正しない
+    DEFAULT_MIN_LENGTH = 4
+
+    # 照合キーの長さに対する編集距離の上限の割合
+    MAX_DISTANCE_RATIO = 0.25
+
+    # 削除辞書に登録する照合キーの先頭文字数（SymSpellの接頭辞最適化）
+    PREFIX_LENGTH = 7
+
+    # これより短い照合キーは先頭文字が一致する語彙のみに補正する
+    SAME_INITIAL_LENGTH = 8
+
+    # 照合キャッシュの最大エントリ数
+    CACHE_LIMIT = 100_000
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE, min_length: int = DEFAULT_MIN_LENGTH):
+        """
+        VocabularyCorrectorの初期化
+
+        Parameters
+        ----------
+        max_distance : int, optional
+            補正を許容する最大編集距離 (デフォルト: 2)
+        min_length : int, optional
+            補正対象とする照合キーの最小文字数 (デフォルト: 4)
+        """
+        self.max_distance = max_distance
+        self.min_length = min_length
+
+        self._source_terms: Sequence[str] = []
+        self._dirty = False
+
+        self._terms: Dict[str, str] = {}
+        self._delete_index: Dict[str, List[str]] = {}
+        self._max_words = 1
+        self._cache: Dict[str, Optional[str]] = {}
+
+    def update(self, terms: Sequence[str]) -> None:
+        """
+        補正に使用する語彙を設定する
+
+        削除辞書は次回の補正時に遅延して再構築されます。
+
+        Parameters
+        ----------
+        terms : Sequence[str]
+            カスタム語彙のリスト
+        """
+        self._source_terms = terms
+        self._dirty = True
+
+    def _ensure_built(self) -> None:
+        """必要であれば削除辞書を再構築する"""
+        if self._dirty:
+            self._build(self._source_terms)
+            self._dirty = False
+
+    def _allowed_distance(self, key: str) -> int:
+        """照合キーの長さに応じた許容編集距離を求める"""
+        if len(key) < self.min_length:
+            return 0
+        return min(self.max_distance, int(len(key) * self.MAX_DISTANCE_RATIO))
+
+    def _build(self, terms: Sequence[str]) -> None:
+        """
+        削除辞書を構築する
+
+        Parameters
+        ----------
+        terms : Sequence[str]
+            カスタム語彙のリスト
+        """
+        self._terms = {}
+        self._delete_index = {}
+        self._cache = {}
+        self._max_words = 1
+
+        for term in terms:
+            term = term.strip()
+            key = _normalize(term)
+            if not key or key in self._terms or _CJK_PATTERN.search(key):
+                continue
+            self._terms[key] = term
+            self._max_words = max(self._max_words, len(_WORD_PATTERN.findall(term)))
+            for deleted in _deletes(key[:self.PREFIX_LENGTH], self._allowed_distance(key)):
+                self._delete_index.setdefault(deleted, []).append(key)
+
+        # 語彙が複数語の場合に加え、1語の語彙が分割されて認識された場合も照合する
+        self._max_words = min(self._max_words + 1, 4)
+
+    def lookup(self, text: str) -> Optional[str]:
+        """
+        テキストに最も近い語彙を検索する
+
+        Parameters
+        ----------
+        text : str
+            照合するテキスト（1語または連続する数語）
+
+        Returns
+        -------
+        str or None
+            許容距離内で最も近い語彙の表記、見つからない場合はNone
+        """
+        self._ensure_built()
+        return self._lookup_key(_normalize(text))
+
+    def _lookup_key(self, key: str) -> Optional[str]:
+        """照合キーから語彙をキャッシュ付きで検索する"""
+        if key in self._cache:
+            return self._cache[key]
+
+        result = self._terms.get(key)
+        if result is None:
+            max_distance = self._allowed_distance(key)
+            if max_distance > 0:
+                best: Optional[Tuple[int, int, str]] = None
+                candidates = set()
+                for deleted in _deletes(key[:self.PREFIX_LENGTH], max_distance):
+                    candidates.update(self._delete_index.get(deleted, ()))
+                for candidate in candidates:
+                    # 短い語は先頭文字が異なる一般語への誤補正を避ける
+                    if len(key) < self.SAME_INITIAL_LENGTH and candidate[0] != key[0]:
+                        continue
+                    allowed = min(max_distance, self._allowed_distance(candidate))
+                    if abs(len(candidate) - len(key)) > allowed:
+                        continue
+                    distance = damerau_levenshtein(key, candidate, allowed)
+                    if distance <= allowed:
+                        rank = (distance, -len(candidate), candidate)
+                        if best is None or rank < best:
+                            best = rank
+                if best is not None:
+                    result = self._terms[best[2]]
+
+        if len(self._cache) >= self.CACHE_LIMIT:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def correct(self, text: str) -> str:
+        """
+        文字起こし結果の綴り誤りを語彙の表記に補正する
+
+        先頭から順に、連続する語数の多い組み合わせを優先して照合し、
+        一致した範囲を語彙の表記に置き換えます。
+
+        Parameters
+        ----------
+        text : str
+            補正する文字起こし結果
+
+        Returns
+        -------
+        str
+            補正後のテキスト
+        """
+        self._ensure_built()
+        if not text or not self._terms:
+            return text
+
+        words = [match for match in _WORD_PATTERN.finditer(text) if not _CJK_PATTERN.search(match.group())]
+        if not words:
+            return text
+
+        output = []
+        last_end = 0
+        i = 0
+        while i < len(words):
+            replaced = False
+            for size in range(min(self._max_words, len(words) - i), 0, -1):
+                window = words[i:i + size]
+                start, end = window[0].start(), window[-1].end()
+                # 語の間に空白以外の文字（句読点など）がある場合は連結しない
+                if size > 1 and not all(
+                    text[a.end():b.start()].isspace() for a, b in zip(window, window[1:])
+                ):
+                    continue
+                key = "".join(w.group() for w in window).casefold()
+                term = self._lookup_key(key)
+                if term is None:
+                    continue
+                output.append(text[last_end:start])
+                output.append(term)
+                last_end = end
+                i += size
+                replaced = True
+                break
+            if not replaced:
+                i += 1
+
+        if not output:
+            return text
+        output.append(text[last_end:])
+        return "".join(output)
@@ -1,7 +1,21 @@
+import io
+import logging
 import os
-import json
+import threading
+import time
 from pathlib import Path
 import openai
+import soundfile as sf
+
+from src.core.transcript import Transcript
+from src.core.prompt_compiler import PromptCompiler
+from src.core.vocabulary_index import VocabularyIndex
+from src.core.vocabulary_corrector import VocabularyCorrector
+from src.core.rate_limiter import RateLimiter
+from src.core.latency_tracker import latency_tracker
+from src.core.metrics import metrics, UPLOAD_BYTES, API_LATENCY, API_ERRORS, API_RETRIES, TRANSCRIPTIONS
+
+logger = logging.getLogger(__name__)
 
 
 class WhisperTranscriber:
@@ -19,7 +33,17 @@ class WhisperTranscriber:
         {"id": "gpt-4o-mini-transcribe", "name": "GPT-4o Mini Transcribe", "description": "Lightweight and fast transcription model"}
     ]
     
-    def __init__(self, api_key=None):
+    # セグメントのタイムスタンプを含む"verbose_json"に対応するモデル
+    # （gpt-4o系のモデルは"json"と"text"のみに対応し、それ以外は400応答になる）
+    VERBOSE_JSON_MODELS = ("whisper-1",)
+    
+    # 429応答や接続エラーで再試行する最大回数
+    MAX_RETRIES = 2
+    
+    # 接続エラーで再試行するまでの初回の待機時間（秒）
+    RETRY_BACKOFF = 0.5
+    
+    def __init__(self, api_key=None, base_url=None):
         """
         Whisper文字起こしクラスの初期化
         
@@ -27,6 +51,9 @@ class WhisperTranscriber:
         ----------
         api_key : str, optional
             OpenAI APIキー。提供されない場合はOPENAI_API_KEY環境変数から取得を試みます。
+        base_url : str, optional
+            APIのベースURL（互換サーバーやベンチマーク用のモックサーバーを使用する場合）。
+            提供されない場合はOPENAI_BASE_URL環境変数、またはOpenAIのAPIを使用します。
         """
         # 提供されたAPIキーを使用するか、環境から取得
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -34,8 +61,16 @@ class WhisperTranscriber:
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Please provide it directly or set the OPENAI_API_KEY environment variable.")
         
-        # OpenAIクライアントの初期化
-        self.client = openai.OpenAI(api_key=self.api_key)
+        # OpenAIクライアントの初期化（再試行はレートリミッターと連携して行う）
+        # 送信開始とレスポンスヘッダーの受信時刻をレイテンシ計測に記録する
+        http_client = openai.DefaultHttpxClient(event_hooks={
+            "request": [lambda request: latency_tracker.mark("request_sent", overwrite=True)],
+            "response": [lambda response: latency_tracker.mark("first_byte", overwrite=True)],
+        })
+        self.client = openai.OpenAI(api_key=self.api_key, base_url=base_url, max_retries=0, http_client=http_client)
+        
+        # すべての文字起こしで共有するレートリミッター
+        self.rate_limiter = RateLimiter()
         
         # デフォルトパラメータの設定
         self.model = "whisper-1"  # 使用するWhisperモデル
@@ -45,6 +80,22 @@ class WhisperTranscriber:
         
         # システム指示用のリスト
         self.system_instructions = []
+        
+        # トークン予算付きのプロンプトコンパイラ
+        self.prompt_compiler = PromptCompiler()
+        
+        # 直近の文字起こしに基づく語彙選択インデックス
+        self.vocabulary_index = VocabularyIndex()
+        
+        # カスタム語彙による文字起こし後の綴り補正
+        self.vocabulary_corrector = VocabularyCorrector()
+        self.enable_vocabulary_correction = True
+        
+        # 語彙・プロンプトの状態を複数のスレッド（サーバーや一括処理のワーカー）から守るロック
+        self._vocabulary_lock = threading.Lock()
+        
+        # スレッドごとの直前の文字起こしで発生したエラーの種類
+        self._last_error = threading.local()
     
     @classmethod
     def get_available_models(cls):
@@ -69,6 +120,25 @@ class WhisperTranscriber:
         """
         self.model = model
         
+    def timestamp_response_format(self, model=None):
+        """
+        タイムスタンプ付きの結果を取得するための応答フォーマットを求める
+        
+        "verbose_json"に対応しないモデルでは"json"を返します。この場合の結果は
+        音声全体を1つのセグメントとするTranscriptになります。
+        
+        Parameters
+        ----------
+        model : str, optional
+            使用するモデル（省略時は設定済みのモデル）
+        
+        Returns
+        -------
+        str
+            "verbose_json"または"json"
+        """
+        return "verbose_json" if (model or self.model) in self.VERBOSE_JSON_MODELS else "json"
+        
     def add_custom_vocabulary(self, terms):
         """
         文字起こし精度向上のためのカスタム語彙を追加する
@@ -80,13 +150,21 @@ class WhisperTranscriber:
         """
         if isinstance(terms, str):
             terms = [terms]
-        self.custom_vocabulary.extend(terms)
+        with self._vocabulary_lock:
+            self.custom_vocabulary.extend(terms)
+            self.prompt_compiler.invalidate()
+            self.vocabulary_index.update(self.custom_vocabulary)
+            self.vocabulary_corrector.update(self.custom_vocabulary)
     
     def clear_custom_vocabulary(self):
         """
         カスタム語彙リストをクリアする
         """
-        self.custom_vocabulary = []
+        with self._vocabulary_lock:
+            self.custom_vocabulary = []
+            self.prompt_compiler.invalidate()
+            self.vocabulary_index.update(self.custom_vocabulary)
+            self.vocabulary_corrector.update(self.custom_vocabulary)
     
     def get_custom_vocabulary(self):
         """
@@ -110,13 +188,17 @@ class WhisperTranscriber:
         """
         if isinstance(instructions, str):
             instructions = [instructions]
-        self.system_instructions.extend(instructions)
+        with self._vocabulary_lock:
+            self.system_instructions.extend(instructions)
+            self.prompt_compiler.invalidate()
     
     def clear_system_instructions(self):
         """
         システムプロンプトをクリアする
         """
-        self.system_instructions = []
+        with self._vocabulary_lock:
+            self.system_instructions = []
+            self.prompt_compiler.invalidate()
     
     def get_system_instructions(self):
         """
@@ -129,85 +211,320 @@ class WhisperTranscriber:
         """
         return self.system_instructions
     
-    def _build_prompt(self):
+    def set_vocabulary_correction(self, enabled):
+        """
+        カスタム語彙による文字起こし後の綴り補正を有効または無効にする
+        
+        Parameters
+        ----------
+        enabled : bool
+            補正を有効にする場合True
+        """
+        self.enable_vocabulary_correction = enabled
+    
+    def set_prompt_token_budget(self, token_budget):
+        """
+        プロンプトに使用する最大トークン数を設定する
+        
+        Parameters
+        ----------
+        token_budget : int
+            プロンプトの最大トークン数
+        """
+        with self._vocabulary_lock:
+            self.prompt_compiler.set_token_budget(token_budget)
+    
+    def set_rate_limits(self, requests_per_minute=None, audio_seconds_per_minute=None, max_in_flight=None):
+        """
+        API呼び出しのレート制限を設定する（Noneの項目は変更しない）
+        
+        Parameters
+        ----------
+        requests_per_minute : float, optional
+            1分あたりの最大リクエスト数（0の場合はアカウントの上限に従う）
+        audio_seconds_per_minute : float, optional
+            1分あたりにアップロードする音声の最大秒数（0の場合は制限しない）
+        max_in_flight : int, optional
+            同時に実行するリクエストの最大数（0の場合は制限しない）
+        """
+        self.rate_limiter.set_limits(requests_per_minute, audio_seconds_per_minute, max_in_flight)
+    
+    def get_rate_limit_state(self):
+        """
+        現在のレート制限の状態を取得する
+        
+        Returns
+        -------
+        dict
+            制限値、残量、待機中と実行中のリクエスト数などを含む辞書
+        """
+        return self.rate_limiter.get_state()
+    
+    def _build_prompt(self, language=None):
         """
         語彙とシステム指示を含むプロンプトを構築する
         
+        システム指示を優先し、語彙はトークン予算に収まる分だけを含めます。
+        直近の文字起こし結果がある場合は、語彙選択インデックスが選んだ語彙を
+        関連度順に含めます。それ以外の場合、構築結果は語彙またはシステム指示が
+        変更されるまでキャッシュされます。
+        
+        Parameters
+        ----------
+        language : str, optional
+            文字起こしの言語コード
+        
         Returns
         -------
         str or None
             構築されたプロンプト、または指示がない場合はNone
         """
-        prompt_parts = []
+        with self._vocabulary_lock:
+            if self.custom_vocabulary and self.vocabulary_index.has_signal():
+                scores = self.vocabulary_index.select(language=language)
+                return self.prompt_compiler.compile(list(scores), self.system_instructions, scores)
+            
+            return self.prompt_compiler.compile(self.custom_vocabulary, self.system_instructions)
         
-        # カスタム語彙を追加
-        if self.custom_vocabulary:
-            prompt_parts.append("Vocabulary: " + ", ".join(self.custom_vocabulary))
+    def _should_correct(self):
+        """
+        文字起こし後の綴り補正を行うかどうかを判定する
         
-        # システム指示を追加
-        if self.system_instructions:
-            prompt_parts.append("Instructions: " + ". ".join(self.system_instructions))
+        Returns
+        -------
+        bool
+            補正が有効でカスタム語彙がある場合True
+        """
+        return self.enable_vocabulary_correction and bool(self.custom_vocabulary)
+    
+    @staticmethod
+    def get_audio_duration(audio_file):
+        """
+        音声の長さを求める
         
-        if not prompt_parts:
-            return None
-            
-        return " ".join(prompt_parts)
+        Parameters
+        ----------
+        audio_file : str or tuple
+            音声ファイルのパス、または(ファイル名, バイト列)の組
+        
+        Returns
+        -------
+        float
+            音声の長さ（秒）。読み取れない形式の場合は0
+        """
+        try:
+            source = io.BytesIO(audio_file[1]) if isinstance(audio_file, tuple) else audio_file
+            return sf.info(source).duration
+        except Exception:
+            return 0.0
+    
+    @staticmethod
+    def _error_kind(error):
+        """
+        メトリクスのラベルに使用するエラーの種類を求める
+        
+        Parameters
+        ----------
+        error : Exception
+            APIの呼び出しで発生した例外
+        
+        Returns
+        -------
+        str
+            "rate_limit"、"connection"、"server"、"client"、または"other"
+        """
+        if isinstance(error, openai.RateLimitError):
+            return "rate_limit"
+        if isinstance(error, openai.APIConnectionError):
+            return "connection"
+        if isinstance(error, openai.InternalServerError):
+            return "server"
+        if isinstance(error, openai.APIStatusError):
+            return "client"
+        return "other"
+    
+    def last_error_kind(self):
+        """
+        このスレッドで直前に実行した文字起こしのエラーの種類を取得する
         
-    def transcribe(self, audio_file, language=None, response_format="text"):
+        Returns
+        -------
+        str or None
+            "rate_limit"、"connection"、"server"、"client"、または"other"。
+            直前の文字起こしが成功した場合はNone
+        """
+        return getattr(self._last_error, "kind", None)
+    
+    def _create_transcription(self, audio_file, audio_path, params, audio_seconds):
+        """
+        レート制限に従ってAPIを呼び出す
+        
+        429応答ではRetry-Afterに従ってすべての呼び出しを停止してから再試行し、
+        接続エラーとサーバーエラーでは待機時間を倍にしながら再試行します。
+        
+        Parameters
+        ----------
+        audio_file : str or tuple
+            音声ファイルのパス、または(ファイル名, バイト列)の組
+        audio_path : Path or None
+            音声ファイルのパス（メモリ上の音声データの場合はNone）
+        params : dict
+            APIに渡すパラメータ
+        audio_seconds : float
+            音声の長さ（秒）
+        
+        Returns
+        -------
+        object
+            APIのレスポンス
+        """
+        model = params["model"]
+        upload_bytes = 0
+        if metrics.enabled:
+            upload_bytes = len(audio_file[1]) if audio_path is None else audio_path.stat().st_size
+        
+        for attempt in range(self.MAX_RETRIES + 1):
+            self.rate_limiter.acquire(audio_seconds)
+            UPLOAD_BYTES.inc(upload_bytes, (model,))
+            started = time.monotonic()
+            try:
+                if audio_path is None:
+                    # OpenAI APIを呼び出す
+                    raw_response = self.client.audio.transcriptions.with_raw_response.create(
+                        file=audio_file,
+                        **params
+                    )
+                else:
+                    # API呼び出し用に音声ファイルを開く
+                    with open(audio_path, "rb") as audio:
+                        # OpenAI APIを呼び出す
+                        raw_response = self.client.audio.transcriptions.with_raw_response.create(
+                            file=audio,
+                            **params
+                        )
+            except openai.RateLimitError as e:
+                API_ERRORS.inc(labels=(model, "rate_limit"))
+                # 利用枠の不足は待っても解消しない
+                if e.code == "insufficient_quota" or attempt == self.MAX_RETRIES:
+                    raise
+                API_RETRIES.inc(labels=(model, "rate_limit"))
+                self.rate_limiter.on_rate_limited(e.response.headers)
+                continue
+            except (openai.APIConnectionError, openai.InternalServerError) as e:
+                kind = self._error_kind(e)
+                API_ERRORS.inc(labels=(model, kind))
+                if attempt == self.MAX_RETRIES:
+                    raise
+                API_RETRIES.inc(labels=(model, kind))
+                time.sleep(self.RETRY_BACKOFF * 2 ** attempt)
+                continue
+            except Exception as e:
+                API_ERRORS.inc(labels=(model, self._error_kind(e)))
+                raise
+            finally:
+                self.rate_limiter.release()
+            
+            API_LATENCY.observe(time.monotonic() - started, (model,))
+            self.rate_limiter.update_from_headers(raw_response.headers)
+            self.rate_limiter.on_success()
+            return raw_response.parse()
+    
+    def transcribe(self, audio_file, language=None, response_format="text", timestamp_granularities=None, model=None):
         """
         OpenAI Whisper APIを使用して音声を文字起こしする
         
         Parameters
         ----------
-        audio_file : str
-            文字起こしする音声ファイルのパス
+        audio_file : str or tuple
+            文字起こしする音声ファイルのパス、または(ファイル名, バイト列)の組
         language : str, optional
             文字起こしの言語コード（例："en"、"ja"、"zh"）
         response_format : str, optional
-            応答フォーマット："text"、"json"、"verbose_json"、または"vtt"
+            応答フォーマット："text"、"json"、"verbose_json"、"srt"、または"vtt"
+        timestamp_granularities : list, optional
+            "verbose_json"で取得するタイムスタンプの粒度（"segment"、"word"）。
+            省略時はセグメントと単語の両方を取得します。
+        model : str, optional
+            この呼び出しだけに使用するモデル（省略時は設定済みのモデル）
             
         Returns
         -------
-        str or dict
-            応答フォーマットによって文字列または辞書形式の文字起こし結果
+        str or Transcript
+            "json"と"verbose_json"の場合はTranscript、それ以外は文字列の文字起こし結果
         """
         try:
-            # ファイルの存在確認
-            audio_path = Path(audio_file)
-            if not audio_path.exists():
-                raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_file}")
+            # ファイルの存在確認（メモリ上の音声データはそのままアップロードする）
+            audio_path = None
+            if not isinstance(audio_file, tuple):
+                audio_path = Path(audio_file)
+                if not audio_path.exists():
+                    raise FileNotFoundError(f"音声ファイルが見つかりません: {audio_file}")
             
             # API呼び出し用のパラメータを構築
             params = {
-                "model": self.model,
+                "model": model or self.model,
                 "response_format": response_format,
             }
             
             # 言語が指定されている場合は追加
             if language:
                 params["language"] = language
+            
+            # verbose_jsonの場合はセグメントと単語のタイムスタンプを要求
+            if response_format == "verbose_json":
+                params["timestamp_granularities"] = timestamp_granularities or ["segment", "word"]
                 
             # カスタム語彙がある場合はプロンプトを追加
-            prompt = self._build_prompt()
+            prompt = self._build_prompt(language)
             if prompt:
                 params["prompt"] = prompt
             
-            # API呼び出し用に音声ファイルを開く
-            with open(audio_path, "rb") as audio:
-                # OpenAI APIを呼び出す
-                response = self.client.audio.transcriptions.create(
-                    file=audio,
-                    **params
-                )
+            # 音声の秒数による制限がある場合のみ音声の長さを読み取る
+            audio_seconds = 0.0
+            if self.rate_limiter.audio_seconds_per_minute > 0:
+                audio_seconds = self.get_audio_duration(audio_file)
+            
+            response = self._create_transcription(audio_file, audio_path, params, audio_seconds)
                 
             # 要求されたフォーマットに基づいてレスポンスを処理
             if response_format == "json" or response_format == "verbose_json":
-                # JSONレスポンスフォーマットの場合、レスポンステキストを解析
-                return json.loads(response)
+                # JSONレスポンスフォーマットの場合、構造化された結果に変換
+                # （"json"の応答には長さが含まれないため、セグメントの終了時刻に音声の長さを使用）
+                duration = None
+                if response_format == "json":
+                    duration = audio_seconds or self.get_audio_duration(audio_file)
+                result = Transcript.from_response(response, duration=duration)
             else:
                 # テキスト、srt、vttの場合は文字列を返す
-                return str(response)
+                result = str(response)
+            
+            # 補正のキャッシュと語彙選択のコンテキストは他のスレッドの文字起こしと共有する
+            with self._vocabulary_lock:
+                if isinstance(result, Transcript):
+                    if self._should_correct():
+                        result = result.map_text(self.vocabulary_corrector.correct)
+                    text = result.text
+                else:
+                    if response_format == "text" and self._should_correct():
+                        result = self.vocabulary_corrector.correct(result)
+                    text = result
+                
+                # 次回の語彙選択のためにコンテキストへ反映
+                if self.custom_vocabulary:
+                    self.vocabulary_index.record_transcript(text)
+            
+            latency_tracker.mark("response_parsed")
+            TRANSCRIPTIONS.inc(labels=(model or self.model, "success"))
+            self._last_error.kind = None
+            return result
                 
         except Exception as e:
-            print(f"Error occurred during transcription: {e}")
+            self._last_error.kind = self._error_kind(e)
+            TRANSCRIPTIONS.inc(labels=(model or self.model, "error"))
+            if isinstance(e, openai.APIError):
+                # APIのエラー（5xx、429、接続エラーなど）は想定内のため、スタックトレースはDEBUGでのみ出力する
+                logger.error("Error occurred during transcription: %s", e)
+                logger.debug("Transcription error details", exc_info=True)
+            else:
+                logger.exception("Error occurred during transcription: %s", e)
             return f"Error: {str(e)}"
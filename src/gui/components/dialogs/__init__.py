@@ -7,4 +7,7 @@
 from src.gui.components.dialogs.api_key_dialog import APIKeyDialog
 from src.gui.components.dialogs.vocabulary_dialog import VocabularyDialog
 from src.gui.components.dialogs.system_instructions_dialog import SystemInstructionsDialog
-from src.gui.components.dialogs.hotkey_dialog import HotkeyDialog 
\ No newline at end of file
+from src.gui.components.dialogs.hotkey_dialog import HotkeyDialog
+from src.gui.components.dialogs.replacement_dialog import ReplacementDialog
+from src.gui.components.dialogs.bulk_retranscribe_dialog import BulkRetranscribeDialog
+from src.gui.components.dialogs.latency_dialog import LatencyDialog 
\ No newline at end of file
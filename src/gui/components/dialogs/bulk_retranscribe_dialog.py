@@ -0,0 +1,265 @@
+"""
+一括再文字起こし用のダイアログモジュール
+
+音声が保存されている文字起こし履歴を選択したモデルでまとめて再文字起こしし、
+料金と所要時間の見積もり、進捗、一時停止と再開を表示するダイアログを提供します
+"""
+
+import threading
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QProgressBar
+)
+from PyQt6.QtCore import pyqtSignal
+
+from src.core.bulk_retranscriber import BulkRetranscriber
+from src.core.whisper_api import WhisperTranscriber
+from src.gui.resources.labels import AppLabels
+from src.gui.resources.styles import AppStyles
+
+
+def format_duration(seconds):
+    """
+    秒数を表示用の文字列に変換する
+
+    Parameters
+    ----------
+    seconds : float
+        秒数
+
+    Returns
+    -------
+    str
+        「1時間23分」のような文字列
+    """
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return AppLabels.DURATION_HOURS.format(hours, minutes)
+    if minutes:
+        return AppLabels.DURATION_MINUTES.format(minutes)
+    return AppLabels.DURATION_SECONDS.format(seconds)
+
+
+class BulkRetranscribeDialog(QDialog):
+    """
+    一括再文字起こしのためのダイアログ
+
+    対象の履歴の収集と見積もり、再文字起こしはすべてバックグラウンドの
+    スレッドで行い、結果はシグナルでGUIスレッドに渡します。
+    ダイアログはモードレスで表示するため、処理中もメインウィンドウを操作できます。
+    """
+
+    # 変更後の履歴（メインウィンドウの履歴パネルを更新するために使用）
+    entry_updated = pyqtSignal(dict)
+
+    # バックグラウンドのスレッドからGUIスレッドへ結果を渡すためのシグナル
+    _estimate_ready = pyqtSignal(str, dict)
+    _progress_changed = pyqtSignal(dict)
+    _finished = pyqtSignal(dict)
+
+    def __init__(self, parent, history_store, archive, transcriber, text_replacer=None, model=None):
+        """
+        BulkRetranscribeDialogの初期化
+
+        Parameters
+        ----------
+        parent : QWidget
+            親ウィジェット
+        history_store : HistoryStore
+            再文字起こしする履歴
+        archive : AudioArchive
+            履歴に関連付けられた音声のアーカイブ
+        transcriber : WhisperTranscriber
+            文字起こしに使用するインスタンス
+        text_replacer : TextReplacer, optional
+            文字起こし結果に適用する置換辞書
+        model : str, optional
+            初期選択するモデル
+        """
+        super().__init__(parent)
+        self.setWindowTitle(AppLabels.BULK_RETRANSCRIBE_TITLE)
+        self.setMinimumWidth(520)
+
+        # スタイルシートを設定
+        self.setStyleSheet(AppStyles.BULK_RETRANSCRIBE_DIALOG_STYLE)
+
+        self.entries = None
+        self.job = BulkRetranscriber(
+            history_store,
+            archive,
+            transcriber,
+            text_replacer=text_replacer,
+            on_progress=self._progress_changed.emit,
+            on_result=self.entry_updated.emit,
+            on_finished=self._finished.emit,
+        )
+        self._estimate_ready.connect(self.on_estimate_ready)
+        self._progress_changed.connect(self.on_progress_changed)
+        self._finished.connect(self.on_finished)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        # 説明ラベル
+        info_label = QLabel(AppLabels.BULK_RETRANSCRIBE_INFO)
+        info_label.setWordWrap(True)
+        info_label.setProperty("class", "info")
+        layout.addWidget(info_label)
+
+        # モデル選択
+        model_layout = QHBoxLayout()
+        model_layout.addWidget(QLabel(AppLabels.MODEL_LABEL))
+        self.model_combo = QComboBox()
+        for available_model in WhisperTranscriber.get_available_models():
+            self.model_combo.addItem(available_model["name"], available_model["id"])
+        index = self.model_combo.findData(model)
+        if index >= 0:
+            self.model_combo.setCurrentIndex(index)
+        self.model_combo.currentIndexChanged.connect(self.request_estimate)
+        model_layout.addWidget(self.model_combo, 1)
+        layout.addLayout(model_layout)
+
+        # 見積もり
+        self.estimate_label = QLabel(AppLabels.BULK_ESTIMATING)
+        self.estimate_label.setWordWrap(True)
+        layout.addWidget(self.estimate_label)
+
+        # 進捗
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
+        self.progress_label = QLabel()
+        layout.addWidget(self.progress_label)
+
+        # ダイアログボタン
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+
+        self.start_button = QPushButton(AppLabels.BULK_START)
+        self.start_button.setEnabled(False)
+        self.start_button.clicked.connect(self.start)
+
+        self.pause_button = QPushButton(AppLabels.BULK_PAUSE)
+        self.pause_button.setProperty("class", "secondary")
+        self.pause_button.setEnabled(False)
+        self.pause_button.clicked.connect(self.toggle_pause)
+
+        self.cancel_button = QPushButton(AppLabels.CANCEL_BUTTON)
+        self.cancel_button.setProperty("class", "secondary")
+        self.cancel_button.clicked.connect(self.close)
+
+        button_layout.addWidget(self.cancel_button)
+        button_layout.addWidget(self.pause_button)
+        button_layout.addWidget(self.start_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+        self.request_estimate()
+
+    def request_estimate(self):
+        """
+        対象の履歴の収集と見積もりをバックグラウンドで開始する
+        """
+        model = self.model_combo.currentData()
+        self.job.model = model
+        self.start_button.setEnabled(False)
+        self.estimate_label.setText(AppLabels.BULK_ESTIMATING)
+
+        def estimate():
+            if self.entries is None:
+                self.entries = self.job.collect()
+            self._estimate_ready.emit(model, self.job.estimate(self.entries))
+
+        threading.Thread(target=estimate, daemon=True).start()
+
+    def on_estimate_ready(self, model, estimate):
+        """
+        見積もりを表示する
+
+        Parameters
+        ----------
+        model : str
+            見積もったモデル
+        estimate : dict
+            BulkRetranscriber.estimate()の結果
+        """
+        if model != self.model_combo.currentData() or self.job.is_running():
+            # 見積もり中にモデルが変更された場合は古い結果を表示しない
+            return
+        if not estimate["entries"]:
+            self.estimate_label.setText(AppLabels.BULK_NO_ENTRIES)
+            return
+
+        cost = f"${estimate['cost']:.2f}" if estimate["cost"] is not None else AppLabels.BULK_COST_UNKNOWN
+        self.estimate_label.setText(AppLabels.BULK_ESTIMATE.format(
+            estimate["entries"],
+            estimate["audio_seconds"] / 60,
+            cost,
+            format_duration(estimate["seconds"]),
+        ))
+        self.start_button.setEnabled(True)
+
+    def start(self):
+        """
+        一括再文字起こしを開始する
+        """
+        if not self.entries:
+            return
+        self.model_combo.setEnabled(False)
+        self.start_button.setEnabled(False)
+        self.pause_button.setEnabled(True)
+        self.progress_bar.setMaximum(len(self.entries))
+        self.progress_bar.setValue(0)
+        self.job.start(self.entries)
+        self.on_progress_changed(self.job.get_progress())
+
+    def toggle_pause(self):
+        """
+        一時停止と再開を切り替える
+        """
+        if self.job.is_paused():
+            self.job.resume()
+            self.pause_button.setText(AppLabels.BULK_PAUSE)
+        else:
+            self.job.pause()
+            self.pause_button.setText(AppLabels.BULK_RESUME)
+
+    def on_progress_changed(self, progress):
+        """
+        進捗を表示する
+
+        Parameters
+        ----------
+        progress : dict
+            BulkRetranscriber.get_progress()の結果
+        """
+        self.progress_bar.setValue(progress["done"] + progress["failed"])
+        self.progress_label.setText(AppLabels.BULK_PROGRESS.format(
+            progress["done"] + progress["failed"], progress["total"], progress["failed"]
+        ))
+
+    def on_finished(self, progress):
+        """
+        一括再文字起こしが終わったときの処理
+
+        Parameters
+        ----------
+        progress : dict
+            最終的な進捗
+        """
+        self.on_progress_changed(progress)
+        self.pause_button.setEnabled(False)
+        self.cancel_button.setText(AppLabels.BULK_CLOSE)
+        self.progress_label.setText(AppLabels.BULK_FINISHED.format(progress["done"], progress["failed"]))
+
+    def reject(self):
+        """
+        ダイアログを閉じるときに残りの処理を中止する（完了した分の結果は保存済み）
+        """
+        self.job.cancel()
+        super().reject()
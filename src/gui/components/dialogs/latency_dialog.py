@@ -0,0 +1,131 @@
+"""
+レイテンシ統計表示用のダイアログモジュール
+
+ホットキーの押下からクリップボードへのコピーまでの区間ごとの所要時間
+（p50/p95/p99）を表示し、JSONファイルに書き出すダイアログを提供します
+"""
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt
+
+from src.core.latency_tracker import INTERVALS, latency_tracker
+from src.gui.resources.labels import AppLabels
+from src.gui.resources.styles import AppStyles
+
+
+class LatencyDialog(QDialog):
+    """
+    レイテンシ統計を表示するためのダイアログ
+
+    区間ごとの計測件数とパーセンタイルをミリ秒単位で表示します
+    """
+
+    # 統計値の列（ヘッダーの後に続く列）
+    STAT_COLUMNS = ("p50", "p95", "p99", "max")
+
+    def __init__(self, parent=None):
+        """
+        LatencyDialogの初期化
+
+        Parameters
+        ----------
+        parent : QWidget, optional
+            親ウィジェット
+        """
+        super().__init__(parent)
+        self.setWindowTitle(AppLabels.LATENCY_DIALOG_TITLE)
+        self.setMinimumWidth(600)
+        self.setMinimumHeight(420)
+
+        # スタイルシートを設定
+        self.setStyleSheet(AppStyles.LATENCY_DIALOG_STYLE)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        # 説明ラベル
+        info_label = QLabel(AppLabels.LATENCY_INFO)
+        info_label.setWordWrap(True)
+        info_label.setProperty("class", "info")
+        layout.addWidget(info_label)
+
+        # 統計テーブル
+        self.latency_table = QTableWidget(len(INTERVALS), 2 + len(self.STAT_COLUMNS))
+        self.latency_table.setHorizontalHeaderLabels(
+            [AppLabels.LATENCY_INTERVAL_HEADER, AppLabels.LATENCY_COUNT_HEADER]
+            + [f"{column} (ms)" for column in self.STAT_COLUMNS]
+        )
+        self.latency_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.latency_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.latency_table.verticalHeader().setVisible(False)
+        self.latency_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.latency_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        layout.addWidget(self.latency_table)
+
+        # ダイアログボタン
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(10)
+
+        refresh_button = QPushButton(AppLabels.LATENCY_REFRESH)
+        refresh_button.setProperty("class", "secondary")
+        refresh_button.clicked.connect(self.refresh)
+
+        reset_button = QPushButton(AppLabels.LATENCY_RESET)
+        reset_button.setProperty("class", "secondary")
+        reset_button.clicked.connect(self.reset)
+
+        export_button = QPushButton(AppLabels.LATENCY_EXPORT)
+        export_button.setProperty("class", "secondary")
+        export_button.clicked.connect(self.export)
+
+        close_button = QPushButton(AppLabels.BULK_CLOSE)
+        close_button.clicked.connect(self.accept)
+
+        button_layout.addWidget(refresh_button)
+        button_layout.addWidget(reset_button)
+        button_layout.addWidget(export_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+        self.refresh()
+
+    def refresh(self):
+        """
+        最新の統計値でテーブルを更新する
+        """
+        summary = latency_tracker.summary()
+        for row, (name, _, _) in enumerate(INTERVALS):
+            stats = summary.get(name, {})
+            values = [AppLabels.LATENCY_INTERVAL_NAMES.get(name, name), str(stats.get("count", 0))]
+            values += [f"{stats[column] * 1000:.1f}" if column in stats else "-" for column in self.STAT_COLUMNS]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column > 0:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.latency_table.setItem(row, column, item)
+
+    def reset(self):
+        """
+        集計したサンプルを破棄する
+        """
+        latency_tracker.reset()
+        self.refresh()
+
+    def export(self):
+        """
+        統計値と直近のサンプルをJSONファイルに書き出す
+        """
+        path, _ = QFileDialog.getSaveFileName(
+            self, AppLabels.LATENCY_EXPORT, "latency.json", "JSON (*.json)"
+        )
+        if not path:
+            return
+        if not latency_tracker.export(path):
+            QMessageBox.warning(self, AppLabels.ERROR_TITLE, AppLabels.ERROR_LATENCY_EXPORT)
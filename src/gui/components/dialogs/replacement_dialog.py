@@ -0,0 +1,194 @@
+"""
+置換辞書管理用のダイアログモジュール
+
+文字起こし結果に適用する置換辞書（話し言葉から表記への変換、略語の展開など）を
+追加・管理するダイアログを提供します
+"""
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QLineEdit, QHeaderView, QAbstractItemView
+)
+from PyQt6.QtCore import Qt
+
+from src.gui.resources.labels import AppLabels
+from src.gui.resources.styles import AppStyles
+
+class ReplacementDialog(QDialog):
+    """
+    置換辞書管理のためのダイアログ
+
+    置換対象のテキストと置換後のテキストの組を追加・管理するダイアログウィンドウ
+    """
+
+    def __init__(self, parent=None, replacements=None):
+        """
+        ReplacementDialogの初期化
+
+        Parameters
+        ----------
+        parent : QWidget, optional
+            親ウィジェット
+        replacements : dict, optional
+            初期表示する置換辞書
+        """
+        super().__init__(parent)
+        self.setWindowTitle(AppLabels.REPLACEMENT_DIALOG_TITLE)
+        self.setMinimumWidth(550)
+        self.setMinimumHeight(400)
+
+        # スタイルシートを設定
+        self.setStyleSheet(AppStyles.REPLACEMENT_DIALOG_STYLE)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        # タイトルラベル
+        title_label = QLabel(AppLabels.REPLACEMENT_SECTION_TITLE)
+        title_label.setProperty("class", "sectionTitle")
+        layout.addWidget(title_label)
+
+        # 説明ラベル
+        info_label = QLabel(AppLabels.REPLACEMENT_INFO)
+        info_label.setWordWrap(True)
+        info_label.setProperty("class", "info")
+        layout.addWidget(info_label)
+
+        # 置換辞書テーブル
+        self.replacement_table = QTableWidget(0, 2)
+        self.replacement_table.setHorizontalHeaderLabels([
+            AppLabels.REPLACEMENT_PATTERN_HEADER,
+            AppLabels.REPLACEMENT_VALUE_HEADER
+        ])
+        self.replacement_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.replacement_table.verticalHeader().setVisible(False)
+        self.replacement_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        if replacements:
+            for pattern, replacement in replacements.items():
+                self._append_row(pattern, replacement)
+
+        layout.addWidget(self.replacement_table)
+
+        # 置換追加インターフェース
+        add_layout = QHBoxLayout()
+        add_layout.setSpacing(8)
+
+        self.pattern_input = QLineEdit()
+        self.pattern_input.setPlaceholderText(AppLabels.REPLACEMENT_PATTERN_PLACEHOLDER)
+
+        self.value_input = QLineEdit()
+        self.value_input.setPlaceholderText(AppLabels.REPLACEMENT_VALUE_PLACEHOLDER)
+        self.value_input.returnPressed.connect(self.add_replacement)
+
+        self.add_button = QPushButton(AppLabels.ADD_BUTTON)
+        self.add_button.setFixedWidth(80)
+        self.add_button.clicked.connect(self.add_replacement)
+
+        add_layout.addWidget(self.pattern_input, 1)
+        add_layout.addWidget(self.value_input, 1)
+        add_layout.addWidget(self.add_button, 0)
+        layout.addLayout(add_layout)
+
+        # アクションボタン
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(8)
+
+        self.remove_button = QPushButton(AppLabels.REMOVE_SELECTED)
+        self.remove_button.setProperty("class", "secondary")
+        self.remove_button.clicked.connect(self.remove_replacement)
+
+        self.clear_button = QPushButton(AppLabels.REMOVE_ALL)
+        self.clear_button.setProperty("class", "danger")
+        self.clear_button.clicked.connect(self.clear_replacements)
+
+        button_layout.addWidget(self.remove_button)
+        button_layout.addWidget(self.clear_button)
+        layout.addLayout(button_layout)
+
+        # ダイアログボタン
+        dialog_buttons = QHBoxLayout()
+        dialog_buttons.setSpacing(10)
+
+        self.ok_button = QPushButton(AppLabels.OK_BUTTON)
+        self.ok_button.clicked.connect(self.accept)
+
+        self.cancel_button = QPushButton(AppLabels.CANCEL_BUTTON)
+        self.cancel_button.setProperty("class", "secondary")
+        self.cancel_button.clicked.connect(self.reject)
+
+        dialog_buttons.addWidget(self.cancel_button)
+        dialog_buttons.addWidget(self.ok_button)
+        layout.addLayout(dialog_buttons)
+
+        self.setLayout(layout)
+
+    def _append_row(self, pattern, replacement):
+        """
+        置換辞書テーブルに行を追加する
+
+        Parameters
+        ----------
+        pattern : str
+            置換対象のテキスト
+        replacement : str
+            置換後のテキスト
+        """
+        row = self.replacement_table.rowCount()
+        self.replacement_table.insertRow(row)
+        self.replacement_table.setItem(row, 0, QTableWidgetItem(pattern))
+        self.replacement_table.setItem(row, 1, QTableWidgetItem(replacement))
+
+    def add_replacement(self):
+        """
+        置換辞書に新しい組を追加する
+
+        同じ置換対象がすでにある場合は置換後のテキストを更新します。
+        """
+        pattern = self.pattern_input.text().strip()
+        replacement = self.value_input.text()
+        if not pattern:
+            return
+
+        for row in range(self.replacement_table.rowCount()):
+            if self.replacement_table.item(row, 0).text() == pattern:
+                self.replacement_table.setItem(row, 1, QTableWidgetItem(replacement))
+                break
+        else:
+            self._append_row(pattern, replacement)
+
+        self.pattern_input.clear()
+        self.value_input.clear()
+        self.pattern_input.setFocus()
+
+    def remove_replacement(self):
+        """
+        選択された組を置換辞書から削除する
+        """
+        rows = sorted({index.row() for index in self.replacement_table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.replacement_table.removeRow(row)
+
+    def clear_replacements(self):
+        """
+        置換辞書からすべての組を削除する
+        """
+        self.replacement_table.setRowCount(0)
+
+    def get_replacements(self):
+        """
+        置換辞書を取得する
+
+        Returns
+        -------
+        dict
+            置換対象のテキストから置換後のテキストへの辞書
+        """
+        replacements = {}
+        for row in range(self.replacement_table.rowCount()):
+            pattern_item = self.replacement_table.item(row, 0)
+            value_item = self.replacement_table.item(row, 1)
+            pattern = pattern_item.text().strip() if pattern_item else ""
+            if pattern:
+                replacements[pattern] = value_item.text() if value_item else ""
+        return replacements
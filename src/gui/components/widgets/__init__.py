@@ -4,4 +4,5 @@
 アプリケーションで使用される各種カスタムウィジェットが含まれます。
 """
 
-from src.gui.components.widgets.status_indicator import StatusIndicatorWindow 
\ No newline at end of file
+from src.gui.components.widgets.status_indicator import StatusIndicatorWindow
+from src.gui.components.widgets.history_panel import HistoryPanel 
\ No newline at end of file
@@ -0,0 +1,417 @@
+"""
+文字起こし履歴パネルモジュール
+
+文字起こし履歴を新しい順に一覧表示し、全文検索で絞り込むためのパネルを提供します
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QLineEdit, QListView, QMenu, QApplication
+)
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer, pyqtSignal
+
+from src.core.whisper_api import WhisperTranscriber
+from src.gui.resources.labels import AppLabels
+from src.gui.resources.styles import AppStyles
+
+
+class HistoryListModel(QAbstractListModel):
+    """
+    文字起こし履歴を遅延読み込みするリストモデル
+
+    履歴はHistoryStoreから1ページずつ読み込み、ビューが末尾までスクロール
+    されたとき（canFetchMore/fetchMore）に次のページを追加します。
+    データベースの読み込みは専用のスレッドで行い、結果はシグナルで
+    GUIスレッドに渡します。検索語を変更すると古い読み込みの結果は破棄されます。
+    """
+
+    # 履歴の辞書を取得するためのロール
+    EntryRole = Qt.ItemDataRole.UserRole + 1
+
+    # 1回に読み込む件数
+    PAGE_SIZE = 200
+
+    # 一覧に表示するテキストの最大文字数
+    PREVIEW_LENGTH = 120
+
+    # 最初のページの読み込みが完了したとき（検索語, 件数）
+    search_finished = pyqtSignal(str, int)
+
+    # 読み込みスレッドからGUIスレッドへ結果を渡すためのシグナル
+    _page_loaded = pyqtSignal(int, list)
+    _entries_committed = pyqtSignal(list)
+    _entries_loaded = pyqtSignal(int, list)
+
+    def __init__(self, store, parent=None):
+        """
+        HistoryListModelの初期化
+
+        Parameters
+        ----------
+        store : HistoryStore
+            文字起こし履歴
+        parent : QObject, optional
+            親オブジェクト
+        """
+        super().__init__(parent)
+        self.store = store
+        self._rows = []
+        self._query = ""
+        self._generation = 0
+        self._loading = False
+        self._exhausted = False
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+        self._page_loaded.connect(self._on_page_loaded)
+        self._entries_committed.connect(self._on_entries_committed)
+        self._entries_loaded.connect(self._on_entries_loaded)
+
+        self._request_page()
+
+    def rowCount(self, parent=QModelIndex()):
+        """読み込み済みの行数を返す"""
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """
+        表示する行のデータを返す
+
+        Parameters
+        ----------
+        index : QModelIndex
+            行のインデックス
+        role : Qt.ItemDataRole
+            データのロール
+        """
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        entry = self._rows[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            created = datetime.fromtimestamp(entry["created"]).strftime("%m/%d %H:%M")
+            preview = " ".join(entry["text"][:self.PREVIEW_LENGTH * 2].split())
+            if len(preview) > self.PREVIEW_LENGTH:
+                preview = preview[:self.PREVIEW_LENGTH] + "…"
+            return f"{created}  {preview}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return entry["text"][:1000]
+        if role == self.EntryRole:
+            return entry
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        """次のページがあり、読み込み中でない場合True"""
+        if parent.isValid():
+            return False
+        return not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        """次のページの読み込みを開始する"""
+        if parent.isValid():
+            return
+        self._request_page()
+
+    def set_query(self, query):
+        """
+        検索語を変更して最初のページから読み込み直す
+
+        Parameters
+        ----------
+        query : str
+            検索語（空の場合はすべての履歴）
+        """
+        query = query.strip()
+        if query == self._query:
+            return
+        self._query = query
+        self.reload()
+
+    def reload(self):
+        """
+        読み込み済みの行を破棄して最初のページから読み込み直す
+        """
+        self._generation += 1
+        self.beginResetModel()
+        self._rows = []
+        self._loading = False
+        self._exhausted = False
+        self.endResetModel()
+        self._request_page()
+
+    def remove_row(self, row):
+        """
+        行を一覧と履歴から削除する
+
+        Parameters
+        ----------
+        row : int
+            削除する行
+        """
+        if not 0 <= row < len(self._rows):
+            return
+        self.store.delete(self._rows[row]["id"])
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+
+    def update_entry(self, entry_id, **fields):
+        """
+        読み込み済みの行の内容を変更する
+
+        履歴への書き込みはHistoryStore.update()で別途行います。
+
+        Parameters
+        ----------
+        entry_id : int
+            変更する履歴のID
+        **fields
+            変更する列と値
+        """
+        for row, entry in enumerate(self._rows):
+            if entry["id"] == entry_id:
+                self._rows[row] = dict(entry, **fields)
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+                return
+
+    def on_commit(self, entry_ids):
+        """
+        履歴が追加されたときに呼び出す（HistoryStoreの書き込みスレッドから呼ばれる）
+
+        Parameters
+        ----------
+        entry_ids : list
+            追加された履歴のID
+        """
+        self._entries_committed.emit(list(entry_ids))
+
+    def shutdown(self):
+        """
+        読み込みスレッドを停止する
+        """
+        self._generation += 1
+        self._executor.shutdown(wait=False)
+
+    def _request_page(self):
+        """次のページを読み込みスレッドで読み込む"""
+        self._loading = True
+        before_id = self._rows[-1]["id"] if self._rows else None
+        generation = self._generation
+        query = self._query
+
+        def load():
+            self._page_loaded.emit(generation, self.store.page(query, before_id, self.PAGE_SIZE))
+
+        self._executor.submit(load)
+
+    def _on_page_loaded(self, generation, rows):
+        """読み込んだページを末尾に追加する"""
+        if generation != self._generation:
+            # 検索語の変更前に開始された読み込みの結果は破棄する
+            return
+        first_page = not self._rows
+        self._loading = False
+        self._exhausted = len(rows) < self.PAGE_SIZE
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+        if first_page:
+            self.search_finished.emit(self._query, len(rows))
+
+    def _on_entries_committed(self, entry_ids):
+        """追加された履歴を読み込みスレッドで読み込む"""
+        if self._query:
+            # 検索中は結果が変わらないように追加された履歴を表示しない
+            return
+        generation = self._generation
+
+        def load():
+            entries = [self.store.get(entry_id) for entry_id in entry_ids]
+            self._entries_loaded.emit(generation, [entry for entry in entries if entry is not None])
+
+        self._executor.submit(load)
+
+    def _on_entries_loaded(self, generation, entries):
+        """追加された履歴を先頭に挿入する"""
+        if generation != self._generation or self._query:
+            return
+        newest = self._rows[0]["id"] if self._rows else 0
+        entries = sorted((entry for entry in entries if entry["id"] > newest), key=lambda entry: entry["id"], reverse=True)
+        if not entries:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(entries) - 1)
+        self._rows[0:0] = entries
+        self.endInsertRows()
+
+
+class HistoryPanel(QWidget):
+    """
+    文字起こし履歴の一覧と検索欄を表示するパネル
+
+    一覧はQListViewで表示し、行の高さを固定することで画面に表示されている
+    行だけを描画します。検索欄の入力は一定時間待ってから検索を開始します。
+    """
+
+    # 履歴がダブルクリックされたとき（履歴の辞書）
+    entry_activated = pyqtSignal(dict)
+    
+    # 履歴が削除されたとき（履歴の辞書）
+    entry_deleted = pyqtSignal(dict)
+    
+    # 別のモデルでの再文字起こしが選択されたとき（履歴の辞書, モデルID）
+    retranscribe_requested = pyqtSignal(dict, str)
+
+    # 入力が止まってから検索を開始するまでの時間（ミリ秒）
+    SEARCH_DELAY_MS = 250
+
+    def __init__(self, store, parent=None):
+        """
+        HistoryPanelの初期化
+
+        Parameters
+        ----------
+        store : HistoryStore
+            文字起こし履歴
+        parent : QWidget, optional
+            親ウィジェット
+        """
+        super().__init__(parent)
+        self.setObjectName("historyPanel")
+        self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground)
+        self.setStyleSheet(AppStyles.HISTORY_PANEL_STYLE)
+
+        self.model = HistoryListModel(store, self)
+        self.model.search_finished.connect(self.on_search_finished)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        # タイトルラベル
+        title_label = QLabel(AppLabels.HISTORY_TITLE)
+        title_label.setObjectName("sectionTitle")
+        title_label.setStyleSheet(AppStyles.TRANSCRIPTION_TITLE_STYLE)
+        layout.addWidget(title_label)
+
+        # 検索欄
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText(AppLabels.HISTORY_SEARCH_PLACEHOLDER)
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.on_search_text_changed)
+        layout.addWidget(self.search_edit)
+
+        # 入力が止まってから検索するためのタイマー
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.apply_search)
+
+        # 履歴の一覧
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)  # 全行のサイズ計算を避ける
+        self.list_view.setWordWrap(False)
+        self.list_view.setTextElideMode(Qt.TextElideMode.ElideRight)
+        self.list_view.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.list_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.list_view.doubleClicked.connect(self.on_item_activated)
+        self.list_view.customContextMenuRequested.connect(self.show_context_menu)
+        layout.addWidget(self.list_view, 1)
+
+        # 検索結果がない場合のラベル
+        self.empty_label = QLabel(AppLabels.HISTORY_NO_RESULTS)
+        self.empty_label.setStyleSheet(AppStyles.HISTORY_EMPTY_LABEL_STYLE)
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.empty_label.hide()
+        layout.addWidget(self.empty_label)
+
+    def on_search_text_changed(self, text):
+        """
+        検索欄の入力が変更されたときの処理
+
+        Parameters
+        ----------
+        text : str
+            検索欄のテキスト
+        """
+        self.search_timer.start()
+
+    def apply_search(self):
+        """
+        検索欄の検索語で一覧を絞り込む
+        """
+        self.model.set_query(self.search_edit.text())
+
+    def on_search_finished(self, query, count):
+        """
+        最初のページの読み込みが完了したときの処理
+
+        Parameters
+        ----------
+        query : str
+            検索語
+        count : int
+            読み込んだ件数
+        """
+        self.empty_label.setVisible(bool(query) and count == 0)
+        self.list_view.scrollToTop()
+
+    def on_item_activated(self, index):
+        """
+        履歴がダブルクリックされたときの処理
+
+        Parameters
+        ----------
+        index : QModelIndex
+            ダブルクリックされた行のインデックス
+        """
+        entry = index.data(HistoryListModel.EntryRole)
+        if entry:
+            self.entry_activated.emit(entry)
+
+    def show_context_menu(self, position):
+        """
+        履歴の右クリックメニューを表示する
+
+        Parameters
+        ----------
+        position : QPoint
+            右クリックされた位置
+        """
+        index = self.list_view.indexAt(position)
+        if not index.isValid():
+            return
+        entry = index.data(HistoryListModel.EntryRole)
+
+        menu = QMenu(self)
+        copy_action = menu.addAction(AppLabels.COPY_TO_CLIPBOARD)
+
+        # 音声が保存されている履歴はモデルを選んで再文字起こしできる
+        retranscribe_menu = menu.addMenu(AppLabels.HISTORY_RETRANSCRIBE)
+        retranscribe_menu.setEnabled(bool(entry.get("audio_ref")))
+        model_actions = {}
+        for model in WhisperTranscriber.get_available_models():
+            model_actions[retranscribe_menu.addAction(model["name"])] = model["id"]
+
+        menu.addSeparator()
+        delete_action = menu.addAction(AppLabels.HISTORY_DELETE)
+        action = menu.exec(self.list_view.viewport().mapToGlobal(position))
+
+        if action == copy_action:
+            QApplication.clipboard().setText(entry["text"])
+        elif action in model_actions:
+            self.retranscribe_requested.emit(entry, model_actions[action])
+        elif action == delete_action:
+            self.model.remove_row(index.row())
+            self.entry_deleted.emit(entry)
+
+    def shutdown(self):
+        """
+        履歴の読み込みを停止する
+        """
+        self.search_timer.stop()
+        self.model.shutdown()
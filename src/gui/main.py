@@ -1,14 +1,20 @@
+import logging
 import os
 import sys
 
 from PyQt6.QtWidgets import QApplication, QMessageBox, QSystemTrayIcon, QStyle
 from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import QSettings
 
+from src.core.logging_config import setup_logging
+from src.core.paths import get_app_data_dir
 from src.gui.windows.main_window import MainWindow
 from src.gui.resources.config import AppConfig
 from src.gui.resources.labels import AppLabels
 from src.gui.utils.resource_helper import getResourcePath
 
+logger = logging.getLogger(__name__)
+
 def main():
     """
     アプリケーションのエントリーポイント
@@ -23,6 +29,19 @@ def main():
     """
     app = QApplication(sys.argv)
     
+    # ログの設定（音声やホットキーのスレッドのログはキューを経由してファイルに書き出す）
+    settings = QSettings(AppConfig.APP_ORGANIZATION, AppConfig.APP_NAME)
+    try:
+        setup_logging(
+            settings.value("log_level", AppConfig.DEFAULT_LOG_LEVEL),
+            get_app_data_dir("logs") / AppConfig.LOG_FILE_NAME,
+            max_bytes=settings.value("log_max_mb", AppConfig.DEFAULT_LOG_MAX_MB, type=int) * 1024 * 1024,
+            backup_count=settings.value("log_backups", AppConfig.DEFAULT_LOG_BACKUPS, type=int),
+        )
+    except (OSError, ValueError) as e:
+        setup_logging()
+        logger.error("Failed to configure logging: %s", e)
+    
     # アプリケーションアイコンを設定
     icon_path = getResourcePath("assets/icon.ico")
     
@@ -32,7 +51,7 @@ def main():
         # アイコンファイルが見つからない場合は標準アイコンを使用
         app_icon = QApplication.style().standardIcon(QStyle.StandardPixmap.SP_MediaPlay)
         app.setWindowIcon(app_icon)
-        print(f"Warning: Application icon file not found: {icon_path}")
+        logger.warning("Application icon file not found: %s", icon_path)
     
     # PyQt6ではハイDPIスケーリングはデフォルトで有効
     # 古い属性設定は不要
@@ -20,12 +20,44 @@ class AppConfig:
     DEFAULT_AUTO_COPY = True
     DEFAULT_ENABLE_SOUND = True
     DEFAULT_SHOW_INDICATOR = True
+    DEFAULT_VOCABULARY_CORRECTION = True
+    DEFAULT_RECORDING_JOURNAL = True
+    DEFAULT_REPLACEMENTS = "{}"  # 置換辞書（JSON文字列）
     DEFAULT_MODEL = "gpt-4o-transcribe"
     
+    # 一時ファイル設定
+    DEFAULT_SCRATCH_USE_TMPFS = False  # Linuxで/dev/shmに一時ファイルを作成する
+    DEFAULT_SCRATCH_MAX_AGE_HOURS = 24
+    DEFAULT_SCRATCH_MAX_MB = 500
+    
+    # 音声アーカイブ設定
+    DEFAULT_ARCHIVE_AUDIO = False
+    DEFAULT_ARCHIVE_FORMAT = "flac"  # "flac"（可逆）または"opus"（より小さい）
+    DEFAULT_ARCHIVE_MAX_DAYS = 90
+    DEFAULT_ARCHIVE_MAX_MB = 1024
+    
+    # メトリクス設定（0または空文字列は無効を意味する）
+    DEFAULT_METRICS_PORT = 0  # ループバックアドレスで待ち受けるPrometheusのエンドポイント
+    DEFAULT_METRICS_TEXTFILE = ""  # node_exporterのtextfileコレクター用のファイル
+    
+    # ログ設定（全体とモジュールごとのレベル、例: "INFO,src.core.audio_recorder=DEBUG"）
+    DEFAULT_LOG_LEVEL = "INFO"
+    DEFAULT_LOG_MAX_MB = 5
+    DEFAULT_LOG_BACKUPS = 3
+    LOG_FILE_NAME = "open-super-whisper.log"
+    
+    # プロファイリング設定（トレイメニューから次の音声入力を計測する場合）
+    DEFAULT_PROFILE_MODE = "cprofile"  # "cprofile"または"sampling"
+    DEFAULT_PROFILE_TRACEMALLOC = True
+    
     # 言語設定
     DEFAULT_LANGUAGE = ""  # 空文字列は自動検出を意味する
     
     # サウンドファイルパス
     START_SOUND_PATH = "assets/start_sound.wav"
     STOP_SOUND_PATH = "assets/stop_sound.wav"
-    COMPLETE_SOUND_PATH = "assets/complete_sound.wav" 
\ No newline at end of file
+    COMPLETE_SOUND_PATH = "assets/complete_sound.wav" 
+    SOUND_VOLUME = 0.5
+    
+    # 文字起こしを実行するワーカースレッドの数（録音と再文字起こしで共有する）
+    TRANSCRIPTION_WORKERS = 2
\ No newline at end of file
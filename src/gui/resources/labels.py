@@ -25,11 +25,13 @@ class AppLabels:
     API_KEY_SETTINGS = "APIキー設定"
     CUSTOM_VOCABULARY = "カスタム語彙"
     SYSTEM_INSTRUCTIONS = "システム指示"
+    REPLACEMENT_DICTIONARY = "置換辞書"
     COPY_TO_CLIPBOARD = "クリップボードにコピー"
     HOTKEY_SETTINGS = "ホットキー設定"
     AUTO_COPY = "自動コピー"
     SOUND_NOTIFICATION = "通知音"
     STATUS_INDICATOR = "状態インジケータ"
+    VOCABULARY_CORRECTION = "語彙補正"
     EXIT_APP = "アプリケーション終了"
     
     # ステータスメッセージ
@@ -46,9 +48,16 @@ class AppLabels:
     STATUS_SOUND_DISABLED = "通知音を無効にしました"
     STATUS_INDICATOR_SHOWN = "状態インジケータを表示にしました"
     STATUS_INDICATOR_HIDDEN = "状態インジケータを非表示にしました"
+    STATUS_VOCABULARY_CORRECTION_ENABLED = "カスタム語彙による補正を有効にしました"
+    STATUS_VOCABULARY_CORRECTION_DISABLED = "カスタム語彙による補正を無効にしました"
     STATUS_VOCABULARY_ADDED = "{0}個の語彙を追加しました"
     STATUS_INSTRUCTIONS_SET = "{0}個のシステム指示を設定しました"
+    STATUS_REPLACEMENTS_SET = "{0}個の置換ルールを設定しました"
     STATUS_MODEL_CHANGED = "文字起こしモデルを「{0}」に変更しました"
+    STATUS_PROFILE_ARMED = "次の音声入力をプロファイルします"
+    STATUS_PROFILE_DISARMED = "プロファイルを取り消しました"
+    STATUS_PROFILE_WRITTEN = "プロファイルを保存しました: {0}"
+    PROFILE_NOTIFICATION_TITLE = "プロファイルの保存完了"
     
     # APIキーダイアログ
     API_KEY_DIALOG_TITLE = "OpenAI APIキー"
@@ -75,6 +84,18 @@ class AppLabels:
     INSTRUCTIONS_SECTION_TITLE = "システム指示リスト:"
     INSTRUCTIONS_PLACEHOLDER = "新しい指示を入力..."
     
+    # 置換辞書ダイアログ
+    REPLACEMENT_DIALOG_TITLE = "置換辞書"
+    REPLACEMENT_SECTION_TITLE = "置換ルール"
+    REPLACEMENT_INFO = "文字起こし結果に含まれるテキストを置き換えます。例：\n" \
+                     "- \"まる\" → \"。\"（読み上げた句読点を記号に）\n" \
+                     "- \"ASAP\" → \"as soon as possible\"（略語の展開）\n" \
+                     "- \"オープンエーアイ\" → \"OpenAI\"（表記の統一）"
+    REPLACEMENT_PATTERN_HEADER = "置換対象"
+    REPLACEMENT_VALUE_HEADER = "置換後"
+    REPLACEMENT_PATTERN_PLACEHOLDER = "置換対象のテキスト..."
+    REPLACEMENT_VALUE_PLACEHOLDER = "置換後のテキスト..."
+    
     # グローバルホットキーダイアログ
     HOTKEY_DIALOG_TITLE = "グローバルホットキー設定"
     HOTKEY_LABEL = "ホットキー:"
@@ -92,9 +113,84 @@ class AppLabels:
     INDICATOR_TRANSCRIBING = "文字起こし中"
     INDICATOR_TRANSCRIBED = "文字起こし完了"
     
+    # 文字起こし履歴
+    HISTORY_TITLE = "履歴"
+    HISTORY_SEARCH_PLACEHOLDER = "履歴を検索..."
+    HISTORY_NO_RESULTS = "一致する履歴はありません"
+    HISTORY_DELETE = "削除"
+    HISTORY_RETRANSCRIBE = "別のモデルで再文字起こし"
+    STATUS_HISTORY_LOADED = "履歴の文字起こしを表示しました"
+    STATUS_RETRANSCRIBED = "再文字起こしが完了しました (使用モデル: {0})"
+    ERROR_AUDIO_NOT_ARCHIVED = "この履歴の音声は保存されていません"
+    
+    # 一括再文字起こしダイアログ
+    BULK_RETRANSCRIBE = "一括再文字起こし"
+    BULK_RETRANSCRIBE_TITLE = "履歴の一括再文字起こし"
+    BULK_RETRANSCRIBE_INFO = "音声が保存されている履歴を、選択したモデルと現在のカスタム語彙でまとめて文字起こしし直します。\n" \
+                           "結果は1件ごとに履歴へ書き戻されるため、途中で中止しても完了した分は保存されます。"
+    BULK_ESTIMATING = "対象の履歴を確認しています..."
+    BULK_NO_ENTRIES = "音声が保存されている履歴はありません"
+    BULK_ESTIMATE = "対象: {0}件 / 音声: {1:.1f}分 / 推定料金: {2} / 推定時間: 約{3}"
+    BULK_COST_UNKNOWN = "不明"
+    BULK_START = "開始"
+    BULK_PAUSE = "一時停止"
+    BULK_RESUME = "再開"
+    BULK_CLOSE = "閉じる"
+    BULK_PROGRESS = "{0} / {1}件 完了（失敗: {2}件）"
+    BULK_FINISHED = "一括再文字起こしが終了しました（成功: {0}件、失敗: {1}件）"
+    DURATION_HOURS = "{0}時間{1}分"
+    DURATION_MINUTES = "{0}分"
+    DURATION_SECONDS = "{0}秒"
+    
+    # レイテンシ統計ダイアログ
+    LATENCY_STATISTICS = "レイテンシ統計"
+    LATENCY_DIALOG_TITLE = "レイテンシ統計"
+    LATENCY_INFO = "ホットキーの押下からクリップボードへのコピーまでの区間ごとの所要時間です。\n" \
+                   "パーセンタイルは直近2048回の計測から求めています。"
+    LATENCY_INTERVAL_HEADER = "区間"
+    LATENCY_COUNT_HEADER = "件数"
+    LATENCY_REFRESH = "更新"
+    LATENCY_RESET = "リセット"
+    LATENCY_EXPORT = "エクスポート"
+    ERROR_LATENCY_EXPORT = "レイテンシ統計の書き出しに失敗しました"
+    LATENCY_INTERVAL_NAMES = {
+        "hotkey_to_dispatch": "ホットキー → 録音処理の開始",
+        "dispatch_to_stream_open": "録音処理の開始 → 入力ストリームの開始",
+        "stream_open_to_first_block": "入力ストリームの開始 → 最初の音声",
+        "stop_to_saved": "録音停止 → 音声ファイルの保存",
+        "saved_to_request_sent": "音声ファイルの保存 → リクエスト送信",
+        "request_sent_to_first_byte": "リクエスト送信 → レスポンス受信",
+        "first_byte_to_response_parsed": "レスポンス受信 → 解析完了",
+        "response_parsed_to_clipboard": "解析完了 → クリップボード",
+        "start_total": "録音開始の合計（ホットキー → 最初の音声）",
+        "stop_to_clipboard": "停止後の合計（録音停止 → クリップボード）",
+    }
+    
+    # 音声アーカイブ
+    AUDIO_ARCHIVE = "音声を保存"
+    STATUS_AUDIO_ARCHIVE_ENABLED = "音声の保存が有効になりました"
+    STATUS_AUDIO_ARCHIVE_DISABLED = "音声の保存が無効になりました"
+    
+    # 録音ジャーナル
+    RECORDING_JOURNAL = "録音ジャーナル"
+    STATUS_RECORDING_JOURNAL_ENABLED = "録音ジャーナルが有効になりました"
+    STATUS_RECORDING_JOURNAL_DISABLED = "録音ジャーナルが無効になりました"
+    RECOVERY_TITLE = "録音の復元"
+    RECOVERY_MESSAGE = "前回中断された録音が{0}件見つかりました。\n復元して文字起こししますか？\n（「いいえ」を選択すると録音は削除されます）"
+    
+    # オフラインキュー
+    INFO_OFFLINE_QUEUED = "音声をオフラインキューに保存しました。接続が回復すると自動的に文字起こしします。"
+    STATUS_OFFLINE_TRANSCRIBED = "オフラインキューの文字起こしが完了しました（残り: {0}件）"
+    OFFLINE_NOTIFICATION_TITLE = "オフラインキューの文字起こし完了"
+    DISCARD_FAILED_OFFLINE = "失敗した録音を削除"
+    DISCARD_FAILED_OFFLINE_MESSAGE = "オフラインキューで文字起こしに失敗した録音が{0}件あります。\n音声を削除しますか？"
+    INFO_NO_FAILED_OFFLINE = "オフラインキューに失敗した録音はありません。"
+    STATUS_FAILED_OFFLINE_DISCARDED = "失敗した録音を{0}件削除しました"
+    
     # システムトレイメニュー
     TRAY_SHOW = "表示"
     TRAY_RECORD = "録音開始/停止"
+    TRAY_PROFILE_NEXT = "次の音声入力をプロファイル"
     TRAY_EXIT = "終了"
     
     # エラーメッセージ
@@ -269,6 +269,60 @@ class AppStyles:
         }
     """
 
+    # 置換辞書ダイアログのスタイル
+    REPLACEMENT_DIALOG_STYLE = SYSTEM_INSTRUCTIONS_DIALOG_STYLE + """
+        QTableWidget {
+            border: 1px solid #E2E6EC;
+            border-radius: 4px;
+            background-color: white;
+            gridline-color: #F2F4F8;
+        }
+        
+        QTableWidget::item {
+            padding: 6px;
+        }
+        
+        QTableWidget::item:selected {
+            background-color: #EBF0FF;
+            color: #5B7FDE;
+        }
+        
+        QHeaderView::section {
+            background-color: #F2F4F8;
+            color: #333333;
+            border: none;
+            border-bottom: 1px solid #E2E6EC;
+            padding: 6px;
+            font-weight: bold;
+        }
+    """
+
+    # 一括再文字起こしダイアログのスタイル
+    BULK_RETRANSCRIBE_DIALOG_STYLE = SYSTEM_INSTRUCTIONS_DIALOG_STYLE + """
+        QComboBox {
+            border: 1px solid #E2E6EC;
+            border-radius: 4px;
+            padding: 6px 12px;
+            background-color: white;
+        }
+        
+        QProgressBar {
+            border: 1px solid #E2E6EC;
+            border-radius: 4px;
+            background-color: white;
+            text-align: center;
+            min-height: 18px;
+        }
+        
+        QProgressBar::chunk {
+            background-color: #5B7FDE;
+            border-radius: 3px;
+        }
+    """
+
+    # レイテンシ統計ダイアログのスタイル
+    LATENCY_DIALOG_STYLE = REPLACEMENT_DIALOG_STYLE
+
     # 状態表示インジケーターウィンドウのスタイル
     STATUS_INDICATOR_STYLE = """
         #statusFrame {
@@ -618,6 +672,45 @@ class AppStyles:
         line-height: 1.5;
     """
 
+    # 履歴パネルのスタイル
+    HISTORY_PANEL_STYLE = """
+        #historyPanel {
+            background-color: white;
+            border-radius: 8px;
+            border: 1px solid #E2E6EC;
+        }
+        
+        QLineEdit {
+            border: 1px solid #E2E6EC;
+            border-radius: 4px;
+            padding: 6px;
+            background-color: white;
+        }
+        
+        QLineEdit:focus {
+            border-color: #5B7FDE;
+        }
+        
+        QListView {
+            border: none;
+            background-color: white;
+            font-size: 13px;
+        }
+        
+        QListView::item {
+            padding: 6px 4px;
+            border-bottom: 1px solid #F2F4F8;
+        }
+        
+        QListView::item:selected {
+            background-color: #EBF0FF;
+            color: #333333;
+        }
+    """
+
+    # 履歴の検索結果がない場合のラベルのスタイル
+    HISTORY_EMPTY_LABEL_STYLE = "color: #888888; padding: 8px;"
+
     # ステータスバーのスタイル
     STATUS_BAR_STYLE = """
         color: #555555;
@@ -1,7 +1,10 @@
+import logging
 import os
 import sys
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 def getResourcePath(relative_path):
     """
     PyInstallerでバンドルされている場合や通常実行時のリソースパスを解決する
@@ -34,5 +37,5 @@ def getResourcePath(relative_path):
         
         return os.path.join(base_path, relative_path)
     except Exception as e:
-        print(f"Resource path resolution error: {e}")
+        logger.error("Resource path resolution error: %s", e)
         return relative_path 
\ No newline at end of file
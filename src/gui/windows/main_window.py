@@ -1,7 +1,10 @@
+import logging
 import os
 import sys
+import json
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -17,6 +20,16 @@ from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 from src.core.audio_recorder import AudioRecorder
 from src.core.whisper_api import WhisperTranscriber
 from src.core.hotkeys import HotkeyManager
+from src.core.text_replacer import TextReplacer
+from src.core.offline_queue import OfflineQueue
+from src.core.paths import get_app_data_dir
+from src.core.recording_journal import find_orphaned_sessions, recover_session, discard_session
+from src.core.scratch_manager import ScratchManager
+from src.core.history_store import HistoryStore
+from src.core.audio_archive import AudioArchive
+from src.core.latency_tracker import latency_tracker
+from src.core.metrics import metrics
+from src.core.profiler import profiler
 from src.gui.resources.config import AppConfig
 from src.gui.resources.labels import AppLabels
 from src.gui.resources.styles import AppStyles
@@ -24,9 +37,15 @@ from src.gui.components.dialogs.api_key_dialog import APIKeyDialog
 from src.gui.components.dialogs.vocabulary_dialog import VocabularyDialog
 from src.gui.components.dialogs.system_instructions_dialog import SystemInstructionsDialog
 from src.gui.components.dialogs.hotkey_dialog import HotkeyDialog
+from src.gui.components.dialogs.replacement_dialog import ReplacementDialog
+from src.gui.components.dialogs.bulk_retranscribe_dialog import BulkRetranscribeDialog
+from src.gui.components.dialogs.latency_dialog import LatencyDialog
 from src.gui.components.widgets.status_indicator import StatusIndicatorWindow
+from src.gui.components.widgets.history_panel import HistoryPanel
 from src.gui.utils.resource_helper import getResourcePath
 
+logger = logging.getLogger(__name__)
+
 class MainWindow(QMainWindow):
     """
     アプリケーションのメインウィンドウ
@@ -36,8 +55,10 @@ class MainWindow(QMainWindow):
     """
     
     # カスタムシグナルの定義
-    transcription_complete = pyqtSignal(str)
+    transcription_complete = pyqtSignal(str, object)
     recording_status_changed = pyqtSignal(bool)
+    offline_transcription_complete = pyqtSignal(str)
+    retranscription_complete = pyqtSignal(object, str)
     
     def __init__(self):
         super().__init__()
@@ -60,17 +81,57 @@ class MainWindow(QMainWindow):
         # 録音状態
         self.is_recording = False
         
+        # 文字起こしを実行するワーカー（録音ごとにスレッドを生成せず再利用する）
+        self.transcription_executor = ThreadPoolExecutor(
+            max_workers=AppConfig.TRANSCRIPTION_WORKERS,
+            thread_name_prefix="transcription",
+        )
+        
         # サウンド設定
         self.enable_sound = self.settings.value("enable_sound", AppConfig.DEFAULT_ENABLE_SOUND, type=bool)
         
         # インジケータ表示設定（デフォルトON）
         self.show_indicator = self.settings.value("show_indicator", AppConfig.DEFAULT_SHOW_INDICATOR, type=bool)
         
+        # カスタム語彙による補正設定
+        self.vocabulary_correction = self.settings.value("vocabulary_correction", AppConfig.DEFAULT_VOCABULARY_CORRECTION, type=bool)
+        
+        # 録音ジャーナル設定
+        self.recording_journal = self.settings.value("recording_journal", AppConfig.DEFAULT_RECORDING_JOURNAL, type=bool)
+        self.recording_journal_dir = get_app_data_dir("recording_journal")
+        self.archive_audio = self.settings.value("archive_audio", AppConfig.DEFAULT_ARCHIVE_AUDIO, type=bool)
+        
+        # 置換辞書の読み込み
+        self.text_replacer = TextReplacer(self.load_replacements())
+        
         # サウンドプレーヤーの初期化
         self.setup_sound_players()
         
+        # 環境変数が設定されている場合は毎回の音声入力をプロファイリングする
+        profiler.configure_from_env()
+        
+        # フリート監視用のメトリクス（設定されている場合のみ有効にする）
+        metrics_port = self.settings.value("metrics_port", AppConfig.DEFAULT_METRICS_PORT, type=int)
+        if metrics_port:
+            metrics.start_http_server(metrics_port)
+        metrics_textfile = self.settings.value("metrics_textfile", AppConfig.DEFAULT_METRICS_TEXTFILE)
+        if metrics_textfile:
+            metrics.start_textfile(metrics_textfile)
+        
+        # 一時ファイルの作業ディレクトリ（起動時に古い一時ファイルを削除する）
+        self.scratch = ScratchManager(
+            use_tmpfs=self.settings.value("scratch_use_tmpfs", AppConfig.DEFAULT_SCRATCH_USE_TMPFS, type=bool),
+            max_age_seconds=self.settings.value("scratch_max_age_hours", AppConfig.DEFAULT_SCRATCH_MAX_AGE_HOURS, type=float) * 3600,
+            max_total_bytes=self.settings.value("scratch_max_mb", AppConfig.DEFAULT_SCRATCH_MAX_MB, type=int) * 1024 * 1024,
+        )
+        self.scratch.cleanup()
+        self.scratch.cleanup_legacy()
+        
         # コンポーネントの初期化
-        self.audio_recorder = AudioRecorder()
+        self.audio_recorder = AudioRecorder(
+            journal_dir=self.recording_journal_dir if self.recording_journal else None,
+            scratch=self.scratch,
+        )
         
         # 状態表示ウィンドウ
         self.status_indicator_window = StatusIndicatorWindow()
@@ -80,15 +141,51 @@ class MainWindow(QMainWindow):
         
         try:
             self.whisper_transcriber = WhisperTranscriber(api_key=self.api_key)
+            self.whisper_transcriber.set_vocabulary_correction(self.vocabulary_correction)
         except ValueError:
             self.whisper_transcriber = None
         
+        # 失敗した文字起こしを接続の回復後に再実行するオフラインキュー
+        self.offline_queue = OfflineQueue(
+            get_app_data_dir("offline_queue"),
+            self.whisper_transcriber,
+            on_result=self.on_offline_result,
+        )
+        self.offline_queue.start()
+        
+        # 文字起こし履歴（書き込みはバックグラウンドスレッドで行われる）
+        try:
+            self.history_store = HistoryStore(get_app_data_dir("history") / "history.db")
+        except Exception as e:
+            logger.error("Failed to open transcription history: %s", e)
+            self.history_store = None
+        
+        # 履歴に関連付けて保存する音声のアーカイブ（保持期間と容量の上限はバックグラウンドで適用）
+        try:
+            self.audio_archive = AudioArchive(
+                get_app_data_dir("audio_archive"),
+                audio_format=self.settings.value("archive_format", AppConfig.DEFAULT_ARCHIVE_FORMAT),
+                max_age_seconds=self.settings.value("archive_max_days", AppConfig.DEFAULT_ARCHIVE_MAX_DAYS, type=float) * 86400,
+                max_total_bytes=self.settings.value("archive_max_mb", AppConfig.DEFAULT_ARCHIVE_MAX_MB, type=int) * 1024 * 1024,
+                # 自動で削除した音声は再文字起こしできないため履歴の参照を外す
+                on_evict=self.history_store.clear_audio_refs if self.history_store is not None else None,
+            )
+            threading.Thread(target=self.audio_archive.enforce_policies, daemon=True).start()
+        except Exception as e:
+            logger.error("Failed to open audio archive: %s", e)
+            self.audio_archive = None
+        
+        # 一括再文字起こしダイアログ（表示中のみ）
+        self.bulk_retranscribe_dialog = None
+        
         # UIの設定
         self.init_ui()
         
         # シグナルの接続
         self.transcription_complete.connect(self.on_transcription_complete)
         self.recording_status_changed.connect(self.update_recording_status)
+        self.offline_transcription_complete.connect(self.on_offline_transcription_complete)
+        self.retranscription_complete.connect(self.on_retranscription_complete)
         
         # APIキーの確認
         if not self.api_key:
@@ -102,6 +199,9 @@ class MainWindow(QMainWindow):
         
         # システムトレイの設定
         self.setup_system_tray()
+        
+        # 前回中断された録音の復元（ウィンドウの表示後に確認する）
+        QTimer.singleShot(0, self.recover_interrupted_recordings)
     
     def init_ui(self):
         """
@@ -122,7 +222,7 @@ class MainWindow(QMainWindow):
         else:
             # アイコンファイルが見つからない場合は標準アイコンを使用
             self.setWindowIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MediaPlay))
-            print(f"Warning: Icon file not found: {icon_path}")
+            logger.warning("Icon file not found: %s", icon_path)
             
         # アプリ全体のスタイルを設定
         self.setStyleSheet(AppStyles.MAIN_WINDOW_STYLE)
@@ -239,7 +339,23 @@ class MainWindow(QMainWindow):
         self.transcription_text.setStyleSheet(AppStyles.TRANSCRIPTION_TEXT_STYLE)
         
         transcription_layout.addWidget(self.transcription_text)
-        main_layout.addWidget(transcription_panel, 1)
+        
+        # 文字起こしパネルと履歴パネルを横に並べる
+        content_layout = QHBoxLayout()
+        content_layout.setSpacing(10)
+        content_layout.addWidget(transcription_panel, 2)
+        
+        # 履歴パネル
+        self.history_panel = None
+        if self.history_store is not None:
+            self.history_panel = HistoryPanel(self.history_store)
+            self.history_panel.entry_activated.connect(self.on_history_entry_activated)
+            self.history_panel.entry_deleted.connect(self.on_history_entry_deleted)
+            self.history_panel.retranscribe_requested.connect(self.retranscribe_history_entry)
+            self.history_store.on_commit = self.history_panel.model.on_commit
+            content_layout.addWidget(self.history_panel, 1)
+        
+        main_layout.addLayout(content_layout, 1)
         
         # ステータスバー
         self.status_bar = self.statusBar()
@@ -291,6 +407,27 @@ class MainWindow(QMainWindow):
         system_instructions_action.triggered.connect(self.show_system_instructions_dialog)
         toolbar.addAction(system_instructions_action)
         
+        # 置換辞書アクション
+        replacement_action = QAction(AppLabels.REPLACEMENT_DICTIONARY, self)
+        replacement_action.triggered.connect(self.show_replacement_dialog)
+        toolbar.addAction(replacement_action)
+        
+        # 一括再文字起こしアクション
+        bulk_retranscribe_action = QAction(AppLabels.BULK_RETRANSCRIBE, self)
+        bulk_retranscribe_action.setEnabled(self.history_store is not None and self.audio_archive is not None)
+        bulk_retranscribe_action.triggered.connect(self.show_bulk_retranscribe_dialog)
+        toolbar.addAction(bulk_retranscribe_action)
+        
+        # オフラインキューで放棄された録音の削除アクション
+        discard_failed_action = QAction(AppLabels.DISCARD_FAILED_OFFLINE, self)
+        discard_failed_action.triggered.connect(self.discard_failed_offline_jobs)
+        toolbar.addAction(discard_failed_action)
+        
+        # レイテンシ統計アクション
+        latency_action = QAction(AppLabels.LATENCY_STATISTICS, self)
+        latency_action.triggered.connect(self.show_latency_dialog)
+        toolbar.addAction(latency_action)
+        
         # クリップボードにコピーアクション
         copy_action = QAction(AppLabels.COPY_TO_CLIPBOARD, self)
         copy_action.triggered.connect(self.copy_to_clipboard)
@@ -325,6 +462,28 @@ class MainWindow(QMainWindow):
         self.indicator_action.triggered.connect(self.toggle_indicator_option)
         toolbar.addAction(self.indicator_action)
         
+        # 語彙補正オプション
+        self.vocabulary_correction_action = QAction(AppLabels.VOCABULARY_CORRECTION, self)
+        self.vocabulary_correction_action.setCheckable(True)
+        self.vocabulary_correction_action.setChecked(self.vocabulary_correction)
+        self.vocabulary_correction_action.triggered.connect(self.toggle_vocabulary_correction)
+        toolbar.addAction(self.vocabulary_correction_action)
+        
+        # 録音ジャーナルオプション
+        self.recording_journal_action = QAction(AppLabels.RECORDING_JOURNAL, self)
+        self.recording_journal_action.setCheckable(True)
+        self.recording_journal_action.setChecked(self.recording_journal)
+        self.recording_journal_action.triggered.connect(self.toggle_recording_journal)
+        toolbar.addAction(self.recording_journal_action)
+        
+        # 音声アーカイブオプション
+        self.archive_audio_action = QAction(AppLabels.AUDIO_ARCHIVE, self)
+        self.archive_audio_action.setCheckable(True)
+        self.archive_audio_action.setChecked(self.archive_audio)
+        self.archive_audio_action.setEnabled(self.audio_archive is not None)
+        self.archive_audio_action.triggered.connect(self.toggle_archive_audio)
+        toolbar.addAction(self.archive_audio_action)
+        
         # セパレーター追加
         toolbar.addSeparator()
         
@@ -348,6 +507,9 @@ class MainWindow(QMainWindow):
             # 新しいAPIキーでトランスクライバーを再初期化
             try:
                 self.whisper_transcriber = WhisperTranscriber(api_key=self.api_key)
+                self.whisper_transcriber.set_vocabulary_correction(self.vocabulary_correction)
+                self.offline_queue.transcriber = self.whisper_transcriber
+                self.offline_queue.wake()
                 self.status_bar.showMessage(AppLabels.STATUS_API_KEY_SAVED, 3000)
             except ValueError as e:
                 self.whisper_transcriber = None
@@ -387,6 +549,47 @@ class MainWindow(QMainWindow):
             self.whisper_transcriber.add_system_instruction(new_instructions)
             self.status_bar.showMessage(AppLabels.STATUS_INSTRUCTIONS_SET.format(len(new_instructions)), 3000)
     
+    def load_replacements(self):
+        """
+        設定から置換辞書を読み込む
+        
+        Returns
+        -------
+        dict
+            置換対象のテキストから置換後のテキストへの辞書
+        """
+        try:
+            replacements = json.loads(self.settings.value("replacements", AppConfig.DEFAULT_REPLACEMENTS))
+            return replacements if isinstance(replacements, dict) else {}
+        except (TypeError, ValueError) as e:
+            logger.error("Failed to load replacements: %s", e)
+            return {}
+    
+    def show_replacement_dialog(self):
+        """
+        置換辞書管理ダイアログを表示する
+        
+        文字起こし結果に適用する置換ルールを管理するダイアログを表示し、
+        変更されたルールのみを置換エンジンに反映します。
+        """
+        dialog = ReplacementDialog(self, self.text_replacer.get_replacements())
+        
+        if dialog.exec():
+            new_replacements = dialog.get_replacements()
+            self.text_replacer.update(new_replacements)
+            self.settings.setValue("replacements", json.dumps(new_replacements, ensure_ascii=False))
+            self.status_bar.showMessage(AppLabels.STATUS_REPLACEMENTS_SET.format(len(new_replacements)), 3000)
+    
+    def show_latency_dialog(self):
+        """
+        レイテンシ統計ダイアログを表示する
+        
+        ホットキーの押下からクリップボードへのコピーまでの区間ごとの
+        所要時間の統計を表示します。
+        """
+        dialog = LatencyDialog(self)
+        dialog.exec()
+    
     def toggle_recording(self):
         """
         録音の開始/停止を切り替える
@@ -402,6 +605,13 @@ class MainWindow(QMainWindow):
         
         録音の状態を確認し、録音の開始または停止を行います。
         """
+        if not self.audio_recorder.is_recording():
+            # 録音開始からのレイテンシ計測を開始（直前のホットキーの時刻を取り込む）
+            trace = latency_tracker.begin()
+            # プロファイリングが予約されている場合はこの音声入力を計測する
+            profiler.begin(trace)
+        latency_tracker.mark("dispatch")
+        
         if self.audio_recorder.is_recording():
             self.stop_recording()
         else:
@@ -415,6 +625,7 @@ class MainWindow(QMainWindow):
         インジケーターウィンドウを表示します。
         """
         if not self.whisper_transcriber:
+            self.finish_profile(latency_tracker.detach())
             QMessageBox.warning(self, AppLabels.ERROR_TITLE, AppLabels.ERROR_API_KEY_REQUIRED)
             return
             
@@ -449,15 +660,20 @@ class MainWindow(QMainWindow):
         audio_file = self.audio_recorder.stop_recording()
         self.recording_status_changed.emit(False)
         
+        # 計測中のトレースを文字起こしスレッドに引き継ぐ（次の録音は新しいトレースになる）
+        trace = latency_tracker.detach()
+        
         # 録音タイマー停止
         self.recording_timer.stop()
         
         if audio_file:
             self.status_bar.showMessage(AppLabels.STATUS_TRANSCRIBING)
-            self.start_transcription(audio_file)
+            self.start_transcription(audio_file, trace)
         else:
             # 録音ファイルが作成されなかった場合は状態表示を非表示
             self.status_indicator_window.hide()
+            latency_tracker.finish(trace)
+            self.finish_profile(trace)
         
         # 停止音を再生
         self.play_stop_sound()
@@ -501,7 +717,7 @@ class MainWindow(QMainWindow):
             # 録音インジケーターウィンドウのタイマーも更新
             self.status_indicator_window.update_timer(time_str)
     
-    def start_transcription(self, audio_file=None):
+    def start_transcription(self, audio_file=None, trace=None):
         """
         文字起こしを開始する
         
@@ -509,6 +725,8 @@ class MainWindow(QMainWindow):
         ----------
         audio_file : str, optional
             文字起こしを行う音声ファイルのパス
+        trace : LatencyTrace, optional
+            録音から引き継いだレイテンシ計測のトレース
         
         録音した音声ファイルの文字起こしを開始し、UIの状態を更新します。
         """
@@ -526,14 +744,9 @@ class MainWindow(QMainWindow):
         
         # バックグラウンドスレッドで文字起こし処理を実行
         if audio_file:
-            transcription_thread = threading.Thread(
-                target=self.perform_transcription,
-                args=(audio_file, selected_language)
-            )
-            transcription_thread.daemon = True
-            transcription_thread.start()
+            self.transcription_executor.submit(self.perform_transcription, audio_file, selected_language, trace)
     
-    def perform_transcription(self, audio_file, language=None):
+    def perform_transcription(self, audio_file, language=None, trace=None):
         """
         バックグラウンドスレッドで文字起こし処理を実行する
         
@@ -543,22 +756,56 @@ class MainWindow(QMainWindow):
             文字起こしを行う音声ファイルのパス
         language : str, optional
             文字起こしの言語コード
+        trace : LatencyTrace, optional
+            APIの呼び出しの各段階を記録するトレース
         
         WhisperTranscriberを使用して実際の文字起こし処理を行い、結果を
         シグナルで通知します。エラー発生時も適切にハンドリングします。
         """
+        latency_tracker.bind(trace)
+        succeeded = False
         try:
-            # 音声を文字起こし
-            result = self.whisper_transcriber.transcribe(audio_file, language)
+            # プロファイリング中の場合は文字起こしのスレッドも計測する
+            with profiler.profile_thread(trace):
+                # 音声を文字起こし
+                started = time.monotonic()
+                result = self.whisper_transcriber.transcribe(audio_file, language)
+                elapsed = time.monotonic() - started
+            
+                # 置換辞書を適用（エラーメッセージには適用しない）
+                succeeded = not result.startswith("Error: ")
+                if succeeded:
+                    result = self.text_replacer.apply(result)
+                elif self.offline_queue.enqueue(
+                    audio_file, language, result[len("Error: "):], self.whisper_transcriber.last_error_kind()
+                ):
+                    # 失敗した音声はオフラインキューに保存し、接続の回復後に文字起こしする
+                    result = result + "\n\n" + AppLabels.INFO_OFFLINE_QUEUED
             
             # 結果でシグナルを発信
-            self.transcription_complete.emit(result)
+            self.transcription_complete.emit(result, trace)
             
         except Exception as e:
             # エラー処理
-            self.transcription_complete.emit(AppLabels.ERROR_TRANSCRIPTION.format(str(e)))
+            succeeded = False
+            self.transcription_complete.emit(AppLabels.ERROR_TRANSCRIPTION.format(str(e)), trace)
+        
+        try:
+            # 音声の圧縮と履歴への追加は、結果の貼り付けを待たせないよう通知の後に行う
+            if succeeded:
+                audio_ref = None
+                if self.archive_audio and self.audio_archive is not None:
+                    audio_ref = self.audio_archive.store(audio_file)
+                self.add_to_history(result, language, WhisperTranscriber.get_audio_duration(audio_file), elapsed, audio_ref)
+        except Exception as e:
+            logger.exception("Failed to save the transcription to history: %s", e)
+        
+        finally:
+            latency_tracker.bind(None)
+            # 文字起こしが終わった一時ファイルを削除（失敗時の音声はオフラインキューに保存済み）
+            self.scratch.release(audio_file)
     
-    def on_transcription_complete(self, text):
+    def on_transcription_complete(self, text, trace=None):
         """
         文字起こし完了時の処理
         
@@ -566,6 +813,8 @@ class MainWindow(QMainWindow):
         ----------
         text : str
             文字起こし結果のテキスト
+        trace : LatencyTrace, optional
+            この文字起こしのレイテンシ計測のトレース
         
         文字起こし結果をテキストウィジェットに表示し、設定に応じて
         クリップボードにコピーします。また、完了サウンドを再生します。
@@ -590,9 +839,288 @@ class MainWindow(QMainWindow):
             # 自動コピーが無効の場合でもモデル情報でステータスを更新
             self.status_bar.showMessage(AppLabels.STATUS_TRANSCRIBED + f" (使用モデル: {model_name})", 3000)
         
+        # 結果の表示とコピーまでの時刻を記録して集計
+        if trace is not None:
+            trace.mark("clipboard")
+            latency_tracker.finish(trace)
+            self.finish_profile(trace)
+        
         # 完了音を再生
         self.play_complete_sound()
     
+    def toggle_profiling(self, checked):
+        """
+        次の音声入力のプロファイリングを予約または取り消す
+        
+        Parameters
+        ----------
+        checked : bool
+            トレイメニューの項目のチェック状態
+        
+        取り消した時点で計測中の場合は、そこまでの結果を書き出します。
+        """
+        if checked:
+            try:
+                profiler.arm(
+                    self.settings.value("profile_mode", AppConfig.DEFAULT_PROFILE_MODE),
+                    self.settings.value("profile_tracemalloc", AppConfig.DEFAULT_PROFILE_TRACEMALLOC, type=bool),
+                )
+            except ValueError as e:
+                logger.error("Failed to enable profiling: %s", e)
+                profiler.arm(AppConfig.DEFAULT_PROFILE_MODE, AppConfig.DEFAULT_PROFILE_TRACEMALLOC)
+            self.status_bar.showMessage(AppLabels.STATUS_PROFILE_ARMED, 3000)
+        else:
+            profiler.disarm()
+            if not self.finish_profile():
+                self.status_bar.showMessage(AppLabels.STATUS_PROFILE_DISARMED, 3000)
+    
+    def finish_profile(self, trace=None):
+        """
+        音声入力のプロファイリングを終了して結果を通知する
+        
+        Parameters
+        ----------
+        trace : LatencyTrace, optional
+            完了した音声入力のトレース（計測中のトレースと異なる場合は何もしない）
+        
+        Returns
+        -------
+        bool
+            結果を書き出した場合True
+        """
+        path = profiler.finish(trace)
+        if path is None:
+            return False
+        
+        # 1回分の予約が終わった場合はトレイメニューのチェックを外す
+        if hasattr(self, 'profile_action'):
+            self.profile_action.blockSignals(True)
+            self.profile_action.setChecked(profiler.is_armed())
+            self.profile_action.blockSignals(False)
+        
+        self.status_bar.showMessage(AppLabels.STATUS_PROFILE_WRITTEN.format(path), 5000)
+        if hasattr(self, 'tray_icon') and self.tray_icon.isVisible():
+            self.tray_icon.showMessage(AppLabels.PROFILE_NOTIFICATION_TITLE, str(path))
+        return True
+    
+    def on_offline_result(self, job, text):
+        """
+        オフラインキューのジョブが完了したときの処理（キューの処理スレッドから呼ばれる）
+        
+        Parameters
+        ----------
+        job : dict
+            完了したジョブの情報
+        text : str
+            文字起こし結果のテキスト
+        """
+        text = self.text_replacer.apply(text)
+        self.add_to_history(text, job.get("language"))
+        self.offline_transcription_complete.emit(text)
+    
+    def add_to_history(self, text, language=None, audio_seconds=None, elapsed_seconds=None, audio_ref=None):
+        """
+        文字起こし結果を履歴に追加する
+        
+        Parameters
+        ----------
+        text : str
+            文字起こし結果のテキスト
+        language : str, optional
+            文字起こしの言語コード
+        audio_seconds : float, optional
+            音声の長さ（秒）
+        elapsed_seconds : float, optional
+            文字起こしにかかった時間（秒）
+        audio_ref : str, optional
+            音声アーカイブに保存した音声の参照文字列
+        """
+        if self.history_store is None or not text.strip():
+            # 履歴に関連付けられない音声は保存しない
+            if self.audio_archive is not None:
+                self.audio_archive.delete(audio_ref)
+            return
+        self.history_store.add(
+            text,
+            model=self.whisper_transcriber.model if self.whisper_transcriber else None,
+            language=language,
+            audio_seconds=audio_seconds,
+            elapsed_seconds=elapsed_seconds,
+            audio_ref=audio_ref,
+        )
+    
+    def on_offline_transcription_complete(self, text):
+        """
+        オフラインキューの文字起こし結果を表示する
+        
+        Parameters
+        ----------
+        text : str
+            文字起こし結果のテキスト
+        
+        結果をテキストウィジェットに表示し、システムトレイの通知で知らせます。
+        """
+        self.transcription_text.setPlainText(text)
+        self.status_bar.showMessage(AppLabels.STATUS_OFFLINE_TRANSCRIBED.format(len(self.offline_queue)), 5000)
+        if hasattr(self, 'tray_icon') and self.tray_icon.isVisible():
+            self.tray_icon.showMessage(AppLabels.OFFLINE_NOTIFICATION_TITLE, text[:200])
+    
+    def discard_failed_offline_jobs(self):
+        """
+        オフラインキューで最大試行回数を超えて放棄された録音を確認の上で削除する
+        """
+        failed = self.offline_queue.failed_jobs()
+        if not failed:
+            QMessageBox.information(self, AppLabels.INFO_TITLE, AppLabels.INFO_NO_FAILED_OFFLINE)
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            AppLabels.DISCARD_FAILED_OFFLINE,
+            AppLabels.DISCARD_FAILED_OFFLINE_MESSAGE.format(len(failed)),
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            removed = self.offline_queue.discard_failed()
+            self.status_bar.showMessage(AppLabels.STATUS_FAILED_OFFLINE_DISCARDED.format(removed), 3000)
+    
+    def on_history_entry_activated(self, entry):
+        """
+        履歴が選択されたときの処理
+        
+        Parameters
+        ----------
+        entry : dict
+            選択された履歴
+        """
+        self.transcription_text.setPlainText(entry["text"])
+        self.status_bar.showMessage(AppLabels.STATUS_HISTORY_LOADED, 2000)
+    
+    def on_history_entry_deleted(self, entry):
+        """
+        履歴が削除されたときに関連付けられた音声も削除する
+        
+        Parameters
+        ----------
+        entry : dict
+            削除された履歴
+        """
+        if self.audio_archive is not None:
+            self.audio_archive.delete(entry.get("audio_ref"))
+    
+    def retranscribe_history_entry(self, entry, model):
+        """
+        保存した音声を別のモデルで再文字起こしする
+        
+        Parameters
+        ----------
+        entry : dict
+            再文字起こしする履歴
+        model : str
+            使用するモデルID
+        
+        アーカイブの音声を一時ファイルに展開せず、そのままAPIに送信します。
+        """
+        if not self.whisper_transcriber:
+            self.show_api_key_dialog()
+            return
+        
+        audio = self.audio_archive.open(entry.get("audio_ref")) if self.audio_archive is not None else None
+        if audio is None:
+            QMessageBox.warning(self, AppLabels.ERROR_TITLE, AppLabels.ERROR_AUDIO_NOT_ARCHIVED)
+            return
+        
+        self.status_bar.showMessage(AppLabels.STATUS_TRANSCRIBING)
+        self.transcription_executor.submit(self.perform_retranscription, entry, model, audio)
+    
+    def perform_retranscription(self, entry, model, audio):
+        """
+        バックグラウンドスレッドで再文字起こしを実行する
+        
+        Parameters
+        ----------
+        entry : dict
+            再文字起こしする履歴
+        model : str
+            使用するモデルID
+        audio : tuple
+            (ファイル名, 圧縮した音声)の組
+        """
+        started = time.monotonic()
+        result = self.whisper_transcriber.transcribe(audio, entry.get("language"), model=model)
+        elapsed = time.monotonic() - started
+        
+        if result.startswith("Error: "):
+            self.retranscription_complete.emit(None, AppLabels.ERROR_TRANSCRIPTION.format(result[len("Error: "):]))
+            return
+        
+        # 結果を履歴に書き戻す
+        result = self.text_replacer.apply(result)
+        if self.history_store is not None:
+            self.history_store.update(entry["id"], text=result, model=model, elapsed_seconds=elapsed)
+        self.retranscription_complete.emit(dict(entry, text=result, model=model, elapsed_seconds=elapsed), result)
+    
+    def show_bulk_retranscribe_dialog(self):
+        """
+        履歴の一括再文字起こしダイアログを表示する
+        
+        ダイアログはモードレスで表示し、処理中もメインウィンドウを操作できます。
+        """
+        if not self.whisper_transcriber:
+            self.show_api_key_dialog()
+            return
+        
+        if self.bulk_retranscribe_dialog is not None and self.bulk_retranscribe_dialog.isVisible():
+            self.bulk_retranscribe_dialog.raise_()
+            self.bulk_retranscribe_dialog.activateWindow()
+            return
+        
+        self.bulk_retranscribe_dialog = BulkRetranscribeDialog(
+            self,
+            self.history_store,
+            self.audio_archive,
+            self.whisper_transcriber,
+            text_replacer=self.text_replacer,
+            model=self.model_combo.currentData(),
+        )
+        if self.history_panel is not None:
+            self.bulk_retranscribe_dialog.entry_updated.connect(self.on_bulk_entry_updated)
+        self.bulk_retranscribe_dialog.show()
+    
+    def on_bulk_entry_updated(self, entry):
+        """
+        一括再文字起こしで変更された履歴を履歴パネルに反映する
+        
+        Parameters
+        ----------
+        entry : dict
+            変更後の履歴
+        """
+        self.history_panel.model.update_entry(
+            entry["id"], text=entry["text"], model=entry["model"], elapsed_seconds=entry["elapsed_seconds"]
+        )
+    
+    def on_retranscription_complete(self, entry, text):
+        """
+        再文字起こしの結果を表示する
+        
+        Parameters
+        ----------
+        entry : dict or None
+            変更後の履歴（失敗した場合はNone）
+        text : str
+            文字起こし結果、またはエラーメッセージ
+        """
+        self.transcription_text.setPlainText(text)
+        if entry is None:
+            self.status_bar.showMessage(AppLabels.STATUS_READY)
+            return
+        if self.history_panel is not None:
+            self.history_panel.model.update_entry(
+                entry["id"], text=entry["text"], model=entry["model"], elapsed_seconds=entry["elapsed_seconds"]
+            )
+        self.status_bar.showMessage(AppLabels.STATUS_RETRANSCRIBED.format(entry["model"]), 3000)
+    
     def copy_to_clipboard(self):
         """
         文字起こし結果をクリップボードにコピーする
@@ -636,13 +1164,13 @@ class MainWindow(QMainWindow):
             result = self.hotkey_manager.register_hotkey(self.hotkey, self.toggle_recording)
             
             if result:
-                print(f"Hotkey '{self.hotkey}' has been set successfully")
+                logger.info("Hotkey '%s' has been set successfully", self.hotkey)
                 return True
             else:
                 raise ValueError(f"Failed to register hotkey: {self.hotkey}")
         except Exception as e:
             error_msg = f"Hotkey setup error: {e}"
-            print(error_msg)
+            logger.error(error_msg)
             # エラーメッセージをユーザーに表示
             self.status_bar.showMessage(AppLabels.ERROR_HOTKEY.format(str(e)), 5000)
             # エラーがあってもアプリは正常に動作するようにする
@@ -692,6 +1220,26 @@ class MainWindow(QMainWindow):
         """
         # キーボードリスナーを停止
         self.hotkey_manager.stop_listener()
+        
+        # オフラインキューの処理を停止（未処理のジョブは次回の起動時に処理される）
+        self.offline_queue.stop()
+        
+        # 実行中の文字起こしは待たずにワーカーを停止
+        self.transcription_executor.shutdown(wait=False)
+        
+        # 書き込み待ちの履歴を保存
+        if self.history_panel is not None:
+            self.history_panel.shutdown()
+        if self.history_store is not None:
+            self.history_store.close()
+        if self.audio_archive is not None:
+            self.audio_archive.close()
+        
+        # メトリクスの公開を停止（textfileコレクター用のファイルには最後の値を書き出す）
+        metrics.stop()
+        
+        # 計測中のプロファイルを書き出す
+        profiler.finish()
             
         # トレイアイコンを非表示にする
         if hasattr(self, 'tray_icon'):
@@ -704,63 +1252,69 @@ class MainWindow(QMainWindow):
         QApplication.quit()
     
     def setup_sound_players(self):
-        """サウンドプレーヤーの初期化"""
+        """
+        サウンドプレーヤーの初期化
+        
+        音声ファイルと音量は起動時に一度だけ設定し、再生のたびに読み込み直しません。
+        """
         # 録音開始用サウンドプレーヤー
-        self.start_player = QMediaPlayer()
-        self.start_audio_output = QAudioOutput()
-        self.start_player.setAudioOutput(self.start_audio_output)
+        self.start_player, self.start_audio_output = self._create_sound_player(AppConfig.START_SOUND_PATH)
         
         # 録音終了用サウンドプレーヤー
-        self.stop_player = QMediaPlayer()
-        self.stop_audio_output = QAudioOutput()
-        self.stop_player.setAudioOutput(self.stop_audio_output)
+        self.stop_player, self.stop_audio_output = self._create_sound_player(AppConfig.STOP_SOUND_PATH)
         
         # 文字起こし完了用サウンドプレーヤー
-        self.complete_player = QMediaPlayer()
-        self.complete_audio_output = QAudioOutput()
-        self.complete_player.setAudioOutput(self.complete_audio_output)
+        self.complete_player, self.complete_audio_output = self._create_sound_player(AppConfig.COMPLETE_SOUND_PATH)
     
-    def play_start_sound(self):
+    def _create_sound_player(self, sound_path):
         """
-        録音開始サウンドを再生する
+        音声ファイルを読み込んだサウンドプレーヤーを生成する
         
-        enable_soundがTrueの場合のみ再生します
+        Parameters
+        ----------
+        sound_path : str
+            assets内の音声ファイルの相対パス
+        
+        Returns
+        -------
+        tuple
+            (QMediaPlayer, QAudioOutput)の組
         """
-        if not self.enable_sound:
-            return
-        # assets内の音声ファイルを使用
-        sound_path = getResourcePath(AppConfig.START_SOUND_PATH)
-        self.start_player.setSource(QUrl.fromLocalFile(sound_path))
-        self.start_audio_output.setVolume(0.5)
-        self.start_player.play()
+        player = QMediaPlayer()
+        audio_output = QAudioOutput()
+        audio_output.setVolume(AppConfig.SOUND_VOLUME)
+        player.setAudioOutput(audio_output)
+        player.setSource(QUrl.fromLocalFile(getResourcePath(sound_path)))
+        return player, audio_output
     
-    def play_stop_sound(self):
+    def _play_sound(self, player):
         """
-        録音終了サウンドを再生する
+        読み込み済みのサウンドを先頭から再生する
         
         enable_soundがTrueの場合のみ再生します
+        
+        Parameters
+        ----------
+        player : QMediaPlayer
+            再生するサウンドプレーヤー
         """
         if not self.enable_sound:
             return
-        # assets内の音声ファイルを使用
-        sound_path = getResourcePath(AppConfig.STOP_SOUND_PATH)
-        self.stop_player.setSource(QUrl.fromLocalFile(sound_path))
-        self.stop_audio_output.setVolume(0.5)
-        self.stop_player.play()
+        # 前回の再生が終わっていない場合も先頭から再生し直す
+        player.setPosition(0)
+        player.play()
+    
+    def play_start_sound(self):
+        """録音開始サウンドを再生する"""
+        self._play_sound(self.start_player)
+    
+    def play_stop_sound(self):
+        """録音終了サウンドを再生する"""
+        self._play_sound(self.stop_player)
     
     def play_complete_sound(self):
-        """
-        文字起こし完了サウンドを再生する
-        
-        enable_soundがTrueの場合のみ再生します
-        """
-        if not self.enable_sound:
-            return
-        # assets内の音声ファイルを使用
-        sound_path = getResourcePath(AppConfig.COMPLETE_SOUND_PATH)
-        self.complete_player.setSource(QUrl.fromLocalFile(sound_path))
-        self.complete_audio_output.setVolume(0.5)
-        self.complete_player.play()
+        """文字起こし完了サウンドを再生する"""
+        self._play_sound(self.complete_player)
 
     def toggle_sound_option(self):
         """
@@ -793,6 +1347,81 @@ class MainWindow(QMainWindow):
         else:
             self.status_bar.showMessage(AppLabels.STATUS_INDICATOR_HIDDEN, 2000)
 
+    def toggle_vocabulary_correction(self):
+        """
+        カスタム語彙による補正のオン/オフを切り替える
+        
+        設定を保存し、状態をステータスバーに表示します
+        """
+        self.vocabulary_correction = self.vocabulary_correction_action.isChecked()
+        self.settings.setValue("vocabulary_correction", self.vocabulary_correction)
+        
+        if self.whisper_transcriber:
+            self.whisper_transcriber.set_vocabulary_correction(self.vocabulary_correction)
+            
+        if self.vocabulary_correction:
+            self.status_bar.showMessage(AppLabels.STATUS_VOCABULARY_CORRECTION_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_VOCABULARY_CORRECTION_DISABLED, 2000)
+
+    def toggle_recording_journal(self):
+        """
+        録音ジャーナルのオン/オフを切り替える
+        
+        設定を保存し、状態をステータスバーに表示します
+        """
+        self.recording_journal = self.recording_journal_action.isChecked()
+        self.settings.setValue("recording_journal", self.recording_journal)
+        self.audio_recorder.set_journal_dir(self.recording_journal_dir if self.recording_journal else None)
+        
+        if self.recording_journal:
+            self.status_bar.showMessage(AppLabels.STATUS_RECORDING_JOURNAL_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_RECORDING_JOURNAL_DISABLED, 2000)
+    
+    def toggle_archive_audio(self):
+        """
+        音声の保存のオン/オフを切り替える
+        
+        設定を保存し、状態をステータスバーに表示します
+        """
+        self.archive_audio = self.archive_audio_action.isChecked()
+        self.settings.setValue("archive_audio", self.archive_audio)
+        
+        if self.archive_audio:
+            self.status_bar.showMessage(AppLabels.STATUS_AUDIO_ARCHIVE_ENABLED, 2000)
+        else:
+            self.status_bar.showMessage(AppLabels.STATUS_AUDIO_ARCHIVE_DISABLED, 2000)
+    
+    def recover_interrupted_recordings(self):
+        """
+        前回中断された録音を復元して文字起こしするかを確認する
+        
+        録音ジャーナルに残っているセッションがある場合、ユーザーに確認した上で
+        音声ファイルに復元して文字起こしします。復元しない場合はセッションを削除します。
+        """
+        sessions = find_orphaned_sessions(self.recording_journal_dir)
+        if not sessions:
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            AppLabels.RECOVERY_TITLE,
+            AppLabels.RECOVERY_MESSAGE.format(len(sessions)),
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        
+        for session in sessions:
+            if reply == QMessageBox.StandardButton.Yes:
+                audio_file = recover_session(session, self.scratch.new_path("recovered", ".wav"))
+                if not audio_file:
+                    continue
+                if self.whisper_transcriber:
+                    self.start_transcription(audio_file)
+                elif not self.offline_queue.enqueue(audio_file):
+                    continue
+            discard_session(session)
+    
     def setup_system_tray(self):
         """
         システムトレイアイコンとメニューの設定
@@ -809,7 +1438,7 @@ class MainWindow(QMainWindow):
         else:
             # アイコンファイルが見つからない場合は標準アイコンを使用
             self.tray_icon = QSystemTrayIcon(self.style().standardIcon(QStyle.StandardPixmap.SP_MediaPlay), self)
-            print(f"Warning: System tray icon file not found: {icon_path}")
+            logger.warning("System tray icon file not found: %s", icon_path)
         
         self.tray_icon.setToolTip(AppLabels.APP_TITLE)
         
@@ -830,6 +1459,13 @@ class MainWindow(QMainWindow):
         record_action.triggered.connect(self.toggle_recording)
         menu.addAction(record_action)
         
+        # プロファイリングアクションを追加（環境変数で有効にした場合はチェック済み）
+        self.profile_action = QAction(AppLabels.TRAY_PROFILE_NEXT, self)
+        self.profile_action.setCheckable(True)
+        self.profile_action.setChecked(profiler.is_armed())
+        self.profile_action.toggled.connect(self.toggle_profiling)
+        menu.addAction(self.profile_action)
+        
         # セパレーターを追加
         menu.addSeparator()
         
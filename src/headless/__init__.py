@@ -0,0 +1,5 @@
+"""
+Open Super Whisper - ヘッドレスモジュール
+
+PyQt6を使用せずにコア機能を実行するためのコマンドラインインターフェースを提供します。
+"""
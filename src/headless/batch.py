@@ -0,0 +1,410 @@
+"""
+一括文字起こしモジュール
+
+ディレクトリやglobパターンで指定された多数の音声ファイルを、同時実行数と
+リクエスト頻度を制限しながら文字起こしし、各ファイルの隣にSRT、VTT、TXT、
+JSONL形式で書き出します。処理結果はマニフェストに記録され、中断後に
+再実行すると完了済みのファイルを飛ばして再開します。
+"""
+
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.core.text_replacer import TextReplacer
+from src.core.transcript import Transcript
+from src.core.whisper_api import WhisperTranscriber
+
+# 一括処理の対象とする音声ファイルの拡張子（OpenAI APIが受け付ける形式）
+AUDIO_EXTENSIONS = {".flac", ".m4a", ".mp3", ".mp4", ".mpeg", ".mpga", ".oga", ".ogg", ".wav", ".webm"}
+
+# 出力フォーマットと拡張子
+OUTPUT_FORMATS = ("srt", "vtt", "txt", "jsonl")
+
+
+def collect_audio_files(inputs: Iterable[str], recursive: bool = False) -> List[Path]:
+    """
+    ディレクトリ、ファイル、globパターンから音声ファイルを収集する
+
+    Parameters
+    ----------
+    inputs : Iterable[str]
+        ディレクトリ、ファイル、またはglobパターンのリスト
+    recursive : bool, optional
+        ディレクトリをサブディレクトリまで検索する場合True
+
+    Returns
+    -------
+    List[Path]
+        重複を除いて並べ替えた音声ファイルのパス
+    """
+    files = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            candidates = path.rglob("*") if recursive else path.iterdir()
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = (Path(match) for match in glob.glob(item, recursive=recursive))
+
+        for candidate in candidates:
+            if candidate.is_file() and candidate.suffix.lower() in AUDIO_EXTENSIONS:
+                files.add(candidate.resolve())
+    return sorted(files)
+
+
+class BatchManifest:
+    """
+    一括処理の結果を記録するマニフェスト
+
+    1行に1件のJSONとして追記するため、処理の途中で中断されても
+    それまでの記録は失われません。ファイルのサイズと更新日時が変わった
+    音声は未処理として扱います。
+    """
+
+    def __init__(self, path: str):
+        """
+        BatchManifestの初期化
+
+        Parameters
+        ----------
+        path : str
+            マニフェストファイルのパス
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._completed: Dict[str, Dict] = {}
+        self._digests = set()
+        self._load()
+
+    def _load(self) -> None:
+        """既存のマニフェストから完了済みのエントリを読み込む"""
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 中断時に書きかけになった行は無視する
+                    continue
+                if entry.get("status") == "done":
+                    self._completed[entry["audio"]] = entry
+                    if entry.get("digest"):
+                        self._digests.add(entry["digest"])
+                else:
+                    self._completed.pop(entry.get("audio"), None)
+
+    @staticmethod
+    def _fingerprint(audio: Path) -> Dict:
+        """音声ファイルの変更を検出するための情報を取得する"""
+        stat = audio.stat()
+        return {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    def is_done(self, audio: Path, output: Path) -> bool:
+        """
+        音声ファイルが処理済みかどうかを判定する
+
+        Parameters
+        ----------
+        audio : Path
+            音声ファイルのパス
+        output : Path
+            出力ファイルのパス
+
+        Returns
+        -------
+        bool
+            同じ内容の音声が同じ出力先に処理済みで、出力ファイルが存在する場合True
+        """
+        entry = self._completed.get(str(audio))
+        if entry is None or entry.get("output") != str(output) or not output.exists():
+            return False
+        fingerprint = self._fingerprint(audio)
+        return entry.get("size") == fingerprint["size"] and entry.get("mtime") == fingerprint["mtime"]
+
+    def has_digest(self, digest: str) -> bool:
+        """
+        同じ内容の音声が処理済みかどうかを判定する
+
+        Parameters
+        ----------
+        digest : str
+            音声ファイルの内容のハッシュ値
+
+        Returns
+        -------
+        bool
+            同じハッシュ値の音声が処理済みの場合True
+        """
+        with self._lock:
+            return digest in self._digests
+
+    def record(
+        self,
+        audio: Path,
+        status: str,
+        output: Optional[Path] = None,
+        error: Optional[str] = None,
+        digest: Optional[str] = None,
+    ) -> None:
+        """
+        処理結果を追記する
+
+        Parameters
+        ----------
+        audio : Path
+            音声ファイルのパス
+        status : str
+            "done"または"failed"
+        output : Path, optional
+            出力ファイルのパス
+        error : str, optional
+            失敗した場合のエラーメッセージ
+        digest : str, optional
+            音声ファイルの内容のハッシュ値
+        """
+        entry = {"audio": str(audio), "status": status, "time": time.time()}
+        entry.update(self._fingerprint(audio))
+        if output is not None:
+            entry["output"] = str(output)
+        if error is not None:
+            entry["error"] = error
+        if digest is not None:
+            entry["digest"] = digest
+
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            if status == "done":
+                self._completed[str(audio)] = entry
+                if digest is not None:
+                    self._digests.add(digest)
+            else:
+                self._completed.pop(str(audio), None)
+
+
+class BatchTranscriber:
+    """
+    複数の音声ファイルを並行して文字起こしするクラス
+
+    実行待ちのファイルは同時実行数の2倍までしかスレッドプールに投入しないため、
+    数千件のファイルでもメモリ使用量は一定です。APIのリクエスト頻度は
+    WhisperTranscriberのレートリミッターによって制限されます。
+
+    Attributes
+    ----------
+    output_format : str
+        出力フォーマット："srt"、"vtt"、"txt"、または"jsonl"
+    max_workers : int
+        同時に実行する文字起こしの最大数
+    max_retries : int
+        接続エラー、5xx、429で失敗した文字起こしを再試行する回数
+    """
+
+    # 再試行までの初回の待機時間（秒）。再試行ごとに2倍になる
+    RETRY_BACKOFF = 2.0
+
+    # 再試行するエラーの種類（WhisperTranscriber.last_error_kindの値）
+    RETRYABLE_ERROR_KINDS = ("connection", "server", "rate_limit")
+
+    def __init__(
+        self,
+        transcriber: WhisperTranscriber,
+        output_format: str = "srt",
+        language: Optional[str] = None,
+        max_workers: int = 4,
+        max_retries: int = 2,
+        manifest: Optional[BatchManifest] = None,
+        overwrite: bool = False,
+        text_replacer: Optional[TextReplacer] = None,
+    ):
+        """
+        BatchTranscriberの初期化
+
+        Parameters
+        ----------
+        transcriber : WhisperTranscriber
+            すべてのファイルで共有するインスタンス
+        output_format : str, optional
+            出力フォーマット (デフォルト: "srt")
+        language : str, optional
+            文字起こしの言語コード
+        max_workers : int, optional
+            同時に実行する文字起こしの最大数 (デフォルト: 4)
+        max_retries : int, optional
+            失敗した文字起こしを再試行する回数 (デフォルト: 2)
+        manifest : BatchManifest, optional
+            処理結果を記録し、再開に使用するマニフェスト
+        overwrite : bool, optional
+            処理済みのファイルも再度文字起こしする場合True
+        text_replacer : TextReplacer, optional
+            文字起こし結果に適用する置換辞書
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format}")
+
+        self.transcriber = transcriber
+        self.output_format = output_format
+        self.language = language or None
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.manifest = manifest
+        self.overwrite = overwrite
+        self.text_replacer = text_replacer
+
+    def output_path(self, audio: Path) -> Path:
+        """
+        音声ファイルに対応する出力ファイルのパスを求める
+
+        Parameters
+        ----------
+        audio : Path
+            音声ファイルのパス
+
+        Returns
+        -------
+        Path
+            音声ファイルと同じディレクトリにある出力ファイルのパス
+        """
+        return audio.with_suffix(f".{self.output_format}")
+
+    def _transcribe(self, audio: Path):
+        """
+        再試行付きで1つの音声ファイルを文字起こしする
+
+        Returns
+        -------
+        str or Transcript
+            文字起こし結果
+
+        Raises
+        ------
+        RuntimeError
+            すべての試行が失敗した場合、または再試行しても成功しないエラー
+            （400、401、413など）で失敗した場合
+        """
+        # verbose_jsonに対応しないモデルではjsonを要求し、全体を1つのセグメントとして出力する
+        if self.output_format == "txt":
+            response_format = "text"
+        else:
+            response_format = self.transcriber.timestamp_response_format()
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.RETRY_BACKOFF * 2 ** (attempt - 1))
+            result = self.transcriber.transcribe(str(audio), self.language, response_format)
+            if not (isinstance(result, str) and result.startswith("Error: ")):
+                return result
+            # エラーの種類は同じスレッドで直前に実行した文字起こしのもの
+            if self.transcriber.last_error_kind() not in self.RETRYABLE_ERROR_KINDS:
+                break
+        raise RuntimeError(result[len("Error: "):])
+
+    def _write(self, result, output: Path) -> None:
+        """文字起こし結果を一時ファイル経由で出力ファイルに書き出す"""
+        if isinstance(result, Transcript):
+            if self.text_replacer:
+                result = result.map_text(self.text_replacer.apply)
+        else:
+            if self.text_replacer:
+                result = self.text_replacer.apply(result)
+            result = Transcript(text=result)
+
+        temp_path = output.with_name(f".{output.name}.part")
+        with open(temp_path, "w", encoding="utf-8", newline="") as f:
+            result.write(f, self.output_format)
+        os.replace(temp_path, output)
+
+    def process(self, audio: Path, digest: Optional[str] = None) -> Path:
+        """
+        1つの音声ファイルを文字起こしして出力ファイルに書き出す
+
+        Parameters
+        ----------
+        audio : Path
+            音声ファイルのパス
+        digest : str, optional
+            マニフェストに記録する音声ファイルの内容のハッシュ値
+
+        Returns
+        -------
+        Path
+            出力ファイルのパス
+        """
+        output = self.output_path(audio)
+        try:
+            self._write(self._transcribe(audio), output)
+        except Exception as e:
+            if self.manifest:
+                self.manifest.record(audio, "failed", output, str(e), digest)
+            raise
+        if self.manifest:
+            self.manifest.record(audio, "done", output, digest=digest)
+        return output
+
+    def run(self, files: List[Path]) -> int:
+        """
+        音声ファイルを一括で文字起こしする
+
+        Parameters
+        ----------
+        files : List[Path]
+            音声ファイルのパスのリスト
+
+        Returns
+        -------
+        int
+            すべて成功した場合0、失敗したファイルがある場合1
+        """
+        pending = [
+            audio for audio in files
+            if self.overwrite or not self.manifest or not self.manifest.is_done(audio, self.output_path(audio))
+        ]
+        skipped = len(files) - len(pending)
+        if skipped:
+            print(f"Skipping {skipped} already transcribed file(s)", file=sys.stderr)
+
+        total = len(pending)
+        finished = 0
+        failed = 0
+        remaining = iter(pending)
+        running = {}
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while True:
+                # 実行待ちのファイルを一定数までに抑えて投入する
+                while len(running) < self.max_workers * 2:
+                    audio = next(remaining, None)
+                    if audio is None:
+                        break
+                    running[executor.submit(self.process, audio)] = audio
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    audio = running.pop(future)
+                    finished += 1
+                    try:
+                        output = future.result()
+                        print(f"[{finished}/{total}] {audio} -> {output}", file=sys.stderr)
+                    except Exception as e:
+                        failed += 1
+                        print(f"[{finished}/{total}] Failed: {audio}: {e}", file=sys.stderr)
+        except KeyboardInterrupt:
+            print("Interrupted; rerun the same command to resume", file=sys.stderr)
+            executor.shutdown(wait=True, cancel_futures=True)
+            return 130
+        executor.shutdown(wait=True)
+
+        print(f"Transcribed {total - failed} file(s), {failed} failed, {skipped} skipped", file=sys.stderr)
+        return 1 if failed else 0
@@ -0,0 +1,536 @@
+"""
+ヘッドレスモードのコマンドラインインターフェース
+
+``python main.py <コマンド>``の形式で、PyQt6を読み込まずにコア機能を実行します。
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+
+from src.headless.config import HeadlessConfig
+
+# main.pyがヘッドレスモードとして扱うサブコマンド
+COMMANDS = ("daemon", "serve", "batch", "watch")
+
+logger = logging.getLogger(__name__)
+
+
+def read_lines(path):
+    """
+    ファイルから空行を除いた行のリストを読み込む
+
+    Parameters
+    ----------
+    path : str
+        読み込むファイルのパス
+
+    Returns
+    -------
+    list
+        行のリスト
+    """
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def load_replacements(path):
+    """
+    JSONファイルから置換辞書を読み込む
+
+    Parameters
+    ----------
+    path : str
+        置換対象のテキストから置換後のテキストへのオブジェクトを含むJSONファイルのパス
+
+    Returns
+    -------
+    dict
+        置換辞書
+    """
+    with open(path, encoding="utf-8") as f:
+        replacements = json.load(f)
+    if not isinstance(replacements, dict):
+        raise ValueError(f"Replacement file must contain a JSON object: {path}")
+    return replacements
+
+
+def add_transcriber_arguments(parser):
+    """
+    文字起こしの共通オプションをパーサーに追加する
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        オプションを追加するパーサー
+    """
+    parser.add_argument("--api-key", help="OpenAI API key (defaults to the OPENAI_API_KEY environment variable)")
+    parser.add_argument(
+        "--base-url",
+        help="API base URL, e.g. a compatible server or a local mock (defaults to the OPENAI_BASE_URL environment variable)",
+    )
+    parser.add_argument("--model", default=HeadlessConfig.DEFAULT_MODEL, help="transcription model ID")
+    parser.add_argument("--language", default=HeadlessConfig.DEFAULT_LANGUAGE, help="language code (empty for auto-detect)")
+    parser.add_argument("--vocabulary", metavar="FILE", help="custom vocabulary file (one term per line)")
+    parser.add_argument("--instructions", metavar="FILE", help="system instructions file (one instruction per line)")
+    parser.add_argument("--replacements", metavar="FILE", help="replacement dictionary JSON file")
+    parser.add_argument("--no-correction", action="store_true", help="disable custom vocabulary post-correction")
+    parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        default=HeadlessConfig.DEFAULT_REQUESTS_PER_MINUTE,
+        help="maximum number of API requests per minute (0 to follow the account limit reported by the API)",
+    )
+    parser.add_argument(
+        "--audio-seconds-per-minute",
+        type=float,
+        default=HeadlessConfig.DEFAULT_AUDIO_SECONDS_PER_MINUTE,
+        help="maximum seconds of audio uploaded per minute (0 for no limit)",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=HeadlessConfig.DEFAULT_MAX_IN_FLIGHT,
+        help="maximum number of API requests running at once (0 for no limit)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="serve Prometheus metrics on this loopback port (0 to disable)",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        metavar="FILE",
+        help="periodically write Prometheus metrics to FILE for the node_exporter textfile collector",
+    )
+    parser.add_argument(
+        "--log-level",
+        default=HeadlessConfig.DEFAULT_LOG_LEVEL,
+        help="log level, optionally per module (e.g. INFO,src.core.whisper_api=DEBUG)",
+    )
+    parser.add_argument("--log-file", metavar="FILE", help="also write JSON logs to FILE, rotated at 5 MB")
+
+
+def build_transcriber(args):
+    """
+    コマンドライン引数からWhisperTranscriberを生成する
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+
+    Returns
+    -------
+    WhisperTranscriber
+        設定済みのインスタンス
+    """
+    from src.core.whisper_api import WhisperTranscriber
+
+    transcriber = WhisperTranscriber(api_key=args.api_key, base_url=args.base_url)
+    transcriber.set_model(args.model)
+    transcriber.set_vocabulary_correction(not args.no_correction)
+    transcriber.set_rate_limits(args.requests_per_minute, args.audio_seconds_per_minute, args.max_in_flight)
+    if args.vocabulary:
+        transcriber.add_custom_vocabulary(read_lines(args.vocabulary))
+    if args.instructions:
+        transcriber.add_system_instruction(read_lines(args.instructions))
+    return transcriber
+
+
+def resolve_batch_model(args):
+    """
+    一括文字起こしと監視モードで使用するモデルを出力フォーマットに応じて決める
+
+    ``--model``が省略された場合、タイムスタンプ付きのフォーマットではセグメントの
+    タイムスタンプを返すモデルを使用します。タイムスタンプを返さないモデルが
+    指定された場合は、ファイル全体が1つのセグメントになることを警告します。
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数（``args.model``を書き換える）
+    """
+    from src.core.whisper_api import WhisperTranscriber
+
+    timestamped = args.format != "txt"
+    if args.model is None:
+        args.model = HeadlessConfig.DEFAULT_TIMESTAMP_MODEL if timestamped else HeadlessConfig.DEFAULT_MODEL
+    elif timestamped and args.model not in WhisperTranscriber.VERBOSE_JSON_MODELS:
+        logger.warning(
+            "Model %s does not return timestamps; each %s file will contain a single cue spanning the whole "
+            "recording. Use --model %s for per-segment timestamps.",
+            args.model, args.format, HeadlessConfig.DEFAULT_TIMESTAMP_MODEL,
+        )
+
+
+def start_metrics(args):
+    """
+    コマンドライン引数に従ってメトリクスの公開を開始する
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+
+    Returns
+    -------
+    bool
+        公開を開始した場合True
+    """
+    if not args.metrics_port and not args.metrics_textfile:
+        return False
+
+    from src.core.metrics import metrics
+
+    if args.metrics_port and not metrics.start_http_server(args.metrics_port):
+        raise OSError(f"Could not serve metrics on port {args.metrics_port}")
+    if args.metrics_textfile and not metrics.start_textfile(args.metrics_textfile, HeadlessConfig.DEFAULT_METRICS_TEXTFILE_INTERVAL):
+        raise OSError(f"Could not write metrics to {args.metrics_textfile}")
+    return True
+
+
+def build_text_replacer(args):
+    """
+    コマンドライン引数から置換辞書を生成する
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+
+    Returns
+    -------
+    TextReplacer or None
+        置換辞書が指定されている場合はTextReplacer、それ以外はNone
+    """
+    if not args.replacements:
+        return None
+
+    from src.core.text_replacer import TextReplacer
+
+    return TextReplacer(load_replacements(args.replacements))
+
+
+def run_daemon(args):
+    """
+    ヘッドレスデーモンを実行する
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+
+    Returns
+    -------
+    int
+        終了コード
+    """
+    from src.headless.daemon import HeadlessDaemon
+    from src.headless.sinks import create_sink
+
+    sinks = [create_sink(name, args.output_file) for name in (args.output or [HeadlessConfig.DEFAULT_OUTPUT])]
+    daemon = HeadlessDaemon(
+        transcriber=build_transcriber(args),
+        sinks=sinks,
+        hotkey=args.hotkey,
+        language=args.language,
+        text_replacer=build_text_replacer(args),
+    )
+
+    # SIGTERMでも録音中の音声を文字起こししてから終了する
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+
+    return daemon.run()
+
+
+def run_server(args):
+    """
+    ローカル文字起こしサービスを実行する
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+
+    Returns
+    -------
+    int
+        終了コード
+    """
+    from src.headless.server import TOKEN_ENV, TranscriptionService, create_server, serve
+
+    service = TranscriptionService(
+        transcriber=build_transcriber(args),
+        language=args.language,
+        max_concurrent=args.max_concurrent,
+        max_queue=args.max_queue,
+        text_replacer=build_text_replacer(args),
+    )
+    token = args.token or os.environ.get(TOKEN_ENV)
+    server = create_server(service, args.host, args.port, args.socket, args.verbose, token)
+
+    # serve_foreverを実行しているスレッドからは停止できないため別スレッドで停止する
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+
+    return serve(server)
+
+
+def run_batch(args):
+    """
+    音声ファイルを一括で文字起こしする
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+
+    Returns
+    -------
+    int
+        終了コード
+    """
+    from src.headless.batch import BatchManifest, BatchTranscriber, collect_audio_files
+
+    files = collect_audio_files(args.inputs, args.recursive)
+    if not files:
+        print("No audio files found", file=sys.stderr)
+        return 1
+
+    resolve_batch_model(args)
+    batch = BatchTranscriber(
+        transcriber=build_transcriber(args),
+        output_format=args.format,
+        language=args.language,
+        max_workers=args.workers,
+        max_retries=args.retries,
+        manifest=BatchManifest(args.manifest),
+        overwrite=args.overwrite,
+        text_replacer=build_text_replacer(args),
+    )
+    return batch.run(files)
+
+
+def run_watch(args):
+    """
+    フォルダーを監視し、追加された音声ファイルを文字起こしする
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        解析済みのコマンドライン引数
+
+    Returns
+    -------
+    int
+        終了コード
+    """
+    from src.headless.batch import BatchManifest, BatchTranscriber
+    from src.headless.watcher import FolderWatcher, WatchIngestor
+
+    resolve_batch_model(args)
+    batch = BatchTranscriber(
+        transcriber=build_transcriber(args),
+        output_format=args.format,
+        language=args.language,
+        max_workers=args.workers,
+        max_retries=args.retries,
+        manifest=BatchManifest(args.manifest),
+        text_replacer=build_text_replacer(args),
+    )
+    ingestor = WatchIngestor(batch)
+    watcher = FolderWatcher(
+        args.directory,
+        ingestor.submit,
+        settle_seconds=args.settle_seconds,
+        recursive=args.recursive,
+        use_polling=args.poll,
+        poll_interval=args.poll_interval,
+    )
+
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+
+    print(f"Watching {watcher.directory} (Ctrl+C to exit)", file=sys.stderr)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ingestor.shutdown()
+    return 0
+
+
+def add_batch_arguments(parser):
+    """
+    一括文字起こしと監視モードの共通オプションをパーサーに追加する
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        オプションを追加するパーサー
+    """
+    parser.add_argument(
+        "--format",
+        choices=["srt", "vtt", "txt", "jsonl"],
+        default=HeadlessConfig.DEFAULT_BATCH_FORMAT,
+        help="output format written next to each audio file",
+    )
+    parser.add_argument("--recursive", action="store_true", help="include subdirectories")
+    # --modelを省略した場合はフォーマットに応じて決める（resolve_batch_model）
+    parser.set_defaults(model=None)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=HeadlessConfig.DEFAULT_BATCH_WORKERS,
+        help="maximum number of uploads running at once",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=HeadlessConfig.DEFAULT_BATCH_RETRIES,
+        help="number of times to retry a file that failed with a network error, 5xx or 429",
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="FILE",
+        default=HeadlessConfig.DEFAULT_BATCH_MANIFEST,
+        help="manifest of transcribed files used to resume and skip duplicates",
+    )
+
+
+def create_parser():
+    """
+    コマンドライン引数のパーサーを生成する
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        サブコマンドを含むパーサー
+    """
+    parser = argparse.ArgumentParser(
+        prog="open-super-whisper",
+        description="Open Super Whisper headless mode",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    daemon_parser = subparsers.add_parser("daemon", help="record with a global hotkey without the GUI")
+    add_transcriber_arguments(daemon_parser)
+    daemon_parser.add_argument("--hotkey", default=HeadlessConfig.DEFAULT_HOTKEY, help="global hotkey to start/stop recording")
+    daemon_parser.add_argument(
+        "--output",
+        action="append",
+        choices=["stdout", "clipboard", "file"],
+        help="where to write transcriptions (may be repeated; default: stdout)",
+    )
+    daemon_parser.add_argument("--output-file", metavar="FILE", help="file to append transcriptions to with --output file")
+    daemon_parser.set_defaults(handler=run_daemon)
+
+    serve_parser = subparsers.add_parser("serve", help="serve transcriptions over loopback HTTP or a Unix socket")
+    add_transcriber_arguments(serve_parser)
+    serve_parser.add_argument("--host", default=HeadlessConfig.DEFAULT_SERVER_HOST, help="address to listen on")
+    serve_parser.add_argument("--port", type=int, default=HeadlessConfig.DEFAULT_SERVER_PORT, help="port to listen on")
+    serve_parser.add_argument("--socket", metavar="PATH", help="listen on a Unix socket instead of HTTP")
+    serve_parser.add_argument(
+        "--token",
+        help="require 'Authorization: Bearer TOKEN' on every request; needed to listen on a non-loopback --host "
+        "(defaults to the OPEN_SUPER_WHISPER_SERVER_TOKEN environment variable)",
+    )
+    serve_parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=HeadlessConfig.DEFAULT_MAX_CONCURRENT,
+        help="maximum number of transcriptions running at once",
+    )
+    serve_parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=HeadlessConfig.DEFAULT_MAX_QUEUE,
+        help="maximum number of requests waiting for a slot before rejecting with 503",
+    )
+    serve_parser.add_argument("--verbose", action="store_true", help="log requests to stderr")
+    serve_parser.set_defaults(handler=run_server)
+
+    batch_parser = subparsers.add_parser("batch", help="transcribe a directory or glob of audio files")
+    batch_parser.add_argument("inputs", nargs="+", metavar="PATH", help="audio files, directories or glob patterns")
+    add_transcriber_arguments(batch_parser)
+    add_batch_arguments(batch_parser)
+    batch_parser.add_argument("--overwrite", action="store_true", help="transcribe files already recorded in the manifest")
+    batch_parser.set_defaults(handler=run_batch)
+
+    watch_parser = subparsers.add_parser("watch", help="transcribe audio files as they are added to a folder")
+    watch_parser.add_argument("directory", help="folder to watch")
+    add_transcriber_arguments(watch_parser)
+    add_batch_arguments(watch_parser)
+    watch_parser.add_argument(
+        "--settle-seconds",
+        type=float,
+        default=HeadlessConfig.DEFAULT_WATCH_SETTLE_SECONDS,
+        help="seconds a file must stay unchanged before it is considered fully written",
+    )
+    watch_parser.add_argument("--poll", action="store_true", help="poll the folder instead of using inotify (e.g. network shares)")
+    watch_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=HeadlessConfig.DEFAULT_WATCH_POLL_INTERVAL,
+        help="seconds between scans when polling",
+    )
+    watch_parser.set_defaults(handler=run_watch)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    ヘッドレスモードのエントリーポイント
+
+    Parameters
+    ----------
+    argv : list, optional
+        コマンドライン引数（省略時はsys.argv[1:]）
+
+    Returns
+    -------
+    int
+        終了コード
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    if getattr(args, "output", None) and "file" in args.output and not args.output_file:
+        parser.error("--output file requires --output-file")
+    if getattr(args, "max_concurrent", 1) < 1 or getattr(args, "max_queue", 0) < 0:
+        parser.error("--max-concurrent must be at least 1 and --max-queue must not be negative")
+    if args.requests_per_minute < 0 or args.audio_seconds_per_minute < 0 or args.max_in_flight < 0:
+        parser.error("rate limits must not be negative")
+    if getattr(args, "workers", 1) < 1 or getattr(args, "retries", 0) < 0:
+        parser.error("--workers must be at least 1 and --retries must not be negative")
+    if not 0 <= args.metrics_port <= 65535:
+        parser.error("--metrics-port must be between 0 and 65535")
+
+    from src.core.logging_config import setup_logging
+
+    metrics_started = False
+    try:
+        setup_logging(args.log_level, args.log_file)
+        metrics_started = start_metrics(args)
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if metrics_started:
+            from src.core.metrics import metrics
+
+            metrics.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+ヘッドレスモードのデフォルト設定値を定義するモジュール
+
+GUIの設定モジュールはPyQt6を読み込むため、ヘッドレスモードでは
+このモジュールの設定値を使用します。
+"""
+
+class HeadlessConfig:
+    """ヘッドレスモード全体の設定を管理するクラス"""
+    
+    # 機能設定
+    DEFAULT_HOTKEY = "ctrl+shift+r"
+    DEFAULT_MODEL = "gpt-4o-transcribe"
+    DEFAULT_OUTPUT = "stdout"
+    
+    # 言語設定
+    DEFAULT_LANGUAGE = ""  # 空文字列は自動検出を意味する
+    
+    # APIのレート制限の設定（0はアカウントの上限に従う、または制限しないことを意味する）
+    DEFAULT_REQUESTS_PER_MINUTE = 0
+    DEFAULT_AUDIO_SECONDS_PER_MINUTE = 0
+    DEFAULT_MAX_IN_FLIGHT = 4
+    
+    # ログの設定（進捗の表示と混ざらないよう、既定では警告以上のみ出力する）
+    DEFAULT_LOG_LEVEL = "WARNING"
+    
+    # メトリクスの設定（textfileコレクター用のファイルを書き出す間隔、秒）
+    DEFAULT_METRICS_TEXTFILE_INTERVAL = 15.0
+    
+    # ローカル文字起こしサービスの設定
+    DEFAULT_SERVER_HOST = "127.0.0.1"
+    DEFAULT_SERVER_PORT = 8765
+    DEFAULT_MAX_CONCURRENT = 4
+    DEFAULT_MAX_QUEUE = 16
+    
+    # 一括文字起こしの設定
+    DEFAULT_BATCH_FORMAT = "srt"
+    # srt、vtt、jsonlで使用するモデル（gpt-4o系はセグメントのタイムスタンプを返さない）
+    DEFAULT_TIMESTAMP_MODEL = "whisper-1"
+    DEFAULT_BATCH_WORKERS = 4
+    DEFAULT_BATCH_RETRIES = 2
+    DEFAULT_BATCH_MANIFEST = "transcription-manifest.jsonl"
+    
+    # 監視モードの設定
+    DEFAULT_WATCH_SETTLE_SECONDS = 2.0
+    DEFAULT_WATCH_POLL_INTERVAL = 2.0
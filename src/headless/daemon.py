@@ -0,0 +1,173 @@
+"""
+ヘッドレスデーモンモジュール
+
+PyQt6を使用せずに、グローバルホットキー、音声録音、文字起こしを連携させ、
+結果を標準出力、ファイル、クリップボードなどの出力先に書き出す常駐処理を提供します。
+"""
+
+import queue
+import sys
+import threading
+from typing import Iterable, Optional
+
+from src.core.audio_recorder import AudioRecorder
+from src.core.hotkeys import HotkeyManager
+from src.core.text_replacer import TextReplacer
+from src.core.whisper_api import WhisperTranscriber
+
+
+class HeadlessDaemon:
+    """
+    GUIなしで録音と文字起こしを行う常駐クラス
+
+    ホットキーのコールバックはキーボードリスナーのスレッドで呼ばれるため、
+    コマンドキューを介してメインループで録音の開始と停止を処理します。
+    文字起こしはバックグラウンドスレッドで実行し、録音の切り替えを妨げません。
+
+    Attributes
+    ----------
+    hotkey : str
+        録音の開始/停止に使用するホットキー
+    language : str or None
+        文字起こしの言語コード
+    """
+
+    # 停止要求を確認する間隔（秒）
+    POLL_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        transcriber: WhisperTranscriber,
+        sinks: Iterable,
+        hotkey: str,
+        language: Optional[str] = None,
+        recorder: Optional[AudioRecorder] = None,
+        hotkey_manager: Optional[HotkeyManager] = None,
+        text_replacer: Optional[TextReplacer] = None,
+    ):
+        """
+        HeadlessDaemonの初期化
+
+        Parameters
+        ----------
+        transcriber : WhisperTranscriber
+            文字起こしに使用するインスタンス
+        sinks : Iterable
+            文字起こし結果の出力先（``write(text)``メソッドを持つオブジェクト）
+        hotkey : str
+            録音の開始/停止に使用するホットキー
+        language : str, optional
+            文字起こしの言語コード
+        recorder : AudioRecorder, optional
+            音声録音に使用するインスタンス
+        hotkey_manager : HotkeyManager, optional
+            ホットキー管理に使用するインスタンス
+        text_replacer : TextReplacer, optional
+            文字起こし結果に適用する置換辞書
+        """
+        self.transcriber = transcriber
+        self.sinks = list(sinks)
+        self.hotkey = hotkey
+        self.language = language or None
+        self.recorder = recorder or AudioRecorder()
+        self.hotkey_manager = hotkey_manager or HotkeyManager()
+        self.text_replacer = text_replacer
+
+        self._commands = queue.Queue()
+        self._stopped = threading.Event()
+        self._transcription_threads = []
+
+    def toggle_recording(self):
+        """
+        録音の開始/停止を要求する
+
+        キーボードリスナーのスレッドから呼ばれても安全です。
+        """
+        self._commands.put("toggle")
+
+    def stop(self):
+        """
+        常駐処理の停止を要求する
+        """
+        self._stopped.set()
+        self._commands.put("stop")
+
+    def run(self):
+        """
+        ホットキーを登録し、停止が要求されるまで常駐する
+
+        Returns
+        -------
+        int
+            終了コード
+        """
+        if not self.hotkey_manager.register_hotkey(self.hotkey, self.toggle_recording):
+            print(f"Failed to register hotkey: {self.hotkey}", file=sys.stderr)
+            return 1
+
+        print(f"Listening for hotkey '{self.hotkey}' (Ctrl+C to exit)", file=sys.stderr)
+
+        try:
+            while not self._stopped.is_set():
+                try:
+                    command = self._commands.get(timeout=self.POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+
+                if command == "toggle":
+                    if self.recorder.is_recording():
+                        self._stop_recording()
+                    else:
+                        self._start_recording()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.hotkey_manager.stop_listener()
+            if self.recorder.is_recording():
+                self._stop_recording()
+            # 実行中の文字起こしの完了を待つ
+            for thread in self._transcription_threads:
+                thread.join()
+
+        return 0
+
+    def _start_recording(self):
+        """録音を開始する"""
+        self.recorder.start_recording()
+        print("Recording...", file=sys.stderr)
+
+    def _stop_recording(self):
+        """録音を停止し、バックグラウンドで文字起こしを開始する"""
+        audio_file = self.recorder.stop_recording()
+        if not audio_file:
+            print("No audio was recorded", file=sys.stderr)
+            return
+
+        print("Transcribing...", file=sys.stderr)
+        thread = threading.Thread(target=self._transcribe, args=(audio_file,), daemon=True)
+        self._transcription_threads = [t for t in self._transcription_threads if t.is_alive()]
+        self._transcription_threads.append(thread)
+        thread.start()
+
+    def _transcribe(self, audio_file):
+        """
+        音声ファイルを文字起こしし、結果を出力先に書き出す
+
+        Parameters
+        ----------
+        audio_file : str
+            文字起こしする音声ファイルのパス
+        """
+        try:
+            result = self.transcriber.transcribe(audio_file, self.language)
+        finally:
+            self.recorder.scratch.release(audio_file)
+        if result.startswith("Error: "):
+            print(result, file=sys.stderr)
+            return
+
+        if self.text_replacer:
+            result = self.text_replacer.apply(result)
+
+        for sink in self.sinks:
+            sink.write(result)
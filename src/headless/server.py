@@ -0,0 +1,604 @@
+"""
+ローカル文字起こしサービスモジュール
+
+1つのWhisperTranscriber（およびそのHTTP接続プール）を常駐プロセスで共有し、
+ループバックHTTPまたはUnixソケット経由でエディタやスクリプトから音声の
+アップロードや録音の開始/停止を受け付けて文字起こし結果を返します。
+
+ブラウザ上のページからのリクエスト（CSRFやDNSリバインディング）を防ぐため、
+HTTPではループバック以外のOriginとHostを拒否します。トークンを設定した場合は
+``Authorization: Bearer <トークン>``ヘッダーのないリクエストを拒否し、
+ループバック以外のアドレスで待ち受けるにはトークンの設定が必要です。
+"""
+
+import hmac
+import ipaddress
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.core.text_replacer import TextReplacer
+from src.core.transcript import Transcript
+from src.core.whisper_api import WhisperTranscriber
+
+# 認証トークンを指定する環境変数
+TOKEN_ENV = "OPEN_SUPER_WHISPER_SERVER_TOKEN"
+
+# ループバックとして扱うホスト名
+LOOPBACK_HOSTNAMES = ("localhost",)
+
+
+def is_loopback_host(host: str) -> bool:
+    """
+    ホスト名またはアドレスがループバックかどうかを判定する
+
+    Parameters
+    ----------
+    host : str
+        ホスト名またはIPアドレス（IPv6は角括弧なし）
+
+    Returns
+    -------
+    bool
+        ループバックの場合True
+    """
+    host = (host or "").lower().rstrip(".")
+    if host in LOOPBACK_HOSTNAMES or host.endswith(".localhost"):
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class ServiceBusyError(Exception):
+    """待機中のリクエストが上限に達しているときに送出される例外"""
+
+
+class TranscriptionService:
+    """
+    同時実行数と待機キューを制限して文字起こしを行うサービスクラス
+
+    同時に実行する文字起こしの数をセマフォで制限し、空きを待つリクエストが
+    上限を超えた場合は即座に拒否します。待機時間や処理時間などの
+    メトリクスを集計します。
+
+    Attributes
+    ----------
+    max_concurrent : int
+        同時に実行する文字起こしの最大数
+    max_queue : int
+        実行の空きを待つリクエストの最大数
+    """
+
+    # 出力フォーマットとContent-Type
+    CONTENT_TYPES = {
+        "text": "text/plain; charset=utf-8",
+        "srt": "application/x-subrip; charset=utf-8",
+        "vtt": "text/vtt; charset=utf-8",
+        "jsonl": "application/x-ndjson; charset=utf-8",
+    }
+
+    def __init__(
+        self,
+        transcriber: WhisperTranscriber,
+        language: Optional[str] = None,
+        max_concurrent: int = 4,
+        max_queue: int = 16,
+        text_replacer: Optional[TextReplacer] = None,
+        recorder=None,
+    ):
+        """
+        TranscriptionServiceの初期化
+
+        Parameters
+        ----------
+        transcriber : WhisperTranscriber
+            すべてのリクエストで共有するインスタンス
+        language : str, optional
+            リクエストで指定されない場合の言語コード
+        max_concurrent : int, optional
+            同時に実行する文字起こしの最大数 (デフォルト: 4)
+        max_queue : int, optional
+            実行の空きを待つリクエストの最大数 (デフォルト: 16)
+        text_replacer : TextReplacer, optional
+            文字起こし結果に適用する置換辞書
+        recorder : AudioRecorder, optional
+            録音コマンドで使用するインスタンス（省略時は最初の録音時に生成）
+        """
+        self.transcriber = transcriber
+        self.language = language or None
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.text_replacer = text_replacer
+        self.recorder = recorder
+
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._recorder_lock = threading.Lock()
+        self._started_at = time.monotonic()
+
+        # メトリクス
+        self._queued = 0
+        self._in_flight = 0
+        self._max_queued = 0
+        self._requests = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._processing_seconds = 0.0
+        self._audio_bytes = 0
+
+    def _acquire(self) -> float:
+        """
+        実行の空きを待つ
+
+        Returns
+        -------
+        float
+            待機時間（秒）
+
+        Raises
+        ------
+        ServiceBusyError
+            待機中のリクエストが上限に達している場合
+        """
+        with self._lock:
+            self._requests += 1
+            if self._slots.acquire(blocking=False):
+                self._in_flight += 1
+                return 0.0
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise ServiceBusyError("Too many pending transcription requests")
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+
+        start = time.monotonic()
+        self._slots.acquire()
+        waited = time.monotonic() - start
+
+        with self._lock:
+            self._queued -= 1
+            self._in_flight += 1
+            self._wait_seconds += waited
+        return waited
+
+    def _release(self, processing_seconds: float, succeeded: bool) -> None:
+        """実行枠を解放し、メトリクスを更新する"""
+        with self._lock:
+            self._in_flight -= 1
+            self._processing_seconds += processing_seconds
+            if succeeded:
+                self._completed += 1
+            else:
+                self._failed += 1
+        self._slots.release()
+
+    def transcribe(self, audio, language: Optional[str] = None, fmt: str = "text") -> Tuple[bool, str]:
+        """
+        音声を文字起こしする
+
+        Parameters
+        ----------
+        audio : str or tuple
+            音声ファイルのパス、または(ファイル名, バイト列)の組
+        language : str, optional
+            文字起こしの言語コード（省略時はサービスの既定値）
+        fmt : str, optional
+            出力フォーマット："text"、"srt"、"vtt"、または"jsonl"
+
+        Returns
+        -------
+        Tuple[bool, str]
+            成功したかどうかと、文字起こし結果またはエラーメッセージ
+
+        Raises
+        ------
+        ServiceBusyError
+            待機中のリクエストが上限に達している場合
+        """
+        if fmt not in self.CONTENT_TYPES:
+            raise ValueError(f"Unsupported format: {fmt}")
+
+        self._acquire()
+        start = time.monotonic()
+        succeeded = False
+        try:
+            if isinstance(audio, tuple):
+                with self._lock:
+                    self._audio_bytes += len(audio[1])
+
+            # verbose_jsonに対応しないモデルではjsonを要求し、全体を1つのセグメントとして出力する
+            if fmt == "text":
+                response_format = "text"
+            else:
+                response_format = self.transcriber.timestamp_response_format()
+            result = self.transcriber.transcribe(audio, language or self.language, response_format)
+            if isinstance(result, str) and result.startswith("Error: "):
+                return False, result[len("Error: "):]
+
+            if isinstance(result, Transcript):
+                if self.text_replacer:
+                    result = result.map_text(self.text_replacer.apply)
+                output = result.to_srt() if fmt == "srt" else result.to_vtt() if fmt == "vtt" else result.to_jsonl()
+            else:
+                output = self.text_replacer.apply(result) if self.text_replacer else result
+
+            succeeded = True
+            return True, output
+        finally:
+            self._release(time.monotonic() - start, succeeded)
+
+    def start_recording(self) -> bool:
+        """
+        マイクからの録音を開始する
+
+        Returns
+        -------
+        bool
+            録音を開始した場合True、すでに録音中の場合False
+        """
+        with self._recorder_lock:
+            if self.recorder is None:
+                # 音声デバイスはアップロードのみの利用では不要なため遅延して読み込む
+                from src.core.audio_recorder import AudioRecorder
+                self.recorder = AudioRecorder()
+            if self.recorder.is_recording():
+                return False
+            self.recorder.start_recording()
+            return True
+
+    def stop_recording(self) -> Optional[str]:
+        """
+        録音を停止する
+
+        Returns
+        -------
+        str or None
+            録音した音声ファイルのパス、録音中でない場合はNone
+        """
+        with self._recorder_lock:
+            if self.recorder is None or not self.recorder.is_recording():
+                return None
+            return self.recorder.stop_recording()
+
+    def is_recording(self) -> bool:
+        """録音中かどうかを返す"""
+        return self.recorder is not None and self.recorder.is_recording()
+
+    def get_metrics(self) -> Dict:
+        """
+        現在のメトリクスを取得する
+
+        Returns
+        -------
+        Dict
+            キューの状態と累計値を含む辞書
+        """
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "uptime_seconds": round(time.monotonic() - self._started_at, 3),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": self._queued,
+                "max_queued": self._max_queued,
+                "requests_total": self._requests,
+                "completed_total": self._completed,
+                "failed_total": self._failed,
+                "rejected_total": self._rejected,
+                "audio_bytes_total": self._audio_bytes,
+                "wait_seconds_total": round(self._wait_seconds, 6),
+                "processing_seconds_total": round(self._processing_seconds, 6),
+                "average_wait_ms": round(self._wait_seconds / finished * 1000, 3) if finished else 0.0,
+                "average_processing_ms": round(self._processing_seconds / finished * 1000, 3) if finished else 0.0,
+                "recording": self.is_recording(),
+                "rate_limit": self.transcriber.get_rate_limit_state(),
+            }
+
+
+class TranscriptionRequestHandler(BaseHTTPRequestHandler):
+    """
+    文字起こしサービスのHTTPリクエストハンドラー
+
+    エンドポイント:
+        GET  /health             稼働確認
+        GET  /metrics            キューとリクエストのメトリクス（JSON）
+        POST /transcribe         リクエスト本文の音声を文字起こし
+                                 （クエリ: language, format, filename）
+        POST /record/start       マイクからの録音を開始
+        POST /record/stop        録音を停止して文字起こし（クエリ: language, format）
+
+    サーバーにトークンが設定されている場合は、すべてのエンドポイントで
+    ``Authorization: Bearer <トークン>``ヘッダーが必要です。
+    """
+
+    # エディタなどのクライアントが接続を再利用できるようにする
+    protocol_version = "HTTP/1.1"
+    server_version = "OpenSuperWhisper"
+
+    # アップロードできる音声の最大サイズ（OpenAI APIの上限）
+    MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+    @property
+    def service(self) -> TranscriptionService:
+        return self.server.service
+
+    def address_string(self):
+        # Unixソケットではクライアントアドレスが空文字列になる
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"
+
+    def log_message(self, format, *args):
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: str, content_type: str, headers: Optional[Dict[str, str]] = None):
+        """レスポンスを送信する"""
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        """JSONレスポンスを送信する"""
+        self._send(status, json.dumps(payload, ensure_ascii=False), "application/json; charset=utf-8", headers)
+
+    def _send_error(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        """エラーレスポンスを送信する"""
+        self._send_json(status, {"error": message}, headers)
+
+    def _read_body(self, required: bool = True) -> Optional[bytes]:
+        """
+        リクエスト本文を読み込む（不正な場合はエラーを送信してNoneを返す）
+
+        Parameters
+        ----------
+        required : bool, optional
+            Content-Lengthを必須とする場合True。Falseの場合、Content-Lengthのない
+            リクエスト（``curl -X POST``など）は本文が空であるとみなします。
+        """
+        if not required and "Content-Length" not in self.headers:
+            # 読み込まない本文（chunkedなど）が次のリクエストとして解釈されないよう接続を閉じる
+            if "Transfer-Encoding" in self.headers:
+                self.close_connection = True
+            return b""
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._send_error(411, "Content-Length is required")
+            return None
+        if length > self.MAX_UPLOAD_BYTES:
+            self.close_connection = True
+            self._send_error(413, f"Audio exceeds {self.MAX_UPLOAD_BYTES} bytes")
+            return None
+        return self.rfile.read(length)
+
+    def _check_access(self) -> bool:
+        """
+        リクエストの送信元を確認する（拒否する場合はエラーを送信してFalseを返す）
+
+        Returns
+        -------
+        bool
+            リクエストを処理してよい場合True
+        """
+        # Unixソケットはファイルのパーミッションで接続元を制限する
+        if isinstance(self.server, ThreadingHTTPServer):
+            # ブラウザはクロスオリジンのリクエストにOriginヘッダーを付ける
+            origin = self.headers.get("Origin")
+            if origin is not None and not is_loopback_host(urlsplit(origin).hostname or ""):
+                self._send_error(403, "Cross-origin requests are not allowed")
+                return False
+            # トークンがない場合、DNSリバインディングで解決されたホスト名を拒否する
+            if not self.server.token:
+                host = urlsplit(f"//{self.headers.get('Host', '')}").hostname or ""
+                if not is_loopback_host(host):
+                    self._send_error(403, "Host header must be a loopback address")
+                    return False
+
+        token = getattr(self.server, "token", None)
+        if token:
+            scheme, _, credentials = self.headers.get("Authorization", "").partition(" ")
+            if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.strip().encode("utf-8"), token.encode("utf-8")):
+                self._send_error(401, "Missing or invalid bearer token", {"WWW-Authenticate": "Bearer"})
+                return False
+        return True
+
+    def _transcribe(self, audio, query: Dict[str, str]):
+        """文字起こしを実行してレスポンスを送信する"""
+        fmt = query.get("format", "text")
+        if fmt not in TranscriptionService.CONTENT_TYPES:
+            self._send_error(400, f"Unsupported format: {fmt}")
+            return
+
+        try:
+            succeeded, output = self.service.transcribe(audio, query.get("language"), fmt)
+        except ServiceBusyError as e:
+            self._send_error(503, str(e), {"Retry-After": "1"})
+            return
+
+        if succeeded:
+            self._send(200, output, TranscriptionService.CONTENT_TYPES[fmt])
+        else:
+            self._send_error(502, output)
+
+    def do_GET(self):
+        if not self._check_access():
+            return
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/metrics":
+            self._send_json(200, self.service.get_metrics())
+        else:
+            self._send_error(404, "Not found")
+
+    def do_POST(self):
+        if not self._check_access():
+            # 読み込まなかった本文が次のリクエストとして解釈されないよう接続を閉じる
+            self.close_connection = True
+            return
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if url.path == "/transcribe":
+            body = self._read_body()
+            if body is None:
+                return
+            if not body:
+                self._send_error(400, "Request body must contain audio data")
+                return
+            # APIはファイル名の拡張子から音声形式を判定する
+            filename = os.path.basename(query.get("filename", "")) or "audio.wav"
+            self._transcribe((filename, body), query)
+
+        elif url.path == "/record/start":
+            if self._read_body(required=False) is None:
+                return
+            try:
+                started = self.service.start_recording()
+            except Exception as e:
+                self._send_error(500, f"Failed to start recording: {e}")
+                return
+            if started:
+                self._send_json(200, {"status": "recording"})
+            else:
+                self._send_error(409, "Already recording")
+
+        elif url.path == "/record/stop":
+            if self._read_body(required=False) is None:
+                return
+            audio_file = self.service.stop_recording()
+            if not audio_file:
+                self._send_error(409, "Not recording")
+                return
+            try:
+                self._transcribe(audio_file, query)
+            finally:
+                self.service.recorder.scratch.release(audio_file)
+
+        else:
+            self._send_error(404, "Not found")
+
+
+class TranscriptionHTTPServer(ThreadingHTTPServer):
+    """ループバックアドレスで待ち受ける文字起こしサーバー"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: TranscriptionService, verbose: bool = False,
+                 token: Optional[str] = None):
+        self.service = service
+        self.verbose = verbose
+        self.token = token or None
+        super().__init__(address, TranscriptionRequestHandler)
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class TranscriptionUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """Unixソケットで待ち受ける文字起こしサーバー"""
+
+        daemon_threads = True
+
+        def __init__(self, path: str, service: TranscriptionService, verbose: bool = False,
+                     token: Optional[str] = None):
+            self.service = service
+            self.verbose = verbose
+            self.token = token or None
+            # 前回の異常終了で残ったソケットファイルを取り除く
+            if os.path.exists(path):
+                os.unlink(path)
+            super().__init__(path, TranscriptionRequestHandler)
+            os.chmod(path, 0o600)
+
+        def get_request(self):
+            request, _ = super().get_request()
+            return request, ("unix", 0)
+
+        def server_close(self):
+            super().server_close()
+            try:
+                os.unlink(self.server_address)
+            except OSError:
+                pass
+
+
+def create_server(service: TranscriptionService, host: str = "127.0.0.1", port: int = 0,
+                  socket_path: Optional[str] = None, verbose: bool = False, token: Optional[str] = None):
+    """
+    文字起こしサーバーを生成する
+
+    Parameters
+    ----------
+    service : TranscriptionService
+        リクエストを処理するサービス
+    host : str, optional
+        HTTPで待ち受けるアドレス (デフォルト: "127.0.0.1")
+    port : int, optional
+        HTTPで待ち受けるポート番号
+    socket_path : str, optional
+        指定された場合はHTTPの代わりにこのUnixソケットで待ち受ける
+    verbose : bool, optional
+        リクエストのログを標準エラー出力に出力する場合True
+    token : str, optional
+        リクエストに要求するBearerトークン（ループバック以外で待ち受ける場合は必須）
+
+    Returns
+    -------
+    socketserver.BaseServer
+        生成したサーバー
+
+    Raises
+    ------
+    ValueError
+        トークンなしでループバック以外のアドレスを指定した場合
+    """
+    if socket_path:
+        if not hasattr(socketserver, "UnixStreamServer"):
+            raise ValueError("Unix sockets are not supported on this platform")
+        return TranscriptionUnixServer(socket_path, service, verbose, token)
+    if not token and not is_loopback_host(host):
+        raise ValueError(f"Listening on a non-loopback address requires a token: {host}")
+    return TranscriptionHTTPServer((host, port), service, verbose, token)
+
+
+def serve(server) -> int:
+    """
+    停止が要求されるまでリクエストを処理する
+
+    Parameters
+    ----------
+    server : socketserver.BaseServer
+        create_serverで生成したサーバー
+
+    Returns
+    -------
+    int
+        終了コード
+    """
+    address = server.server_address
+    location = address if isinstance(address, str) else f"http://{address[0]}:{address[1]}"
+    print(f"Serving transcriptions on {location} (Ctrl+C to exit)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
@@ -0,0 +1,186 @@
+"""
+文字起こし結果の出力先モジュール
+
+ヘッドレスモードで文字起こし結果を書き出す出力先（標準出力、ファイル、
+クリップボード）を提供します。クリップボードはQtを使用せず、
+各プラットフォームのコマンドを利用します。
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StdoutSink:
+    """
+    文字起こし結果を標準出力に書き出す出力先
+    """
+
+    def write(self, text: str) -> bool:
+        """
+        文字起こし結果を書き出す
+
+        Parameters
+        ----------
+        text : str
+            文字起こし結果
+
+        Returns
+        -------
+        bool
+            書き出しの成功・失敗
+        """
+        sys.stdout.write(text + "\n")
+        sys.stdout.flush()
+        return True
+
+
+class FileSink:
+    """
+    文字起こし結果をファイルに追記する出力先
+
+    Attributes
+    ----------
+    path : str
+        書き込み先のファイルパス
+    timestamps : bool
+        各結果の前に時刻を付けるかどうか
+    """
+
+    def __init__(self, path: str, timestamps: bool = True):
+        """
+        FileSinkの初期化
+
+        Parameters
+        ----------
+        path : str
+            書き込み先のファイルパス
+        timestamps : bool, optional
+            各結果の前に時刻を付けるかどうか (デフォルト: True)
+        """
+        self.path = path
+        self.timestamps = timestamps
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> bool:
+        """
+        文字起こし結果をファイルに追記する
+
+        Parameters
+        ----------
+        text : str
+            文字起こし結果
+
+        Returns
+        -------
+        bool
+            書き出しの成功・失敗
+        """
+        line = text
+        if self.timestamps:
+            line = f"[{datetime.now().isoformat(timespec='seconds')}] {text}"
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            return True
+        except OSError as e:
+            logger.error("Failed to write transcription to %s: %s", self.path, e)
+            return False
+
+
+class ClipboardSink:
+    """
+    文字起こし結果をクリップボードにコピーする出力先
+
+    macOSでは``pbcopy``、Windowsでは``clip``、Linuxでは``wl-copy``、``xclip``、
+    ``xsel``のうち最初に見つかったコマンドを使用します。
+    """
+
+    def __init__(self):
+        """ClipboardSinkの初期化"""
+        self.command = self.find_clipboard_command()
+
+    @staticmethod
+    def find_clipboard_command() -> Optional[List[str]]:
+        """
+        利用可能なクリップボードコマンドを探す
+
+        Returns
+        -------
+        Optional[List[str]]
+            クリップボードにコピーするコマンド、見つからない場合はNone
+        """
+        if sys.platform == "darwin":
+            candidates = [["pbcopy"]]
+        elif sys.platform == "win32":
+            candidates = [["clip"]]
+        else:
+            candidates = []
+            if os.environ.get("WAYLAND_DISPLAY"):
+                candidates.append(["wl-copy"])
+            candidates += [["xclip", "-selection", "clipboard"], ["xsel", "--clipboard", "--input"]]
+
+        for command in candidates:
+            if shutil.which(command[0]):
+                return command
+        return None
+
+    def write(self, text: str) -> bool:
+        """
+        文字起こし結果をクリップボードにコピーする
+
+        Parameters
+        ----------
+        text : str
+            文字起こし結果
+
+        Returns
+        -------
+        bool
+            コピーの成功・失敗
+        """
+        if not self.command:
+            logger.error("No clipboard command found (install wl-clipboard, xclip or xsel)")
+            return False
+        # Windowsのclipコマンドはシステムのコードページではなく UTF-16 を受け付ける
+        encoding = "utf-16" if sys.platform == "win32" else "utf-8"
+        try:
+            subprocess.run(self.command, input=text.encode(encoding), check=True, timeout=5)
+            return True
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error("Failed to copy transcription to clipboard: %s", e)
+            return False
+
+
+def create_sink(name: str, path: Optional[str] = None):
+    """
+    名前から出力先を生成する
+
+    Parameters
+    ----------
+    name : str
+        出力先の名前："stdout"、"file"、または"clipboard"
+    path : str, optional
+        "file"の場合の書き込み先ファイルパス
+
+    Returns
+    -------
+    StdoutSink or FileSink or ClipboardSink
+        生成された出力先
+    """
+    if name == "stdout":
+        return StdoutSink()
+    if name == "clipboard":
+        return ClipboardSink()
+    if name == "file":
+        if not path:
+            raise ValueError("An output file path is required for the file sink")
+        return FileSink(path)
+    raise ValueError(f"Unknown output sink: {name}")
@@ -0,0 +1,457 @@
+"""
+監視フォルダーからの取り込みモジュール
+
+フォルダーに追加された音声ファイルをinotify（利用できない環境ではポーリング）で
+検出し、書き込みが完了したことを確認してから内容のハッシュ値で重複を除き、
+文字起こしのキューに投入します。
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.headless.batch import AUDIO_EXTENSIONS, BatchTranscriber
+
+logger = logging.getLogger(__name__)
+
+# inotifyのイベントマスク（linux/inotify.h）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+# inotify_event構造体のヘッダー（wd, mask, cookie, len）
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def file_digest(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    ファイルの内容のハッシュ値を計算する
+
+    Parameters
+    ----------
+    path : Path
+        ハッシュ値を計算するファイルのパス
+    chunk_size : int, optional
+        一度に読み込むバイト数
+
+    Returns
+    -------
+    str
+        BLAKE2bによる16進数のハッシュ値
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _is_audio_file(path: Path) -> bool:
+    """取り込み対象の音声ファイルかどうかを判定する（隠しファイルを除く）"""
+    return path.suffix.lower() in AUDIO_EXTENSIONS and not path.name.startswith(".")
+
+
+class InotifyEventSource:
+    """
+    inotifyでフォルダー内の変更を検出するイベントソース
+
+    ctypesでlibcのinotify関数を直接呼び出すため、追加の依存関係は不要です。
+    """
+
+    # 監視するイベント
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+
+    def __init__(self, directory: Path, recursive: bool = False):
+        """
+        InotifyEventSourceの初期化
+
+        Parameters
+        ----------
+        directory : Path
+            監視するフォルダー
+        recursive : bool, optional
+            サブフォルダーも監視する場合True
+
+        Raises
+        ------
+        OSError
+            inotifyが利用できない場合
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.directory = directory
+        self.recursive = recursive
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+        self._watches: Dict[int, Path] = {}
+        self._add_watch(directory)
+        if recursive:
+            for root, dirs, _ in os.walk(directory):
+                for name in dirs:
+                    self._add_watch(Path(root) / name)
+
+    def _add_watch(self, directory: Path) -> None:
+        """フォルダーを監視対象に追加する"""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed for {directory}: {os.strerror(errno)}")
+        self._watches[wd] = directory
+
+    def read(self, timeout: float) -> Optional[List[Path]]:
+        """
+        変更されたファイルを取得する
+
+        Parameters
+        ----------
+        timeout : float
+            イベントを待つ最大時間（秒）
+
+        Returns
+        -------
+        List[Path] or None
+            変更されたファイルのパス。イベントが溢れて取りこぼした可能性がある
+            場合はNone（呼び出し側でフォルダーを走査し直す）
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        overflowed = False
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                overflowed = True
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                # 新しいサブフォルダーを監視し、作成前に置かれたファイルを取り込む
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        self._add_watch(path)
+                    except OSError:
+                        continue
+                    paths.extend(p for p in path.rglob("*") if p.is_file())
+                continue
+            paths.append(path)
+
+        return None if overflowed else paths
+
+    def close(self) -> None:
+        """inotifyのファイル記述子を閉じる"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingEventSource:
+    """
+    フォルダーを定期的に走査して変更を検出するイベントソース
+
+    inotifyが利用できない環境や、他のホストからの書き込みがinotifyに
+    通知されないネットワーク共有で使用します。
+    """
+
+    def __init__(self, directory: Path, recursive: bool = False, interval: float = 2.0):
+        """
+        PollingEventSourceの初期化
+
+        Parameters
+        ----------
+        directory : Path
+            監視するフォルダー
+        recursive : bool, optional
+            サブフォルダーも監視する場合True
+        interval : float, optional
+            走査の間隔（秒）
+        """
+        self.directory = directory
+        self.recursive = recursive
+        self.interval = interval
+        self._snapshot: Dict[Path, Tuple[int, int]] = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        """フォルダー内の音声ファイルのサイズと更新日時を取得する"""
+        snapshot = {}
+        stack = [self.directory]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.recursive:
+                            stack.append(Path(entry.path))
+                    elif entry.is_file():
+                        path = Path(entry.path)
+                        if _is_audio_file(path):
+                            stat = entry.stat()
+                            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue
+        return snapshot
+
+    def read(self, timeout: float) -> Optional[List[Path]]:
+        """
+        前回の走査から変更されたファイルを取得する
+
+        Parameters
+        ----------
+        timeout : float
+            次の走査までの最大待機時間（秒）
+
+        Returns
+        -------
+        List[Path]
+            追加または変更されたファイルのパス
+        """
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = [path for path, state in snapshot.items() if self._snapshot.get(path) != state]
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        """何もしない（インターフェースをInotifyEventSourceと揃えるため）"""
+
+
+class FolderWatcher:
+    """
+    フォルダーを監視し、書き込みが完了した音声ファイルを通知するクラス
+
+    変更が検出されたファイルは、サイズと更新日時が一定時間変化しなくなった
+    時点で書き込み完了とみなします。起動時にフォルダー内の既存のファイルも
+    一度だけ通知します。
+
+    Attributes
+    ----------
+    directory : Path
+        監視するフォルダー
+    settle_seconds : float
+        書き込み完了とみなすまでにファイルが変化しない時間（秒）
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        on_ready: Callable[[Path], None],
+        settle_seconds: float = 2.0,
+        recursive: bool = False,
+        use_polling: bool = False,
+        poll_interval: float = 2.0,
+    ):
+        """
+        FolderWatcherの初期化
+
+        Parameters
+        ----------
+        directory : str
+            監視するフォルダー
+        on_ready : Callable[[Path], None]
+            書き込みが完了したファイルを受け取るコールバック
+        settle_seconds : float, optional
+            書き込み完了とみなすまでにファイルが変化しない時間（秒）
+        recursive : bool, optional
+            サブフォルダーも監視する場合True
+        use_polling : bool, optional
+            inotifyを使用せずポーリングする場合True
+        poll_interval : float, optional
+            ポーリングの間隔（秒）
+        """
+        self.directory = Path(directory).resolve()
+        if not self.directory.is_dir():
+            raise ValueError(f"Not a directory: {directory}")
+
+        self.on_ready = on_ready
+        self.settle_seconds = settle_seconds
+        self.recursive = recursive
+        self._stopped = threading.Event()
+
+        # 書き込み完了を待っているファイルと、最後に確認したサイズ・更新日時・変化した時刻
+        self._pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+
+        self.source = None
+        if not use_polling:
+            try:
+                self.source = InotifyEventSource(self.directory, recursive)
+            except (OSError, AttributeError) as e:
+                logger.warning("inotify is unavailable, falling back to polling: %s", e)
+        if self.source is None:
+            self.source = PollingEventSource(self.directory, recursive, poll_interval)
+
+    def _existing_files(self) -> List[Path]:
+        """フォルダー内の既存の音声ファイルを列挙する"""
+        pattern = self.directory.rglob("*") if self.recursive else self.directory.iterdir()
+        return [path for path in pattern if path.is_file()]
+
+    def _touch(self, path: Path, now: float) -> None:
+        """変更されたファイルを書き込み完了待ちに登録する"""
+        if not _is_audio_file(path):
+            return
+        try:
+            stat = path.stat()
+        except OSError:
+            self._pending.pop(path, None)
+            return
+        state = (stat.st_size, stat.st_mtime_ns)
+        previous = self._pending.get(path)
+        if previous is None or previous[0] != state:
+            self._pending[path] = (state, now)
+
+    def _check_pending(self, now: float) -> None:
+        """一定時間変化していないファイルを通知する"""
+        for path, (state, changed_at) in list(self._pending.items()):
+            try:
+                stat = path.stat()
+            except OSError:
+                del self._pending[path]
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != state:
+                self._pending[path] = (current, now)
+            elif now - changed_at >= self.settle_seconds and stat.st_size > 0:
+                del self._pending[path]
+                self.on_ready(path)
+
+    def stop(self) -> None:
+        """監視の停止を要求する"""
+        self._stopped.set()
+
+    def run(self) -> None:
+        """停止が要求されるまでフォルダーを監視する"""
+        now = time.monotonic()
+        for path in self._existing_files():
+            self._touch(path, now)
+
+        try:
+            while not self._stopped.is_set():
+                # 書き込み完了待ちのファイルがある場合は短い間隔で確認する
+                timeout = min(self.settle_seconds / 2, 1.0) if self._pending else 1.0
+                changed = self.source.read(timeout)
+                now = time.monotonic()
+                if changed is None:
+                    changed = self._existing_files()
+                for path in changed:
+                    self._touch(path, now)
+                self._check_pending(now)
+        finally:
+            self.source.close()
+
+
+class WatchIngestor:
+    """
+    書き込みが完了した音声ファイルを重複を除いて文字起こしするクラス
+
+    同じ内容の音声がすでに処理済み、または処理待ちの場合は取り込みません。
+
+    Attributes
+    ----------
+    batch : BatchTranscriber
+        文字起こしと出力ファイルの書き出しに使用するインスタンス
+    """
+
+    def __init__(self, batch: BatchTranscriber):
+        """
+        WatchIngestorの初期化
+
+        Parameters
+        ----------
+        batch : BatchTranscriber
+            文字起こしと出力ファイルの書き出しに使用するインスタンス
+        """
+        self.batch = batch
+        self._executor = ThreadPoolExecutor(max_workers=batch.max_workers)
+        self._lock = threading.Lock()
+        self._in_progress = set()
+
+    def submit(self, path: Path) -> bool:
+        """
+        音声ファイルを文字起こしのキューに投入する
+
+        Parameters
+        ----------
+        path : Path
+            書き込みが完了した音声ファイルのパス
+
+        Returns
+        -------
+        bool
+            キューに投入した場合True、重複のため取り込まなかった場合False
+        """
+        manifest = self.batch.manifest
+        # 再起動時に既存のファイルを読み直さないよう、処理済みのファイルはハッシュ値を計算せずに飛ばす
+        try:
+            if manifest and manifest.is_done(path, self.batch.output_path(path)):
+                return False
+            digest = file_digest(path)
+        except OSError as e:
+            logger.error("Failed to read %s: %s", path, e)
+            return False
+
+        with self._lock:
+            if digest in self._in_progress or (manifest and manifest.has_digest(digest)):
+                print(f"Skipping duplicate: {path}", file=sys.stderr)
+                return False
+            self._in_progress.add(digest)
+
+        print(f"Queued: {path}", file=sys.stderr)
+        self._executor.submit(self._process, path, digest)
+        return True
+
+    def _process(self, path: Path, digest: str) -> None:
+        """音声ファイルを文字起こしする（ワーカースレッドで実行）"""
+        try:
+            output = self.batch.process(path, digest)
+            print(f"{path} -> {output}", file=sys.stderr)
+        except Exception as e:
+            logger.error("Failed to transcribe %s: %s", path, e)
+        finally:
+            with self._lock:
+                self._in_progress.discard(digest)
+
+    def shutdown(self) -> None:
+        """実行中の文字起こしの完了を待って終了する"""
+        self._executor.shutdown(wait=True, cancel_futures=True)